@@ -173,7 +173,10 @@ class AIHandler(commands.Cog):
                 )
             ) else None
             self.bm25_manager = (
-                BM25IndexManager(config.BM25_DATABASE_PATH)
+                BM25IndexManager(
+                    config.BM25_DATABASE_PATH,
+                    read_pool_size=config.BM25_READ_POOL_SIZE,
+                )
                 if config.BM25_DATABASE_PATH
                 else None
             )
@@ -183,6 +186,7 @@ class AIHandler(commands.Cog):
                     model_name=config.RAG_RERANKER_MODEL_NAME,
                     device=config.RAG_RERANKER_DEVICE,
                     score_threshold=config.RAG_RERANKER_SCORE_THRESHOLD,
+                    dtype=config.RAG_RERANKER_DTYPE,
                 )
                 self.reranker = Reranker(reranker_config)
             self.hybrid_search_engine = HybridSearchEngine(
@@ -413,6 +417,12 @@ class AIHandler(commands.Cog):
     async def cog_unload(self) -> None:
         """reload/종료 시 worker와 미처리 접수 표시를 정리합니다."""
         await self.close_ai_queue()
+        # 임베딩 저장소가 재사용하던 SQLite 연결을 닫는다.
+        for store in (self.discord_embedding_store, self.kakao_embedding_store):
+            if store is not None:
+                await store.close()
+        if self.bm25_manager is not None:
+            await self.bm25_manager.close()
 
     async def _ensure_ai_queue_workers(self) -> None:
         if self._ai_queue_closing or self._ai_queue_workers:
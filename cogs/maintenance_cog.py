@@ -78,6 +78,13 @@ class MaintenanceCog(commands.Cog):
                 self.bot.db,
                 config.RAG_ARCHIVING_CONFIG.get("activity_log_retention_days", 0),
             )
+            # 한도 집계 창을 지난 api_call_log 행은 요청 경로가 아닌 여기서 정리한다.
+            await db_utils.prune_api_call_log(
+                self.bot.db,
+                config.RAG_ARCHIVING_CONFIG.get("api_call_log_retention_days", 0),
+            )
+            # 아카이빙으로 생긴 WAL을 정리해 파일 크기가 계속 커지지 않게 한다.
+            await db_utils.checkpoint_wal(self.bot.db)
             logger.info("정기 RAG 아카이빙 작업을 성공적으로 완료했습니다.")
         except Exception as e:
             try:
@@ -216,9 +216,13 @@ class ToolsCog(commands.Cog):
             loop = asyncio.get_running_loop()
         except RuntimeError:
             return
-        task = loop.create_task(kakao.close_kakao_session())
-        self._cleanup_tasks.add(task)
-        task.add_done_callback(self._cleanup_tasks.discard)
+        for close_session in (
+            kakao.close_kakao_session,
+            exchange_rate.close_exchange_session,
+        ):
+            task = loop.create_task(close_session())
+            self._cleanup_tasks.add(task)
+            task.add_done_callback(self._cleanup_tasks.discard)
 
     # --- 고수준 메타 도구 --- #
 
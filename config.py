@@ -1165,6 +1165,25 @@ EMBEDDING_MAX_CONCURRENCY = min(
         as_int(load_config_value("EMBEDDING_MAX_CONCURRENCY", 1), 1),
     ),
 )
+# 같은 입력 문자열의 encode 결과를 재사용하는 LRU 크기. 0이면 캐시하지 않는다.
+_embedding_cache_default = 1_000 if PROFILE == "general" else 10_000
+EMBEDDING_CACHE_SIZE = max(
+    0,
+    as_int(
+        load_config_value("EMBEDDING_CACHE_SIZE", _embedding_cache_default),
+        _embedding_cache_default,
+    ),
+)
+# 동시에 들어온 get_embedding 호출을 이 시간(ms) 동안 모아 한 번의 배치
+# encode로 처리한다. 모든 호출이 이만큼 기다리므로 기본은 0(호출마다 바로
+# encode)이고, 동시 임베딩 요청이 많은 배포에서만 켠다.
+EMBEDDING_COALESCE_WINDOW_MS = min(
+    100.0,
+    max(
+        0.0,
+        as_float(load_config_value("EMBEDDING_COALESCE_WINDOW_MS", 0.0), 0.0),
+    ),
+)
 _rag_background_tasks_default = 2 if PROFILE == "general" else 16
 RAG_MAX_BACKGROUND_TASKS = min(
     64,
@@ -1753,6 +1772,103 @@ DISCORD_EMBEDDING_DB_PATH = _resolve_project_storage_path(
     _DISCORD_EMBEDDING_DB_PATH_RAW,
     "database/discord_embeddings.db",
 )
+# SQLite Discord 임베딩을 int8(행별 scale)로도 저장한다. 켜면 다음 초기화 때
+# 컬럼을 추가한다. 기존 float32 행의 변환은 DISCORD_EMBEDDING_DROP_FLOAT32를 따른다.
+DISCORD_EMBEDDING_INT8 = as_bool(load_config_value('DISCORD_EMBEDDING_INT8', 'false'))
+# SQLite Discord 임베딩 저장 형식. float32(기본), float16(크기 1/2, 정규화된 문장
+# 임베딩의 코사인 유사도 오차는 무시할 수준), int8(1/4). float16/int8 행은
+# embedding_q에 두고 읽을 때 이 값을 쓴다. DISCORD_EMBEDDING_INT8=true는 int8과 같다.
+DISCORD_EMBEDDING_STORAGE_DTYPE = as_str(
+    load_config_value(
+        'DISCORD_EMBEDDING_STORAGE_DTYPE',
+        'int8' if DISCORD_EMBEDDING_INT8 else 'float32',
+    ),
+    'float32',
+).lower()
+if DISCORD_EMBEDDING_STORAGE_DTYPE not in {"float32", "float16", "int8"}:
+    raise RuntimeError("DISCORD_EMBEDDING_STORAGE_DTYPE는 float32, float16, int8 중 하나여야 합니다.")
+# float16/int8 저장에서 float32 원본(embedding)을 비워 실제로 공간을 줄일지 여부.
+# 기본값 false는 원본을 embedding_q 옆에 그대로 두고 기존 행도 건드리지 않는다.
+# true로 켜면 새 행은 압축 값만 쓰고, 다음 초기화 때 남은 float32 행도 되돌릴 수
+# 없게 변환한다. vec0 인덱스는 압축 값을 복원해 채운다.
+DISCORD_EMBEDDING_DROP_FLOAT32 = as_bool(
+    load_config_value('DISCORD_EMBEDDING_DROP_FLOAT32', 'false')
+)
+# 부호 1비트 코드(embedding_bin)를 함께 저장하고, vec0이 없을 때 질의 벡터 검색의
+# 1차 후보를 Hamming 거리로 고른다. 후보는 limit의 OVERSAMPLE배를 뽑아 원본
+# 벡터로 다시 정렬하며, 1차 스캔은 채널의 최신 SCAN_LIMIT행까지만 본다.
+DISCORD_EMBEDDING_BINARY_INDEX = as_bool(load_config_value('DISCORD_EMBEDDING_BINARY_INDEX', 'false'))
+DISCORD_EMBEDDING_BINARY_OVERSAMPLE = max(
+    1,
+    as_int(load_config_value('DISCORD_EMBEDDING_BINARY_OVERSAMPLE', 4), 4),
+)
+DISCORD_EMBEDDING_BINARY_SCAN_LIMIT = max(
+    1,
+    as_int(load_config_value('DISCORD_EMBEDDING_BINARY_SCAN_LIMIT', 20000), 20000),
+)
+# hnswlib가 설치돼 있으면 메시지 임베딩으로 메모리 HNSW 근사 kNN 인덱스를 만들어,
+# vec0이 없을 때 1비트 코드/최신순 조회보다 먼저 쓴다. 행이 MIN_ROWS보다 적으면
+# 인덱스를 만들지 않고 기존 경로로 계산한다. EF는 검색 시 탐색 폭(클수록 정확).
+# 다른 프로세스나 스크립트가 DB를 고치면 다음 검색 때 인덱스를 다시 만든다.
+DISCORD_EMBEDDING_HNSW = as_bool(load_config_value('DISCORD_EMBEDDING_HNSW', 'false'))
+DISCORD_EMBEDDING_HNSW_MIN_ROWS = max(
+    0,
+    as_int(load_config_value('DISCORD_EMBEDDING_HNSW_MIN_ROWS', 1000), 1000),
+)
+DISCORD_EMBEDDING_HNSW_EF = max(
+    1,
+    as_int(load_config_value('DISCORD_EMBEDDING_HNSW_EF', 64), 64),
+)
+# upsert_message_embedding을 이 시간(초) 동안 메모리에 모았다가 한 트랜잭션으로
+# 기록한다. 같은 메시지의 연속 수정은 마지막 값 하나로 합쳐진다. 기본 0(즉시
+# 기록)이며 opt-in이다. 켜면 cog_unload를 거치지 않은 종료(크래시 등)에서 이
+# 구간의 쓰기가 유실되고, 버퍼에 있는 행은 다른 프로세스에 보이지 않는다.
+DISCORD_EMBEDDING_WRITE_BACK_SECONDS = max(
+    0.0,
+    as_float(load_config_value('DISCORD_EMBEDDING_WRITE_BACK_SECONDS', 0.0), 0.0),
+)
+DISCORD_EMBEDDING_WRITE_BACK_MAX_ROWS = max(
+    1,
+    as_int(load_config_value('DISCORD_EMBEDDING_WRITE_BACK_MAX_ROWS', 1000), 1000),
+)
+# 이 프로세스가 마지막으로 기록한 메시지/메모리 행의 digest(기록 컬럼 전체와
+# 임베딩 모델 식별자)를 이 개수만큼 기억해, 같은 행의 재기록(겹치는 대화 윈도우
+# 등)은 encode와 upsert를 건너뛴다.
+# 다른 프로세스의 삭제는 보지 못하므로 그 경우 내용이 바뀔 때 다시 기록된다. 0이면 끔.
+DISCORD_EMBEDDING_DIGEST_CACHE_SIZE = max(
+    0,
+    as_int(load_config_value('DISCORD_EMBEDDING_DIGEST_CACHE_SIZE', 8192), 8192),
+)
+# fetch_recent_matrix 결과(최신 임베딩 행렬)를 조회 범위별로 이 개수만큼
+# 기억해, 그 채널에 새 행이 기록되기 전의 반복 검색은 BLOB을 다시 읽지 않는다.
+# 다른 프로세스의 쓰기는 보지 못하므로 기본은 0(끔)이다. 봇과 함께 도는
+# reindex/migrate 스크립트도 쓰기 프로세스이므로, 저장소에 이 프로세스 하나만
+# 쓰는 배포에서만 켠다.
+DISCORD_EMBEDDING_MATRIX_CACHE_SIZE = max(
+    0,
+    as_int(load_config_value('DISCORD_EMBEDDING_MATRIX_CACHE_SIZE', 0), 0),
+)
+# fetch_recent_matrix가 만드는(그리고 캐시하는) 행렬의 자료형. float16이면
+# 메모리와 점수 계산 시 읽는 양이 절반이 되고, 단위 벡터 내적 오차는 후보
+# 추림(리랭커 이전)에 쓰기에 충분히 작다. float32(기본) 또는 float16.
+DISCORD_EMBEDDING_MATRIX_DTYPE = as_str(
+    load_config_value('DISCORD_EMBEDDING_MATRIX_DTYPE', 'float32'),
+    'float32',
+).lower()
+if DISCORD_EMBEDDING_MATRIX_DTYPE not in {"float32", "float16"}:
+    raise RuntimeError("DISCORD_EMBEDDING_MATRIX_DTYPE는 float32, float16 중 하나여야 합니다.")
+# 쓰기 후 마지막 점검에서 이 시간(초)이 지났으면 백그라운드에서 WAL을
+# checkpoint(TRUNCATE)해 -wal 파일이 계속 커지지 않게 한다. 0이면 끔.
+DISCORD_EMBEDDING_CHECKPOINT_SECONDS = max(
+    0.0,
+    as_float(load_config_value('DISCORD_EMBEDDING_CHECKPOINT_SECONDS', 300.0), 300.0),
+)
+# checkpoint 때 incremental_vacuum으로 돌려줄 최대 빈 페이지 수. auto_vacuum이
+# INCREMENTAL인 DB(새로 만든 임베딩 DB)에서만 효과가 있다. 0이면 끔.
+DISCORD_EMBEDDING_VACUUM_PAGES = max(
+    0,
+    as_int(load_config_value('DISCORD_EMBEDDING_VACUUM_PAGES', 1000), 1000),
+)
 _KAKAO_EMBEDDING_DB_PATH_RAW = as_str(
     load_config_value(
         "KAKAO_EMBEDDING_DB_PATH",
@@ -1766,6 +1882,9 @@ KAKAO_EMBEDDING_DB_PATH = _resolve_project_storage_path(
 )
 KAKAO_EMBEDDING_SERVER_MAP = _normalize_kakao_servers(EMBED_CONFIG.get("kakao_servers", []))
 KAKAO_VECTOR_EXTENSION = EMBED_CONFIG.get("kakao_vector_extension")
+# Discord 임베딩 SQLite 저장소의 sqlite-vec(vec0) 확장 경로. 비우면 설치된
+# sqlite_vec 패키지와 "vec0"을 차례로 시도하고, 모두 실패하면 파이썬 스캔을 쓴다.
+DISCORD_VECTOR_EXTENSION = EMBED_CONFIG.get("discord_vector_extension")
 DISCORD_EMBEDDING_TIDB_TABLE = str(load_config_value('DISCORD_EMBEDDING_TIDB_TABLE', 'discord_chat_embeddings')).strip()
 KAKAO_TIDB_TABLE = str(load_config_value('KAKAO_TIDB_TABLE', 'kakao_chunks')).strip()
 for _table_setting_name, _table_name in (
@@ -1826,12 +1945,30 @@ EMBEDDING_ENABLED = as_bool(
 # BM25는 현재 운영 정책상 사용하지 않음 (로컬/서버 공통 비활성화)
 BM25_ENABLED = False
 BM25_DATABASE_PATH = None
+# BM25 조회가 재사용할 읽기 전용 SQLite 연결 수(동시 조회 상한). 0이면 조회마다 연결을 연다.
+BM25_READ_POOL_SIZE = max(0, as_int(load_config_value('BM25_READ_POOL_SIZE', 4), 4))
 LOCAL_EMBEDDING_MODEL_NAME = EMBED_CONFIG.get("embedding_model_name", "dragonkue/multilingual-e5-small-ko-v2")
 LOCAL_EMBEDDING_DEVICE = EMBED_CONFIG.get("embedding_device")
 LOCAL_EMBEDDING_NORMALIZE = EMBED_CONFIG.get("normalize_embeddings", True)
 LOCAL_EMBEDDING_LOCAL_FILES_ONLY = as_bool(
     load_config_value('LOCAL_EMBEDDING_LOCAL_FILES_ONLY', EMBED_CONFIG.get("local_files_only", False))
 )
+# sentence-transformers 추론 백엔드. onnx/openvino는 sentence-transformers 3.2+와
+# 해당 런타임이 필요하며, 로드에 실패하면 torch로 되돌린다.
+LOCAL_EMBEDDING_BACKEND = as_str(
+    load_config_value('LOCAL_EMBEDDING_BACKEND', EMBED_CONFIG.get("backend", "torch")),
+    "torch",
+).lower()
+if LOCAL_EMBEDDING_BACKEND not in {"torch", "onnx", "openvino"}:
+    raise RuntimeError("LOCAL_EMBEDDING_BACKEND는 torch, onnx, openvino 중 하나여야 합니다.")
+# onnx/openvino 백엔드가 읽을 모델 내 파일. 비우면 sentence-transformers 기본값
+# (onnx/model.onnx, openvino/openvino_model.xml)을 쓴다. 동적 int8 양자화본은 CPU
+# 명령어마다 따로 만들어지므로 scripts/export_embedding_onnx.py가 출력한 파일
+# 이름을 배포 서버에 맞게 직접 지정한다(예: onnx/model_qint8_avx2.onnx).
+LOCAL_EMBEDDING_BACKEND_FILE = as_str(
+    load_config_value('LOCAL_EMBEDDING_BACKEND_FILE', EMBED_CONFIG.get("backend_file", "")),
+    "",
+)
 LOCAL_EMBEDDING_QUERY_LIMIT = EMBED_CONFIG.get("query_limit", 200)
 RAG_SIMILARITY_THRESHOLD = as_float(EMBED_CONFIG.get("similarity_threshold"), 0.6)
 STRUCTURED_MEMORY_QUERY_LIMIT = as_int(
@@ -2037,6 +2174,16 @@ RAG_MEMORY_MAX_BLOCKS = as_int(
 RAG_MEMORY_MAX_BLOCKS = max(1, min(8, RAG_MEMORY_MAX_BLOCKS))
 RAG_BM25_TOP_N = int(EMBED_CONFIG.get("bm25_top_n", 8))
 RAG_RRF_K = float(EMBED_CONFIG.get("rrf_constant", 60))
+# 하이브리드 후보의 정렬 기준. similarity(기본)는 임베딩 유사도(없으면 BM25
+# 순위 점수) 순이고, rrf는 변형별 임베딩/BM25 순위를 Σ 1/(RAG_RRF_K + 순위)로
+# 합친 순서를 쓴다. 어느 쪽이든 combined_score는 유사도 척도로 남아 기억
+# 관문(RAG_MEMORY_GATE_SCORE 등)의 절대 임계값은 그대로 적용된다.
+RAG_SCORE_FUSION = as_str(
+    load_config_value("RAG_SCORE_FUSION", EMBED_CONFIG.get("score_fusion", "similarity")),
+    "similarity",
+).lower()
+if RAG_SCORE_FUSION not in {"similarity", "rrf"}:
+    raise RuntimeError("RAG_SCORE_FUSION은 similarity, rrf 중 하나여야 합니다.")
 RAG_QUERY_REWRITE_ENABLED = as_bool(
     load_config_value('RAG_QUERY_REWRITE_ENABLED', EMBED_CONFIG.get("query_rewrite_enabled", True))
 )
@@ -2046,6 +2193,13 @@ RAG_QUERY_REWRITE_VARIANTS = int(EMBED_CONFIG.get("query_rewrite_variants", 3))
 RAG_RERANKER_MODEL_NAME = EMBED_CONFIG.get("reranker_model_name", "BAAI/bge-reranker-v2-m3")
 RAG_RERANKER_DEVICE = EMBED_CONFIG.get("reranker_device")
 RAG_RERANKER_SCORE_THRESHOLD = EMBED_CONFIG.get("reranker_score_threshold")
+# 재순위화 추론 정밀도: float32(기본), bfloat16, int8(CPU 동적 양자화), float16(CUDA).
+RAG_RERANKER_DTYPE = str(
+    load_config_value("RAG_RERANKER_DTYPE", EMBED_CONFIG.get("reranker_dtype", "float32"))
+    or "float32"
+).strip().lower()
+if RAG_RERANKER_DTYPE not in {"float32", "bfloat16", "int8", "float16"}:
+    raise RuntimeError("RAG_RERANKER_DTYPE는 float32, bfloat16, int8, float16 중 하나여야 합니다.")
 if RAG_RERANKER_SCORE_THRESHOLD is not None:
     try:
         RAG_RERANKER_SCORE_THRESHOLD = float(RAG_RERANKER_SCORE_THRESHOLD)
@@ -2445,6 +2599,11 @@ RAG_ARCHIVING_CONFIG = {
     "activity_log_retention_days": as_int(
         load_config_value("USER_ACTIVITY_LOG_RETENTION_DAYS", 0), 0
     ),
+    # api_call_log 보존 일수. 0 이하이면 비활성(무한 보존)이며, 한도 집계 창보다
+    # 짧아지지 않도록 실제 적용 값은 최소 2일이다.
+    "api_call_log_retention_days": as_int(
+        load_config_value("API_CALL_LOG_RETENTION_DAYS", 0), 0
+    ),
 }
 AI_CREATIVE_PROMPTS = {
     "fortune": "사용자 '{user_name}'를 위한 오늘의 운세를 재치있게 알려줘.",
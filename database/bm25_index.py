@@ -5,12 +5,14 @@ from __future__ import annotations
 
 import asyncio
 import json
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable, List, Optional
+from typing import Any, AsyncIterator, Iterable, List, Optional
 
 import aiosqlite
 
+from database.compat_db import SQLITE_READER_PRAGMAS
 from logger_config import logger
 
 _FTS_TABLE_SQL = """
@@ -101,13 +103,68 @@ class BM25SearchResult:
 class BM25IndexManager:
     """대화 히스토리에 대한 FTS5 기반 BM25 검색을 처리합니다."""
 
-    def __init__(self, db_path: str, context_minutes: int = 10, context_limit: int = 6):
-        """DB 경로·컨텍스트 수집 범위(분)·조회 제한 수를 받아 FTS5 인덱스 관리기를 초기화한다."""
+    def __init__(
+        self,
+        db_path: str,
+        context_minutes: int = 10,
+        context_limit: int = 6,
+        *,
+        read_pool_size: int = 0,
+    ):
+        """DB 경로·컨텍스트 수집 범위(분)·조회 제한 수를 받아 FTS5 인덱스 관리기를 초기화한다.
+
+        read_pool_size가 양수이면 조회용 읽기 전용 연결을 그 수만큼 재사용하고
+        동시 조회도 그 수로 제한한다. 0이면 조회마다 연결을 새로 연다.
+        풀을 쓰면 종료 시 ``close()``를 호출해야 한다.
+        """
         self.db_path = Path(db_path)
         self.context_minutes = max(1, context_minutes)
         self.context_limit = max(1, context_limit)
         self._init_lock = asyncio.Lock()
         self._initialized = False
+        self.read_pool_size = max(0, int(read_pool_size))
+        # 쉬고 있는 읽기 연결 스택. 세마포어가 빌려 간 연결까지 포함한 총수를 묶는다.
+        self._idle_readers: list[aiosqlite.Connection] = []
+        self._reader_slots = asyncio.Semaphore(self.read_pool_size) if self.read_pool_size else None
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """조회용 연결을 빌려 준다. 행은 aiosqlite.Row로 돌려받는다.
+
+        풀이 꺼져 있으면 기존처럼 이번 조회만 쓰는 연결을 연다. 풀 연결은
+        query_only라 쓰기가 섞이지 않으며, 조회 중 예외가 나면 상태를
+        믿을 수 없으므로 돌려놓지 않고 닫는다.
+        """
+        if self._reader_slots is None:
+            async with aiosqlite.connect(self.db_path) as db:
+                db.row_factory = aiosqlite.Row
+                yield db
+            return
+
+        async with self._reader_slots:
+            if self._idle_readers:
+                db = self._idle_readers.pop()
+            else:
+                db = await aiosqlite.connect(self.db_path)
+                try:
+                    db.row_factory = aiosqlite.Row
+                    for pragma in SQLITE_READER_PRAGMAS:
+                        await db.execute(pragma)
+                except BaseException:
+                    await db.close()
+                    raise
+            try:
+                yield db
+            except BaseException:
+                await db.close()
+                raise
+            self._idle_readers.append(db)
+
+    async def close(self) -> None:
+        """풀에 남아 있는 읽기 연결을 모두 닫습니다."""
+        readers, self._idle_readers = self._idle_readers, []
+        for db in readers:
+            await db.close()
 
     async def ensure_index(self) -> None:
         """FTS5 인덱스 및 트리거를 생성하고 동기화합니다."""
@@ -207,8 +264,7 @@ class BM25IndexManager:
         params.append(int(limit))
 
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self._reader() as db:
                 async with db.execute(query_sql, params) as cursor:
                     rows = await cursor.fetchall()
                 results: list[BM25SearchResult] = []
@@ -283,7 +339,7 @@ class BM25IndexManager:
         if not center_timestamp or not self.db_path.exists():
             return []
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._reader() as db:
                 return await self._build_context_window(
                     db,
                     channel_id=channel_id,
@@ -313,8 +369,7 @@ class BM25IndexManager:
             LIMIT 1
         """
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self._reader() as db:
                 async with db.execute(query, (int(channel_id), int(message_id), int(message_id))) as cursor:
                     row = await cursor.fetchone()
         except aiosqlite.Error as exc:
@@ -323,9 +378,59 @@ class BM25IndexManager:
 
         if not row:
             return []
+        return self._parse_window_json(row["messages_json"], channel_id, message_id)
 
+    async def fetch_windows_for_messages(
+        self,
+        *,
+        channel_id: int,
+        message_ids: Iterable[int],
+    ) -> dict[int, list[dict[str, Any]]]:
+        """여러 메시지의 슬라이딩 윈도우를 쿼리 한 번으로 조회합니다.
+
+        메시지마다 ``fetch_window_for_message``와 같은 규칙(가장 최근 anchor의
+        윈도우 하나)을 적용하고, 윈도우가 없는 메시지는 결과에서 빠진다.
+        """
+        targets = sorted({int(message_id) for message_id in message_ids})
+        await self.ensure_index()
+        if not targets or not self.db_path.exists():
+            return {}
+
+        query = """
+            SELECT target.value AS message_id,
+                   (
+                       SELECT messages_json
+                       FROM conversation_windows
+                       WHERE channel_id = ?
+                         AND start_message_id <= target.value
+                         AND end_message_id >= target.value
+                       ORDER BY anchor_timestamp DESC
+                       LIMIT 1
+                   ) AS messages_json
+            FROM json_each(?) AS target
+        """
+        try:
+            async with self._reader() as db:
+                async with db.execute(query, (int(channel_id), json.dumps(targets))) as cursor:
+                    rows = await cursor.fetchall()
+        except aiosqlite.Error as exc:
+            logger.error("대화 윈도우 일괄 조회 중 DB 오류: %s", exc, exc_info=True)
+            return {}
+
+        windows: dict[int, list[dict[str, Any]]] = {}
+        for row in rows:
+            if row["messages_json"] is None:
+                continue
+            window = self._parse_window_json(row["messages_json"], channel_id, row["message_id"])
+            if window:
+                windows[int(row["message_id"])] = window
+        return windows
+
+    @staticmethod
+    def _parse_window_json(raw: Any, channel_id: int, message_id: int) -> list[dict[str, Any]]:
+        """conversation_windows.messages_json을 메시지 dict 목록으로 바꿉니다."""
         try:
-            data = json.loads(row["messages_json"])  # 저장된 윈도우 JSON을 역직렬화한다.
+            data = json.loads(raw)  # 저장된 윈도우 JSON을 역직렬화한다.
         except (TypeError, json.JSONDecodeError) as exc:
             logger.warning(
                 "conversation_windows JSON 파싱 실패(channel=%s message=%s): %s",
@@ -374,8 +479,7 @@ class BM25IndexManager:
         """
 
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self._reader() as db:
                 async with db.execute(center_query, (int(message_id),)) as cursor:
                     center = await cursor.fetchone()  # 기준 메시지 1건을 확보한다.
                 if not center:
@@ -613,6 +613,58 @@ class TiDBConnection:
                 self._release_transaction_gate(None)
 
 
+# 분석·호출 기록처럼 작은 쓰기가 잦은 메인 SQLite 연결용 설정. WAL은 읽기와
+# 쓰기를 서로 막지 않게 하고, synchronous=NORMAL은 WAL에서 commit마다의
+# fsync를 checkpoint 시점으로 미룬다. 자주 읽는 페이지는 메모리에 둔다.
+SQLITE_TUNING_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+async def apply_sqlite_tuning_pragmas(conn: aiosqlite.Connection) -> None:
+    """새로 연 aiosqlite 연결에 쓰기 중심 PRAGMA를 적용한다."""
+    for pragma in SQLITE_TUNING_PRAGMAS:
+        await conn.execute(pragma)
+
+
+# 읽기 전용 보조 연결용 설정. WAL 모드는 DB 파일에 유지되므로 다시 켜지 않고,
+# query_only로 실수로 쓰기가 섞이지 않게 막는다.
+SQLITE_READER_PRAGMAS = (
+    "PRAGMA query_only=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16384",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+async def open_sqlite_read_pool(sqlite_path: str, size: int = 4) -> list[aiosqlite.Connection]:
+    """WAL 동시 읽기용 aiosqlite 연결 묶음을 연다.
+
+    각 aiosqlite 연결은 자기 worker thread를 가지므로, 설정·카운트 조회를
+    여기로 보내면 메인 연결의 쓰기 대기열 뒤에 줄 서지 않는다.
+    """
+    readers: list[aiosqlite.Connection] = []
+    try:
+        for _ in range(max(0, int(size))):
+            reader = await aiosqlite.connect(sqlite_path)
+            readers.append(reader)
+            reader.row_factory = aiosqlite.Row
+            for pragma in SQLITE_READER_PRAGMAS:
+                await reader.execute(pragma)
+    except Exception:
+        for reader in readers:
+            await reader.close()
+        raise
+    return readers
+
+
 async def connect_main_db(backend: str, *, sqlite_path: str | None = None, tidb_settings: TiDBSettings | None = None):
     """환경에 따라 SQLite 또는 TiDB 연결을 생성한다."""
     backend_norm = (backend or "sqlite").strip().lower()
@@ -623,6 +675,7 @@ async def connect_main_db(backend: str, *, sqlite_path: str | None = None, tidb_
         raise CompatOperationalError("SQLite 경로가 필요합니다.")
     conn = await aiosqlite.connect(sqlite_path)
     conn.row_factory = aiosqlite.Row
+    await apply_sqlite_tuning_pragmas(conn)
     return conn
 
 
@@ -134,6 +134,14 @@ def migrate_database(cursor) -> bool:
             "ON linkup_usage_log (request_id)"
         )
 
+        # 한도 집계용 복합 인덱스. 구버전 DB에도 추가하고 planner 통계를 갱신해
+        # COUNT 쿼리가 covering index 범위 스캔을 선택하게 한다.
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_api_call_log_type_called_at "
+            "ON api_call_log (api_type, called_at)"
+        )
+        cursor.execute("ANALYZE api_call_log")
+
         # [Safety Check] Ensure new tables exist (redundant but safe)
         tables_to_check = ['user_profiles', 'dm_usage_logs']
         for table in tables_to_check:
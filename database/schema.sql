@@ -129,6 +129,10 @@ CREATE TABLE IF NOT EXISTS api_call_log (
     called_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'utc'))
 );
 
+-- RPM/RPD·이미지·운세 한도 집계는 모두 (api_type, called_at) 범위 조회이므로
+-- 복합 인덱스만 읽고 끝나도록(covering index) 한다. TiDB 스키마와 같은 이름을 쓴다.
+CREATE INDEX IF NOT EXISTS idx_api_call_log_type_called_at ON api_call_log (api_type, called_at);
+
 -- 봇의 운영 지표를 기록하기 위한 분석용 로그 테이블
 CREATE TABLE IF NOT EXISTS analytics_log (
     log_id INTEGER PRIMARY KEY AUTOINCREMENT,
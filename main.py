@@ -191,6 +191,21 @@ class ReMasamongBot(commands.Bot):
         self._guild_settings_cache = cache
         logger.info("서버별 AI 설정 캐시 로드 완료: %d개 길드", len(cache))
 
+    async def _attach_sqlite_read_pool(self) -> None:
+        """SQLite 파일 DB면 설정·사용량 조회용 읽기 연결 묶음을 붙입니다."""
+        if config.DB_BACKEND != "sqlite" or str(self.db_path) == ":memory:":
+            return
+        from database.compat_db import open_sqlite_read_pool
+        from utils.db import attach_read_pool
+
+        try:
+            readers = await open_sqlite_read_pool(self.db_path)
+        except Exception as e:
+            # 읽기 연결은 최적화일 뿐이므로 실패하면 메인 연결로 계속 조회한다.
+            logger.warning("읽기 전용 SQLite 연결을 열지 못했습니다: %s", e)
+            return
+        attach_read_pool(self.db, readers)
+
     async def _load_guild_control_cache(self) -> None:
         """인스턴스별 최고 관리자 override를 정적/DB 모드와 무관하게 읽습니다."""
         from utils.guild_controls import load_guild_controls
@@ -794,6 +809,22 @@ class ReMasamongBot(commands.Bot):
                 except Exception:
                     await self.db.rollback()
                     pass  # 이미 존재하면 무시
+
+                # 스키마 재적용을 건너뛴 기존 SQLite DB에도 한도 집계용 복합
+                # 인덱스를 보장한다. 새로 만든 경우에만 planner 통계를 갱신한다.
+                async with self.db.execute(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'index' AND name = 'idx_api_call_log_type_called_at'"
+                ) as cursor:
+                    has_api_call_index = await cursor.fetchone() is not None
+                if not has_api_call_index:
+                    await self.db.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_api_call_log_type_called_at "
+                        "ON api_call_log (api_type, called_at)"
+                    )
+                    await self.db.execute("ANALYZE api_call_log")
+                    await self.db.commit()
+                    logger.info("api_call_log (api_type, called_at) 인덱스를 추가했습니다.")
             else:
                 try:
                     await self.db.execute(
@@ -928,6 +959,7 @@ class ReMasamongBot(commands.Bot):
             self.db = await connect_main_db(config.DB_BACKEND, sqlite_path=self.db_path, tidb_settings=tidb_settings)
             self.db.row_factory = aiosqlite.Row # 결과를 딕셔너리처럼 접근 가능하게 설정
             logger.info("데이터베이스 연결 완료: backend=%s target=%s", config.DB_BACKEND, _format_storage_target())
+            await self._attach_sqlite_read_pool()
         except Exception as e:
             logger.critical(f"데이터베이스 연결 실패. 봇을 종료합니다: {e}", exc_info=True)
             raise RuntimeError("필수 데이터베이스 연결에 실패했습니다.") from e
@@ -1153,6 +1185,8 @@ class ReMasamongBot(commands.Bot):
             await super().close()
         finally:
             if self.db:
+                from utils.db import close_read_pool
+                await close_read_pool(self.db)
                 await self.db.close()
                 self.db = None
                 logger.info("데이터베이스 연결을 안전하게 닫았습니다.")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""로컬 임베딩 모델을 sentence-transformers ONNX 형식으로 내보낸다.
+
+실행 방법:
+    python -m scripts.export_embedding_onnx --output models/e5-small-onnx \
+        --quantization-config avx2
+
+출력 디렉터리를 LOCAL_EMBEDDING_MODEL_NAME으로, LOCAL_EMBEDDING_BACKEND를 onnx로
+지정하면 fp32 onnx/model.onnx를 읽는다. 동적 int8 양자화본은 대상 CPU 명령어별
+파일(onnx/model_qint8_<config>.onnx)로 만들어지므로, 배포 서버에서 지원하는
+설정을 골라 만들고 출력된 파일 이름을 LOCAL_EMBEDDING_BACKEND_FILE로 지정한다.
+sentence-transformers[onnx]는 이 스크립트와 onnx 백엔드에서만 필요하다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.getcwd())
+
+import config
+
+
+def parse_args() -> argparse.Namespace:
+    """CLI 인자를 파싱하여 원본 모델, 출력 디렉터리와 양자화 대상을 반환합니다."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=config.LOCAL_EMBEDDING_MODEL_NAME)
+    parser.add_argument("--output", required=True, help="sentence-transformers 모델을 저장할 디렉터리")
+    parser.add_argument(
+        "--quantization-config",
+        choices=("arm64", "avx2", "avx512", "avx512_vnni"),
+        help="동적 int8 양자화 대상 CPU. 생략하면 fp32 onnx/model.onnx만 만든다.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """모델을 export하고, 대상 CPU를 지정했으면 동적 int8 양자화본을 추가합니다."""
+    args = parse_args()
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    try:
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    except ImportError as exc:
+        raise SystemExit(
+            "sentence-transformers 3.2+와 onnx 추가 의존성이 필요합니다: "
+            "pip install 'sentence-transformers[onnx]'"
+        ) from exc
+
+    model = SentenceTransformer(args.model, backend="onnx")
+    model.save_pretrained(str(output))
+    print(f"[export] {output / 'onnx' / 'model.onnx'}")
+    if not args.quantization_config:
+        return
+    export_dynamic_quantized_onnx_model(
+        model,
+        args.quantization_config,
+        str(output),
+    )
+    backend_file = f"onnx/model_qint8_{args.quantization_config}.onnx"
+    print(f"[quantize] {output / backend_file}")
+    print(f"LOCAL_EMBEDDING_BACKEND_FILE={backend_file}")
+
+
+if __name__ == "__main__":
+    main()
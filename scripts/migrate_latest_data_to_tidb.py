@@ -675,14 +675,30 @@ def migrate_sqlite_tables(source_db: Path, conn: pymysql.connections.Connection)
         src.close()
 
 
+def _float32_embedding(row: sqlite3.Row) -> bytes:
+    """float16/int8 압축 행이면 float32 BLOB으로 복원하고, 아니면 원본을 반환한다."""
+    if row["embedding_q"] is None:
+        return row["embedding"]
+    if row["embedding_scale"] is None:
+        return np.frombuffer(row["embedding_q"], dtype=np.float16).astype(np.float32).tobytes()
+    restored = np.frombuffer(row["embedding_q"], dtype=np.int8).astype(np.float32)
+    return (restored * np.float32(row["embedding_scale"])).tobytes()
+
+
 def migrate_discord_embeddings(source_db: Path, conn: pymysql.connections.Connection) -> None:
     """discord_chat_embeddings 테이블을 SQLite에서 TiDB로 이전합니다."""
+    # float16/int8로 저장된 행은 embedding이 비어 있으므로 TiDB에는
+    # float32로 되돌려 적재한다.
+    quantized = {"embedding_q", "embedding_scale"} <= _sqlite_table_columns(
+        source_db, "discord_chat_embeddings"
+    )
+    extra_columns = ", embedding_q, embedding_scale" if quantized else ""
     src = _connect_sqlite_read_only(source_db)
     src.row_factory = sqlite3.Row
     try:
         source_cursor = src.execute(
-            """
-            SELECT message_id, server_id, channel_id, user_id, user_name, message, timestamp, embedding
+            f"""
+            SELECT message_id, server_id, channel_id, user_id, user_name, message, timestamp, embedding{extra_columns}
             FROM discord_chat_embeddings
             ORDER BY id ASC
             """
@@ -711,7 +727,7 @@ def migrate_discord_embeddings(source_db: Path, conn: pymysql.connections.Connec
                     row["user_name"],
                     row["message"],
                     row["timestamp"],
-                    row["embedding"],
+                    _float32_embedding(row) if quantized else row["embedding"],
                 )
                 for row in rows
             ]
@@ -110,29 +110,33 @@ async def rebuild_channel_memories(
             max_context_chars=getattr(config, "STRUCTURED_MEMORY_MAX_CONTEXT_CHARS", 1200),
             user_turn_min_chars=getattr(config, "STRUCTURED_USER_MEMORY_MIN_CHARS", 12),
         )
+        entries = []
         for unit in units:
             embedding = await get_embedding(unit.memory_text, prefix="passage: ")
             if embedding is None:
                 continue
-            await store.upsert_memory_entry(
-                memory_id=unit.memory_id,
-                anchor_message_id=unit.anchor_message_id,
-                server_id=guild_id,
-                channel_id=channel_id,
-                owner_user_id=unit.owner_user_id,
-                owner_user_name=unit.owner_user_name,
-                memory_scope=unit.memory_scope,
-                memory_type=unit.memory_type,
-                summary_text=unit.summary_text,
-                memory_text=unit.memory_text,
-                raw_context=unit.raw_context,
-                source_message_ids=unit.source_message_ids,
-                speaker_names=unit.speaker_names,
-                keywords=unit.keywords,
-                timestamp_iso=unit.timestamp_iso,
-                embedding=embedding,
+            entries.append(
+                {
+                    "memory_id": unit.memory_id,
+                    "anchor_message_id": unit.anchor_message_id,
+                    "server_id": guild_id,
+                    "channel_id": channel_id,
+                    "owner_user_id": unit.owner_user_id,
+                    "owner_user_name": unit.owner_user_name,
+                    "memory_scope": unit.memory_scope,
+                    "memory_type": unit.memory_type,
+                    "summary_text": unit.summary_text,
+                    "memory_text": unit.memory_text,
+                    "raw_context": unit.raw_context,
+                    "source_message_ids": unit.source_message_ids,
+                    "speaker_names": unit.speaker_names,
+                    "keywords": unit.keywords,
+                    "timestamp_iso": unit.timestamp_iso,
+                    "embedding": embedding,
+                }
             )
-            inserted_units += 1
+        # 윈도우 단위로 executemany + commit 한 번에 기록한다.
+        inserted_units += await store.upsert_many_memory_entries(entries)
 
     return created_windows, inserted_units
 
@@ -180,26 +184,30 @@ async def main() -> None:
             "--clear 대상 재구축 원본에 대화 행이 없어 기존 메모리를 비우지 않습니다."
         )
     store = DiscordEmbeddingStore(str(Path(args.target_db).resolve()))
-    await store.initialize()
-    if args.clear:
-        await store.clear_memory_entries()
-
-    total_channels = 0
-    total_windows = 0
-    total_units = 0
-    for (guild_id, channel_id), rows in grouped.items():
-        windows, units = await rebuild_channel_memories(
-            store,
-            guild_id=guild_id,
-            channel_id=channel_id,
-            rows=rows,
-        )
-        total_channels += 1
-        total_windows += windows
-        total_units += units
-        print(f"[channel] guild={guild_id} channel={channel_id} windows={windows} units={units}")
+    try:
+        await store.initialize()
+        if args.clear:
+            await store.clear_memory_entries()
+
+        total_channels = 0
+        total_windows = 0
+        total_units = 0
+        for (guild_id, channel_id), rows in grouped.items():
+            windows, units = await rebuild_channel_memories(
+                store,
+                guild_id=guild_id,
+                channel_id=channel_id,
+                rows=rows,
+            )
+            total_channels += 1
+            total_windows += windows
+            total_units += units
+            print(f"[channel] guild={guild_id} channel={channel_id} windows={windows} units={units}")
 
-    count = await store.count_memory_entries()
+        count = await store.count_memory_entries()
+    finally:
+        # 재사용 SQLite 연결과 write-back 버퍼를 정리한다.
+        await store.close()
     print(f"[done] channels={total_channels} windows={total_windows} units={total_units} stored={count}")
 
 
@@ -29,6 +29,8 @@ logger = logging.getLogger("ReindexRAG")
 # 청킹 설정 (emb/embedding_chunked.py와 동일하게 설정 가능)
 TIME_WINDOW_MINUTES = 10
 MAX_MESSAGES_PER_CHUNK = 15
+# 임베딩 저장 배치 크기 (한 트랜잭션에 묶어 쓸 청크 수)
+REINDEX_WRITE_BATCH = 64
 
 def parse_iso(iso_str):
     """ISO 형식 문자열을 datetime으로 변환합니다. 실패 시 현재 시간을 반환합니다."""
@@ -152,41 +154,55 @@ async def main():
         print(f"⚠️  Existing embedding DB moved to {backup_path}")
         
     store = DiscordEmbeddingStore(discord_db_path)
-    await store.initialize()
-    
-    # 4. Process Chunks
-    total_chunks = 0
-    processed_chunks = 0
-    
-    print("\n🧩 Chunking and Embedding...")
-    
-    for (guild_id, channel_id), msgs in channels.items():
-        channel_chunks = chunk_messages(msgs)
-        total_chunks += len(channel_chunks)
-        
-        for chunk in channel_chunks:
-            chunk_text = format_chunk(chunk)
-            
-            # E5 Prefix 적용 ("passage: ")
-            embedding = await get_embedding(chunk_text, prefix="passage: ")
-            
-            if embedding is not None:
-                last_msg = chunk[-1]
-                await store.upsert_message_embedding(
-                    message_id=last_msg['message_id'], # Chunk Anchor
-                    server_id=guild_id,
-                    channel_id=channel_id,
-                    user_id=last_msg['user_id'],
-                    user_name="Conversation Chunk",
-                    message=chunk_text,
-                    timestamp_iso=last_msg['created_at'],
-                    embedding=embedding
-                )
-                processed_chunks += 1
-                
-                if processed_chunks % 50 == 0:
-                    print(f"   Processed {processed_chunks} chunks...", end='\r')
-                    
+    try:
+        await store.initialize()
+
+        # 4. Process Chunks
+        total_chunks = 0
+        processed_chunks = 0
+        pending_rows = []
+
+        async def flush_pending_rows():
+            nonlocal processed_chunks
+            if not pending_rows:
+                return
+            processed_chunks += await store.upsert_many_message_embeddings(pending_rows)
+            pending_rows.clear()
+            print(f"   Processed {processed_chunks} chunks...", end='\r')
+
+        print("\n🧩 Chunking and Embedding...")
+
+        for (guild_id, channel_id), msgs in channels.items():
+            channel_chunks = chunk_messages(msgs)
+            total_chunks += len(channel_chunks)
+
+            for chunk in channel_chunks:
+                chunk_text = format_chunk(chunk)
+
+                # E5 Prefix 적용 ("passage: ")
+                embedding = await get_embedding(chunk_text, prefix="passage: ")
+
+                if embedding is not None:
+                    last_msg = chunk[-1]
+                    pending_rows.append((
+                        last_msg['message_id'], # Chunk Anchor
+                        guild_id,
+                        channel_id,
+                        last_msg['user_id'],
+                        "Conversation Chunk",
+                        chunk_text,
+                        last_msg['created_at'],
+                        embedding,
+                    ))
+                    # 행마다 커밋하지 않고 REINDEX_WRITE_BATCH개씩 한 트랜잭션으로 저장
+                    if len(pending_rows) >= REINDEX_WRITE_BATCH:
+                        await flush_pending_rows()
+
+        await flush_pending_rows()
+    finally:
+        # 워커 스레드가 남아 프로세스 종료를 막지 않도록 실패해도 닫는다.
+        await store.close()
+
     print(f"\n✅ Reindexing complete!")
     print(f"   Total Messages: {len(rows)}")
     print(f"   Total Chunks Embedded: {processed_chunks}")
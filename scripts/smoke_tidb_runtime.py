@@ -40,6 +40,8 @@ async def main() -> None:
             require_tls=config.REQUIRE_DB_TLS,
         ),
     )
+    discord_store = None
+    kakao_store = None
     try:
         cursor = await db.execute("SELECT COUNT(*) AS cnt FROM conversation_history")
         row = await cursor.fetchone()
@@ -137,10 +139,14 @@ async def main() -> None:
             await discord_store.delete_embeddings([990000000000001])
             await discord_store.delete_memory_entries(["smoke:memory:1"])
             await db.execute("DELETE FROM guild_settings WHERE guild_id = ?", (test_guild_id,))
+            db_utils.invalidate_guild_settings(db, test_guild_id)
             await db.execute("DELETE FROM user_profiles WHERE user_id = ?", (test_user_id,))
             await db.commit()
     finally:
         await db.close()
+        for store in (discord_store, kakao_store):
+            if store is not None:
+                await store.close()
 
 
 if __name__ == "__main__":
@@ -515,6 +515,7 @@ async def _run_write_pipeline_check(
             await discord_store.delete_embeddings(test_message_ids)
             await db.execute("DELETE FROM conversation_history WHERE message_id IN (?, ?)", tuple(test_message_ids))
             await db.execute("DELETE FROM guild_settings WHERE guild_id = ?", (test_guild_id,))
+            db_utils.invalidate_guild_settings(db, test_guild_id)
             await db.execute("DELETE FROM user_profiles WHERE user_id = ?", (test_user_id,))
             await db.commit()
         except Exception:
@@ -969,6 +970,9 @@ async def main() -> int:
 
     finally:
         await db.close()
+        await discord_store.close()
+        if kakao_store is not None:
+            await kakao_store.close()
 
     summary = {
         "ok": all(item.ok for item in results),
@@ -95,6 +95,8 @@ async def test_log_analytics_preserves_content_only_when_explicitly_enabled(
         await db.close()
 
     assert json.loads(row[0]) == details
+    assert ", " not in row[0]
+    assert "opt-in content" in row[0]
 
 
 def test_dm_interaction_analytics_uses_null_guild_id():
@@ -139,3 +141,35 @@ async def test_log_analytics_always_writes_an_explicit_utc_timestamp(monkeypatch
 
     timestamp = datetime.fromisoformat(row[0])
     assert timestamp.utcoffset() == timedelta(0)
+
+
+@pytest.mark.asyncio
+async def test_log_analytics_commits_each_event_before_returning(monkeypatch):
+    monkeypatch.setattr(config, "ANALYTICS_STORE_CONTENT", False)
+    db = await _analytics_db()
+    commits = 0
+    original_commit = db.commit
+
+    async def counting_commit():
+        nonlocal commits
+        commits += 1
+        await original_commit()
+
+    db.commit = counting_commit
+    try:
+        for user_id in (1, 2, 3):
+            await db_utils.log_analytics(
+                db,
+                "COMMAND_USAGE",
+                {"guild_id": 9, "user_id": user_id},
+            )
+        async with db.execute(
+            "SELECT user_id FROM analytics_log ORDER BY log_id"
+        ) as cursor:
+            rows = [row[0] for row in await cursor.fetchall()]
+    finally:
+        db.commit = original_commit
+        await db.close()
+
+    assert rows == [1, 2, 3]
+    assert commits == 3
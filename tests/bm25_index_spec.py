@@ -1,3 +1,5 @@
+import asyncio
+
 import aiosqlite
 import pytest
 
@@ -139,3 +141,90 @@ async def test_bulk_rebuild_does_not_run_a_second_full_rebuild(monkeypatch):
     await bm25_module.bulk_rebuild("history.db")
 
     assert ensure_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_windows_for_messages_match_single_lookups_in_one_query(tmp_path):
+    db_path = tmp_path / "history.db"
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            """
+            CREATE TABLE conversation_windows (
+                window_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_id INTEGER NOT NULL,
+                start_message_id INTEGER NOT NULL,
+                end_message_id INTEGER NOT NULL,
+                messages_json TEXT NOT NULL,
+                anchor_timestamp TEXT NOT NULL
+            )
+            """
+        )
+        await db.executemany(
+            "INSERT INTO conversation_windows "
+            "(channel_id, start_message_id, end_message_id, messages_json, anchor_timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (20, 1, 3, '[{"message_id": 1, "content": "old"}]', "2026-01-01T00:00:00"),
+                (20, 2, 4, '[{"message_id": 2, "content": "new"}]', "2026-01-01T00:01:00"),
+                (20, 5, 6, "not json", "2026-01-01T00:02:00"),
+                (99, 1, 9, '[{"message_id": 7, "content": "other"}]', "2026-01-01T00:03:00"),
+            ],
+        )
+        await db.commit()
+    manager = BM25IndexManager(str(db_path))
+    manager._initialized = True
+
+    windows = await manager.fetch_windows_for_messages(
+        channel_id=20,
+        message_ids=[1, 3, 5, 7, 3],
+    )
+
+    assert windows == {
+        1: [{"message_id": 1, "content": "old"}],
+        3: [{"message_id": 2, "content": "new"}],
+    }
+    for message_id in (1, 3, 5, 7):
+        single = await manager.fetch_window_for_message(channel_id=20, message_id=message_id)
+        assert windows.get(message_id, []) == single
+
+
+@pytest.mark.asyncio
+async def test_read_pool_reuses_bounded_read_only_connections(tmp_path, monkeypatch):
+    db_path = tmp_path / "history.db"
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "CREATE TABLE conversation_windows ("
+            "channel_id INTEGER, start_message_id INTEGER, end_message_id INTEGER, "
+            "messages_json TEXT, anchor_timestamp TEXT)"
+        )
+        await db.execute(
+            "INSERT INTO conversation_windows VALUES (20, 1, 3, ?, '2026-01-01T00:00:00')",
+            ('[{"message_id": 1, "content": "hello"}]',),
+        )
+        await db.commit()
+    opened = 0
+    real_connect = aiosqlite.connect
+
+    def counting_connect(*args, **kwargs):
+        nonlocal opened
+        opened += 1
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(bm25_module.aiosqlite, "connect", counting_connect)
+    manager = BM25IndexManager(str(db_path), read_pool_size=2)
+    manager._initialized = True
+    try:
+        results = await asyncio.gather(
+            *(manager.fetch_window_for_message(channel_id=20, message_id=2) for _ in range(6))
+        )
+        again = await manager.fetch_window_for_message(channel_id=20, message_id=2)
+        async with manager._reader() as db:
+            with pytest.raises(aiosqlite.OperationalError):
+                await db.execute("DELETE FROM conversation_windows")
+    finally:
+        await manager.close()
+
+    assert results == [[{"message_id": 1, "content": "hello"}]] * 6
+    assert again == results[0]
+    assert opened <= 2
+    assert manager._idle_readers == []
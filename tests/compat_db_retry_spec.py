@@ -1,5 +1,6 @@
 import asyncio
 import time
+from datetime import datetime, timezone
 
 import pytest
 
@@ -9,7 +10,10 @@ from database.compat_db import (
     TiDBConnection,
     TiDBSettings,
     _is_safe_read_retry,
+    connect_main_db,
+    open_sqlite_read_pool,
 )
+from utils import db as db_utils
 
 
 def _connection() -> TiDBConnection:
@@ -322,3 +326,60 @@ async def test_repeated_transactions_register_one_task_done_callback(monkeypatch
     assert list(db._transaction_owner_callbacks) == [asyncio.current_task()]
     assert db._transaction_owner is None
     assert db._transaction_gate.locked() is False
+
+
+@pytest.mark.asyncio
+async def test_main_sqlite_connection_uses_wal_and_checkpoints(tmp_path):
+    db = await connect_main_db("sqlite", sqlite_path=str(tmp_path / "main.db"))
+    try:
+        async with db.execute("PRAGMA journal_mode") as cursor:
+            journal_mode = (await cursor.fetchone())[0]
+        async with db.execute("PRAGMA synchronous") as cursor:
+            synchronous = int((await cursor.fetchone())[0])
+        await db.execute("CREATE TABLE sample (value INTEGER)")
+        await db.execute("INSERT INTO sample (value) VALUES (1)")
+        await db.commit()
+
+        await db_utils.checkpoint_wal(db)
+        wal_size = (tmp_path / "main.db-wal").stat().st_size
+    finally:
+        await db.close()
+
+    assert journal_mode == "wal"
+    assert synchronous == 1
+    assert wal_size == 0
+
+
+@pytest.mark.asyncio
+async def test_sqlite_read_pool_serves_committed_reads_and_rejects_writes(tmp_path):
+    db_path = str(tmp_path / "main.db")
+    db = await connect_main_db("sqlite", sqlite_path=db_path)
+    readers = await open_sqlite_read_pool(db_path, size=2)
+    db_utils.attach_read_pool(db, readers)
+    try:
+        await db.execute(
+            "CREATE TABLE api_call_log (api_type TEXT NOT NULL, called_at TEXT NOT NULL)"
+        )
+        await db.commit()
+        await db_utils.log_api_call(db, "gemini")
+        await db_utils.log_api_call(db, "gemini")
+
+        picked = [db_utils._read_connection(db) for _ in range(3)]
+        count = await db_utils.get_daily_api_count(db, "gemini")
+        # 한도 판정용 일일 사용량은 reader가 아직 못 보는 같은 연결의 행까지 센다.
+        await db.execute(
+            "INSERT INTO api_call_log (api_type, called_at) VALUES (?, ?)",
+            ("gemini", datetime.now(timezone.utc).isoformat()),
+        )
+        counts = await db_utils.get_daily_api_counts(db, ["gemini"])
+        await db.rollback()
+        with pytest.raises(Exception):
+            await readers[0].execute("DELETE FROM api_call_log")
+    finally:
+        await db_utils.close_read_pool(db)
+        await db.close()
+
+    assert picked == [readers[0], readers[1], readers[0]]
+    assert count == 2
+    assert counts == {"gemini": 3}
+    assert db_utils._read_connection(db) is db
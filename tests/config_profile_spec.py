@@ -200,6 +200,28 @@ def test_general_profile_rejects_kakao_memory(tmp_path):
     assert "정확히 discord" in result.stderr
 
 
+def test_config_rejects_unknown_reranker_dtype(tmp_path):
+    profile_path = _profile_env(tmp_path)
+    profile_path.write_text(
+        profile_path.read_text(encoding="utf-8") + "\nRAG_RERANKER_DTYPE=fp64\n",
+        encoding="utf-8",
+    )
+    env = os.environ.copy()
+    env["MASAMONG_ENV_FILE"] = str(profile_path)
+
+    result = subprocess.run(
+        [sys.executable, "-c", "import config"],
+        cwd=ROOT,
+        env=env,
+        text=True,
+        capture_output=True,
+        timeout=15,
+    )
+
+    assert result.returncode != 0
+    assert "RAG_RERANKER_DTYPE" in result.stderr
+
+
 def test_masamo_runtime_accepts_owned_school_notice_paths(tmp_path):
     profile_path = _masamo_profile_env(tmp_path)
     catalog_path = ROOT / "profiles" / "catalogs" / "school_notice_catalog.v1.json"
@@ -0,0 +1,185 @@
+from utils.data_formatters import (
+    FinancialDataFormatter,
+    GameDataFormatter,
+    TravelDataFormatter,
+    WeatherDataFormatter,
+)
+
+
+def _forecast_item(category: str, value: str, time: str = "0600") -> dict:
+    return {"category": category, "fcstValue": value, "fcstTime": time}
+
+
+def test_forecast_summarizes_temperatures_noon_sky_and_max_pop():
+    raw = {
+        "item": [
+            _forecast_item("SKY", "4", "0900"),
+            _forecast_item("TMN", "3.0"),
+            _forecast_item("POP", "20", "0900"),
+            _forecast_item("SKY", "1", "1200"),
+            _forecast_item("TMX", "12.5", "1500"),
+            _forecast_item("POP", "60", "1500"),
+            _forecast_item("TMN", "1.5"),
+        ]
+    }
+
+    rendered = WeatherDataFormatter.format_forecast(raw, "내일")
+
+    assert rendered == (
+        "내일 날씨: 🌡️ 기온 1.5°C ~ 12.5°C, 하늘: 맑음☀️, 강수확률: ~60%"
+    )
+
+
+def test_forecast_falls_back_to_first_sky_and_omits_missing_temperatures():
+    raw = {
+        "item": [
+            _forecast_item("SKY", "3", "0900"),
+            _forecast_item("SKY", "4", "1500"),
+        ]
+    }
+
+    rendered = WeatherDataFormatter.format_forecast(raw)
+
+    assert rendered == "오늘 날씨: , 하늘: 구름많음☁️, 강수확률: ~0%"
+
+
+def test_wind_direction_wraps_sixteen_points():
+    assert WeatherDataFormatter._get_wind_direction(0.0) == "북"
+    assert WeatherDataFormatter._get_wind_direction(45.0) == "북동"
+    assert WeatherDataFormatter._get_wind_direction(190.0) == "남"
+    assert WeatherDataFormatter._get_wind_direction(350.0) == "북"
+    assert WeatherDataFormatter._get_wind_direction(360.0) == "북"
+    # 구간 경계는 round()의 짝수 반올림을 따른다.
+    assert WeatherDataFormatter._get_wind_direction(11.25) == "북"
+    assert WeatherDataFormatter._get_wind_direction(33.75) == "북동"
+    assert WeatherDataFormatter._get_wind_direction(348.75) == "북"
+
+
+def test_current_weather_joins_optional_precipitation_and_wind():
+    raw = {
+        "item": [
+            {"category": category, "obsrValue": value}
+            for category, value in (
+                ("T1H", "3.1"),
+                ("REH", "40"),
+                ("WSD", "5.2"),
+                ("VEC", "100"),
+                ("PTY", "1"),
+                ("RN1", "2"),
+            )
+        ]
+    }
+
+    rendered = WeatherDataFormatter.format_current_weather(raw)
+
+    assert rendered == (
+        "🌡️ 기온: 3.1°C, 💧 습도: 40%, ☔ 강수: 비 (시간당 2mm), "
+        "💨 바람: 동 5.2m/s (보통 바람)"
+    )
+
+
+def test_game_recommendation_separates_blocks_without_trailing_blank_lines():
+    raw = {
+        "results": [
+            {
+                "name": "Alpha",
+                "released": "2020-01-01",
+                "rating": 4.25,
+                "playtime": 12,
+                "metacritic": 90,
+                "genres": [{"name": "RPG"}, {"name": "Action"}],
+                "platforms": [{"platform": {"name": "PC"}}],
+            },
+            {"name": "Beta", "rating": 3, "metacritic": 0},
+        ]
+    }
+
+    rendered = GameDataFormatter.format_game_recommendation(raw)
+
+    assert rendered == (
+        "🎮 추천 게임 목록\n\n"
+        "1. **Alpha**\n"
+        "   • 출시일: 2020-01-01\n"
+        "   • 평점: 4.2/5.0 (메타크리틱: 90/100)\n"
+        "   • 평균 플레이타임: 12시간\n"
+        "   • 품질: 최고 등급 🏆\n"
+        "   • 장르: RPG, Action\n"
+        "   • 플랫폼: PC\n\n"
+        "2. **Beta**\n"
+        "   • 출시일: N/A\n"
+        "   • 평점: 3.0/5.0\n"
+        "   • 평균 플레이타임: 0시간\n"
+        "   • 장르: N/A\n"
+        "   • 플랫폼: N/A"
+    )
+
+
+def test_places_render_address_and_tolerate_empty_categories():
+    raw = {
+        "places": [
+            {
+                "name": "전주 한옥마을",
+                "categories": [],
+                "distance": 120,
+                "location": {"formatted_address": "전북 전주시 완산구"},
+            }
+        ]
+    }
+
+    rendered = TravelDataFormatter.format_places(raw)
+
+    assert rendered == (
+        "📍 추천 장소\n\n"
+        "1. **전주 한옥마을**\n"
+        "   • 카테고리: N/A\n"
+        "   • 거리: 120.0m\n"
+        "   • 주소: 전북 전주시 완산구"
+    )
+
+
+def test_empty_place_and_event_results_return_not_found_messages():
+    assert TravelDataFormatter.format_places({"places": []}) == (
+        "조건에 맞는 장소를 찾지 못했습니다."
+    )
+    assert TravelDataFormatter.format_events({"events": []}) == (
+        "조건에 맞는 이벤트를 찾지 못했습니다."
+    )
+
+
+def test_exchange_rate_strips_thousands_separators():
+    rendered = FinancialDataFormatter.format_exchange_rate(
+        {
+            "cur_unit": "USD",
+            "cur_nm": "미국 달러",
+            "deal_bas_r": "1,352.50",
+            "ttb": "1,329.12",
+            "tts": "1,375.88",
+        }
+    )
+
+    assert rendered == (
+        "💰 USD → KRW 환율\n"
+        "• 매매기준율: 1,352.50원 (미국 달러)\n"
+        "• 현찰 살 때(TTB): 1,329.12원\n"
+        "• 현찰 팔 때(TTS): 1,375.88원\n"
+        "• 스프레드: 46.76원 (3.46%)"
+    )
+
+
+def test_game_recommendation_caps_genres_and_platforms_at_three():
+    raw = {
+        "results": [
+            {
+                "name": "Gamma",
+                "rating": 4,
+                "metacritic": 75,
+                "genres": [{"name": f"G{i}"} for i in range(5)],
+                "platforms": None,
+            }
+        ]
+    }
+
+    rendered = GameDataFormatter.format_game_recommendation(raw)
+
+    assert "   • 품질: 우수 등급 ⭐\n   • 장르: G0, G1, G2\n" in rendered
+    assert rendered.endswith("   • 플랫폼: N/A")
@@ -132,3 +132,63 @@ async def test_archive_rolls_back_insert_when_delete_trigger_fails(tmp_path, mon
             assert await cursor.fetchall() == []
         async with db.execute("SELECT value FROM commit_probe") as cursor:
             assert await cursor.fetchall() == [(1,)]
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_same_rows_it_deletes_when_created_at_ties(monkeypatch):
+    monkeypatch.setattr(
+        db_utils.config,
+        "RAG_ARCHIVING_CONFIG",
+        {"enabled": True, "history_limit": 1, "batch_size": 10},
+    )
+
+    async with aiosqlite.connect(":memory:") as db:
+        await _create_conversation_tables(db)
+        await db.execute(
+            """
+            INSERT INTO conversation_history (
+                message_id, guild_id, channel_id, user_id, user_name,
+                content, is_bot, created_at, embedding
+            ) VALUES (0, 10, 20, 32, "tie-user", "tied text", 0, "2026-01-01", NULL)
+            """
+        )
+        await db.commit()
+
+        await db_utils.archive_old_conversations(db)
+
+        async with db.execute(
+            "SELECT message_id FROM conversation_history ORDER BY message_id"
+        ) as cursor:
+            assert await cursor.fetchall() == [(2,)]
+        async with db.execute(
+            "SELECT message_id FROM conversation_history_archive ORDER BY message_id"
+        ) as cursor:
+            assert await cursor.fetchall() == [(0,), (1,)]
+
+
+@pytest.mark.asyncio
+async def test_archive_uses_immediate_transaction_after_committed_writes(monkeypatch):
+    _enable_one_row_archive(monkeypatch)
+
+    async with aiosqlite.connect(":memory:") as db:
+        await _create_conversation_tables(db)
+        await db.execute(
+            "CREATE TABLE api_call_log (api_type TEXT NOT NULL, called_at TEXT NOT NULL)"
+        )
+        await db.commit()
+        await db_utils.log_api_call(db, "archive_probe")
+
+        statements: list[str] = []
+        await db.set_trace_callback(statements.append)
+        await db_utils.archive_old_conversations(db)
+        await db.set_trace_callback(None)
+
+        async with db.execute("SELECT COUNT(*) FROM api_call_log") as cursor:
+            assert (await cursor.fetchone())[0] == 1
+
+    begin_index = statements.index("BEGIN IMMEDIATE")
+    assert not any("api_call_log" in sql for sql in statements)
+    assert any(
+        sql.startswith("INSERT INTO conversation_history_archive")
+        for sql in statements[begin_index:]
+    )
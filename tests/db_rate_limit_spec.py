@@ -1,5 +1,7 @@
 import asyncio
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
 
 import aiosqlite
 import pytest
@@ -180,6 +182,19 @@ async def test_daily_api_counts_reads_multiple_keys_in_one_result(api_log_db):
     }
 
 
+def test_variable_in_filter_keeps_sqlite_sql_text_constant():
+    class _TiDB:
+        backend = "tidb"
+
+    sqlite_one = db_utils._in_values_sql(object(), "api_type", ["a"])
+    sqlite_three = db_utils._in_values_sql(object(), "api_type", ["a", "b", "c"])
+    tidb_three = db_utils._in_values_sql(_TiDB(), "api_type", ["a", "b", "c"])
+
+    assert sqlite_one[0] == sqlite_three[0]
+    assert sqlite_three[1] == ('["a", "b", "c"]',)
+    assert tidb_three == ("api_type IN (?,?,?)", ("a", "b", "c"))
+
+
 @pytest.mark.asyncio
 async def test_hierarchical_llm_reservation_records_every_scope_once(
     api_log_db,
@@ -352,3 +367,242 @@ async def test_dm_reservation_fails_closed_when_usage_store_is_missing():
         await db.close()
 
     assert result == (False, "usage_store_error", None)
+
+
+@pytest.mark.asyncio
+async def test_schema_rate_limit_counts_use_covering_index():
+    schema_path = Path(__file__).resolve().parents[1] / "database" / "schema.sql"
+    db = await aiosqlite.connect(":memory:")
+    try:
+        await db.executescript(schema_path.read_text(encoding="utf-8"))
+        async with db.execute(
+            "EXPLAIN QUERY PLAN "
+            "SELECT COUNT(*) FROM api_call_log "
+            "WHERE api_type = ? AND called_at >= ?",
+            ("weather", datetime.now(timezone.utc).isoformat()),
+        ) as cursor:
+            plan = " ".join(str(row[3]) for row in await cursor.fetchall())
+    finally:
+        await db.close()
+
+    assert "COVERING INDEX idx_api_call_log_type_called_at" in plan
+
+
+@pytest.mark.asyncio
+async def test_api_rate_limit_counts_each_committed_call(api_log_db):
+    await db_utils.log_api_call(api_log_db, "weather")
+    assert await db_utils.check_api_rate_limit(
+        api_log_db,
+        "weather",
+        rpm_limit=2,
+        rpd_limit=100,
+    ) is False
+
+    await db_utils.log_api_call(api_log_db, "weather")
+    assert await db_utils.check_api_rate_limit(
+        api_log_db,
+        "weather",
+        rpm_limit=2,
+        rpd_limit=100,
+    ) is True
+
+    async with api_log_db.execute(
+        "SELECT COUNT(*) FROM api_call_log WHERE api_type = 'weather'"
+    ) as cursor:
+        assert int((await cursor.fetchone())[0]) == 2
+
+
+@pytest.mark.asyncio
+async def test_log_api_call_commits_each_row_before_returning(api_log_db):
+    commits = 0
+    original_commit = api_log_db.commit
+
+    async def counting_commit():
+        nonlocal commits
+        commits += 1
+        await original_commit()
+
+    api_log_db.commit = counting_commit
+    try:
+        for api_type in ("llm_global", "llm_user_1", "llm_global"):
+            await db_utils.log_api_call(api_log_db, api_type)
+    finally:
+        api_log_db.commit = original_commit
+
+    async with api_log_db.execute(
+        "SELECT api_type, COUNT(*) FROM api_call_log GROUP BY api_type"
+    ) as cursor:
+        rows = dict(await cursor.fetchall())
+
+    assert rows == {"llm_global": 2, "llm_user_1": 1}
+    assert commits == 3
+
+
+@pytest.mark.asyncio
+async def test_api_rate_limit_sees_external_writes_immediately(api_log_db):
+    assert await db_utils.check_api_rate_limit(
+        api_log_db,
+        "cometapi",
+        rpm_limit=1,
+        rpd_limit=100,
+    ) is False
+    await api_log_db.execute(
+        "INSERT INTO api_call_log (api_type, called_at) VALUES (?, ?)",
+        ("cometapi", datetime.now(timezone.utc).isoformat()),
+    )
+    await api_log_db.commit()
+
+    assert await db_utils.check_api_rate_limit(
+        api_log_db,
+        "cometapi",
+        rpm_limit=1,
+        rpd_limit=100,
+    ) is True
+
+
+@pytest.mark.asyncio
+async def test_legacy_dm_limit_upsert_counts_and_blocks_without_overshoot(
+    dm_limit_db,
+    monkeypatch,
+):
+    monkeypatch.setattr(db_utils, "DM_LIMIT_COUNT", 2)
+
+    results = [
+        await db_utils.check_dm_message_limit(dm_limit_db, 42)
+        for _ in range(3)
+    ]
+    async with dm_limit_db.execute(
+        "SELECT usage_count FROM dm_usage_logs WHERE user_id = 42"
+    ) as cursor:
+        usage_count = int((await cursor.fetchone())[0])
+
+    assert results[:2] == [(True, None), (True, None)]
+    assert results[2][0] is False
+    assert results[2][1]
+    assert usage_count == 2
+
+
+@pytest.mark.asyncio
+async def test_legacy_dm_limit_upsert_resets_expired_window(
+    dm_limit_db,
+    monkeypatch,
+):
+    monkeypatch.setattr(db_utils, "DM_LIMIT_COUNT", 1)
+    now = datetime.now(timezone.utc)
+    await dm_limit_db.execute(
+        """
+        INSERT INTO dm_usage_logs (
+            user_id, usage_count, window_start_at, reset_at
+        ) VALUES (?, 1, ?, ?)
+        """,
+        (
+            42,
+            (now - timedelta(hours=6)).isoformat(),
+            (now - timedelta(hours=1)).isoformat(),
+        ),
+    )
+    await dm_limit_db.commit()
+
+    allowed = await db_utils.check_dm_message_limit(dm_limit_db, 42)
+    async with dm_limit_db.execute(
+        "SELECT usage_count, reset_at FROM dm_usage_logs WHERE user_id = 42"
+    ) as cursor:
+        usage_count, reset_at = await cursor.fetchone()
+
+    assert allowed == (True, None)
+    assert usage_count == 1
+    assert datetime.fromisoformat(reset_at) > now
+
+
+def test_cached_utc_iso_timestamp_matches_datetime_isoformat_ordering():
+    before = datetime.now(timezone.utc).isoformat()
+    stamps = [db_utils._utc_now_iso() for _ in range(3)]
+    after = datetime.now(timezone.utc).isoformat()
+
+    parsed = datetime.fromisoformat(stamps[0])
+    assert parsed.tzinfo == timezone.utc
+    assert len(stamps[0]) == len("2026-01-01T00:00:00.000000+00:00")
+    assert before <= stamps[0] <= stamps[1] <= stamps[2] <= after
+
+
+def test_current_kst_time_uses_fixed_offset_and_matches_pytz(monkeypatch):
+    import pytz
+
+    monkeypatch.setattr(db_utils.time, "time", lambda: 1_785_000_000.25)
+    monkeypatch.setattr(db_utils, "_kst_time_text", (-1, ""))
+
+    expected = datetime.fromtimestamp(
+        1_785_000_000,
+        pytz.timezone("Asia/Seoul"),
+    ).strftime("%Y년 %m월 %d일 %H시 %M분 %S초")
+    assert db_utils.KST.utcoffset(None) == timedelta(hours=9)
+    assert db_utils.get_current_time() == expected
+    assert db_utils._kst_time_text == (1_785_000_000, expected)
+
+
+@pytest.mark.asyncio
+async def test_prune_api_call_log_deletes_old_rows_in_batches(api_log_db):
+    now = datetime.now(timezone.utc)
+    rows = [("old", (now - timedelta(days=40, minutes=i)).isoformat()) for i in range(5)]
+    rows += [
+        ("recent", (now - timedelta(hours=30)).isoformat()),
+        ("recent", now.isoformat()),
+    ]
+    await api_log_db.executemany(
+        "INSERT INTO api_call_log (api_type, called_at) VALUES (?, ?)",
+        rows,
+    )
+    await api_log_db.commit()
+
+    disabled = await db_utils.prune_api_call_log(api_log_db, 0)
+    # 보존 기간 1일은 한도 집계 창을 지키기 위해 2일로 올려 적용된다.
+    deleted = await db_utils.prune_api_call_log(api_log_db, 1, batch_size=2)
+    async with api_log_db.execute(
+        "SELECT api_type FROM api_call_log ORDER BY called_at"
+    ) as cursor:
+        remaining = [row[0] for row in await cursor.fetchall()]
+
+    assert disabled == 0
+    assert deleted == 5
+    assert remaining == ["recent", "recent"]
+
+
+@pytest.mark.asyncio
+async def test_image_user_limit_uses_constants_bound_from_config(
+    api_log_db,
+    monkeypatch,
+):
+    assert db_utils._IMAGE_USER_LIMIT == config.IMAGE_USER_LIMIT
+    assert db_utils._IMAGE_GUILD_DAILY_LIMIT == config.IMAGE_GUILD_DAILY_LIMIT
+    await api_log_db.execute(
+        "INSERT INTO api_call_log (api_type, called_at) VALUES (?, ?)",
+        ("image_gen_user_7", datetime.now(timezone.utc).isoformat()),
+    )
+    await api_log_db.commit()
+    monkeypatch.setattr(db_utils, "_IMAGE_USER_LIMIT", 1)
+
+    assert await db_utils.check_image_user_limit(api_log_db, 7) == (True, 0)
+
+
+@pytest.mark.asyncio
+async def test_global_dm_limit_single_upsert_stops_at_limit(
+    dm_limit_db,
+    monkeypatch,
+):
+    monkeypatch.setattr(db_utils, "DM_GLOBAL_LIMIT", 2)
+
+    results = [await db_utils.check_global_dm_limit(dm_limit_db) for _ in range(3)]
+    async with dm_limit_db.execute(
+        "SELECT counter_value FROM system_counters WHERE counter_name LIKE 'dm_daily_global_%'"
+    ) as cursor:
+        counter_values = [int(row[0]) for row in await cursor.fetchall()]
+
+    assert results == [True, True, False]
+    assert counter_values == [2]
+
+
+def test_is_sqlite_treats_missing_or_cased_backend_consistently():
+    assert db_utils._is_sqlite(SimpleNamespace()) is True
+    assert db_utils._is_sqlite(SimpleNamespace(backend=None)) is True
+    assert db_utils._is_sqlite(SimpleNamespace(backend=" SQLite ")) is True
+    assert db_utils._is_sqlite(SimpleNamespace(backend="TiDB")) is False
@@ -1,4 +1,5 @@
 import sqlite3
+from unittest.mock import AsyncMock
 
 import numpy as np
 import pytest
@@ -7,6 +8,12 @@ import config
 from utils.embeddings import DiscordEmbeddingStore
 
 
+async def _create_store_file(db_path) -> None:
+    seed_store = DiscordEmbeddingStore(str(db_path))
+    await seed_store.initialize()
+    await seed_store.close()
+
+
 def _use_sqlite(monkeypatch, *, auto_migrate: bool) -> None:
     monkeypatch.setattr(config, "DISCORD_EMBEDDING_BACKEND", "sqlite")
     monkeypatch.setattr(config, "DISCORD_EMBEDDING_TIDB_TABLE", "discord_chat_embeddings")
@@ -96,7 +103,7 @@ async def test_auto_migrate_false_allows_writes_without_becoming_read_only(
 ):
     _use_sqlite(monkeypatch, auto_migrate=True)
     db_path = tmp_path / "existing.db"
-    await DiscordEmbeddingStore(str(db_path)).initialize()
+    await _create_store_file(db_path)
 
     monkeypatch.setattr(config, "AUTO_MIGRATE", False)
     store = DiscordEmbeddingStore(str(db_path))
@@ -112,6 +119,7 @@ async def test_auto_migrate_false_allows_writes_without_becoming_read_only(
     )
 
     rows = await store.fetch_recent_embeddings(2, 3)
+    await store.close()
     assert len(rows) == 1
     assert rows[0]["message"] == "stored"
 
@@ -192,6 +200,7 @@ async def test_memory_lookup_isolates_servers_and_other_users(
         user_id=7,
     )
     messages = {row["message"] for row in rows}
+    await store.close()
 
     # 같은 서버의 공용 기억과 현재 사용자 본인 기억만 회수한다. 순서는 최신순이며
     # 본인 기억 우대는 SQL이 아니라 _score_discord_rows의 유사도 가산으로 한다.
@@ -210,7 +219,7 @@ async def test_read_only_store_blocks_all_public_mutations(
 ):
     _use_sqlite(monkeypatch, auto_migrate=True)
     db_path = tmp_path / "readonly.db"
-    await DiscordEmbeddingStore(str(db_path)).initialize()
+    await _create_store_file(db_path)
     store = DiscordEmbeddingStore(str(db_path), read_only=True)
     vector = np.zeros(4, dtype=np.float32)
 
@@ -251,6 +260,7 @@ async def test_read_only_store_blocks_all_public_mutations(
         await store.delete_memory_entries([])
     with pytest.raises(RuntimeError, match="read-only"):
         await store.delete_embeddings([])
+    await store.close()
 
 
 @pytest.mark.asyncio
@@ -306,3 +316,1138 @@ async def test_tidb_read_only_initialization_runs_schema_selects_only(
     assert len(queries) == 3
     with pytest.raises(RuntimeError, match="read-only"):
         await store.delete_embeddings([1])
+
+
+@pytest.mark.asyncio
+async def test_sqlite_store_reuses_one_connection_and_reopens_after_close(
+    tmp_path,
+    monkeypatch,
+):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    import aiosqlite
+
+    opened = []
+    original_connect = aiosqlite.connect
+
+    def counting_connect(*args, **kwargs):
+        opened.append(args[0])
+        return original_connect(*args, **kwargs)
+
+    monkeypatch.setattr(aiosqlite, "connect", counting_connect)
+    store = DiscordEmbeddingStore(str(tmp_path / "pooled.db"))
+    try:
+        for message_id in (1, 2):
+            await store.upsert_message_embedding(
+                message_id=message_id,
+                server_id=2,
+                channel_id=3,
+                user_id=4,
+                user_name="tester",
+                message=f"message-{message_id}",
+                timestamp_iso=f"2026-07-27T00:00:0{message_id}+00:00",
+                embedding=np.zeros(4, dtype=np.float32),
+            )
+        rows = await store.fetch_recent_embeddings(2, 3)
+        writable_connections = [
+            target for target in opened if not str(target).startswith("file:")
+        ]
+        async with store._sqlite_connect() as db:
+            async with db.execute("PRAGMA journal_mode") as cursor:
+                journal_mode = (await cursor.fetchone())[0]
+            tuned = {}
+            for pragma in ("synchronous", "temp_store", "busy_timeout", "wal_autocheckpoint"):
+                async with db.execute(f"PRAGMA {pragma}") as cursor:
+                    tuned[pragma] = (await cursor.fetchone())[0]
+
+        await store.close()
+        assert await store.count_memory_entries() == 0
+    finally:
+        await store.close()
+
+    assert [row["message"] for row in rows] == ["message-2", "message-1"]
+    assert len(writable_connections) == 1
+    assert journal_mode == "wal"
+    # synchronous=NORMAL(1), temp_store=MEMORY(2)
+    assert tuned == {
+        "synchronous": 1,
+        "temp_store": 2,
+        "busy_timeout": 5000,
+        "wal_autocheckpoint": 1000,
+    }
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_message_embeddings_writes_batch_in_one_commit(
+    tmp_path,
+    monkeypatch,
+):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    store = DiscordEmbeddingStore(str(tmp_path / "batch.db"))
+    vector = np.ones(4, dtype=np.float32)
+    try:
+        assert await store.upsert_many_message_embeddings([]) == 0
+        async with store._sqlite_connect() as db:
+            changes_before = db.total_changes
+        written = await store.upsert_many_message_embeddings(
+            [
+                (1, 2, 3, 4, "tester", "first", "2026-07-27T00:00:01+00:00", vector),
+                (2, 2, 3, 4, "tester", "second", "2026-07-27T00:00:02+00:00", vector),
+                (1, 2, 3, 4, "tester", "first-edited", "2026-07-27T00:00:03+00:00", vector),
+            ]
+        )
+        async with store._sqlite_connect() as db:
+            changes_after = db.total_changes
+            assert not db.in_transaction
+        rows = await store.fetch_recent_embeddings(2, 3)
+    finally:
+        await store.close()
+
+    assert written == 3
+    assert changes_after - changes_before == 3
+    assert [row["message"] for row in rows] == ["first-edited", "second"]
+    # 저장 벡터는 단위 길이로 정규화된다.
+    assert np.frombuffer(rows[0]["embedding"], dtype=np.float32).tolist() == [0.5] * 4
+
+
+@pytest.mark.asyncio
+async def test_fetch_recent_matrix_stacks_blobs_in_row_order(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    store = DiscordEmbeddingStore(str(tmp_path / "matrix.db"))
+    try:
+        await store.upsert_many_message_embeddings(
+            [
+                (
+                    message_id,
+                    2,
+                    3,
+                    4,
+                    "tester",
+                    f"message-{message_id}",
+                    f"2026-07-27T00:00:0{message_id}+00:00",
+                    np.eye(3, dtype=np.float32)[message_id - 1],
+                )
+                for message_id in (1, 2, 3)
+            ]
+        )
+        message_ids, matrix, metadata = await store.fetch_recent_matrix(2, 3)
+    finally:
+        await store.close()
+
+    assert message_ids == ["3", "2", "1"]
+    assert matrix.shape == (3, 3)
+    assert matrix.dtype == np.float32
+    assert matrix.tolist() == np.eye(3)[[2, 1, 0]].tolist()
+    assert [row["message"] for row in metadata] == ["message-3", "message-2", "message-1"]
+    assert all("embedding" not in row for row in metadata)
+
+
+@pytest.mark.asyncio
+async def test_fetch_recent_matrix_can_hold_half_precision_rows(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_MATRIX_DTYPE", "float16")
+    store = DiscordEmbeddingStore(str(tmp_path / "matrix-f16.db"))
+    vector = np.array([0.6, 0.8, 0.0], dtype=np.float32)
+    try:
+        await store.upsert_many_message_embeddings(
+            [(1, 2, 3, 4, "tester", "message", "2026-07-27T00:00:01+00:00", vector)]
+        )
+        _, matrix, _ = await store.fetch_recent_matrix(2, 3)
+    finally:
+        await store.close()
+
+    assert matrix.dtype == np.float16
+    assert matrix.tolist() == [vector.astype(np.float16).tolist()]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage_dtype", ["int8", "float16"])
+@pytest.mark.parametrize("matrix_dtype", ["float32", "float16"])
+async def test_fetch_recent_matrix_unpacks_compact_rows_like_decoded_blobs(
+    tmp_path, monkeypatch, storage_dtype, matrix_dtype
+):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_STORAGE_DTYPE", storage_dtype)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_MATRIX_DTYPE", matrix_dtype)
+    store = DiscordEmbeddingStore(str(tmp_path / f"matrix-{storage_dtype}.db"))
+    rng = np.random.default_rng(5)
+    vectors = rng.normal(size=(3, 8)).astype(np.float32)
+    try:
+        await store.upsert_many_message_embeddings(
+            [
+                (index + 1, 2, 3, 4, "tester", f"m{index}",
+                 f"2026-07-27T00:00:0{index + 1}+00:00", vector)
+                for index, vector in enumerate(vectors)
+            ]
+        )
+        rows = await store.fetch_recent_embeddings(2, 3)
+        _, matrix, _ = await store.fetch_recent_matrix(2, 3)
+    finally:
+        await store.close()
+
+    # 압축 행을 버퍼에 바로 풀어도 float32 BLOB으로 복원한 값과 같아야 한다.
+    expected = np.stack(
+        [np.frombuffer(row["embedding"], dtype=np.float32) for row in rows]
+    ).astype(matrix_dtype)
+    assert matrix.dtype == np.dtype(matrix_dtype)
+    assert np.array_equal(matrix, expected)
+
+
+@pytest.mark.asyncio
+async def test_fetch_recent_matrix_is_cached_until_the_channel_changes(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_MATRIX_CACHE_SIZE", 8)
+    store = DiscordEmbeddingStore(str(tmp_path / "matrix-cache.db"))
+    vector = np.ones(3, dtype=np.float32)
+    try:
+        await store.upsert_message_embedding(
+            1, 2, 3, 4, "tester", "first", "2026-07-27T00:00:01+00:00", vector
+        )
+        first = await store.fetch_recent_matrix(2, 3)
+        again = await store.fetch_recent_matrix(2, 3)
+        # 다른 채널 쓰기는 이 채널 캐시를 버리지 않는다.
+        await store.upsert_message_embedding(
+            2, 2, 9, 4, "tester", "elsewhere", "2026-07-27T00:00:02+00:00", vector
+        )
+        unaffected = await store.fetch_recent_matrix(2, 3)
+        await store.upsert_message_embedding(
+            3, 2, 3, 4, "tester", "second", "2026-07-27T00:00:03+00:00", vector
+        )
+        refreshed = await store.fetch_recent_matrix(2, 3)
+        await store.delete_embeddings([3])
+        after_delete = await store.fetch_recent_matrix(2, 3)
+    finally:
+        await store.close()
+
+    assert again is first
+    assert unaffected is first
+    assert refreshed[0] == ["3", "1"]
+    assert after_delete[0] == ["1"]
+
+
+@pytest.mark.asyncio
+async def test_int8_embeddings_store_quarter_size_and_round_trip(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    db_path = tmp_path / "int8.db"
+    legacy = np.array([0.6, -0.8, 0.0, 0.0], dtype=np.float32)
+    await _create_store_file(db_path)
+    seed = DiscordEmbeddingStore(str(db_path))
+    await seed.upsert_message_embedding(
+        1, 2, 3, 4, "tester", "legacy", "2026-07-27T00:00:01+00:00", legacy
+    )
+    await seed.close()
+
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_INT8", True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_DROP_FLOAT32", True)
+    store = DiscordEmbeddingStore(str(db_path))
+    vector = np.array([0.5, -0.5, 0.5, -0.5], dtype=np.float32)
+    try:
+        await store.upsert_message_embedding(
+            2, 2, 3, 4, "tester", "quantized", "2026-07-27T00:00:02+00:00", vector
+        )
+        rows = await store.fetch_recent_embeddings(2, 3)
+    finally:
+        await store.close()
+
+    with sqlite3.connect(db_path) as db:
+        stored = {
+            row[0]: row[1:]
+            for row in db.execute(
+                "SELECT message_id, length(embedding), length(embedding_q) "
+                "FROM discord_chat_embeddings"
+            )
+        }
+    # 초기화가 기존 float32 행도 int8(4바이트 → 1바이트)로 옮기고, 새 행도 int8로 저장한다.
+    assert stored == {"1": (0, 4), "2": (0, 4)}
+    decoded = {
+        row["message"]: np.frombuffer(row["embedding"], dtype=np.float32)
+        for row in rows
+    }
+    assert decoded["legacy"].tolist() == pytest.approx(legacy.tolist(), abs=1 / 127)
+    assert decoded["quantized"].tolist() == pytest.approx(vector.tolist(), abs=1 / 127)
+
+
+@pytest.mark.asyncio
+async def test_float16_embeddings_store_half_size_and_round_trip(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    db_path = tmp_path / "fp16.db"
+    legacy = np.array([0.6, -0.8, 0.0, 0.0], dtype=np.float32)
+    await _create_store_file(db_path)
+    seed = DiscordEmbeddingStore(str(db_path))
+    await seed.upsert_message_embedding(
+        1, 2, 3, 4, "tester", "legacy", "2026-07-27T00:00:01+00:00", legacy
+    )
+    await seed.close()
+
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_STORAGE_DTYPE", "float16")
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_DROP_FLOAT32", True)
+    store = DiscordEmbeddingStore(str(db_path))
+    vector = np.array([0.1, -0.7, 0.3, 0.64], dtype=np.float32)
+    try:
+        await store.upsert_message_embedding(
+            2, 2, 3, 4, "tester", "half", "2026-07-27T00:00:02+00:00", vector
+        )
+        rows = await store.fetch_recent_embeddings(2, 3)
+    finally:
+        await store.close()
+
+    with sqlite3.connect(db_path) as db:
+        stored = {
+            row[0]: row[1:]
+            for row in db.execute(
+                "SELECT message_id, length(embedding), length(embedding_q), embedding_scale "
+                "FROM discord_chat_embeddings"
+            )
+        }
+    # float16은 scale 없이 embedding_q에 2바이트씩 저장된다.
+    assert stored == {"1": (0, 8, None), "2": (0, 8, None)}
+    decoded = {
+        row["message"]: np.frombuffer(row["embedding"], dtype=np.float32)
+        for row in rows
+    }
+    assert decoded["legacy"].tolist() == pytest.approx(legacy.tolist(), abs=1e-3)
+    restored = decoded["half"]
+    cosine = float(restored @ vector) / float(np.linalg.norm(restored) * np.linalg.norm(vector))
+    assert cosine == pytest.approx(1.0, abs=1e-6)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage_dtype", ["int8", "float16"])
+async def test_compact_storage_keeps_float32_rows_without_explicit_opt_in(
+    tmp_path, monkeypatch, storage_dtype
+):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    db_path = tmp_path / f"keep-{storage_dtype}.db"
+    legacy = np.array([0.6, -0.8, 0.0, 0.0], dtype=np.float32)
+    seed = DiscordEmbeddingStore(str(db_path))
+    await seed.upsert_message_embedding(
+        1, 2, 3, 4, "tester", "legacy", "2026-07-27T00:00:01+00:00", legacy
+    )
+    await seed.close()
+
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_STORAGE_DTYPE", storage_dtype)
+    store = DiscordEmbeddingStore(str(db_path))
+    vector = np.array([0.5, -0.5, 0.5, -0.5], dtype=np.float32)
+    try:
+        await store.upsert_message_embedding(
+            2, 2, 3, 4, "tester", "new", "2026-07-27T00:00:02+00:00", vector
+        )
+    finally:
+        await store.close()
+
+    with sqlite3.connect(db_path) as db:
+        stored = {
+            row[0]: row[1:]
+            for row in db.execute(
+                "SELECT message_id, embedding, embedding_q IS NOT NULL "
+                "FROM discord_chat_embeddings"
+            )
+        }
+    # 기존 행은 변환하지 않고, 새 행은 압축 값을 float32 원본 옆에 함께 쓴다.
+    assert stored == {
+        "1": (legacy.tobytes(), 0),
+        "2": (vector.tobytes(), 1),
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage_dtype", ["int8", "float16"])
+async def test_vec0_index_covers_rows_after_float32_drop_migration(
+    tmp_path, monkeypatch, storage_dtype
+):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    db_path = tmp_path / f"vec0-{storage_dtype}.db"
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(4, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    seed = DiscordEmbeddingStore(str(db_path))
+    await seed.upsert_many_message_embeddings(
+        [
+            (index, 2, 3, 4, "tester", f"m{index}", f"2026-07-27T00:00:0{index}+00:00", vector)
+            for index, vector in enumerate(vectors)
+        ]
+    )
+    await seed.close()
+
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_STORAGE_DTYPE", storage_dtype)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_DROP_FLOAT32", True)
+    migrated = DiscordEmbeddingStore(str(db_path))
+    try:
+        await migrated.initialize()
+        knn_available = migrated.knn_search_available
+    finally:
+        await migrated.close()
+    if not knn_available:
+        pytest.skip("sqlite-vec 확장이 없어 vec0 인덱스를 확인할 수 없습니다.")
+    # 인덱스를 잃은 상태에서도 float32 원본 없이 다시 채워져야 한다.
+    with sqlite3.connect(db_path) as db:
+        assert db.execute(
+            "SELECT COUNT(*) FROM discord_chat_embeddings WHERE length(embedding) > 0"
+        ).fetchone() == (0,)
+    store = DiscordEmbeddingStore(str(db_path))
+    try:
+        await store.initialize()
+        async with store._sqlite_connect() as db:
+            await db.execute(f"DROP TABLE {store._KNN_TABLE}")
+            await db.commit()
+        store._knn_dimension = None
+        async with store._sqlite_connect() as db:
+            await store._prepare_knn_index(db)
+            await db.commit()
+            async with db.execute(f"SELECT COUNT(*) FROM {store._KNN_TABLE}") as cursor:
+                indexed = (await cursor.fetchone())[0]
+        nearest = await store.fetch_recent_embeddings(
+            2, 3, limit=1, query_vector=vectors[2]
+        )
+    finally:
+        await store.close()
+
+    assert indexed == len(vectors)
+    assert [row["message"] for row in nearest] == ["m2"]
+
+
+@pytest.mark.asyncio
+async def test_disabling_int8_rewrites_quantized_rows_as_float32(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_INT8", True)
+    db_path = tmp_path / "int8-off.db"
+    store = DiscordEmbeddingStore(str(db_path))
+    vector = np.array([0.25, 0.5, -1.0], dtype=np.float32)
+    await store.upsert_message_embedding(
+        1, 2, 3, 4, "tester", "first", "2026-07-27T00:00:01+00:00", vector
+    )
+    await store.close()
+
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_INT8", False)
+    store = DiscordEmbeddingStore(str(db_path))
+    try:
+        await store.upsert_message_embedding(
+            1, 2, 3, 4, "tester", "rewritten", "2026-07-27T00:00:02+00:00", vector
+        )
+        rows = await store.fetch_recent_embeddings(2, 3)
+    finally:
+        await store.close()
+
+    with sqlite3.connect(db_path) as db:
+        stored = db.execute(
+            "SELECT length(embedding), embedding_q, embedding_scale "
+            "FROM discord_chat_embeddings"
+        ).fetchone()
+    assert stored == (12, None, None)
+    assert np.allclose(
+        np.frombuffer(rows[0]["embedding"], dtype=np.float32),
+        vector / np.linalg.norm(vector),
+    )
+
+
+@pytest.mark.asyncio
+async def test_delete_embeddings_and_memories_use_one_json_bound_statement(
+    tmp_path,
+    monkeypatch,
+):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    store = DiscordEmbeddingStore(str(tmp_path / "delete.db"))
+    vector = np.zeros(2, dtype=np.float32)
+    statements = []
+    try:
+        await store.upsert_many_message_embeddings(
+            [
+                (message_id, 2, 3, 4, "tester", f"m{message_id}", f"2026-07-27T00:00:0{message_id}", vector)
+                for message_id in range(1, 6)
+            ]
+        )
+        for memory_id in ("keep", "drop-1", "drop-2"):
+            await store.upsert_memory_entry(
+                memory_id=memory_id,
+                anchor_message_id=1,
+                server_id=2,
+                channel_id=3,
+                owner_user_id=None,
+                owner_user_name="tester",
+                memory_scope="guild",
+                memory_type="conversation",
+                summary_text=memory_id,
+                memory_text=memory_id,
+                raw_context="",
+                source_message_ids=[],
+                speaker_names=[],
+                keywords=[],
+                timestamp_iso="2026-07-27T00:00:00+00:00",
+                embedding=vector,
+            )
+        async with store._sqlite_connect() as db:
+            await db.set_trace_callback(statements.append)
+
+        await store.delete_embeddings([1])
+        await store.delete_embeddings([2, 3])
+        await store.delete_memory_entries(["drop-1", "drop-2"])
+        rows = await store.fetch_recent_embeddings(2, 3)
+        remaining_memories = await store.count_memory_entries()
+    finally:
+        await store.close()
+
+    assert [row["message"] for row in rows] == ["m5", "m4"]
+    assert remaining_memories == 1
+    deletes = [statement for statement in statements if statement.startswith("DELETE")]
+    assert len(deletes) == 3
+    assert all("IN (SELECT value FROM json_each(" in statement for statement in deletes)
+
+
+def test_embedding_blob_binds_float32_without_copy():
+    from utils.embeddings import _embedding_blob
+
+    vector = np.arange(4, dtype=np.float32)
+    view = _embedding_blob(vector, zero_copy=True)
+    as_bytes = _embedding_blob([0, 1, 2, 3], zero_copy=False)
+
+    assert isinstance(view, memoryview)
+    assert np.shares_memory(np.frombuffer(view, dtype=np.float32), vector)
+    assert as_bytes == vector.tobytes()
+
+
+@pytest.mark.asyncio
+async def test_query_vector_falls_back_to_recency_scan_without_vec0(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(
+        config,
+        "DISCORD_VECTOR_EXTENSION",
+        str(tmp_path / "missing-vec0"),
+    )
+    store = DiscordEmbeddingStore(str(tmp_path / "knn.db"))
+    try:
+        await store.upsert_many_message_embeddings(
+            [
+                (
+                    message_id,
+                    2,
+                    3,
+                    4,
+                    "tester",
+                    f"message-{message_id}",
+                    f"2026-07-27T00:00:0{message_id}+00:00",
+                    np.full(3, message_id, dtype=np.float32),
+                )
+                for message_id in (1, 2, 3)
+            ]
+        )
+        rows = await store.fetch_recent_embeddings(
+            2,
+            3,
+            limit=2,
+            query_vector=np.ones(3, dtype=np.float32),
+        )
+        await store.delete_embeddings([1])
+    finally:
+        await store.close()
+
+    assert store._knn_extension_candidates[0] == str(tmp_path / "missing-vec0")
+    assert store.knn_search_available is False
+    assert [row["message"] for row in rows] == ["message-3", "message-2"]
+    with sqlite3.connect(tmp_path / "knn.db") as conn:
+        tables = {
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+    assert "vec_discord_embeddings" not in tables
+
+
+@pytest.mark.asyncio
+async def test_iter_recent_embeddings_streams_tuples_and_fills_matrix(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_INT8", True)
+    store = DiscordEmbeddingStore(str(tmp_path / "stream.db"))
+    try:
+        await store.upsert_many_message_embeddings(
+            [
+                (
+                    message_id,
+                    2,
+                    3,
+                    4,
+                    "tester",
+                    f"message-{message_id}",
+                    f"2026-07-27T00:00:0{message_id}+00:00",
+                    np.eye(3, dtype=np.float32)[message_id - 1],
+                )
+                for message_id in (1, 2, 3)
+            ]
+        )
+        streamed = [
+            row async for row in store.iter_recent_embeddings(2, 3, limit=2)
+        ]
+        message_ids, matrix, metadata = await store.fetch_recent_matrix(2, 3, limit=10)
+    finally:
+        await store.close()
+
+    assert [type(row) for row in streamed] == [tuple, tuple]
+    assert [row[3] for row in streamed] == ["message-3", "message-2"]
+    assert np.allclose(np.frombuffer(streamed[0][5], dtype=np.float32), [0.0, 0.0, 1.0], atol=0.05)
+    assert message_ids == ["3", "2", "1"]
+    assert matrix.shape == (3, 3)
+    assert np.allclose(matrix, np.eye(3)[[2, 1, 0]], atol=0.05)
+    assert metadata[0] == {
+        "message_id": "3",
+        "user_id": "4",
+        "user_name": "tester",
+        "message": "message-3",
+        "timestamp": "2026-07-27T00:00:03+00:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_write_back_buffer_collapses_edits_and_flushes_before_reads(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 60.0)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_MAX_ROWS", 1000)
+    db_path = tmp_path / "write-back.db"
+    store = DiscordEmbeddingStore(str(db_path))
+    batches: list[int] = []
+    original_upsert_many = store.upsert_many_message_embeddings
+
+    async def recording_upsert_many(rows):
+        rows = list(rows)
+        batches.append(len(rows))
+        return await original_upsert_many(rows)
+
+    store.upsert_many_message_embeddings = recording_upsert_many
+    try:
+        for message_id, text in ((1, "draft"), (1, "edited"), (2, "second"), (3, "dropped")):
+            await store.upsert_message_embedding(
+                message_id,
+                2,
+                3,
+                4,
+                "tester",
+                text,
+                f"2026-07-27T00:00:0{message_id}+00:00",
+                np.full(3, message_id, dtype=np.float32),
+            )
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM discord_chat_embeddings").fetchone() == (0,)
+
+        await store.delete_embeddings([3])
+        rows = await store.fetch_recent_embeddings(2, 3)
+        await store.upsert_message_embedding(
+            4, 2, 3, 4, "tester", "on-close", "2026-07-27T00:00:04+00:00",
+            np.full(3, 4, dtype=np.float32),
+        )
+    finally:
+        await store.close()
+
+    assert batches == [2, 1]
+    assert [row["message"] for row in rows] == ["second", "edited"]
+    with sqlite3.connect(db_path) as conn:
+        stored = conn.execute(
+            "SELECT message_id FROM discord_chat_embeddings ORDER BY message_id"
+        ).fetchall()
+    assert stored == [("1",), ("2",), ("4",)]
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_memory_entries_writes_window_in_one_commit(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    db_path = tmp_path / "memory-batch.db"
+    store = DiscordEmbeddingStore(str(db_path))
+
+    def _entry(memory_id, summary):
+        return {
+            "memory_id": memory_id,
+            "anchor_message_id": 1,
+            "server_id": 2,
+            "channel_id": 3,
+            "owner_user_id": None,
+            "owner_user_name": "tester",
+            "memory_scope": "channel",
+            "memory_type": "conversation",
+            "summary_text": summary,
+            "memory_text": summary,
+            "raw_context": "raw",
+            "source_message_ids": [1],
+            "speaker_names": ["tester"],
+            "keywords": ["test"],
+            "timestamp_iso": "2026-07-27T00:00:00+00:00",
+            "embedding": np.ones(3, dtype=np.float32),
+        }
+
+    try:
+        assert await store.upsert_many_memory_entries([]) == 0
+        written = await store.upsert_many_memory_entries(
+            [_entry("m-1", "first"), _entry("m-2", "second"), _entry("m-1", "first edited")]
+        )
+        rows = await store.fetch_recent_memory_entries(server_id=2, channel_id=3, limit=10)
+    finally:
+        await store.close()
+
+    assert written == 3
+    assert sorted(row["summary_text"] for row in rows) == ["first edited", "second"]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_content_skips_rewrites_until_deleted(tmp_path, monkeypatch):
+    from utils.embeddings import memory_entry_digest
+
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_DIGEST_CACHE_SIZE", 16)
+    store = DiscordEmbeddingStore(str(tmp_path / "digest.db"))
+    entry = {
+        "memory_id": "m-1",
+        "anchor_message_id": 1,
+        "server_id": 2,
+        "channel_id": 3,
+        "owner_user_id": None,
+        "owner_user_name": "tester",
+        "memory_scope": "channel",
+        "memory_type": "conversation",
+        "summary_text": "summary",
+        "memory_text": "memory",
+        "raw_context": "raw",
+        "source_message_ids": [1],
+        "speaker_names": ["tester"],
+        "keywords": ["test"],
+        "timestamp_iso": "2026-07-27T00:00:00+00:00",
+        "embedding": np.ones(3, dtype=np.float32),
+    }
+
+    def _message(text):
+        return (1, 2, 3, 4, "tester", text, "2026-07-27T00:00:00+00:00", np.ones(3, dtype=np.float32))
+
+    try:
+        assert await store.upsert_many_memory_entries([entry]) == 1
+        assert await store.upsert_many_memory_entries([entry]) == 0
+        assert store.unchanged_memory_ids(
+            {
+                "m-1": memory_entry_digest(entry),
+                "m-2": memory_entry_digest({**entry, "memory_id": "m-2"}),
+            }
+        ) == {"m-1"}
+        assert await store.upsert_many_memory_entries([{**entry, "raw_context": "raw 2"}]) == 1
+
+        await store.delete_memory_entries(["m-1"])
+        assert store.unchanged_memory_ids(
+            {"m-1": memory_entry_digest({**entry, "raw_context": "raw 2"})}
+        ) == set()
+        assert await store.upsert_many_memory_entries([{**entry, "raw_context": "raw 2"}]) == 1
+
+        assert await store.upsert_many_message_embeddings([_message("hello")]) == 1
+        assert await store.upsert_many_message_embeddings([_message("hello")]) == 0
+        assert await store.upsert_many_message_embeddings([_message("edited")]) == 1
+        await store.delete_embeddings([1])
+        assert await store.upsert_many_message_embeddings([_message("edited")]) == 1
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_digest_covers_every_column_and_the_model(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_DIGEST_CACHE_SIZE", 16)
+    store = DiscordEmbeddingStore(str(tmp_path / "digest-columns.db"))
+    ones = np.ones(3, dtype=np.float32)
+    row = (1, 2, 3, 4, "tester", "hello", "2026-07-27T00:00:00+00:00", ones)
+    entry = {
+        "memory_id": "m-1",
+        "anchor_message_id": 1,
+        "server_id": 2,
+        "channel_id": 3,
+        "owner_user_id": None,
+        "owner_user_name": "tester",
+        "memory_scope": "channel",
+        "memory_type": "conversation",
+        "summary_text": "summary",
+        "memory_text": "memory",
+        "raw_context": "raw",
+        "source_message_ids": [1],
+        "speaker_names": ["tester"],
+        "keywords": ["test"],
+        "timestamp_iso": "2026-07-27T00:00:00+00:00",
+        "embedding": ones,
+    }
+
+    try:
+        assert await store.upsert_many_message_embeddings([row]) == 1
+        renamed = (*row[:4], "renamed", *row[5:])
+        assert await store.upsert_many_message_embeddings([renamed]) == 1
+        moved = (*renamed[:6], "2026-07-28T00:00:00+00:00", ones)
+        assert await store.upsert_many_message_embeddings([moved]) == 1
+        reembedded = (*moved[:7], np.full(3, 2.0, dtype=np.float32))
+        assert await store.upsert_many_message_embeddings([reembedded]) == 1
+        assert await store.upsert_many_message_embeddings([reembedded]) == 0
+
+        assert await store.upsert_many_memory_entries([entry]) == 1
+        assert await store.upsert_many_memory_entries([{**entry, "summary_text": "new"}]) == 1
+        assert await store.upsert_many_memory_entries([{**entry, "keywords": ["other"]}]) == 1
+
+        monkeypatch.setattr(config, "LOCAL_EMBEDDING_MODEL_NAME", "another-model")
+        assert await store.upsert_many_message_embeddings([reembedded]) == 1
+        assert await store.upsert_many_memory_entries([{**entry, "keywords": ["other"]}]) == 1
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_int8_migration_converts_float32_rows_in_batches(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    db_path = tmp_path / "int8-migrate.db"
+    seed = DiscordEmbeddingStore(str(db_path))
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(5, 8)).astype(np.float32)
+    await seed.upsert_many_message_embeddings(
+        [
+            (index, 2, 3, 4, "tester", f"m{index}", f"2026-07-27T00:00:0{index}+00:00", vector)
+            for index, vector in enumerate(vectors)
+        ]
+    )
+    await seed.close()
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "INSERT INTO discord_chat_embeddings "
+            "(message_id, server_id, channel_id, user_id, embedding) "
+            "VALUES ('odd', '2', '3', '4', x'0102')"
+        )
+
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_INT8", True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_DROP_FLOAT32", True)
+    monkeypatch.setattr(DiscordEmbeddingStore, "_QUANTIZE_MIGRATION_BATCH_ROWS", 2)
+    store = DiscordEmbeddingStore(str(db_path))
+    try:
+        await store.initialize()
+        _, matrix, metadata = await store.fetch_recent_matrix(2, 3)
+    finally:
+        await store.close()
+
+    with sqlite3.connect(db_path) as db:
+        remaining = db.execute(
+            "SELECT message_id FROM discord_chat_embeddings WHERE embedding_q IS NULL"
+        ).fetchall()
+    assert remaining == [("odd",)]
+    restored = {row["message"]: matrix[i] for i, row in enumerate(metadata)}
+    for index, vector in enumerate(vectors):
+        vector = vector / np.linalg.norm(vector)
+        scale = np.max(np.abs(vector)) / 127
+        assert np.allclose(restored[f"m{index}"], vector, atol=scale / 2 + 1e-6)
+
+
+@pytest.mark.asyncio
+async def test_binary_codes_find_old_rows_and_rerank_with_full_vectors(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_VECTOR_EXTENSION", str(tmp_path / "missing-vec0"))
+    db_path = tmp_path / "binary.db"
+    rng = np.random.default_rng(11)
+    vectors = rng.normal(size=(40, 64)).astype(np.float32)
+    seed = DiscordEmbeddingStore(str(db_path))
+    await seed.upsert_many_message_embeddings(
+        [
+            (index, 2, 3, 4, "tester", f"m{index}", f"2026-07-27T00:{index:02d}:00+00:00", vector)
+            for index, vector in enumerate(vectors)
+        ]
+    )
+    await seed.close()
+
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_BINARY_INDEX", True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_BINARY_OVERSAMPLE", 4)
+    store = DiscordEmbeddingStore(str(db_path))
+    query = vectors[0] + rng.normal(scale=0.05, size=64).astype(np.float32)
+    try:
+        await store.initialize()
+        await store.upsert_message_embedding(
+            99, 2, 3, 4, "tester", "new", "2026-07-27T01:00:00+00:00", -vectors[0]
+        )
+        recent = await store.fetch_recent_embeddings(2, 3, limit=3)
+        nearest = await store.fetch_recent_embeddings(2, 3, limit=3, query_vector=query)
+    finally:
+        await store.close()
+
+    assert store.knn_search_available is True
+    assert "m0" not in [row["message"] for row in recent]
+    assert nearest[0]["message"] == "m0"
+    assert len(nearest) == 3
+    with sqlite3.connect(db_path) as db:
+        sizes = {
+            row[0]
+            for row in db.execute("SELECT length(embedding_bin) FROM discord_chat_embeddings")
+        }
+    assert sizes == {8}
+
+
+def test_hamming_distances_match_with_and_without_numpy_bitwise_count(monkeypatch):
+    from utils import embeddings
+
+    rng = np.random.default_rng(3)
+    codes = rng.integers(0, 256, size=(6, 5), dtype=np.uint8)
+    query = rng.integers(0, 256, size=5, dtype=np.uint8)
+    expected = np.unpackbits(codes ^ query, axis=1).sum(axis=1)
+
+    assert embeddings._hamming_distances(codes, query).tolist() == expected.tolist()
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert embeddings._hamming_distances(codes, query).tolist() == expected.tolist()
+
+
+def test_int8_round_trip_reads_memoryview_without_copy():
+    from utils.embeddings import _dequantize_int8, _quantize_int8
+
+    vector = np.array([0.5, -1.0, 0.25, 0.0], dtype=np.float32)
+    blob, scale = _quantize_int8(vector)
+
+    restored = _dequantize_int8(memoryview(blob), scale)
+
+    assert restored.dtype == np.float32
+    assert np.allclose(restored, vector, atol=scale)
+    assert np.array_equal(restored, _dequantize_int8(blob, scale))
+
+
+def test_sqlite_recent_query_reuses_prebuilt_sql_text(tmp_path):
+    store = DiscordEmbeddingStore(str(tmp_path / "recent-sql.db"))
+
+    first, params = store._sqlite_recent_query(1, 2, None, 10)
+    again, _ = store._sqlite_recent_query(3, 4, None, 20)
+    by_user, user_params = store._sqlite_recent_query(1, 2, 5, 10)
+
+    # 같은 형태의 조회는 같은 SQL 문자열을 써 sqlite3 문장 캐시에 적중한다.
+    assert first is again
+    assert params == ["1", "2", 10]
+    assert "user_id = ?" in by_user and "user_id = ?" not in first
+    assert user_params == ["1", "2", "5", 10]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_truncates_wal_and_reclaims_deleted_pages(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_CHECKPOINT_SECONDS", 0.0)
+    db_path = tmp_path / "checkpoint.db"
+    store = DiscordEmbeddingStore(str(db_path))
+    vector = np.ones(256, dtype=np.float32)
+    try:
+        await store.upsert_many_message_embeddings(
+            [
+                (index, 2, 3, 4, "tester", f"m{index}", "2026-07-27T00:00:01+00:00", vector)
+                for index in range(200)
+            ]
+        )
+        await store.delete_embeddings(range(200))
+        assert store._checkpoint_task is None
+        wal_path = db_path.with_name(db_path.name + "-wal")
+        assert wal_path.stat().st_size > 0
+
+        await store.checkpoint()
+
+        assert wal_path.stat().st_size == 0
+        async with store._sqlite_connect() as db:
+            async with db.execute("PRAGMA auto_vacuum") as cursor:
+                auto_vacuum = (await cursor.fetchone())[0]
+            async with db.execute("PRAGMA freelist_count") as cursor:
+                free_pages = (await cursor.fetchone())[0]
+    finally:
+        await store.close()
+
+    # 새 DB는 INCREMENTAL(2)로 만들어지고, 삭제로 생긴 빈 페이지는 돌려준다.
+    assert auto_vacuum == 2
+    assert free_pages == 0
+
+
+@pytest.mark.asyncio
+async def test_writes_schedule_background_checkpoint_after_interval(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_CHECKPOINT_SECONDS", 60.0)
+    store = DiscordEmbeddingStore(str(tmp_path / "scheduled.db"))
+    calls = []
+
+    async def _fake_checkpoint():
+        calls.append("checkpoint")
+
+    monkeypatch.setattr(store, "checkpoint", _fake_checkpoint)
+    vector = np.ones(4, dtype=np.float32)
+    try:
+        await store.upsert_message_embedding(
+            1, 2, 3, 4, "tester", "first", "2026-07-27T00:00:01+00:00", vector
+        )
+        assert store._checkpoint_task is None
+
+        store._last_checkpoint -= 61.0
+        await store.upsert_message_embedding(
+            2, 2, 3, 4, "tester", "second", "2026-07-27T00:00:02+00:00", vector
+        )
+        await store._checkpoint_task
+    finally:
+        await store.close()
+
+    assert calls == ["checkpoint"]
+
+
+@pytest.mark.asyncio
+async def test_hnsw_index_serves_scoped_nearest_rows_and_tracks_writes(tmp_path, monkeypatch):
+    pytest.importorskip("hnswlib")
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_HNSW", True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_HNSW_MIN_ROWS", 4)
+    store = DiscordEmbeddingStore(str(tmp_path / "hnsw.db"))
+    monkeypatch.setattr(store, "_load_knn_extension", AsyncMock(return_value=False))
+    basis = np.eye(4, dtype=np.float32)
+    query = np.array([0.1, 1.0, 0.0, 0.0], dtype=np.float32)
+    try:
+        await store.upsert_many_message_embeddings(
+            [(index, 2, 3, 4, "tester", f"c3-{index}", f"2026-07-27T00:00:0{index}+00:00", basis[index]) for index in range(4)]
+            + [(10, 2, 9, 4, "tester", "c9", "2026-07-27T00:00:09+00:00", basis[1])]
+        )
+        assert store.knn_search_available
+        nearest = await store.fetch_recent_embeddings(2, 3, limit=2, query_vector=query)
+        assert store._hnsw_index is not None
+
+        await store.upsert_message_embedding(
+            20, 2, 3, 4, "tester", "late", "2026-07-27T00:00:20+00:00", query
+        )
+        await store.delete_embeddings([1])
+        updated = await store.fetch_recent_embeddings(2, 3, limit=2, query_vector=query)
+    finally:
+        await store.close()
+
+    # 다른 채널의 같은 벡터(c9)는 범위 필터로 빠진다.
+    assert [row["message"] for row in nearest] == ["c3-1", "c3-0"]
+    assert [row["message"] for row in updated] == ["late", "c3-0"]
+    assert np.frombuffer(updated[0]["embedding"], dtype=np.float32).tolist() == pytest.approx(
+        (query / np.linalg.norm(query)).tolist()
+    )
+
+
+@pytest.mark.asyncio
+async def test_hnsw_index_is_rebuilt_after_another_connection_writes(tmp_path, monkeypatch):
+    pytest.importorskip("hnswlib")
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_HNSW", True)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_HNSW_MIN_ROWS", 4)
+    db_path = tmp_path / "hnsw.db"
+    store = DiscordEmbeddingStore(str(db_path))
+    monkeypatch.setattr(store, "_load_knn_extension", AsyncMock(return_value=False))
+    basis = np.eye(4, dtype=np.float32)
+    query = np.array([0.0, 0.0, 0.1, 1.0], dtype=np.float32)
+    try:
+        await store.upsert_many_message_embeddings(
+            [(index, 2, 3, 4, "tester", f"c3-{index}", f"2026-07-27T00:00:0{index}+00:00", basis[index]) for index in range(4)]
+        )
+        before = await store.fetch_recent_embeddings(2, 3, limit=1, query_vector=query)
+        stale_index = store._hnsw_index
+
+        # 재색인 스크립트처럼 다른 연결이 행을 바꾼다.
+        unit_query = query / np.linalg.norm(query)
+        with sqlite3.connect(db_path) as db:
+            db.execute("DELETE FROM discord_chat_embeddings WHERE message_id = '3'")
+            db.execute(
+                "INSERT INTO discord_chat_embeddings "
+                "(message_id, server_id, channel_id, user_id, user_name, message, timestamp, embedding) "
+                "VALUES ('30', '2', '3', '4', 'tester', 'external', '2026-07-27T00:00:30+00:00', ?)",
+                (unit_query.astype(np.float32).tobytes(),),
+            )
+        after = await store.fetch_recent_embeddings(2, 3, limit=1, query_vector=query)
+        rebuilt_index = store._hnsw_index
+    finally:
+        await store.close()
+
+    assert [row["message"] for row in before] == ["c3-3"]
+    assert [row["message"] for row in after] == ["external"]
+    assert rebuilt_index is not stale_index
+
+
+@pytest.mark.asyncio
+async def test_startup_normalizes_existing_rows_once(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "LOCAL_EMBEDDING_NORMALIZE", True)
+    db_path = tmp_path / "unit.db"
+    await _create_store_file(db_path)
+    raw = np.array([3.0, 4.0, 0.0], dtype=np.float32)
+    with sqlite3.connect(db_path) as db:
+        # 정규화 이전에 만들어진 저장소처럼 표시를 지운다.
+        db.execute("DELETE FROM discord_embedding_meta")
+        db.execute(
+            "INSERT INTO discord_chat_embeddings "
+            "(message_id, server_id, channel_id, user_id, message, timestamp, embedding) "
+            "VALUES ('1', '2', '3', '4', 'old', '2026-07-27T00:00:01+00:00', ?)",
+            (raw.tobytes(),),
+        )
+        db.execute(
+            "INSERT INTO discord_memory_entries "
+            "(memory_id, anchor_message_id, server_id, channel_id, memory_scope, "
+            "memory_type, summary_text, memory_text, embedding) "
+            "VALUES ('m1', '1', '2', '3', 'channel', 'fact', 's', 't', ?)",
+            (raw.tobytes(),),
+        )
+
+    store = DiscordEmbeddingStore(str(db_path))
+    try:
+        await store.initialize()
+        unit_normalized = store.unit_normalized
+    finally:
+        await store.close()
+
+    with sqlite3.connect(db_path) as db:
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        marks = db.execute("SELECT key, value FROM discord_embedding_meta").fetchall()
+        blobs = [
+            db.execute(f"SELECT embedding FROM {table}").fetchone()[0]
+            for table in ("discord_chat_embeddings", "discord_memory_entries")
+        ]
+        # 표시가 남은 DB는 다시 훑지 않는다.
+        db.execute("UPDATE discord_chat_embeddings SET embedding = ?", (raw.tobytes(),))
+
+    # 전역 user_version 슬롯은 건드리지 않고 전용 meta 행에만 표시한다.
+    assert version == 0
+    assert marks == [("unit_normalized", "1")]
+    assert unit_normalized
+    for blob in blobs:
+        assert np.frombuffer(blob, dtype=np.float32).tolist() == pytest.approx([0.6, 0.8, 0.0])
+
+    store = DiscordEmbeddingStore(str(db_path))
+    try:
+        await store.initialize()
+    finally:
+        await store.close()
+    with sqlite3.connect(db_path) as db:
+        blob = db.execute("SELECT embedding FROM discord_chat_embeddings").fetchone()[0]
+    assert np.frombuffer(blob, dtype=np.float32).tolist() == raw.tolist()
+
+
+@pytest.mark.asyncio
+async def test_startup_skips_normalization_when_model_normalize_is_off(tmp_path, monkeypatch):
+    _use_sqlite(monkeypatch, auto_migrate=True)
+    monkeypatch.setattr(config, "LOCAL_EMBEDDING_NORMALIZE", False)
+    monkeypatch.setattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0)
+    db_path = tmp_path / "raw.db"
+    await _create_store_file(db_path)
+    raw = np.array([3.0, 4.0, 0.0], dtype=np.float32)
+    with sqlite3.connect(db_path) as db:
+        db.execute(
+            "INSERT INTO discord_chat_embeddings "
+            "(message_id, server_id, channel_id, user_id, message, timestamp, embedding) "
+            "VALUES ('1', '2', '3', '4', 'old', '2026-07-27T00:00:01+00:00', ?)",
+            (raw.tobytes(),),
+        )
+
+    store = DiscordEmbeddingStore(str(db_path))
+    try:
+        await store.initialize()
+        await store.upsert_message_embedding(
+            2, 2, 3, 4, "tester", "new", "2026-07-27T00:00:02+00:00", raw
+        )
+        unit_normalized = store.unit_normalized
+    finally:
+        await store.close()
+
+    with sqlite3.connect(db_path) as db:
+        blobs = [
+            row[0]
+            for row in db.execute(
+                "SELECT embedding FROM discord_chat_embeddings ORDER BY message_id"
+            )
+        ]
+        marks = db.execute("SELECT key FROM discord_embedding_meta").fetchall()
+
+    assert not unit_normalized
+    assert marks == []
+    assert [np.frombuffer(blob, dtype=np.float32).tolist() for blob in blobs] == [
+        raw.tolist(),
+        raw.tolist(),
+    ]
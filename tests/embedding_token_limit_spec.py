@@ -86,3 +86,243 @@ async def test_get_embedding_trims_complete_input_before_model_encode(
 
     assert vector is not None
     assert len(model.encoded_text.split()) <= model.max_seq_length
+
+
+@pytest.mark.asyncio
+async def test_get_embedding_reuses_cached_vector_for_repeated_text(monkeypatch):
+    model = _EncodingDummyModel()
+    calls = []
+    original_encode = model.encode
+
+    def counting_encode(text, **kwargs):
+        calls.append(text)
+        return original_encode(text, **kwargs)
+
+    model.encode = counting_encode
+
+    async def _fake_load_model():
+        return model
+
+    monkeypatch.setattr(embeddings, "_load_model", _fake_load_model)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_CACHE_SIZE", 1)
+
+    first = await embeddings.get_embedding("ㅇㅇ", prefix="query: ")
+    first[0] = 99.0
+    second = await embeddings.get_embedding("ㅇㅇ", prefix="query: ")
+    await embeddings.get_embedding("ok", prefix="query: ")
+    await embeddings.get_embedding("ㅇㅇ", prefix="query: ")
+
+    # 사본을 돌려주므로 호출자 수정이 캐시에 남지 않고, 상한 1이라 "ok"가
+    # 들어오면서 "ㅇㅇ"는 밀려나 다시 encode된다.
+    assert second.tolist() == [1.0, 2.0]
+    assert calls == ["query: ㅇㅇ", "query: ok", "query: ㅇㅇ"]
+
+
+@pytest.mark.asyncio
+async def test_get_embedding_cache_hit_skips_tokenizer_and_shares_inflight_encode(monkeypatch):
+    import asyncio
+    import threading
+
+    tokenized = []
+    calls = []
+    release = threading.Event()
+
+    class _CountingTokenizer(_DummyTokenizer):
+        def __call__(self, text, **kwargs):
+            tokenized.append(text)
+            return super().__call__(text, **kwargs)
+
+    model = _EncodingDummyModel()
+    model.tokenizer = _CountingTokenizer()
+    original_encode = model.encode
+
+    def slow_encode(text, **kwargs):
+        calls.append(text)
+        release.wait(timeout=5)
+        return original_encode(text, **kwargs)
+
+    model.encode = slow_encode
+
+    async def _fake_load_model():
+        return model
+
+    monkeypatch.setattr(embeddings, "_load_model", _fake_load_model)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_CACHE_SIZE", 16)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_COALESCE_WINDOW_MS", 0.0)
+
+    first = asyncio.create_task(embeddings.get_embedding("같은 질문", prefix="query: "))
+    second = asyncio.create_task(embeddings.get_embedding("같은 질문", prefix="query: "))
+    await asyncio.sleep(0.05)
+    release.set()
+    vectors = await asyncio.gather(first, second)
+    tokenized_before_hit = len(tokenized)
+    again = await embeddings.get_embedding("같은 질문", prefix="query: ")
+
+    # 동시에 들어온 같은 질의는 encode 한 번을 나눠 쓰고, 캐시 적중은 토큰화도 건너뛴다.
+    assert calls == ["query: 같은 질문"]
+    assert [vector.tolist() for vector in vectors] == [[1.0, 2.0], [1.0, 2.0]]
+    assert vectors[0] is not vectors[1]
+    assert again.tolist() == [1.0, 2.0]
+    assert len(tokenized) == tokenized_before_hit
+
+
+@pytest.mark.asyncio
+async def test_get_embedding_waiter_encodes_itself_when_leader_is_cancelled(monkeypatch):
+    import asyncio
+    import threading
+
+    calls = []
+    release = threading.Event()
+    model = _EncodingDummyModel()
+    original_encode = model.encode
+
+    def slow_encode(text, **kwargs):
+        calls.append(text)
+        release.wait(timeout=5)
+        return original_encode(text, **kwargs)
+
+    model.encode = slow_encode
+
+    async def _fake_load_model():
+        return model
+
+    monkeypatch.setattr(embeddings, "_load_model", _fake_load_model)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_CACHE_SIZE", 16)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_COALESCE_WINDOW_MS", 0.0)
+
+    leader = asyncio.create_task(embeddings.get_embedding("취소될 질문", prefix="query: "))
+    waiter = asyncio.create_task(embeddings.get_embedding("취소될 질문", prefix="query: "))
+    await asyncio.sleep(0.05)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    release.set()
+    vector = await asyncio.wait_for(waiter, timeout=5)
+
+    # 기다리던 호출은 None을 받지 않고 직접 encode해 결과를 낸다.
+    assert vector.tolist() == [1.0, 2.0]
+    assert calls == ["query: 취소될 질문", "query: 취소될 질문"]
+    assert not embeddings._EMBED_INFLIGHT
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_encodes_uncached_texts_in_one_batch(monkeypatch):
+    batches = []
+
+    class _BatchModel:
+        max_seq_length = 40
+        tokenizer = _DummyTokenizer()
+
+        def encode(self, texts, *, normalize_embeddings, show_progress_bar=False, batch_size=32):
+            _ = normalize_embeddings, show_progress_bar
+            batches.append((list(texts), batch_size))
+            return [[float(len(text)), 1.0] for text in texts]
+
+    model = _BatchModel()
+
+    async def _fake_load_model():
+        return model
+
+    monkeypatch.setattr(embeddings, "_load_model", _fake_load_model)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_CACHE_SIZE", 16)
+
+    cached = await embeddings.get_embeddings(["a"], prefix="passage: ")
+    vectors = await embeddings.get_embeddings(["bb", "", "a", "ccc"], prefix="passage: ")
+
+    assert batches == [
+        (["passage: a"], embeddings._ENCODE_BATCH_SIZE),
+        (["passage: bb", "passage: ccc"], embeddings._ENCODE_BATCH_SIZE),
+    ]
+    assert vectors[1] is None
+    assert vectors[2].tolist() == cached[0].tolist()
+    assert [vectors[0][0], vectors[3][0]] == [11.0, 12.0]
+    assert vectors[0].dtype.name == "float32"
+
+
+@pytest.mark.asyncio
+async def test_tokenizer_and_encode_calls_share_the_model_executor(monkeypatch):
+    import threading
+
+    thread_names = set()
+
+    class _RecordingTokenizer(_DummyTokenizer):
+        def __call__(self, text, **kwargs):
+            thread_names.add(threading.current_thread().name)
+            return super().__call__(text, **kwargs)
+
+    model = _EncodingDummyModel()
+    model.tokenizer = _RecordingTokenizer()
+    original_encode = model.encode
+
+    def recording_encode(text, **kwargs):
+        thread_names.add(threading.current_thread().name)
+        return original_encode(text, **kwargs)
+
+    model.encode = recording_encode
+
+    async def _fake_load_model():
+        return model
+
+    monkeypatch.setattr(embeddings, "_load_model", _fake_load_model)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_CACHE_SIZE", 0)
+
+    await embeddings.count_embedding_tokens("a b c")
+    await embeddings.get_embedding("shared executor", prefix="query: ")
+
+    assert thread_names
+    assert all(name.startswith("masamong-embed") for name in thread_names)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_embedding_calls_share_one_batched_encode(monkeypatch):
+    import asyncio
+
+    import numpy as np
+
+    calls = []
+
+    class _BatchModel:
+        max_seq_length = 64
+        tokenizer = _DummyTokenizer()
+
+        def encode(self, inputs, *, normalize_embeddings, show_progress_bar=False, batch_size=32):
+            _ = normalize_embeddings, show_progress_bar
+            calls.append((inputs, batch_size))
+            texts = [inputs] if isinstance(inputs, str) else list(inputs)
+            matrix = np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+            return matrix[0] if isinstance(inputs, str) else matrix
+
+    model = _BatchModel()
+
+    async def _fake_load_model():
+        return model
+
+    monkeypatch.setattr(embeddings, "_load_model", _fake_load_model)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_CACHE_SIZE", 0)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_COALESCE_WINDOW_MS", 20.0)
+
+    vectors = await asyncio.gather(
+        embeddings.get_embedding("a", prefix="query: "),
+        embeddings.get_embedding("bb", prefix="query: "),
+        embeddings.get_embedding("a", prefix="query: "),
+        embeddings.get_embedding("cccc", prefix="query: "),
+    )
+
+    assert calls == [(["query: a", "query: bb", "query: cccc"], 3)]
+    assert [vector[0] for vector in vectors] == [8.0, 9.0, 8.0, 11.0]
+    assert vectors[0] is not vectors[2]
+    assert all(vector.dtype == np.float32 and vector.shape == (2,) for vector in vectors)
+    # 묶음 task는 끝날 때까지 모듈 집합이 붙잡고, 끝나면 스스로 빠진다.
+    await asyncio.sleep(0)
+    assert not embeddings._ENCODE_BATCH_TASKS
+
+    calls.clear()
+    single = await embeddings.get_embedding("solo", prefix="query: ")
+    assert calls == [("query: solo", 32)]
+    assert single.tolist() == [11.0, 1.0]
@@ -32,3 +32,87 @@ async def test_static_guild_settings_mode_never_reads_stale_database_rows(
     finally:
         bot.db = None
         await bot.close()
+
+
+@pytest.mark.asyncio
+async def test_guild_setting_lookup_is_cached_and_written_through(monkeypatch):
+    import aiosqlite
+
+    from utils import db as db_utils
+
+    monkeypatch.setattr(config, "DB_BACKEND", "sqlite")
+    db = await aiosqlite.connect(":memory:")
+    try:
+        await db.execute(
+            """
+            CREATE TABLE guild_settings (
+                guild_id INTEGER PRIMARY KEY,
+                ai_enabled BOOLEAN DEFAULT 1,
+                ai_allowed_channels TEXT,
+                persona_text TEXT,
+                language TEXT DEFAULT 'ko',
+                created_at TEXT,
+                updated_at TEXT
+            )
+            """
+        )
+        await db_utils.set_guild_setting(db, 1, "persona_text", "first")
+        assert await db_utils.get_guild_setting(db, 1, "persona_text") == "first"
+        assert await db_utils.get_guild_setting(db, 1, "language") == "ko"
+
+        statements: list[str] = []
+        await db.set_trace_callback(statements.append)
+        assert await db_utils.get_guild_setting(db, 1, "ai_enabled") == 1
+        await db_utils.set_guild_setting(db, 1, "persona_text", "second")
+        assert await db_utils.get_guild_setting(db, 1, "persona_text") == "second"
+        assert await db_utils.get_guild_setting(db, 2, "persona_text", "none") == "none"
+        assert await db_utils.get_guild_setting(db, 2, "language", "en") == "en"
+        await db.set_trace_callback(None)
+
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 1
+        assert "WHERE guild_id = 2" in selects[0]
+    finally:
+        await db.close()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_guild_settings_rereads_direct_database_writes(monkeypatch):
+    import aiosqlite
+
+    from utils import db as db_utils
+
+    monkeypatch.setattr(config, "DB_BACKEND", "sqlite")
+    db = await aiosqlite.connect(":memory:")
+    try:
+        await db.execute(
+            """
+            CREATE TABLE guild_settings (
+                guild_id INTEGER PRIMARY KEY,
+                ai_enabled BOOLEAN DEFAULT 1,
+                ai_allowed_channels TEXT,
+                persona_text TEXT,
+                language TEXT DEFAULT 'ko',
+                created_at TEXT,
+                updated_at TEXT
+            )
+            """
+        )
+        await db_utils.set_guild_setting(db, 1, "persona_text", "cached")
+        await db_utils.set_guild_setting(db, 2, "persona_text", "other")
+        assert await db_utils.get_guild_setting(db, 1, "persona_text") == "cached"
+        assert await db_utils.get_guild_setting(db, 2, "persona_text") == "other"
+
+        await db.execute("DELETE FROM guild_settings WHERE guild_id = 1")
+        await db.execute("UPDATE guild_settings SET persona_text = 'direct' WHERE guild_id = 2")
+        await db.commit()
+        assert await db_utils.get_guild_setting(db, 1, "persona_text") == "cached"
+
+        db_utils.invalidate_guild_settings(db, 1)
+        assert await db_utils.get_guild_setting(db, 1, "persona_text", "gone") == "gone"
+        assert await db_utils.get_guild_setting(db, 2, "persona_text") == "other"
+
+        db_utils.invalidate_guild_settings(db)
+        assert await db_utils.get_guild_setting(db, 2, "persona_text") == "direct"
+    finally:
+        await db.close()
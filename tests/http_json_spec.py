@@ -0,0 +1,20 @@
+"""API 응답 JSON 헬퍼는 orjson 유무와 관계없이 같은 결과를 냅니다."""
+
+from __future__ import annotations
+
+import pytest
+
+from utils import http
+
+
+def test_json_helpers_strip_bom_and_round_trip_with_or_without_orjson(monkeypatch):
+    payload = {"q": "환율", "n": [1, 2]}
+    body = http.json_dumps(payload)
+
+    assert http.json_loads(b"\xef\xbb\xbf " + body) == payload
+    assert http.json_loads("\ufeff" + body.decode("utf-8")) == payload
+
+    monkeypatch.setattr(http, "orjson", None)
+    assert http.json_loads(http.json_dumps(payload)) == payload
+    with pytest.raises(ValueError):
+        http.json_loads(b"{broken")
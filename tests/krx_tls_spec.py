@@ -54,7 +54,9 @@ async def test_krx_uses_tls12_session_without_disabling_certificate_check(
 ):
     session = _Session()
     monkeypatch.setattr(config, "KRX_API_KEY", "test-key")
-    monkeypatch.setattr(krx.http, "get_tlsv12_session", lambda: session)
+    # 스레드별 공유 세션 캐시를 비워 가짜 세션이 다른 테스트로 새지 않게 한다.
+    monkeypatch.setattr(krx.http, "_SESSION_LOCAL", __import__("threading").local())
+    monkeypatch.setattr(krx.http, "_new_session", lambda adapter: session)
     monkeypatch.setattr(
         krx.http,
         "get_insecure_session",
@@ -74,3 +76,65 @@ async def test_krx_uses_tls12_session_without_disabling_certificate_check(
     assert len(session.calls) == 1
     assert session.calls[0]["timeout"] == 10
     assert "verify" not in session.calls[0]
+
+
+def test_shared_session_is_reused_per_thread_and_profile(monkeypatch):
+    import threading
+
+    created: list[object] = []
+    monkeypatch.setattr(krx.http, "_SESSION_LOCAL", threading.local())
+    monkeypatch.setattr(
+        krx.http, "_new_session", lambda adapter: created.append(adapter) or _Session()
+    )
+
+    first = krx.http.get_shared_session("tlsv12")
+    assert krx.http.get_shared_session("tlsv12") is first
+    assert krx.http.get_shared_session("modern") is not first
+
+    other: list[object] = []
+    worker = threading.Thread(target=lambda: other.append(krx.http.get_shared_session("tlsv12")))
+    worker.start()
+    worker.join()
+
+    assert other[0] is not first
+    assert created == [
+        krx.http.TLSV12_ADAPTER,
+        krx.http.MODERN_ADAPTER,
+        krx.http.TLSV12_ADAPTER,
+    ]
+    with pytest.raises(ValueError):
+        krx.http.get_shared_session("legacy")
+
+
+def test_shared_sessions_share_one_adapter_and_context_per_profile(monkeypatch):
+    import threading
+
+    from utils import http
+
+    monkeypatch.setattr(http, "_SESSION_LOCAL", threading.local())
+    tlsv12 = http.get_shared_session("tlsv12")
+    modern = http.get_shared_session("modern")
+    worker_sessions: list[object] = []
+    worker = threading.Thread(target=lambda: worker_sessions.append(http.get_shared_session("tlsv12")))
+    worker.start()
+    worker.join()
+
+    assert tlsv12.get_adapter("https://example.com") is http.TLSV12_ADAPTER
+    assert worker_sessions[0].get_adapter("https://example.com") is http.TLSV12_ADAPTER
+    assert modern.get_adapter("https://example.com") is http.MODERN_ADAPTER
+    assert http.TLSV12_ADAPTER.poolmanager.connection_pool_kw["ssl_context"] is http._TLSV12_CONTEXT
+    assert http._MODERN_TLS_CONTEXT.verify_mode == __import__("ssl").CERT_REQUIRED
+
+
+def test_public_tls_sessions_can_be_closed_without_touching_shared_pools():
+    from utils import http
+
+    with http.get_tlsv12_session() as first, http.get_modern_tls_session() as modern:
+        adapter = first.get_adapter("https://example.com")
+        assert adapter is not http.TLSV12_ADAPTER
+        assert adapter.poolmanager.connection_pool_kw["ssl_context"] is http._TLSV12_CONTEXT
+        assert modern.get_adapter("https://example.com") is not http.MODERN_ADAPTER
+        shared_pool = http.TLSV12_ADAPTER.poolmanager.connection_from_url("https://example.com")
+
+    # 공개 세션을 닫아도 공유 어댑터의 연결 풀은 그대로 남는다.
+    assert http.TLSV12_ADAPTER.poolmanager.connection_from_url("https://example.com") is shared_pool
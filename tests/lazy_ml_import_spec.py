@@ -1,3 +1,4 @@
+import asyncio
 import os
 from pathlib import Path
 import subprocess
@@ -214,6 +215,97 @@ async def test_embedding_dependency_imports_run_outside_event_loop(monkeypatch):
     assert isinstance(await embeddings._load_model(), FakeSentenceTransformer)
 
 
+@pytest.mark.asyncio
+async def test_embedding_onnx_backend_is_requested_and_falls_back_to_torch(monkeypatch):
+    attempts = []
+
+    class FakeSentenceTransformer:
+        def __init__(self, model_name, **kwargs):
+            attempts.append(kwargs)
+            if kwargs.get("backend") == "onnx":
+                raise ValueError("onnx/model_qint8_avx512_vnni.onnx not found")
+
+    monkeypatch.setattr(embeddings, "_MODEL", None)
+    monkeypatch.setattr(embeddings, "_MODEL_FAILURE_RETRY_AT", 0.0)
+    monkeypatch.setattr(embeddings, "SentenceTransformer", FakeSentenceTransformer)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "CPU_THREAD_LIMIT", 0)
+    monkeypatch.setattr(embeddings.config, "LOCAL_EMBEDDING_LOCAL_FILES_ONLY", False)
+    monkeypatch.setattr(embeddings.config, "LOCAL_EMBEDDING_BACKEND", "onnx")
+    monkeypatch.setattr(
+        embeddings.config,
+        "LOCAL_EMBEDDING_BACKEND_FILE",
+        "onnx/model_qint8_avx512_vnni.onnx",
+    )
+
+    model = await embeddings._load_model()
+
+    assert isinstance(model, FakeSentenceTransformer)
+    assert attempts == [
+        {
+            "backend": "onnx",
+            "model_kwargs": {"file_name": "onnx/model_qint8_avx512_vnni.onnx"},
+        },
+        {},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_embedding_onnx_backend_uses_default_file_unless_configured(monkeypatch):
+    attempts = []
+
+    class FakeSentenceTransformer:
+        def __init__(self, model_name, **kwargs):
+            attempts.append(kwargs)
+
+    monkeypatch.setattr(embeddings, "_MODEL", None)
+    monkeypatch.setattr(embeddings, "_MODEL_FAILURE_RETRY_AT", 0.0)
+    monkeypatch.setattr(embeddings, "SentenceTransformer", FakeSentenceTransformer)
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "CPU_THREAD_LIMIT", 0)
+    monkeypatch.setattr(embeddings.config, "LOCAL_EMBEDDING_LOCAL_FILES_ONLY", False)
+    monkeypatch.setattr(embeddings.config, "LOCAL_EMBEDDING_BACKEND", "onnx")
+    monkeypatch.setattr(embeddings.config, "LOCAL_EMBEDDING_BACKEND_FILE", "")
+
+    await embeddings._load_model()
+
+    # CPU별 양자화 파일을 추측하지 않고 sentence-transformers 기본 파일을 읽는다.
+    assert attempts == [{"backend": "onnx"}]
+
+
+@pytest.mark.asyncio
+async def test_embedding_load_reuses_model_built_by_another_thread(monkeypatch):
+    """다른 스레드가 thread lock을 쥐고 만든 모델이 있으면 다시 만들지 않는다."""
+    constructed = []
+    other_model = object()
+
+    class FakeSentenceTransformer:
+        def __init__(self, _model_name, **_kwargs):
+            constructed.append(_model_name)
+
+    monkeypatch.setattr(embeddings, "_MODEL", None)
+    monkeypatch.setattr(embeddings, "_MODEL_FAILURE_RETRY_AT", 0.0)
+    monkeypatch.setattr(
+        embeddings,
+        "_get_sentence_transformer_class",
+        lambda: FakeSentenceTransformer,
+    )
+    monkeypatch.setattr(embeddings.config, "EMBEDDING_ENABLED", True)
+    monkeypatch.setattr(embeddings.config, "CPU_THREAD_LIMIT", 0)
+
+    embeddings._MODEL_THREAD_LOCK.acquire()
+    try:
+        loader = asyncio.ensure_future(embeddings._load_model())
+        await asyncio.sleep(0.05)
+        assert not loader.done()
+        embeddings._MODEL = other_model
+    finally:
+        embeddings._MODEL_THREAD_LOCK.release()
+
+    assert await loader is other_model
+    assert constructed == []
+
+
 @pytest.mark.asyncio
 async def test_embedding_load_failure_has_finite_retry_cooldown(monkeypatch):
     calls = 0
@@ -400,3 +492,37 @@ async def test_reranker_still_loads_and_scores_on_first_request(monkeypatch):
 
     assert [item["text"] for item in ranked] == ["높은 점수", "낮은 점수"]
     assert [item["rerank_score"] for item in ranked] == [0.8, 0.2]
+
+
+def test_reranker_dtype_casts_or_quantizes_for_the_device():
+    calls = []
+
+    class FakeModel:
+        def to(self, *args, **kwargs):
+            calls.append(("to", kwargs.get("dtype")))
+            return self
+
+    class FakeQuantization:
+        @staticmethod
+        def quantize_dynamic(model, layers, dtype):
+            calls.append(("quantize", dtype))
+            return model
+
+    class FakeTorch:
+        bfloat16 = "bf16"
+        float16 = "fp16"
+        qint8 = "qint8"
+        ao = type("ao", (), {"quantization": FakeQuantization})
+        nn = type("nn", (), {"Linear": object})
+
+    model = FakeModel()
+    apply = reranker_module._apply_reranker_dtype
+    assert apply(model, "bfloat16", "cpu", FakeTorch) is model
+    assert apply(model, "int8", "cpu", FakeTorch) is model
+    assert apply(model, "float16", "cuda", FakeTorch) is model
+    # CPU float16과 CUDA int8은 지원하지 않으므로 float32 모델을 그대로 둔다.
+    assert apply(model, "float16", "cpu", FakeTorch) is model
+    assert apply(model, "int8", "cuda:0", FakeTorch) is model
+    assert apply(model, "float32", "cpu", FakeTorch) is model
+
+    assert calls == [("to", "bf16"), ("quantize", "qint8"), ("to", "fp16")]
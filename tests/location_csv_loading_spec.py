@@ -0,0 +1,48 @@
+from utils.initial_data import _collect_candidate_names, load_locations_from_csv
+
+
+def _write_csv(path, rows):
+    header = "1단계,2단계,3단계,격자 X,격자 Y"
+    path.write_text("\n".join([header, *rows]) + "\n", encoding="utf-8-sig")
+
+
+def test_candidate_names_combine_normalized_level_aliases():
+    names = _collect_candidate_names("서울특별시", " 종로구", "청운효자동")
+
+    assert {
+        "서울특별시 종로구 청운효자동",
+        "서울 종로구",
+        "서울 청운효자동",
+        "종로 청운효자동",
+        "서울",
+        "청운효자동",
+    } <= names
+    assert all(name == " ".join(name.split()) for name in names if " " in name)
+
+
+def test_load_locations_keeps_first_coordinates_and_skips_bad_rows(tmp_path):
+    csv_path = tmp_path / "coords.csv"
+    _write_csv(
+        csv_path,
+        [
+            "서울특별시,종로구,,60,127",
+            "서울특별시,중구,,60,126",
+            "부산광역시,,,bad,76",
+            "광주광역시,,,0,74",
+            "전라남도,광양시",
+        ],
+    )
+
+    entries = {entry["name"]: (entry["nx"], entry["ny"]) for entry in load_locations_from_csv(csv_path)}
+
+    # 같은 이름("서울")은 먼저 읽은 좌표를 유지하고, 좌표가 없는 행은 건너뛴다.
+    assert entries["서울"] == (60, 127)
+    assert entries["서울 중구"] == (60, 126)
+    assert not any(name.startswith(("부산", "광주", "광양", "전남")) for name in entries)
+
+
+def test_load_locations_without_grid_columns_returns_empty(tmp_path):
+    csv_path = tmp_path / "coords.csv"
+    csv_path.write_text("1단계,2단계\n서울특별시,종로구\n", encoding="utf-8-sig")
+
+    assert load_locations_from_csv(csv_path) == []
@@ -114,6 +114,7 @@ async def test_shared_context_survives_when_user_has_more_rows_than_limit(
     rows = await store.fetch_recent_memory_entries(
         server_id=GUILD, channel_id=CHANNEL, user_id=ASKER, limit=100
     )
+    await store.close()
 
     scopes = [row["memory_scope"] for row in rows]
     assert len(rows) == 100
@@ -129,6 +130,7 @@ async def test_window_is_ordered_by_recency_only(tmp_path, monkeypatch):
     rows = await store.fetch_recent_memory_entries(
         server_id=GUILD, channel_id=CHANNEL, user_id=ASKER, limit=60
     )
+    await store.close()
 
     stamps = [row["timestamp"] for row in rows]
     assert stamps == sorted(stamps, reverse=True)
@@ -141,6 +143,7 @@ async def test_other_users_own_scope_memory_is_never_returned(tmp_path, monkeypa
     rows = await store.fetch_recent_memory_entries(
         server_id=GUILD, channel_id=CHANNEL, user_id=ASKER, limit=100
     )
+    await store.close()
 
     owners = {row["user_id"] for row in rows if row["user_id"]}
     assert str(OTHER) not in owners
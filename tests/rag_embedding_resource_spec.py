@@ -1,4 +1,5 @@
 import json
+import os
 from datetime import datetime, timezone
 from pathlib import Path
 from types import SimpleNamespace
@@ -168,3 +169,125 @@ def test_numpy_kakao_store_batched_top_k_matches_full_cosine():
     )
     expected_ids = np.argsort(expected_scores)[::-1][:7].tolist()
     assert [row["message_id"] for row in rows] == expected_ids
+
+
+@pytest.mark.asyncio
+async def test_kakao_table_meta_is_persisted_and_reused_from_sidecar(tmp_path):
+    db_path = tmp_path / "kakao.db"
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "CREATE TABLE chunks (message_text TEXT, embedding BLOB, created_at TEXT)"
+        )
+        await db.commit()
+
+    store = KakaoEmbeddingStore(None, {})
+    try:
+        detected = await store._get_or_detect_table_meta(db_path)
+    finally:
+        await store.close()
+    sidecar = db_path.with_suffix(".db.meta.json")
+    stored = json.loads(sidecar.read_text(encoding="utf-8"))
+    assert detected.table_name == "chunks"
+    # 부분 일치로 고른 컬럼도 다시 읽을 때 받아들여야 매 기동 재감지가 없다.
+    assert stored["meta"]["text_column"] == "message_text"
+    assert stored["db_size"] == db_path.stat().st_size
+
+    fresh = KakaoEmbeddingStore(None, {})
+
+    async def _must_not_detect(_db):
+        raise AssertionError("sidecar가 최신이면 스키마를 다시 감지하지 않는다")
+
+    fresh._detect_table_meta = _must_not_detect
+    # cp -p처럼 mtime만 바뀌어도 스키마가 같으면 sidecar를 그대로 쓴다.
+    os.utime(db_path, (1, 1))
+    assert await fresh._get_or_detect_table_meta(db_path) == detected
+    await fresh.close()
+
+    # 식별자로 쓰이는 값이 후보 밖이면 sidecar를 믿지 않는다.
+    fingerprint = (stored["schema_version"], stored["db_size"])
+    stored["meta"]["text_column"] = "x; DROP"
+    sidecar.write_text(json.dumps(stored), encoding="utf-8")
+    assert fresh._load_table_meta_sidecar(db_path, fingerprint) is None
+
+
+@pytest.mark.asyncio
+async def test_kakao_table_meta_sidecar_is_ignored_after_schema_change(tmp_path):
+    db_path = tmp_path / "kakao.db"
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("CREATE TABLE chunks (content TEXT, embedding BLOB)")
+        await db.commit()
+
+    store = KakaoEmbeddingStore(None, {})
+    try:
+        await store._get_or_detect_table_meta(db_path)
+    finally:
+        await store.close()
+
+    # 새 DB로 교체하면서 mtime을 예전 값으로 되돌려도 스키마 버전이 달라 다시 감지한다.
+    old_mtime = db_path.stat().st_mtime
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("DROP TABLE chunks")
+        await db.execute("CREATE TABLE messages (body TEXT, vector BLOB)")
+        await db.commit()
+    os.utime(db_path, (old_mtime, old_mtime))
+
+    fresh = KakaoEmbeddingStore(None, {})
+    try:
+        meta = await fresh._get_or_detect_table_meta(db_path)
+    finally:
+        await fresh.close()
+    assert (meta.table_name, meta.text_column, meta.embedding_column) == (
+        "messages",
+        "body",
+        "vector",
+    )
+
+
+def test_kakao_column_picker_keeps_candidate_priority_and_type_hints():
+    picked = KakaoEmbeddingStore._pick_columns(
+        [
+            ("Body", "TEXT"),
+            ("Message", "TEXT"),
+            ("embedding", "TEXT"),
+            ("vector_blob", "BLOB"),
+            ("created_at", "TEXT"),
+            ("timestamp", "TEXT"),
+            ("sender", ""),
+        ]
+    )
+
+    assert picked == {
+        "text": "Message",
+        "embedding": "vector_blob",
+        "timestamp": "timestamp",
+        "speaker": "sender",
+    }
+
+
+@pytest.mark.asyncio
+async def test_kakao_sqlite_recent_rows_are_plain_dicts_with_aliased_columns(tmp_path):
+    db_path = tmp_path / "kakao-recent.db"
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "CREATE TABLE chunks (content TEXT, embedding BLOB, created_at TEXT, sender TEXT)"
+        )
+        await db.executemany(
+            "INSERT INTO chunks VALUES (?, ?, ?, ?)",
+            [
+                (f"msg-{index}", np.full(2, index, dtype=np.float32).tobytes(), f"2026-01-0{index}", "kim")
+                for index in (1, 2, 3)
+            ],
+        )
+        await db.commit()
+
+    store = KakaoEmbeddingStore(str(db_path), {})
+    try:
+        rows = await store.fetch_recent_embeddings([], limit=2)
+    finally:
+        await store.close()
+
+    assert [type(row) for row in rows] == [dict, dict]
+    assert [row["message"] for row in rows] == ["msg-3", "msg-2"]
+    assert rows[0]["speaker"] == "kim"
+    assert rows[0]["timestamp"] == "2026-01-03"
+    assert rows[0]["db_path"] == str(db_path)
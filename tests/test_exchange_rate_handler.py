@@ -61,3 +61,30 @@ async def test_get_raw_exchange_rate_returns_float(monkeypatch):
 
     value = await exchange_rate.get_raw_exchange_rate("JPY(100)")
     assert value == pytest.approx(925.50)
+
+
+@pytest.mark.asyncio
+async def test_exchange_session_is_shared_until_closed():
+    first = await exchange_rate._get_exchange_session()
+    try:
+        assert await exchange_rate._get_exchange_session() is first
+        assert first.connector.use_dns_cache
+    finally:
+        await exchange_rate.close_exchange_session()
+
+    assert first.closed
+    second = await exchange_rate._get_exchange_session()
+    try:
+        assert second is not first
+    finally:
+        await exchange_rate.close_exchange_session()
+
+
+@pytest.mark.asyncio
+async def test_exchange_session_carries_the_request_timeout():
+    session = await exchange_rate._get_exchange_session()
+    try:
+        assert session.timeout is exchange_rate._CLIENT_TIMEOUT
+        assert session.timeout.total == exchange_rate._REQ_TIMEOUT
+    finally:
+        await exchange_rate.close_exchange_session()
@@ -48,3 +48,69 @@ def test_unknown_birth_time_is_not_replaced_with_noon_and_target_date_is_used():
     assert "UserBirth: 1990-01-01 [time not provided]" in full_info
     assert "UserBirth: 1990-01-01 12:00" not in full_info
     assert "Time: 2026-07-29 08:00" in full_info
+
+
+def test_astrology_chart_is_cached_per_utc_minute():
+    from utils import fortune
+
+    calc = FortuneCalculator()
+    seoul = pytz.timezone("Asia/Seoul")
+    fortune._astrology_chart_for_minute.cache_clear()
+
+    first = calc._get_astrology_chart(seoul.localize(datetime(2024, 3, 1, 9, 30, 5)))
+    same_minute = calc._get_astrology_chart(
+        datetime(2024, 3, 1, 0, 30, 59, 999000, tzinfo=pytz.utc)
+    )
+    calc._get_astrology_chart(seoul.localize(datetime(2024, 3, 1, 9, 31, 0)))
+
+    info = fortune._astrology_chart_for_minute.cache_info()
+    assert same_minute == first
+    assert "산출 실패" not in first
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_zodiac_sign_boundaries_use_thirty_degree_segments():
+    from utils.fortune import ZODIAC_SIGNS, get_zodiac_sign
+
+    assert get_zodiac_sign(0.0) == "양자리"
+    assert get_zodiac_sign(29.999) == "양자리"
+    assert get_zodiac_sign(30.0) == "황소자리"
+    assert get_zodiac_sign(359.9) == "물고기자리"
+    assert get_zodiac_sign(360.0) == "양자리"
+    assert [get_zodiac_sign(15 + 30 * index) for index in range(12)] == list(ZODIAC_SIGNS)
+
+
+def test_saju_is_cached_per_solar_date():
+    from utils import fortune
+
+    calc = FortuneCalculator()
+    fortune._saju_cached.cache_clear()
+
+    first = calc._get_saju_palja(2024, 2, 10)
+    again = calc._get_saju_palja(2024, 2, 10)
+    other = calc._get_saju_palja(2024, 2, 11)
+
+    assert first == again
+    assert first != other
+    assert fortune._saju_cached.cache_info().hits == 1
+
+
+def test_importing_fortune_defers_calculation_libraries():
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = (
+        "import sys, utils.fortune as f; "
+        "print('ephem' in sys.modules, 'korean_lunar_calendar' in sys.modules, f.EPHEM_AVAILABLE)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+
+    # 설치 여부는 find_spec으로만 확인하고 모듈은 첫 계산 때 import한다.
+    assert result.stdout.split() == ["False", "False", "True"]
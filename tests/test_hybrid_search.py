@@ -1,3 +1,5 @@
+import asyncio
+
 import numpy as np
 import pytest
 
@@ -5,6 +7,21 @@ import config
 from utils.hybrid_search import HybridSearchEngine
 
 
+@pytest.fixture(autouse=True)
+def _batch_embeddings_follow_single_fake(monkeypatch):
+    """각 테스트가 바꿔 넣은 get_embedding 대역을 배치 조회도 쓰게 한다."""
+    import utils.hybrid_search as hybrid_search
+
+    async def fake_get_embeddings(texts, prefix=""):
+        return list(
+            await asyncio.gather(
+                *(hybrid_search.get_embedding(text, prefix=prefix) for text in texts)
+            )
+        )
+
+    monkeypatch.setattr(hybrid_search, "get_embeddings", fake_get_embeddings)
+
+
 class DummyDiscordStore:
     def __init__(self):
         self.structured_calls = 0
@@ -101,6 +118,220 @@ async def test_query_variants_reuse_same_discord_database_rows(monkeypatch):
     assert store.legacy_calls == 1
 
 
+@pytest.mark.asyncio
+async def test_query_variant_embeddings_are_fetched_in_one_batch(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+    batches: list[list[str]] = []
+
+    async def single_embedding(_text: str, prefix: str = ""):
+        raise AssertionError("변형 임베딩은 배치로만 구해야 한다")
+
+    async def batch_embeddings(texts, prefix=""):
+        batches.append(list(texts))
+        return [np.array([0.9, 0.1 * (index + 1)], dtype=np.float32) for index, _ in enumerate(texts)]
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", single_embedding)
+    monkeypatch.setattr("utils.hybrid_search.get_embeddings", batch_embeddings)
+    store = DummyDiscordStore()
+    engine = HybridSearchEngine(
+        discord_store=store,
+        kakao_store=None,
+        bm25_manager=None,
+    )
+
+    result = await engine.search(
+        "그럼   설명해줘",
+        guild_id=123,
+        channel_id=456,
+        user_id=789,
+        recent_messages=["직전 대화 주제"],
+        deep_search=True,
+    )
+
+    assert batches == [[" ".join(variant.split()) for variant in result.query_variants]]
+    assert [entry["message_id"] for entry in result.entries] == [1]
+
+
+@pytest.mark.asyncio
+async def test_query_variants_are_searched_concurrently(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+    in_flight: list[str] = []
+    both_started = asyncio.Event()
+
+    async def fake_get_embedding(text: str, prefix: str = ""):
+        # 두 변형이 동시에 들어와야만 풀린다. 순차 실행이면 시간 초과로 실패한다.
+        in_flight.append(text)
+        if len(in_flight) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=1.0)
+        return np.array([0.9, 0.1], dtype=np.float32)
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    store = DummyDiscordStore()
+    engine = HybridSearchEngine(
+        discord_store=store,
+        kakao_store=None,
+        bm25_manager=None,
+    )
+
+    result = await engine.search(
+        "그럼 설명해줘",
+        guild_id=123,
+        channel_id=456,
+        user_id=789,
+        recent_messages=["직전 대화 주제"],
+        deep_search=True,
+    )
+
+    assert sorted(in_flight) == sorted(result.query_variants)
+    assert (store.structured_calls, store.legacy_calls) == (1, 1)
+    assert [entry["message_id"] for entry in result.entries] == [1]
+
+
+@pytest.mark.asyncio
+async def test_failed_retrieval_for_one_variant_does_not_fail_the_search(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+
+    async def fake_get_embedding(text: str, prefix: str = ""):
+        return np.array([0.9, 0.1], dtype=np.float32)
+
+    class FailingBM25:
+        async def search(self, query, *, guild_id, channel_id, limit):
+            raise RuntimeError("FTS 조회 실패")
+
+        async def fetch_window_for_message(self, *, channel_id, message_id):
+            return []
+
+        async def fetch_neighbors(self, *, channel_id, message_id, radius):
+            return []
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    engine = HybridSearchEngine(
+        discord_store=DummyDiscordStore(),
+        kakao_store=None,
+        bm25_manager=FailingBM25(),
+    )
+
+    result = await engine.search("하이브리드 검색 테스트", guild_id=123, channel_id=456, deep_search=True)
+
+    assert [entry["message_id"] for entry in result.entries] == [1]
+
+
+@pytest.mark.asyncio
+async def test_variants_differing_in_whitespace_share_one_query_embedding(monkeypatch):
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+    encoded: list[str] = []
+
+    async def fake_get_embedding(text: str, prefix: str = ""):
+        encoded.append(text)
+        await asyncio.sleep(0)
+        return np.array([0.9, 0.1], dtype=np.float32)
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    engine = HybridSearchEngine(
+        discord_store=DummyDiscordStore(),
+        kakao_store=None,
+        bm25_manager=None,
+    )
+    row_cache: dict = {}
+
+    first, second = await asyncio.gather(
+        *(
+            engine._embedding_candidates(
+                query, guild_id=123, channel_id=456, user_id=None, row_cache=row_cache
+            )
+            for query in ("그럼  설명해줘", " 그럼 설명해줘 ")
+        )
+    )
+
+    assert encoded == ["그럼 설명해줘"]
+    assert [entry["message_id"] for entry in first] == [entry["message_id"] for entry in second]
+
+
+class KnnDiscordStore(DummyDiscordStore):
+    knn_search_available = True
+
+    def __init__(self):
+        super().__init__()
+        self.query_vectors = []
+
+    async def fetch_recent_embeddings(self, server_id, channel_id, user_id, limit, query_vector):
+        self.query_vectors.append(query_vector)
+        return await super().fetch_recent_embeddings(server_id, channel_id, user_id, limit)
+
+
+@pytest.mark.asyncio
+async def test_knn_capable_store_receives_query_vector_per_variant(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    monkeypatch.setattr(config, "RAG_QUERY_REWRITE_VARIANTS", 3)
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+
+    async def fake_get_embedding(text: str, prefix: str = ""):
+        if text == "그럼 설명해줘":
+            return np.array([0.9, 0.1], dtype=np.float32)
+        return np.array([0.6, 0.4], dtype=np.float32)
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    store = KnnDiscordStore()
+    engine = HybridSearchEngine(
+        discord_store=store,
+        kakao_store=None,
+        bm25_manager=None,
+    )
+
+    result = await engine.search(
+        "그럼 설명해줘",
+        guild_id=123,
+        channel_id=456,
+        user_id=789,
+        recent_messages=["직전 대화 주제"],
+        deep_search=True,
+    )
+
+    assert len(result.query_variants) == 2
+    assert store.legacy_calls == 2
+    assert all(vector is not None for vector in store.query_vectors)
+
+
+@pytest.mark.asyncio
+async def test_variants_with_near_identical_embeddings_are_searched_once(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    monkeypatch.setattr(config, "RAG_QUERY_REWRITE_VARIANTS", 3)
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+    encoded: list[str] = []
+
+    async def fake_get_embedding(text: str, prefix: str = ""):
+        encoded.append(text)
+        if text == "그럼 설명해줘":
+            return np.array([0.9, 0.1], dtype=np.float32)
+        return np.array([0.91, 0.1], dtype=np.float32)
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    store = KnnDiscordStore()
+    engine = HybridSearchEngine(
+        discord_store=store,
+        kakao_store=None,
+        bm25_manager=None,
+    )
+
+    result = await engine.search(
+        "그럼 설명해줘",
+        guild_id=123,
+        channel_id=456,
+        user_id=789,
+        recent_messages=["직전 대화 주제"],
+        deep_search=True,
+    )
+
+    assert len(result.query_variants) == 2
+    assert sorted(encoded) == sorted(result.query_variants)
+    assert store.legacy_calls == 1
+    assert np.allclose(store.query_vectors[0], [0.9, 0.1])
+
+
 @pytest.mark.asyncio
 async def test_independent_query_does_not_inherit_unrelated_recent_topic(
     monkeypatch,
@@ -178,6 +409,84 @@ def test_lexical_name_bonus_handles_korean_postposition():
     assert score >= 0.04
 
 
+def test_batch_cosine_similarities_match_single_row_scores():
+    query = np.array([0.3, -0.2, 0.9], dtype=np.float32)
+    vectors = [
+        np.array([0.1, 0.4, 0.2], dtype=np.float32),
+        None,
+        np.zeros(3, dtype=np.float32),
+        np.array([-0.7, 0.5, 0.1], dtype=np.float32),
+    ]
+
+    scores = HybridSearchEngine._batch_cosine_similarities(query, vectors)
+
+    assert scores[1] is None
+    assert scores[2] == 0.0
+    for index in (0, 3):
+        expected = HybridSearchEngine._cosine_similarity(query, vectors[index])
+        assert scores[index] == pytest.approx(expected, abs=1e-6)
+
+
+def test_cosine_similarity_matches_norm_based_reference():
+    rng = np.random.default_rng(7)
+    left = rng.standard_normal(384).astype(np.float32)
+    right = rng.standard_normal(384).astype(np.float32)
+
+    expected = float(np.dot(left, right) / (np.linalg.norm(left) * np.linalg.norm(right)))
+
+    assert HybridSearchEngine._cosine_similarity(left, right) == pytest.approx(expected, abs=1e-6)
+    assert HybridSearchEngine._cosine_similarity(left, np.zeros(384, dtype=np.float32)) == 0.0
+
+
+def test_simsimd_kernels_match_numpy_scores(monkeypatch):
+    pytest.importorskip("simsimd")
+    from utils import hybrid_search
+
+    rng = np.random.default_rng(11)
+    query = rng.standard_normal(384).astype(np.float32)
+    vectors = [rng.standard_normal(384).astype(np.float32) for _ in range(4)]
+    vectors.append(np.zeros(384, dtype=np.float32))
+
+    simd_scores = HybridSearchEngine._batch_cosine_similarities(query, vectors)
+    simd_single = HybridSearchEngine._cosine_similarity(query, vectors[0])
+    monkeypatch.setattr(hybrid_search, "_get_simsimd", lambda: None)
+    numpy_scores = HybridSearchEngine._batch_cosine_similarities(query, vectors)
+
+    assert simd_scores == pytest.approx(numpy_scores, abs=1e-5)
+    assert simd_single == pytest.approx(numpy_scores[0], abs=1e-5)
+    assert simd_scores[-1] == 0.0
+
+
+def test_half_precision_matrices_reach_simsimd_without_upcasting(monkeypatch):
+    from utils import hybrid_search
+
+    calls = []
+
+    class FakeSimsimd:
+        @staticmethod
+        def cdist(matrix, queries, metric):
+            calls.append((matrix.dtype, queries.dtype, metric))
+            left = matrix.astype(np.float64)
+            right = queries.astype(np.float64)[0]
+            if metric == "dot":
+                return (left @ right).reshape(-1, 1)
+            norms = np.linalg.norm(left, axis=1) * np.linalg.norm(right)
+            return (1.0 - (left @ right) / np.where(norms == 0, 1.0, norms)).reshape(-1, 1)
+
+    monkeypatch.setattr(hybrid_search, "_get_simsimd", lambda: FakeSimsimd)
+    matrix = np.array([[0.6, 0.8], [1.0, 0.0]], dtype=np.float16)
+    query = np.array([1.0, 0.0], dtype=np.float32)
+
+    dots = HybridSearchEngine._matrix_dot_scores(query, matrix)
+    cosines = HybridSearchEngine._matrix_cosine_similarities(query, matrix)
+
+    assert [call[:2] for call in calls] == [(np.float16, np.float16)] * 2
+    assert [call[2] for call in calls] == ["dot", "cosine"]
+    assert dots.dtype == cosines.dtype == np.float32
+    assert dots.tolist() == pytest.approx([0.6, 1.0], abs=1e-3)
+    assert cosines.tolist() == pytest.approx([0.6, 1.0], abs=1e-3)
+
+
 def test_overlapping_structured_memories_do_not_monopolize_top_k():
     entries = [
         {
@@ -329,6 +638,46 @@ def test_dedupe_does_not_override_distinct_vectors_with_lexical_overlap():
     ]
 
 
+def test_dedupe_limit_matches_truncated_full_pass_and_stops_early(monkeypatch):
+    """상한만큼 고른 뒤에는 남은 후보의 3-gram을 만들지 않는다."""
+    entries = [
+        {
+            "candidate_id": "first",
+            "dialogue_block": "민수: 부산 회의는 8월 3일이야.",
+            "embedding_vector": np.array([1.0, 0.0], dtype=np.float32),
+        },
+        {
+            "candidate_id": "first-again",
+            "dialogue_block": "민수: 부산 회의는 8월 3일이야!",
+            "embedding_vector": np.array([1.0, 0.0], dtype=np.float32),
+        },
+        {
+            "candidate_id": "second",
+            "dialogue_block": "지연: KTX로 가기로 했어.",
+            "embedding_vector": np.array([0.0, 1.0], dtype=np.float32),
+        },
+        {
+            "candidate_id": "third",
+            "dialogue_block": "수아: 숙소는 해운대야.",
+            "embedding_vector": np.array([0.6, -0.8], dtype=np.float32),
+        },
+    ]
+    expected = HybridSearchEngine._dedupe_overlapping_entries(entries)[:2]
+    shingled: list[str] = []
+    original = HybridSearchEngine._content_shingles
+
+    def tracking_shingles(text):
+        shingled.append(text)
+        return original(text)
+
+    monkeypatch.setattr(HybridSearchEngine, "_content_shingles", staticmethod(tracking_shingles))
+    selected = HybridSearchEngine._dedupe_overlapping_entries(entries, limit=2)
+
+    assert [entry["candidate_id"] for entry in selected] == ["first", "second"]
+    assert selected == expected
+    assert "수아: 숙소는 해운대야." not in shingled
+
+
 def test_embedding_and_bm25_for_same_message_merge_into_one_candidate(monkeypatch):
     monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
     engine = HybridSearchEngine(DummyDiscordStore(), None, None)
@@ -358,7 +707,177 @@ def test_embedding_and_bm25_for_same_message_merge_into_one_candidate(monkeypatc
     )
 
     assert list(candidates) == ["message:10"]
-    assert candidates["message:10"]["sources"] == {"embedding", "bm25"}
+    assert list(candidates["message:10"]["sources"]) == ["embedding", "bm25"]
+
+
+def test_bm25_hit_does_not_replace_embedding_content(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    engine = HybridSearchEngine(DummyDiscordStore(), None, None)
+    candidates = {}
+    engine._merge_candidate(
+        candidates,
+        {
+            "message_id": 10,
+            "similarity": 0.7,
+            "message": "구조화 기억 요약",
+            "dialogue_messages": [{"content": "임베딩 창"}],
+            "dialogue_block": "임베딩 블록",
+        },
+        source="embedding",
+        rank=0,
+    )
+    engine._merge_candidate(
+        candidates,
+        {
+            "message_id": 10,
+            "bm25_score": 0.57,
+            "message": "원문",
+            "dialogue_messages": [{"content": "BM25 창"}],
+            "dialogue_block": None,
+        },
+        source="bm25",
+        rank=0,
+    )
+
+    candidate = candidates["message:10"]
+    assert candidate["bm25_score"] == 0.57
+    assert (candidate["message"], candidate["dialogue_block"]) == ("구조화 기억 요약", "임베딩 블록")
+
+
+@pytest.mark.asyncio
+async def test_bm25_dialogue_blocks_are_formatted_once_after_merging(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    monkeypatch.setattr(config, "RAG_QUERY_REWRITE_VARIANTS", 3)
+
+    class Hit:
+        def __init__(self, message_id, content):
+            self.message_id = message_id
+            self.content = content
+            self.user_name = "tester"
+            self.user_id = 4
+            self.guild_id = 1
+            self.created_at = "2025-01-01T00:00:00"
+            self.bm25_score = -1.0
+            self.context_window = None
+
+    class DummyBM25:
+        async def search(self, query, *, guild_id, channel_id, limit):
+            return [Hit(7, "부산 여행 일정"), Hit(8, "부산 맛집")]
+
+        async def fetch_window_for_message(self, *, channel_id, message_id):
+            return [{"message_id": message_id, "user_name": "tester", "content": f"창 {message_id}"}]
+
+    async def no_embedding(_text: str, prefix: str = ""):
+        return None
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", no_embedding)
+    engine = HybridSearchEngine(DummyDiscordStore(), None, DummyBM25())
+    formatted: list[int] = []
+    original = engine._format_dialogue_block
+
+    def tracking_format(messages):
+        formatted.append(len(messages))
+        return original(messages)
+
+    monkeypatch.setattr(engine, "_format_dialogue_block", tracking_format)
+    result = await engine.search(
+        "그럼 부산은?",
+        guild_id=1,
+        channel_id=2,
+        recent_messages=["부산 여행 얘기"],
+        deep_search=True,
+    )
+
+    assert len(result.query_variants) == 2
+    # 두 변형이 같은 두 메시지를 찾아도 병합 뒤 후보당 한 번만 블록을 만든다.
+    assert len(formatted) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("fusion", "expected_order"),
+    [("similarity", [2, 1]), ("rrf", [1, 2])],
+)
+async def test_score_fusion_mode_orders_candidates(monkeypatch, fusion, expected_order):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+    monkeypatch.setattr(config, "RAG_MEMORY_GATE_SCORE", 0.0)
+    monkeypatch.setattr(config, "RAG_MEMORY_RELATIVE_FLOOR", 0.0)
+    monkeypatch.setattr(config, "RAG_SCORE_FUSION", fusion)
+    monkeypatch.setattr(config, "RAG_RRF_K", 60.0)
+
+    class Hit:
+        message_id = 1
+        content = "하이브리드 검색 테스트 관련 메시지"
+        user_name = "tester"
+        user_id = 4
+        guild_id = 123
+        created_at = "2025-01-01T00:00:00"
+        bm25_score = -1.0
+        context_window = None
+
+    class DummyBM25:
+        async def search(self, query, *, guild_id, channel_id, limit):
+            return [Hit()]
+
+        async def fetch_window_for_message(self, *, channel_id, message_id):
+            return []
+
+        async def fetch_neighbors(self, *, channel_id, message_id, radius):
+            return []
+
+    async def fake_get_embedding(_text: str, prefix: str = ""):
+        return np.array([0.6, 0.8], dtype=np.float32)
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    engine = HybridSearchEngine(DummyDiscordStore(), None, DummyBM25())
+
+    result = await engine.search("무엇", guild_id=123, channel_id=456, user_id=789)
+
+    # 2번은 유사도가 더 높고, 1번은 임베딩 2위지만 BM25에서도 1위라 RRF 합이 크다.
+    assert [entry["message_id"] for entry in result.entries] == expected_order
+    by_id = {entry["message_id"]: entry for entry in result.entries}
+    assert by_id[1]["rrf_score"] == pytest.approx(1 / 62 + 1 / 61)
+    assert by_id[2]["rrf_score"] == pytest.approx(1 / 61)
+    assert result.top_score == pytest.approx(by_id[expected_order[0]]["combined_score"])
+
+
+@pytest.mark.asyncio
+async def test_candidate_dialogue_windows_are_fetched_concurrently(monkeypatch):
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+
+    class Hit:
+        def __init__(self, message_id):
+            self.message_id = message_id
+            self.content = f"부산 {message_id}"
+            self.user_name = "tester"
+            self.user_id = 4
+            self.guild_id = 1
+            self.created_at = "2025-01-01T00:00:00"
+            self.bm25_score = -1.0
+            self.context_window = None
+
+    in_flight: list[int] = []
+    both_started = asyncio.Event()
+
+    class SlowWindowBM25:
+        async def search(self, query, *, guild_id, channel_id, limit):
+            return [Hit(7), Hit(8)]
+
+        async def fetch_window_for_message(self, *, channel_id, message_id):
+            # 두 후보가 동시에 들어와야만 풀린다. 순차 조회면 시간 초과로 실패한다.
+            in_flight.append(message_id)
+            if len(in_flight) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), timeout=1.0)
+            return [{"message_id": message_id, "user_name": "tester", "content": f"창 {message_id}"}]
+
+    engine = HybridSearchEngine(DummyDiscordStore(), None, SlowWindowBM25())
+
+    entries = await engine._bm25_candidates("부산", guild_id=1, channel_id=2)
+
+    assert sorted(in_flight) == [7, 8]
+    assert [entry["dialogue_messages"][0]["content"] for entry in entries] == ["창 7", "창 8"]
 
 
 @pytest.mark.asyncio
@@ -411,3 +930,444 @@ async def test_deep_search_reads_structured_and_raw_discord_embeddings(monkeypat
     assert store.structured_calls == 1
     assert store.legacy_calls == 1
     assert result.entries[0]["lexical_score"] >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_kakao_rows_without_scores_are_scored_in_one_batch(monkeypatch):
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.5)
+
+    async def fake_get_embedding(_text: str, prefix: str = ""):
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+    class KakaoStore:
+        async def fetch_recent_embeddings(self, *, server_ids, limit, query_vector):
+            return [
+                {"message_id": 1, "message": "가까운 대화", "embedding": np.array([0.8, 0.6], dtype=np.float32)},
+                {"message_id": 2, "message": "먼 대화", "embedding": np.array([0.0, 1.0], dtype=np.float32)},
+                {"message_id": 3, "message": "점수 있는 대화", "score": 0.9},
+            ]
+
+    batches = []
+    lexical_rows = []
+    original = HybridSearchEngine._batch_cosine_similarities.__func__
+    original_lexical = HybridSearchEngine._lexical_relevance.__func__
+
+    def counting_batch(cls, query_vector, vectors):
+        batches.append(len(vectors))
+        return original(cls, query_vector, vectors)
+
+    def tracking_lexical(cls, query, row):
+        lexical_rows.append(row.get("message_id"))
+        return original_lexical(cls, query, row)
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    monkeypatch.setattr(
+        HybridSearchEngine, "_batch_cosine_similarities", classmethod(counting_batch)
+    )
+    monkeypatch.setattr(HybridSearchEngine, "_lexical_relevance", classmethod(tracking_lexical))
+    engine = HybridSearchEngine(
+        discord_store=DummyDiscordStore(),
+        kakao_store=KakaoStore(),
+        bm25_manager=None,
+    )
+
+    entries = await engine._embedding_candidates("질문", guild_id=1, channel_id=2, user_id=None)
+    kakao = {entry["message_id"]: entry for entry in entries if entry["origin"] == "Kakao"}
+
+    # 미리 계산된 score가 있는 행은 제외하고 나머지 두 행을 한 번에 계산한다.
+    assert 2 in batches
+    assert set(kakao) == {1, 3}
+    assert kakao[1]["semantic_similarity"] == pytest.approx(0.8, abs=1e-6)
+    assert kakao[3]["semantic_similarity"] == pytest.approx(0.9)
+    # 코사인 0인 2번 행은 어휘 보너스를 더해도 0.5에 못 미쳐 어휘 점수를 계산하지 않는다.
+    assert 2 not in lexical_rows
+
+
+@pytest.mark.asyncio
+async def test_legacy_discord_rows_are_scored_from_the_store_matrix(monkeypatch):
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.5)
+
+    async def fake_get_embedding(_text: str, prefix: str = ""):
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+    class MatrixDiscordStore(DummyDiscordStore):
+        def __init__(self):
+            super().__init__()
+            self.matrix_calls = 0
+
+        async def fetch_recent_matrix(self, server_id, channel_id, user_id=None, limit=200):
+            self.matrix_calls += 1
+            rows = await super().fetch_recent_embeddings(server_id, channel_id, user_id, limit)
+            matrix = np.stack([row.pop("embedding") for row in rows])
+            return [str(row["message_id"]) for row in rows], matrix, rows
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    store = MatrixDiscordStore()
+    engine = HybridSearchEngine(
+        discord_store=store,
+        kakao_store=None,
+        bm25_manager=None,
+    )
+
+    entries = await engine._embedding_candidates(
+        "질문", guild_id=1, channel_id=2, user_id=None, deep_search=True
+    )
+
+    assert (store.matrix_calls, store.legacy_calls) == (1, 1)
+    assert [entry["message_id"] for entry in entries] == [1]
+    assert entries[0]["semantic_similarity"] == pytest.approx(0.9 / np.hypot(0.9, 0.1), abs=1e-6)
+
+
+@pytest.mark.asyncio
+async def test_rows_that_cannot_reach_the_threshold_skip_lexical_scoring(monkeypatch):
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.5)
+    engine = HybridSearchEngine(
+        discord_store=DummyDiscordStore(),
+        kakao_store=None,
+        bm25_manager=None,
+    )
+    rows = await DummyDiscordStore().fetch_recent_embeddings(1, 2, None, 10)
+    rows.append(
+        dict(rows[0], message_id=3, message="다른 이야기", embedding=np.array([0.45, 0.9], dtype=np.float32))
+    )
+    matrix = np.stack([row.pop("embedding") for row in rows])
+    lexical_rows: list[int] = []
+    original = HybridSearchEngine._lexical_relevance.__func__
+
+    def tracking_lexical(cls, query, row):
+        lexical_rows.append(row.get("message_id"))
+        return original(cls, query, row)
+
+    monkeypatch.setattr(HybridSearchEngine, "_lexical_relevance", classmethod(tracking_lexical))
+    entries = await engine._score_discord_rows(
+        "하이브리드",
+        np.array([1.0, 0.0], dtype=np.float32),
+        rows,
+        guild_id=1,
+        channel_id=2,
+        use_legacy_discord_rows=True,
+        matrix=matrix,
+    )
+
+    # 2번 행(코사인 0)은 가산점을 모두 받아도 0.5에 못 미쳐 어휘 점수를 계산하지 않는다.
+    assert lexical_rows == [1, 3]
+    assert [entry["message_id"] for entry in entries] == [1]
+
+
+@pytest.mark.asyncio
+async def test_blob_rows_are_unpacked_into_one_matrix(monkeypatch):
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+    engine = HybridSearchEngine(
+        discord_store=DummyDiscordStore(),
+        kakao_store=None,
+        bm25_manager=None,
+    )
+    array_rows = await DummyDiscordStore().fetch_recent_embeddings(1, 2, None, 10)
+    blob_rows = [dict(row, embedding=row["embedding"].tobytes()) for row in array_rows]
+    query_vector = np.array([0.92, 0.08], dtype=np.float32)
+    expected = await engine._score_discord_rows(
+        "질문", query_vector, array_rows, guild_id=1, channel_id=2, use_legacy_discord_rows=True
+    )
+
+    def fail_to_vector(_blob):
+        raise AssertionError("BLOB 행은 행렬로 한 번에 풀어야 한다")
+
+    monkeypatch.setattr(engine, "_to_vector", fail_to_vector)
+    entries = await engine._score_discord_rows(
+        "질문", query_vector, blob_rows, guild_id=1, channel_id=2, use_legacy_discord_rows=True
+    )
+
+    assert [entry["message_id"] for entry in entries] == [entry["message_id"] for entry in expected]
+    assert [entry["semantic_similarity"] for entry in entries] == pytest.approx(
+        [entry["semantic_similarity"] for entry in expected]
+    )
+
+
+@pytest.mark.asyncio
+async def test_shared_blob_rows_are_decoded_once_per_search(monkeypatch):
+    import utils.hybrid_search as hybrid_search
+
+    monkeypatch.setattr(config, "SEARCH_QUERY_EXPANSION_ENABLED", False)
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.1)
+
+    class BlobDiscordStore(DummyDiscordStore):
+        async def fetch_recent_embeddings(self, server_id, channel_id, user_id, limit):
+            rows = await super().fetch_recent_embeddings(server_id, channel_id, user_id, limit)
+            return [dict(row, embedding=row["embedding"].tobytes()) for row in rows]
+
+    async def fake_get_embedding(text: str, prefix: str = ""):
+        # 두 변형이 중복 제거되지 않도록 서로 먼 벡터를 준다.
+        return np.array([0.9, 0.1] if text == "그럼 설명해줘" else [0.6, 0.8], dtype=np.float32)
+
+    decoded: list[int] = []
+    original_decode = hybrid_search.embedding_blobs_to_matrix
+
+    def counting_decode(blobs):
+        blobs = list(blobs)
+        decoded.append(len(blobs))
+        return original_decode(blobs)
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    monkeypatch.setattr(hybrid_search, "embedding_blobs_to_matrix", counting_decode)
+    store = BlobDiscordStore()
+    engine = HybridSearchEngine(discord_store=store, kakao_store=None, bm25_manager=None)
+
+    result = await engine.search(
+        "그럼 설명해줘",
+        guild_id=123,
+        channel_id=456,
+        user_id=789,
+        recent_messages=["직전 대화 주제"],
+        deep_search=True,
+    )
+
+    # 두 변형이 같은 행을 쓰므로 조회도, BLOB 해석도 한 번이다.
+    assert len(result.query_variants) == 2
+    assert store.legacy_calls == 1
+    assert decoded == [2]
+    assert [entry["message_id"] for entry in result.entries][:1] == [1]
+
+
+@pytest.mark.asyncio
+async def test_unit_normalized_structured_memories_are_scored_by_dot_product(monkeypatch):
+    monkeypatch.setattr(config, "STRUCTURED_MEMORY_SIMILARITY_THRESHOLD", 0.5)
+
+    async def fake_get_embedding(_text: str, prefix: str = ""):
+        return np.array([2.0, 0.0], dtype=np.float32)
+
+    class UnitMemoryStore(DummyDiscordStore):
+        unit_normalized = True
+
+        async def fetch_recent_memory_entries(self, *, server_id, channel_id, user_id=None, limit=200, query_vector=None):
+            self.structured_calls += 1
+            return [
+                {
+                    "memory_id": "m1",
+                    "message_id": 5,
+                    "summary_text": "부산 여행 계획",
+                    "embedding": np.array([0.8, 0.6], dtype=np.float32).tobytes(),
+                },
+                {
+                    "memory_id": "m2",
+                    "message_id": 6,
+                    "summary_text": "다른 이야기",
+                    "embedding": np.array([0.0, 1.0], dtype=np.float32).tobytes(),
+                },
+            ]
+
+    def fail_norms(*_args, **_kwargs):
+        raise AssertionError("단위 길이 행은 코사인 정규화를 거치지 않아야 한다")
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    monkeypatch.setattr(HybridSearchEngine, "_matrix_cosine_similarities", staticmethod(fail_norms))
+    engine = HybridSearchEngine(
+        discord_store=UnitMemoryStore(),
+        kakao_store=None,
+        bm25_manager=None,
+    )
+
+    entries = await engine._embedding_candidates("질문", guild_id=1, channel_id=2, user_id=None)
+
+    assert [entry["message_id"] for entry in entries] == [5]
+    assert entries[0]["semantic_similarity"] == pytest.approx(0.8, abs=1e-6)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("dtype, tolerance", [(np.float32, 1e-6), (np.float16, 1e-3)])
+async def test_unit_normalized_store_matrix_is_scored_by_dot_product(monkeypatch, dtype, tolerance):
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", 0.5)
+
+    async def fake_get_embedding(_text: str, prefix: str = ""):
+        return np.array([2.0, 0.0], dtype=np.float32)
+
+    class UnitMatrixDiscordStore(DummyDiscordStore):
+        unit_normalized = True
+
+        async def fetch_recent_matrix(self, server_id, channel_id, user_id=None, limit=200):
+            rows = await super().fetch_recent_embeddings(server_id, channel_id, user_id, limit)
+            matrix = np.stack([row.pop("embedding") for row in rows])
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+            return [str(row["message_id"]) for row in rows], matrix.astype(dtype), rows
+
+    def fail_norms(*_args, **_kwargs):
+        raise AssertionError("단위 길이 행렬은 코사인 정규화를 거치지 않아야 한다")
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    monkeypatch.setattr(HybridSearchEngine, "_matrix_cosine_similarities", staticmethod(fail_norms))
+    engine = HybridSearchEngine(
+        discord_store=UnitMatrixDiscordStore(),
+        kakao_store=None,
+        bm25_manager=None,
+    )
+
+    entries = await engine._embedding_candidates(
+        "질문", guild_id=1, channel_id=2, user_id=None, deep_search=True
+    )
+
+    assert [entry["message_id"] for entry in entries] == [1]
+    assert isinstance(entries[0]["semantic_similarity"], float)
+    assert entries[0]["semantic_similarity"] == pytest.approx(0.9 / np.hypot(0.9, 0.1), abs=tolerance)
+
+
+
+@pytest.mark.asyncio
+async def test_candidate_dialogue_windows_are_fetched_in_one_batch(monkeypatch):
+    monkeypatch.setattr(config, "RAG_SIMILARITY_THRESHOLD", -1.0)
+
+    async def fake_get_embedding(_text: str, prefix: str = ""):
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+    class BatchWindowManager:
+        def __init__(self):
+            self.batches = []
+
+        async def fetch_windows_for_messages(self, *, channel_id, message_ids):
+            self.batches.append((channel_id, sorted(message_ids)))
+            return {1: [{"message_id": 1, "user_name": "tester", "content": "창 안의 대화"}]}
+
+        async def fetch_window_for_message(self, **_kwargs):
+            raise AssertionError("일괄 조회한 윈도우를 메시지마다 다시 읽으면 안 된다")
+
+        async def fetch_neighbors(self, *, channel_id, message_id, radius):
+            return []
+
+    monkeypatch.setattr("utils.hybrid_search.get_embedding", fake_get_embedding)
+    manager = BatchWindowManager()
+    engine = HybridSearchEngine(
+        discord_store=DummyDiscordStore(),
+        kakao_store=None,
+        bm25_manager=manager,
+    )
+
+    entries = await engine._embedding_candidates(
+        "질문", guild_id=1, channel_id=2, user_id=None, deep_search=True
+    )
+
+    assert manager.batches == [(2, [1, 2])]
+    assert "창 안의 대화" in entries[0]["dialogue_block"]
+
+
+def test_dialogue_chunks_match_chunker_and_are_cached(monkeypatch):
+    from utils.chunker import ChunkerConfig, SemanticChunker
+
+    monkeypatch.setattr(config, "SEARCH_CHUNKING_ENABLED", True)
+    calls = []
+
+    class CountingChunker(SemanticChunker):
+        def chunk(self, text, *, metadata=None):
+            calls.append(text)
+            return super().chunk(text, metadata=metadata)
+
+    short = "[a][t1] 짧은 대화입니다.\n[b][t2] 네 맞아요!"
+    long = "\n".join(f"[u{index}][t] 문장 {index} 입니다." for index in range(40))
+    reference = SemanticChunker(ChunkerConfig(max_tokens=20, overlap_tokens=5))
+    engine = HybridSearchEngine(
+        discord_store=DummyDiscordStore(),
+        kakao_store=None,
+        bm25_manager=None,
+        chunker=CountingChunker(ChunkerConfig(max_tokens=20, overlap_tokens=5)),
+    )
+
+    for text in (short, long, long):
+        assert engine._first_dialogue_chunk(text) == reference.chunk(text)[0].text
+
+    # 한도 이하 블록은 청커를 거치지 않고, 긴 블록은 두 번째부터 캐시에서 읽는다.
+    assert calls == [long]
+
+
+@pytest.mark.asyncio
+async def test_reranker_skips_candidates_far_below_the_top_score(monkeypatch):
+    monkeypatch.setattr(config, "RERANK_ENABLED", True)
+
+    class RecordingReranker:
+        def __init__(self):
+            self.sent = []
+
+        async def rerank(self, query, documents, *, top_k=None):
+            docs = list(documents)
+            self.sent = [doc["candidate_id"] for doc in docs]
+            # 원래 순서를 뒤집어 재순위화 결과가 반영되는지 본다.
+            return [
+                dict(doc, rerank_score=float(index))
+                for index, doc in enumerate(docs)
+            ]
+
+    reranker = RecordingReranker()
+    engine = HybridSearchEngine(
+        discord_store=DummyDiscordStore(),
+        kakao_store=None,
+        bm25_manager=None,
+        reranker=reranker,
+    )
+    entries = [
+        {"candidate_id": f"c{index}", "message": f"m{index}", "combined_score": score}
+        for index, score in enumerate((1.0, 0.9, 0.8, 0.5, 0.1))
+    ]
+
+    ranked = await engine._apply_reranker("질문", entries)
+
+    assert reranker.sent == ["c0", "c1", "c2", "c3"]
+    assert [entry["candidate_id"] for entry in ranked] == ["c3", "c2", "c1", "c0", "c4"]
+    assert "rerank_score" not in ranked[-1]
+
+
+def test_clean_content_normalizes_and_reuses_cleaned_messages(monkeypatch):
+    import utils.hybrid_search as hybrid_search
+
+    engine = HybridSearchEngine(discord_store=None, kakao_store=None, bm25_manager=None)
+    calls: list[str] = []
+    original = hybrid_search.clean_profanity
+
+    def counting_clean(text):
+        calls.append(text)
+        return original(text)
+
+    monkeypatch.setattr(hybrid_search, "clean_profanity", counting_clean)
+    text = "링크  https://example.com/a\r\n다음 줄\r끝 "
+
+    assert engine._clean_content(text) == "링크 [링크] 다음 줄 끝"
+    assert engine._clean_content(text) == "링크 [링크] 다음 줄 끝"
+    assert engine._clean_content("주소 없는\n문장") == "주소 없는 문장"
+    assert calls == ["링크 [링크] 다음 줄 끝", "주소 없는 문장"]
+
+
+@pytest.mark.asyncio
+async def test_reranker_results_are_mapped_back_by_candidate_id(monkeypatch):
+    monkeypatch.setattr(config, "RERANK_ENABLED", True)
+
+    class ReversingReranker:
+        def __init__(self):
+            self.seen: list[str] = []
+
+        async def rerank(self, query, docs, *, top_k=None):
+            self.seen = [doc["candidate_id"] for doc in docs]
+            return [
+                dict(doc, rerank_score=float(position))
+                for position, doc in enumerate(docs)
+            ]
+
+    reranker = ReversingReranker()
+    engine = HybridSearchEngine(
+        discord_store=None,
+        kakao_store=None,
+        bm25_manager=None,
+        reranker=reranker,
+    )
+    entries = [
+        {"candidate_id": "a", "message": "첫째", "combined_score": 0.9},
+        {"candidate_id": "b", "message": "둘째", "combined_score": None},
+        {"candidate_id": "a", "message": "중복", "combined_score": 0.1},
+        {"candidate_id": "c", "message": "셋째", "combined_score": 0.5},
+    ]
+
+    merged = await engine._apply_reranker("질문", entries)
+
+    # 점수 없는 후보는 0점으로 컷오프에 걸려 재순위화 없이 뒤에 붙고,
+    # 같은 ID의 재순위화 결과는 앞선 항목으로 되돌린다.
+    assert reranker.seen == ["a", "c", "a"]
+    assert [(entry["message"], entry.get("rerank_score")) for entry in merged] == [
+        ("첫째", 2.0),
+        ("셋째", 1.0),
+        ("첫째", 0.0),
+        ("둘째", None),
+    ]
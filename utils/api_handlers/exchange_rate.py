@@ -12,10 +12,52 @@ import aiohttp
 
 import config
 from logger_config import logger
+from utils import http
 from utils.data_formatters import FinancialDataFormatter
 
 _API_DATA_CODE = "AP01"
 _REQ_TIMEOUT = 10
+# 요청마다 ClientTimeout을 새로 만들지 않도록 공유 세션의 기본값으로 한 번만 둔다.
+_CLIENT_TIMEOUT = aiohttp.ClientTimeout(total=_REQ_TIMEOUT)
+# 해석한 호스트 주소를 커넥터에 두는 시간(초). aiohttp 기본값은 10초다.
+_DNS_CACHE_SECONDS = 300
+
+_exchange_session: aiohttp.ClientSession | None = None
+_session_lock = asyncio.Lock()
+
+
+async def _get_exchange_session() -> aiohttp.ClientSession:
+    """공유 aiohttp 세션을 생성하거나 기존 세션을 반환합니다.
+
+    호출마다 세션을 만들면 DNS 조회와 TLS 연결을 매번 새로 하므로, 커넥터의
+    DNS 캐시와 keep-alive 연결을 다음 조회에서도 재사용합니다.
+    """
+    global _exchange_session
+
+    if _exchange_session and not _exchange_session.closed:
+        return _exchange_session
+
+    async with _session_lock:
+        if _exchange_session and not _exchange_session.closed:
+            return _exchange_session
+
+        connector = aiohttp.TCPConnector(
+            limit_per_host=4,
+            ttl_dns_cache=_DNS_CACHE_SECONDS,
+        )
+        _exchange_session = aiohttp.ClientSession(
+            timeout=_CLIENT_TIMEOUT,
+            connector=connector,
+        )
+        return _exchange_session
+
+
+async def close_exchange_session() -> None:
+    """공유 aiohttp 세션을 안전하게 종료합니다."""
+    global _exchange_session
+    if _exchange_session and not _exchange_session.closed:
+        await _exchange_session.close()
+    _exchange_session = None
 
 
 def _candidate_dates(days: int = 5) -> Iterable[str]:
@@ -35,7 +77,7 @@ async def _fetch_exchange_rates_for_date(session: aiohttp.ClientSession, date_st
     }
 
     try:
-        async with session.get(base_url, params=params, timeout=_REQ_TIMEOUT) as resp:
+        async with session.get(base_url, params=params) as resp:
             if resp.status != 200:
                 error_text = await resp.text()
                 logger.warning(
@@ -46,7 +88,8 @@ async def _fetch_exchange_rates_for_date(session: aiohttp.ClientSession, date_st
                 return None
 
             try:
-                payload = await resp.json(content_type=None)
+                # 이 API는 content-type을 text/html로 주는 경우가 있어 검사하지 않는다.
+                payload = http.json_loads(await resp.read())
             except Exception as exc:  # pragma: no cover - JSON 파싱 오류 대비
                 logger.error("환율 응답 JSON 파싱 실패: %s", exc, exc_info=True)
                 return None
@@ -80,12 +123,12 @@ async def _fetch_latest_exchange_rates() -> list[Dict[str, Any]] | None:
         logger.error("EXIM_API_KEY_KR가 설정되지 않아 환율 데이터를 조회할 수 없습니다.")
         return None
 
-    async with aiohttp.ClientSession() as session:
-        for date_str in _candidate_dates():
-            records = await _fetch_exchange_rates_for_date(session, date_str)
-            if records:
-                logger.info("환율 데이터 조회 성공 (%s)", date_str)
-                return records
+    session = await _get_exchange_session()
+    for date_str in _candidate_dates():
+        records = await _fetch_exchange_rates_for_date(session, date_str)
+        if records:
+            logger.info("환율 데이터 조회 성공 (%s)", date_str)
+            return records
     return None
 
 
@@ -109,7 +152,8 @@ async def get_raw_exchange_rate(currency_code: str = "USD") -> float | None:
     if not records:
         return None
 
-    target = next((item for item in records if item.get("cur_unit") == currency_code.upper()), None)
+    currency_code = currency_code.upper()
+    target = next((item for item in records if item.get("cur_unit") == currency_code), None)
     if not target:
         return None
 
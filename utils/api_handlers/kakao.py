@@ -18,6 +18,7 @@ import aiohttp
 
 import config
 from logger_config import logger
+from utils import http
 
 _kakao_session: aiohttp.ClientSession | None = None
 _session_lock = asyncio.Lock()
@@ -137,7 +138,7 @@ async def _request_kakao_json(url: str, params: dict[str, Any], endpoint_name: s
         async with _request_guard:
             async with session.get(url, headers=_kakao_headers(), params=params) as resp:
                 if resp.status == 200:
-                    return await resp.json()
+                    return await resp.json(loads=http.json_loads)
                 error_text = await resp.text()
                 logger.error(
                     "카카오 %s API 오류. status=%s response_chars=%d",
@@ -139,13 +139,13 @@ async def get_stock_price(stock_name: str) -> str | None:
         logger.info(f"KRX API 요청: URL='{config.KRX_BASE_URL}', Params='{log_params}'")
 
         # data.go.kr 호환용 TLS 1.2 세션을 사용하되 인증서 검증은 유지한다.
-        with http.get_tlsv12_session() as session:
-            response = await asyncio.to_thread(
-                session.get,
-                url,
-                params=params,
-                timeout=10,
-            )
+        response = await asyncio.to_thread(
+            http.shared_get,
+            "tlsv12",
+            url,
+            params=params,
+            timeout=10,
+        )
         response.raise_for_status()
         try:
             data = response.json()
@@ -4,9 +4,25 @@
 Phase 2: 효율성 극대화 - LLM 토큰 사용량 최적화
 """
 
+from itertools import islice
+import math
 from typing import Dict, Any
 from logger_config import logger
 
+# 16방위 풍향 이름. 22.5도 간격이며 각 방위의 중앙값에서 ±11.25도를 포함한다.
+_WIND_DIRECTIONS = (
+    "북", "북북동", "북동", "동북동", "동", "동남동", "남동", "남남동",
+    "남", "남남서", "남서", "서남서", "서", "서북서", "북서", "북북서",
+)
+# 기상청 강수형태(PTY)·하늘상태(SKY) 코드표
+_PTY_MAP = {
+    "0": "없음", "1": "비", "2": "비/눈", "3": "눈",
+    "5": "빗방울", "6": "빗방울/눈날림", "7": "눈날림",
+}
+_SKY_MAP = {"1": "맑음☀️", "3": "구름많음☁️", "4": "흐림🌥️"}
+# 환율 금액의 천 단위 쉼표 제거용 변환표
+_STRIP_COMMA = str.maketrans("", "", ",")
+
 class WeatherDataFormatter:
     """기상청 API 응답을 LLM이 이해하기 쉬운 문자열로 가공하는 정적 메서드 모음"""
     
@@ -30,19 +46,15 @@ class WeatherDataFormatter:
                 return "현재 날씨 정보가 불완전합니다."
             
             # 강수 상태 변환
-            pty_map = {
-                "0": "없음", "1": "비", "2": "비/눈", "3": "눈", 
-                "5": "빗방울", "6": "빗방울/눈날림", "7": "눈날림"
-            }
-            pty = pty_map.get(pty_code, "정보 없음")
+            pty = _PTY_MAP.get(pty_code, "정보 없음")
             
             # 풍향 변환
             wind_dir = WeatherDataFormatter._get_wind_direction(float(vec))
             
             # 결과 조합 및 상세 정보 추가
-            result = f"🌡️ 기온: {temp}°C, 💧 습도: {reh}%"
+            parts = [f"🌡️ 기온: {temp}°C, 💧 습도: {reh}%"]
             if pty != "없음":
-                result += f", ☔ 강수: {pty} (시간당 {rn1}mm)"
+                parts.append(f"☔ 강수: {pty} (시간당 {rn1}mm)")
 
             # 바람 정보 상세화
             wind_speed = float(wsd)
@@ -54,9 +66,9 @@ class WeatherDataFormatter:
                 wind_desc = "보통 바람"
             else:
                 wind_desc = "강한 바람"
-            result += f", 💨 바람: {wind_dir} {wsd}m/s ({wind_desc})"
+            parts.append(f"💨 바람: {wind_dir} {wsd}m/s ({wind_desc})")
             
-            return result
+            return ", ".join(parts)
             
         except (KeyError, TypeError, ValueError) as e:
             logger.error(f"날씨 데이터 포맷팅 오류: {e}")
@@ -70,32 +82,37 @@ class WeatherDataFormatter:
         
         try:
             items = raw_data['item']
+
+            # 최저/최고 기온, 정오 하늘 상태, 최대 강수확률을 한 번의 순회로 모은다.
+            min_temp = math.inf
+            max_temp = -math.inf
+            max_pop = 0
+            sky_item = None
+            first_sky_item = None
+            for item in items:
+                category = item['category']
+                if category == 'TMN':
+                    min_temp = min(min_temp, float(item['fcstValue']))
+                elif category == 'TMX':
+                    max_temp = max(max_temp, float(item['fcstValue']))
+                elif category == 'POP':
+                    max_pop = max(max_pop, int(item['fcstValue']))
+                elif category == 'SKY':
+                    if first_sky_item is None:
+                        first_sky_item = item
+                    if sky_item is None and item['fcstTime'] == '1200':
+                        sky_item = item
+            if sky_item is None:
+                sky_item = first_sky_item
+
+            sky_condition = _SKY_MAP.get(sky_item['fcstValue'], "정보없음") if sky_item else "정보없음"
             
-            # 온도 정보 추출
-            min_temps = [float(item['fcstValue']) for item in items if item['category'] == 'TMN']
-            max_temps = [float(item['fcstValue']) for item in items if item['category'] == 'TMX']
-            
-            min_temp = min(min_temps) if min_temps else None
-            max_temp = max(max_temps) if max_temps else None
-            
-            # 하늘 상태 (정오 기준)
-            sky_item = next((item for item in items if item['category'] == 'SKY' and item['fcstTime'] == '1200'), None)
-            if not sky_item:
-                sky_item = next((item for item in items if item['category'] == 'SKY'), None)
-            
-            sky_map = {"1": "맑음☀️", "3": "구름많음☁️", "4": "흐림🌥️"}
-            sky_condition = sky_map.get(sky_item['fcstValue'], "정보없음") if sky_item else "정보없음"
-            
-            # 강수확률
-            pops = [int(item['fcstValue']) for item in items if item['category'] == 'POP']
-            max_pop = max(pops) if pops else 0
-            
-            result = f"{day_name} 날씨: "
-            if min_temp is not None and max_temp is not None:
-                result += f"🌡️ 기온 {min_temp:.1f}°C ~ {max_temp:.1f}°C"
-            result += f", 하늘: {sky_condition}, 강수확률: ~{max_pop}%"
-            
-            return result
+            temp_text = (
+                f"🌡️ 기온 {min_temp:.1f}°C ~ {max_temp:.1f}°C"
+                if min_temp != math.inf and max_temp != -math.inf
+                else ""
+            )
+            return f"{day_name} 날씨: {temp_text}, 하늘: {sky_condition}, 강수확률: ~{max_pop}%"
             
         except (KeyError, TypeError, ValueError) as e:
             logger.error(f"예보 데이터 포맷팅 오류: {e}")
@@ -104,10 +121,7 @@ class WeatherDataFormatter:
     @staticmethod
     def _get_wind_direction(vec_value: float) -> str:
         """풍향 각도를 16방위 문자열로 변환"""
-        angles = ["북", "북북동", "북동", "동북동", "동", "동남동", "남동", "남남동", 
-                 "남", "남남서", "남서", "서남서", "서", "서북서", "북서", "북북서"]
-        index = round(vec_value / 22.5) % 16
-        return angles[index]
+        return _WIND_DIRECTIONS[round(vec_value / 22.5) % 16]
 
 class FinancialDataFormatter:
     """환율·주식 등의 금융 API 응답을 LLM이 소비할 수 있는 텍스트로 정제하는 정적 메서드 모음"""
@@ -118,9 +132,9 @@ class FinancialDataFormatter:
         try:
             currency = rate_info.get('cur_unit', 'N/A')
             currency_name = rate_info.get('cur_nm', '정보 없음')
-            deal_rate = float(str(rate_info.get('deal_bas_r', '0')).replace(',', ''))
-            ttb = str(rate_info.get('ttb', '0')).replace(',', '')
-            tts = str(rate_info.get('tts', '0')).replace(',', '')
+            deal_rate = float(str(rate_info.get('deal_bas_r', '0')).translate(_STRIP_COMMA))
+            ttb = str(rate_info.get('ttb', '0')).translate(_STRIP_COMMA)
+            tts = str(rate_info.get('tts', '0')).translate(_STRIP_COMMA)
 
             lines = [
                 f"💰 {currency} → KRW 환율",
@@ -161,24 +175,25 @@ class FinancialDataFormatter:
                 low = raw_data.get('l', 0)
                 open_price = raw_data.get('o', 0)
                 
-                result = f"📈 {stock_name} 주식 정보\n"
-                result += f"• 현재가: ${current_price:.2f}\n"
-                result += f"• 변동: {change:+.2f} ({change_percent:+.2f}%)\n"
-                result += f"• 고가: ${high:.2f}, 저가: ${low:.2f}\n"
-                result += f"• 시가: ${open_price:.2f}"
-                
-                return result
+                return (
+                    f"📈 {stock_name} 주식 정보\n"
+                    f"• 현재가: ${current_price:.2f}\n"
+                    f"• 변동: {change:+.2f} ({change_percent:+.2f}%)\n"
+                    f"• 고가: ${high:.2f}, 저가: ${low:.2f}\n"
+                    f"• 시가: ${open_price:.2f}"
+                )
             
             # KRX API 응답 처리
             elif 'output' in raw_data:
                 output = raw_data['output']
                 if isinstance(output, list) and output:
                     stock_info = output[0]
-                    result = f"📈 {stock_name} 주식 정보\n"
-                    result += f"• 현재가: {stock_info.get('stck_prpr', 'N/A')}원\n"
-                    result += f"• 변동: {stock_info.get('prdy_vrss', 'N/A')}원\n"
-                    result += f"• 변동률: {stock_info.get('prdy_ctrt', 'N/A')}%"
-                    return result
+                    return (
+                        f"📈 {stock_name} 주식 정보\n"
+                        f"• 현재가: {stock_info.get('stck_prpr', 'N/A')}원\n"
+                        f"• 변동: {stock_info.get('prdy_vrss', 'N/A')}원\n"
+                        f"• 변동률: {stock_info.get('prdy_ctrt', 'N/A')}%"
+                    )
             
             return f"{stock_name} 주식 데이터 형식을 인식할 수 없습니다."
             
@@ -197,37 +212,42 @@ class GameDataFormatter:
         
         try:
             games = raw_data['results'][:5]  # 상위 5개만
-            result = "🎮 추천 게임 목록\n\n"
+            blocks = ["🎮 추천 게임 목록"]
             
             for i, game in enumerate(games, 1):
-                name = game.get('name', '알 수 없음')
-                released = game.get('released', 'N/A')
-                rating = game.get('rating', 0)
-                playtime = game.get('playtime', 0)
-                metacritic = game.get('metacritic', 0)
-                
-                # 장르 정보
-                genres = [genre.get('name', '') for genre in game.get('genres', [])]
-                genre_str = ', '.join(genres[:3]) if genres else 'N/A'
+                game_get = game.get
+                name = game_get('name', '알 수 없음')
+                released = game_get('released', 'N/A')
+                rating = game_get('rating', 0)
+                playtime = game_get('playtime', 0)
+                metacritic = game_get('metacritic', 0)
                 
-                # 플랫폼 정보
-                platforms = [platform.get('platform', {}).get('name', '') for platform in game.get('platforms', [])]
-                platform_str = ', '.join(platforms[:3]) if platforms else 'N/A'
+                # 장르·플랫폼은 앞의 3개만 쓰므로 전체 목록을 만들지 않는다.
+                genre_str = ', '.join(
+                    genre.get('name', '')
+                    for genre in islice(game_get('genres') or (), 3)
+                ) or 'N/A'
+                platform_str = ', '.join(
+                    platform.get('platform', {}).get('name', '')
+                    for platform in islice(game_get('platforms') or (), 3)
+                ) or 'N/A'
                 
-                result += f"{i}. **{name}**\n"
-                result += f"   • 출시일: {released}\n"
-                result += f"   • 평점: {rating:.1f}/5.0"
-                if metacritic > 0:
-                    result += f" (메타크리틱: {metacritic}/100)"
-                result += f"\n   • 평균 플레이타임: {playtime}시간\n"
+                meta_suffix = f" (메타크리틱: {metacritic}/100)" if metacritic > 0 else ""
+                lines = [
+                    f"{i}. **{name}**",
+                    f"   • 출시일: {released}",
+                    f"   • 평점: {rating:.1f}/5.0{meta_suffix}",
+                    f"   • 평균 플레이타임: {playtime}시간",
+                ]
                 if metacritic > 85:
-                    result += f"   • 품질: 최고 등급 🏆\n"
+                    lines.append("   • 품질: 최고 등급 🏆")
                 elif metacritic > 70:
-                    result += f"   • 품질: 우수 등급 ⭐\n"
-                result += f"   • 장르: {genre_str}\n"
-                result += f"   • 플랫폼: {platform_str}\n\n"
+                    lines.append("   • 품질: 우수 등급 ⭐")
+                lines.append(f"   • 장르: {genre_str}")
+                lines.append(f"   • 플랫폼: {platform_str}")
+                blocks.append("\n".join(lines))
             
-            return result.strip()
+            return "\n\n".join(blocks)
             
         except (KeyError, TypeError, ValueError) as e:
             logger.error(f"게임 데이터 포맷팅 오류: {e}")
@@ -244,20 +264,25 @@ class TravelDataFormatter:
         
         try:
             places = raw_data['places'][:5]  # 상위 5개만
-            result = "📍 추천 장소\n\n"
+            if not places:
+                return "조건에 맞는 장소를 찾지 못했습니다."
+            blocks = ["📍 추천 장소"]
             
             for i, place in enumerate(places, 1):
                 name = place.get('name', '알 수 없음')
-                category = place.get('categories', [{}])[0].get('name', 'N/A')
+                # 빈 categories 배열도 IndexError 없이 N/A로 처리한다.
+                category = (place.get('categories') or [{}])[0].get('name', 'N/A')
                 distance = place.get('distance', 0)
                 address = place.get('location', {}).get('formatted_address', 'N/A')
                 
-                result += f"{i}. **{name}**\n"
-                result += f"   • 카테고리: {category}\n"
-                result += f"   • 거리: {distance:.1f}m\n"
-                result += f"   • 주소: {address}\n\n"
+                blocks.append(
+                    f"{i}. **{name}**\n"
+                    f"   • 카테고리: {category}\n"
+                    f"   • 거리: {distance:.1f}m\n"
+                    f"   • 주소: {address}"
+                )
             
-            return result.strip()
+            return "\n\n".join(blocks)
             
         except (KeyError, TypeError, ValueError) as e:
             logger.error(f"장소 데이터 포맷팅 오류: {e}")
@@ -271,7 +296,9 @@ class TravelDataFormatter:
         
         try:
             events = raw_data['events'][:5]  # 상위 5개만
-            result = "🎪 주변 이벤트\n\n"
+            if not events:
+                return "조건에 맞는 이벤트를 찾지 못했습니다."
+            blocks = ["🎪 주변 이벤트"]
             
             for i, event in enumerate(events, 1):
                 name = event.get('name', '알 수 없음')
@@ -281,16 +308,18 @@ class TravelDataFormatter:
                 venue = event.get('venue', 'N/A')
                 url = event.get('url', '')
                 
-                result += f"{i}. **{name}**\n"
-                result += f"   • 유형: {event_type}\n"
-                result += f"   • 날짜: {start_date}\n"
-                result += f"   • 장르: {genre}\n"
-                result += f"   • 장소: {venue}\n"
+                lines = [
+                    f"{i}. **{name}**",
+                    f"   • 유형: {event_type}",
+                    f"   • 날짜: {start_date}",
+                    f"   • 장르: {genre}",
+                    f"   • 장소: {venue}",
+                ]
                 if url:
-                    result += f"   • 링크: {url}\n"
-                result += "\n"
+                    lines.append(f"   • 링크: {url}")
+                blocks.append("\n".join(lines))
             
-            return result.strip()
+            return "\n\n".join(blocks)
             
         except (KeyError, TypeError, ValueError) as e:
             logger.error(f"이벤트 데이터 포맷팅 오류: {e}")
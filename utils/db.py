@@ -10,10 +10,11 @@
 """
 
 import asyncio
+import itertools
 from datetime import datetime, timedelta, timezone
-import pytz
 import json
 import re
+import time
 import aiosqlite
 
 import config
@@ -21,7 +22,9 @@ from logger_config import logger
 from utils.constants import DM_LIMIT_WINDOW_HOURS, DM_LIMIT_COUNT, DM_GLOBAL_LIMIT, FORTUNE_DAILY_LIMIT
 from typing import Any
 
-KST = pytz.timezone('Asia/Seoul')
+# 한국은 일광절약시간이 없으므로 pytz tz 조회 대신 고정 UTC+9 오프셋을 쓴다.
+# datetime.now(KST)/astimezone(KST)가 DST 판정 없이 C 구현만으로 끝난다.
+KST = timezone(timedelta(hours=9), "KST")
 
 _ALLOWED_GUILD_SETTING_COLUMNS = frozenset(
     {"ai_enabled", "ai_allowed_channels", "persona_text", "language"}
@@ -46,6 +49,41 @@ _LINKUP_SCHEMA_LOCK_ATTR = "_masamong_linkup_usage_table_lock"
 _API_BUDGET_RESERVATION_LOCK = asyncio.Lock()
 _DM_BUDGET_RESERVATION_LOCK = asyncio.Lock()
 _SAFE_BUDGET_FEATURE_RE = re.compile(r"[^a-z0-9_.:-]+")
+_GUILD_SETTING_CACHE_ATTR = "_masamong_guild_setting_cache"
+# 쓰기는 set_guild_setting이 write-through로 반영하고, TTL은 다른 연결/관리
+# 스크립트가 직접 바꾼 값을 늦어도 이 시간 안에 다시 읽기 위한 상한이다.
+_GUILD_SETTING_CACHE_TTL_SECONDS = 60.0
+_GUILD_SETTING_CACHE_MAX_GUILDS = 1024
+# 화이트리스트 컬럼만 고정 순서로 한 번에 읽어 나머지 설정도 함께 캐시한다.
+_GUILD_SETTING_COLUMNS_ORDERED = tuple(sorted(_ALLOWED_GUILD_SETTING_COLUMNS))
+_SQLITE_READ_POOL_ATTR = "_masamong_sqlite_read_pool"
+
+
+# 이미지 한도는 요청마다 읽히므로 import 시점에 config에서 한 번 묶어 둔다.
+_IMAGE_USER_RESET_HOURS = config.IMAGE_USER_RESET_HOURS
+_IMAGE_USER_LIMIT = config.IMAGE_USER_LIMIT
+_IMAGE_GLOBAL_DAILY_LIMIT = config.IMAGE_GLOBAL_DAILY_LIMIT
+_IMAGE_GUILD_DAILY_LIMIT = config.IMAGE_GUILD_DAILY_LIMIT
+
+
+_utc_iso_second_prefix: tuple[int, str] = (-1, "")
+_kst_time_text: tuple[int, str] = (-1, "")
+
+
+def _utc_now_iso() -> str:
+    """`datetime.now(timezone.utc).isoformat()`과 같은 형식의 현재 UTC 시각입니다.
+
+    초 단위 접두부(`YYYY-MM-DDTHH:MM:SS`)는 초가 바뀔 때만 새로 만들고 마이크로초만
+    덧붙이므로, 계측 로그처럼 자주 불리는 경로에서 datetime 생성을 피합니다.
+    기존 ISO 문자열과 사전순 비교 결과도 그대로 유지됩니다.
+    """
+    global _utc_iso_second_prefix
+    seconds, remainder = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _utc_iso_second_prefix
+    if cached_second != seconds:
+        prefix = datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _utc_iso_second_prefix = (seconds, prefix)
+    return f"{prefix}.{remainder // 1000:06d}+00:00"
 
 
 async def _rollback_after_write_error(db: Any, operation: str) -> None:
@@ -72,41 +110,152 @@ def _analytics_details_for_storage(details: dict[str, Any]) -> dict[str, Any]:
     }
 
 def get_current_time() -> str:
-    """현재 시간을 KST(UTC+9) 기준의 문자열로 반환합니다."""
-    return datetime.now(KST).strftime("%Y년 %m월 %d일 %H시 %M분 %S초")
+    """현재 시간을 KST(UTC+9) 기준의 문자열로 반환합니다.
+
+    출력이 초 단위라 같은 초 안의 호출은 이전에 만든 문자열을 재사용한다.
+    """
+    global _kst_time_text
+    seconds = int(time.time())
+    cached_second, text = _kst_time_text
+    if cached_second != seconds:
+        text = datetime.fromtimestamp(seconds, KST).strftime("%Y년 %m월 %d일 %H시 %M분 %S초")
+        _kst_time_text = (seconds, text)
+    return text
+
+_ANALYTICS_INSERT_SQL = """
+    INSERT INTO analytics_log (
+        log_timestamp, event_type, guild_id, user_id, details
+    ) VALUES (?, ?, ?, ?, ?)
+"""
+
 
 async def log_analytics(db: aiosqlite.Connection, event_type: str, details: dict):
-    """봇의 주요 활동(명령어, AI 상호작용 등)을 `analytics_log` 테이블에 기록합니다."""
+    """봇의 주요 활동(명령어, AI 상호작용 등)을 `analytics_log` 테이블에 기록합니다.
+
+    `log_api_call`과 마찬가지로 공유 연결의 다른 트랜잭션과 섞이지 않게 이벤트마다
+    바로 commit한다. 문장은 모듈 상수로 두어 sqlite3 문장 캐시를 그대로 재사용한다.
+    """
     try:
         stored_details = _analytics_details_for_storage(details)
-        details_json = json.dumps(stored_details, ensure_ascii=False)
+        # 기본 ", " / ": " 패딩을 빼 이벤트마다 직렬화 비용과 저장 크기를 줄인다.
+        details_json = json.dumps(
+            stored_details,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
         await db.execute(
-            """
-            INSERT INTO analytics_log (
-                log_timestamp, event_type, guild_id, user_id, details
-            ) VALUES (?, ?, ?, ?, ?)
-            """,
+            _ANALYTICS_INSERT_SQL,
             (
-                datetime.now(timezone.utc).isoformat(),
+                _utc_now_iso(),
                 event_type,
                 stored_details.get("guild_id"),
                 stored_details.get("user_id"),
                 details_json,
-            )
+            ),
         )
         await db.commit()
     except Exception as e:
         await _rollback_after_write_error(db, f"분석 로그({event_type}) 기록")
         logger.error(f"분석 로그({event_type}) 기록 중 오류: {e}", exc_info=True)
 
+def attach_read_pool(db: Any, readers: list[aiosqlite.Connection]) -> None:
+    """메인 연결에 읽기 전용 보조 연결 묶음을 붙입니다.
+
+    길드 설정처럼 약간 늦게 보여도 되는 조회만 이 연결들로 돌려
+    메인 연결의 worker thread에서 쓰기와 줄 서지 않게 합니다.
+    """
+    setattr(db, _SQLITE_READ_POOL_ATTR, (itertools.count(), list(readers)))
+
+
+def _is_sqlite(db: Any) -> bool:
+    """연결의 backend 속성으로 SQLite 여부를 판정합니다. 없거나 비어 있으면 SQLite로 본다."""
+    return str(getattr(db, "backend", "sqlite") or "sqlite").strip().lower() == "sqlite"
+
+
+def _in_values_sql(db: Any, column: str, values: list[Any]) -> tuple[str, tuple[Any, ...]]:
+    """가변 길이 ``column IN (...)`` 조건과 바인딩 값을 만듭니다.
+
+    SQLite는 값 목록을 JSON 하나로 묶어 ``json_each(?)``에 바인딩하므로 값 개수가
+    달라도 SQL 문자열이 같아 캐시된 문장을 재사용한다. json_each가 없는 TiDB는
+    기존처럼 자리표시자 목록을 쓴다.
+    """
+    if _is_sqlite(db):
+        return f"{column} IN (SELECT value FROM json_each(?))", (json.dumps(values),)
+    placeholders = ",".join("?" for _ in values)
+    return f"{column} IN ({placeholders})", tuple(values)
+
+
+def _read_connection(db: Any) -> Any:
+    """붙어 있는 읽기 연결을 round-robin으로 고르고, 없으면 메인 연결을 씁니다."""
+    pool = getattr(db, _SQLITE_READ_POOL_ATTR, None)
+    if not pool or not pool[1]:
+        return db
+    counter, readers = pool
+    return readers[next(counter) % len(readers)]
+
+
+async def close_read_pool(db: Any) -> None:
+    """`attach_read_pool`로 붙인 읽기 연결을 모두 닫습니다."""
+    pool = getattr(db, _SQLITE_READ_POOL_ATTR, None)
+    if not pool:
+        return
+    setattr(db, _SQLITE_READ_POOL_ATTR, None)
+    for reader in pool[1]:
+        try:
+            await reader.close()
+        except Exception as e:
+            logger.error(f"읽기 전용 DB 연결 종료 중 오류: {e}", exc_info=True)
+
+
+def _guild_setting_cache(db: Any) -> dict[int, tuple[float, dict[str, Any]]]:
+    """연결별 `guild_id -> (만료 monotonic 시각, 설정 행)` 캐시를 반환합니다."""
+    cache = getattr(db, _GUILD_SETTING_CACHE_ATTR, None)
+    if cache is None:
+        cache = {}
+        setattr(db, _GUILD_SETTING_CACHE_ATTR, cache)
+    return cache
+
+
+def invalidate_guild_settings(db: Any, guild_id: int | None = None) -> None:
+    """set_guild_setting을 거치지 않고 guild_settings를 바꾼 뒤 캐시를 비웁니다.
+
+    한 길드의 설정은 한 행으로 함께 캐시되므로 길드 단위로 지운다.
+    guild_id가 None이면 이 연결의 캐시 전체를 비운다.
+    """
+    cache = _guild_setting_cache(db)
+    if guild_id is None:
+        cache.clear()
+    else:
+        cache.pop(guild_id, None)
+
+
 async def get_guild_setting(db: aiosqlite.Connection, guild_id: int, setting_name: str, default: Any = None) -> Any:
-    """데이터베이스에서 특정 서버(guild)의 설정 값을 조회합니다."""
+    """데이터베이스에서 특정 서버(guild)의 설정 값을 조회합니다.
+
+    한 길드의 허용 설정 컬럼을 한 번에 읽어 짧은 TTL 동안 연결별로 캐시하므로
+    메시지마다 반복되는 설정 조회는 DB를 거치지 않습니다.
+    """
     if setting_name not in _ALLOWED_GUILD_SETTING_COLUMNS:
         raise ValueError(f"허용되지 않은 서버 설정 이름입니다: {setting_name}")
     try:
-        async with db.execute(f"SELECT {setting_name} FROM guild_settings WHERE guild_id = ?", (guild_id,)) as cursor:
-            result = await cursor.fetchone()
-        return result[0] if result and result[0] is not None else default
+        cache = _guild_setting_cache(db)
+        now = time.monotonic()
+        cached = cache.get(guild_id)
+        if cached is None or cached[0] <= now:
+            async with _read_connection(db).execute(
+                f"SELECT {', '.join(_GUILD_SETTING_COLUMNS_ORDERED)} "
+                "FROM guild_settings WHERE guild_id = ?",
+                (guild_id,),
+            ) as cursor:
+                result = await cursor.fetchone()
+            # 행이 없는 길드도 캐시해 기본값 조회가 매번 DB로 가지 않게 한다.
+            row = dict(zip(_GUILD_SETTING_COLUMNS_ORDERED, result or ()))
+            if len(cache) >= _GUILD_SETTING_CACHE_MAX_GUILDS and guild_id not in cache:
+                cache.clear()
+            cached = (now + _GUILD_SETTING_CACHE_TTL_SECONDS, row)
+            cache[guild_id] = cached
+        value = cached[1].get(setting_name)
+        return value if value is not None else default
 
     except Exception as e:
         logger.error(f"서버 설정({setting_name}) 조회 중 DB 오류: {e}", exc_info=True, extra={'guild_id': guild_id})
@@ -139,11 +288,50 @@ async def set_guild_setting(db: aiosqlite.Connection, guild_id: int, setting_nam
             )
         await db.execute(query, (guild_id, value, now_iso, now_iso))
         await db.commit()
+        cache = _guild_setting_cache(db)
+        cached = cache.get(guild_id)
+        if cached is not None and cached[1]:
+            cached[1][setting_name] = value
+        else:
+            # 새로 만들어진 행은 다른 컬럼의 DB 기본값을 알 수 없으므로 다시 읽는다.
+            invalidate_guild_settings(db, guild_id)
     except Exception as e:
+        invalidate_guild_settings(db, guild_id)
         await _rollback_after_write_error(db, f"서버 설정({setting_name}) 저장")
         logger.error(f"서버 설정({setting_name}) 저장 중 DB 오류: {e}", exc_info=True, extra={'guild_id': guild_id})
         raise
 
+async def _count_recent_api_calls(
+    db: aiosqlite.Connection,
+    api_type: str,
+    since: str,
+    *,
+    recent_since: str | None = None,
+) -> tuple[int, int]:
+    """``since`` 이후 호출 수와 ``recent_since`` 이후 호출 수를 반환합니다.
+
+    한도·예약 판정은 다른 경로(뉴스 검색, 학교 공지 예약)가 같은 api_type에
+    넣은 행까지 바로 보여야 하므로 캐시 없이 복합 인덱스로 매번 정확히 센다.
+    """
+    async with db.execute(
+        """
+        SELECT
+            COUNT(*) AS total_count,
+            COALESCE(
+                SUM(CASE WHEN called_at >= ? THEN 1 ELSE 0 END),
+                0
+            ) AS recent_count
+        FROM api_call_log
+        WHERE api_type = ? AND called_at >= ?
+        """,
+        (recent_since or since, api_type, since),
+    ) as cursor:
+        row = await cursor.fetchone()
+    total = int(row[0] or 0) if row else 0
+    recent = int(row[1] or 0) if row and recent_since is not None else 0
+    return total, recent
+
+
 async def check_api_rate_limit(db: aiosqlite.Connection, api_type: str, rpm_limit: int, rpd_limit: int) -> bool:
     """
     API 호출에 대한 RPM(분당) 및 RPD(일일) 제한을 확인합니다.
@@ -155,22 +343,12 @@ async def check_api_rate_limit(db: aiosqlite.Connection, api_type: str, rpm_limi
         one_day_ago = (now_utc - timedelta(days=1)).isoformat()
 
         # 보존된 계측 행은 삭제하지 않고 복합 인덱스로 최근 24시간만 집계한다.
-        async with db.execute(
-            """
-            SELECT
-                COUNT(*) AS daily_count,
-                COALESCE(
-                    SUM(CASE WHEN called_at >= ? THEN 1 ELSE 0 END),
-                    0
-                ) AS minute_count
-            FROM api_call_log
-            WHERE api_type = ? AND called_at >= ?
-            """,
-            (one_minute_ago, api_type, one_day_ago),
-        ) as cursor:
-            row = await cursor.fetchone()
-        daily_count = int(row[0] or 0) if row else 0
-        minute_count = int(row[1] or 0) if row else 0
+        daily_count, minute_count = await _count_recent_api_calls(
+            db,
+            api_type,
+            one_day_ago,
+            recent_since=one_minute_ago,
+        )
 
         if daily_count >= rpd_limit:
             logger.warning(f"API 일일 호출 한도 도달: {api_type}")
@@ -186,9 +364,12 @@ async def check_api_rate_limit(db: aiosqlite.Connection, api_type: str, rpm_limi
         return True # DB 오류 시 안전하게 요청 차단
 
 async def log_api_call(db: aiosqlite.Connection, api_type: str):
-    """API 호출을 `api_call_log` 테이블에 기록합니다."""
+    """API 호출을 `api_call_log` 테이블에 기록합니다.
+
+    공유 연결에서 다른 코루틴의 트랜잭션과 섞이지 않도록 행마다 바로 commit한다.
+    """
     try:
-        await db.execute("INSERT INTO api_call_log (api_type, called_at) VALUES (?, ?)", (api_type, datetime.now(timezone.utc).isoformat()))
+        await db.execute("INSERT INTO api_call_log (api_type, called_at) VALUES (?, ?)", (api_type, _utc_now_iso()))
         await db.commit()
     except Exception as e:
         await _rollback_after_write_error(db, f"API 호출({api_type}) 기록")
@@ -272,7 +453,7 @@ async def reserve_llm_api_call(
     now = datetime.now(timezone.utc)
     one_minute_ago = (now - timedelta(minutes=1)).isoformat()
     one_day_ago = (now - timedelta(days=1)).isoformat()
-    placeholders = ",".join("?" for _ in keys)
+    api_type_filter, api_type_params = _in_values_sql(db, "api_type", keys)
     async with _API_BUDGET_RESERVATION_LOCK:
         try:
             counts: dict[str, tuple[int, int]] = {}
@@ -285,11 +466,11 @@ async def reserve_llm_api_call(
                            0
                        ) AS minute_count
                 FROM api_call_log
-                WHERE api_type IN ({placeholders})
+                WHERE {api_type_filter}
                   AND called_at >= ?
                 GROUP BY api_type
                 """,
-                (one_minute_ago, *keys, one_day_ago),
+                (one_minute_ago, *api_type_params, one_day_ago),
             ) as cursor:
                 for row in await cursor.fetchall():
                     counts[str(row[0])] = (
@@ -375,7 +556,7 @@ async def reserve_web_search_call(
     now = datetime.now(timezone.utc)
     one_minute_ago = (now - timedelta(minutes=1)).isoformat()
     one_day_ago = (now - timedelta(days=1)).isoformat()
-    placeholders = ",".join("?" for _ in keys)
+    api_type_filter, api_type_params = _in_values_sql(db, "api_type", keys)
     async with _API_BUDGET_RESERVATION_LOCK:
         try:
             counts: dict[str, tuple[int, int]] = {}
@@ -388,11 +569,11 @@ async def reserve_web_search_call(
                            0
                        ) AS minute_count
                 FROM api_call_log
-                WHERE api_type IN ({placeholders})
+                WHERE {api_type_filter}
                   AND called_at >= ?
                 GROUP BY api_type
                 """,
-                (one_minute_ago, *keys, one_day_ago),
+                (one_minute_ago, *api_type_params, one_day_ago),
             ) as cursor:
                 for row in await cursor.fetchall():
                     counts[str(row[0])] = (
@@ -448,8 +629,7 @@ async def _ensure_linkup_usage_table(db: aiosqlite.Connection):
         if bool(getattr(db, _LINKUP_SCHEMA_READY_ATTR, False)):
             return
         try:
-            backend = str(getattr(db, "backend", "") or "").strip().lower() or "sqlite"
-            if backend == "tidb":
+            if not _is_sqlite(db):
                 await db.execute(
                     """
                     CREATE TABLE IF NOT EXISTS linkup_usage_log (
@@ -805,7 +985,7 @@ async def get_daily_api_counts(
         return {}
 
     result = {api_type: 0 for api_type in normalized}
-    placeholders = ",".join("?" for _ in normalized)
+    api_type_filter, api_type_params = _in_values_sql(db, "api_type", normalized)
     today_start = datetime.now(timezone.utc).replace(
         hour=0,
         minute=0,
@@ -813,15 +993,16 @@ async def get_daily_api_counts(
         microsecond=0,
     ).isoformat()
     try:
+        # 일일 한도 판정에 쓰이므로 방금 commit한 호출까지 보이는 메인 연결에서 센다.
         async with db.execute(
             f"""
             SELECT api_type, COUNT(*) AS call_count
             FROM api_call_log
-            WHERE api_type IN ({placeholders})
+            WHERE {api_type_filter}
               AND called_at >= ?
             GROUP BY api_type
             """,
-            (*normalized, today_start),
+            (*api_type_params, today_start),
         ) as cursor:
             rows = await cursor.fetchall()
         for row in rows:
@@ -843,6 +1024,40 @@ async def get_daily_api_counts(
         return result
 
 
+async def _archive_oldest_conversations_sqlite(db: aiosqlite.Connection, limit: int) -> int:
+    """가장 오래된 대화 `limit`개를 한 번의 `BEGIN IMMEDIATE` 트랜잭션으로 옮깁니다.
+
+    SQLite는 CTE 안의 DML을 지원하지 않으므로, 같은 트랜잭션에서 동일한 결정적
+    victim 서브쿼리로 INSERT/DELETE 한다. id 목록을 Python으로 왕복시키지 않는다.
+    실패하면 rollback해 절반만 옮긴 상태를 남기지 않는다.
+    """
+    victims = (
+        "SELECT message_id FROM conversation_history "
+        "ORDER BY created_at ASC, message_id ASC LIMIT ?"
+    )
+    try:
+        if not getattr(db, "in_transaction", False):
+            # 쓰기 잠금을 처음부터 잡아 읽기→쓰기 승격 중 SQLITE_BUSY를 피한다.
+            await db.execute("BEGIN IMMEDIATE")
+        cursor = await db.execute(
+            "INSERT INTO conversation_history_archive "
+            f"SELECT * FROM conversation_history WHERE message_id IN ({victims})",
+            (limit,),
+        )
+        archived_count = cursor.rowcount
+        await cursor.close()
+        if archived_count:
+            await db.execute(
+                f"DELETE FROM conversation_history WHERE message_id IN ({victims})",
+                (archived_count,),
+            )
+        await db.commit()
+    except Exception:
+        await _rollback_after_write_error(db, "RAG 아카이빙")
+        raise
+    return max(0, archived_count)
+
+
 async def archive_old_conversations(db: aiosqlite.Connection):
     """
     `conversation_history` 테이블의 레코드 수가 한도를 초과하면,
@@ -863,16 +1078,22 @@ async def archive_old_conversations(db: aiosqlite.Connection):
         records_to_archive = min(current_records - conf.get("history_limit"), conf.get("batch_size"))
         logger.info(f"대화 기록 아카이빙 시작: {records_to_archive}개 레코드.")
 
-        async with db.execute("SELECT message_id FROM conversation_history ORDER BY created_at ASC LIMIT ?", (records_to_archive,)) as cursor:
-            ids_to_archive = [row[0] for row in await cursor.fetchall()]
+        if _is_sqlite(db):
+            archived_count = await _archive_oldest_conversations_sqlite(db, records_to_archive)
+            if not archived_count:
+                return
+        else:
+            async with db.execute("SELECT message_id FROM conversation_history ORDER BY created_at ASC LIMIT ?", (records_to_archive,)) as cursor:
+                ids_to_archive = [row[0] for row in await cursor.fetchall()]
 
-        if not ids_to_archive: return
+            if not ids_to_archive: return
 
-        placeholders = ",".join("?" * len(ids_to_archive))
-        await db.execute(f"INSERT INTO conversation_history_archive SELECT * FROM conversation_history WHERE message_id IN ({placeholders})", ids_to_archive)
-        await db.execute(f"DELETE FROM conversation_history WHERE message_id IN ({placeholders})", ids_to_archive)
-        await db.commit()
-        logger.info(f"대화 기록 아카이빙 완료: {len(ids_to_archive)}개 레코드.")
+            id_filter, id_params = _in_values_sql(db, "message_id", ids_to_archive)
+            await db.execute(f"INSERT INTO conversation_history_archive SELECT * FROM conversation_history WHERE {id_filter}", id_params)
+            await db.execute(f"DELETE FROM conversation_history WHERE {id_filter}", id_params)
+            archived_count = len(ids_to_archive)
+            await db.commit()
+        logger.info(f"대화 기록 아카이빙 완료: {archived_count}개 레코드.")
 
     except Exception as e:
         # INSERT가 성공한 뒤 DELETE(예: BM25 동기화 트리거)에서 실패하면
@@ -890,6 +1111,19 @@ async def archive_old_conversations(db: aiosqlite.Connection):
         logger.error(f"RAG 아카이빙 작업 중 DB 오류: {e}", exc_info=True)
 
 
+async def checkpoint_wal(db: aiosqlite.Connection) -> None:
+    """SQLite WAL 파일을 본 DB에 반영하고 잘라 WAL이 무한히 커지지 않게 합니다."""
+    if not _is_sqlite(db):
+        return
+    try:
+        async with db.execute("PRAGMA wal_checkpoint(TRUNCATE)") as cursor:
+            row = await cursor.fetchone()
+        if row and int(row[0] or 0):
+            logger.warning("WAL checkpoint가 다른 연결 때문에 완료되지 못했습니다: %s", tuple(row))
+    except Exception as e:
+        logger.error(f"WAL checkpoint 중 DB 오류: {e}", exc_info=True)
+
+
 async def prune_user_activity_log(db: aiosqlite.Connection, retention_days: int):
     """`user_activity_log`에서 보존 기간을 넘긴 오래된 행을 삭제합니다.
 
@@ -908,6 +1142,49 @@ async def prune_user_activity_log(db: aiosqlite.Connection, retention_days: int)
         logger.error(f"user_activity_log 정리 중 DB 오류: {e}", exc_info=True)
 
 
+async def prune_api_call_log(
+    db: aiosqlite.Connection,
+    retention_days: int,
+    *,
+    batch_size: int = 5000,
+) -> int:
+    """`api_call_log`에서 보존 기간을 넘긴 행을 작은 배치로 나눠 삭제합니다.
+
+    한도 집계는 최대 24시간 창만 읽으므로 보존 기간은 최소 2일로 올려 적용합니다.
+    배치마다 commit해 쓰기 잠금을 짧게 유지하고, 요청 경로가 아닌 정기 유지보수
+    루프에서만 호출합니다. retention_days가 0 이하이면 비활성(무한 보존)입니다.
+    """
+    if not retention_days or retention_days <= 0:
+        return 0
+    cutoff = (
+        datetime.now(timezone.utc) - timedelta(days=max(2, int(retention_days)))
+    ).isoformat()
+    if _is_sqlite(db):
+        query = (
+            "DELETE FROM api_call_log WHERE rowid IN ("
+            "SELECT rowid FROM api_call_log WHERE called_at < ? LIMIT ?)"
+        )
+    else:
+        query = "DELETE FROM api_call_log WHERE called_at < ? LIMIT ?"
+    deleted = 0
+    try:
+        while True:
+            cursor = await db.execute(query, (cutoff, batch_size))
+            batch_deleted = cursor.rowcount
+            await cursor.close()
+            await db.commit()
+            deleted += max(0, batch_deleted)
+            if batch_deleted < batch_size:
+                break
+            # 배치 사이에 다른 코루틴의 쓰기가 끼어들 수 있게 양보한다.
+            await asyncio.sleep(0)
+        logger.info("api_call_log 보존정책 적용 완료: %d행 삭제 (cutoff=%s)", deleted, cutoff)
+    except Exception as e:
+        await _rollback_after_write_error(db, "api_call_log 보존정책 적용")
+        logger.error(f"api_call_log 정리 중 DB 오류: {e}", exc_info=True)
+    return deleted
+
+
 # ========== 이미지 생성 Rate Limiting ==========
 
 async def check_image_user_limit(db: aiosqlite.Connection, user_id: int) -> tuple[bool, int]:
@@ -921,18 +1198,13 @@ async def check_image_user_limit(db: aiosqlite.Connection, user_id: int) -> tupl
         (제한 도달 여부, 남은 이미지 수)
     """
     try:
-        reset_hours = getattr(config, 'IMAGE_USER_RESET_HOURS', 6)
-        user_limit = getattr(config, 'IMAGE_USER_LIMIT', 7)
+        reset_hours = _IMAGE_USER_RESET_HOURS
+        user_limit = _IMAGE_USER_LIMIT
         
         cutoff = (datetime.now(timezone.utc) - timedelta(hours=reset_hours)).isoformat()
         api_type = f"image_gen_user_{user_id}"
         
-        async with db.execute(
-            "SELECT COUNT(*) FROM api_call_log WHERE api_type = ? AND called_at >= ?",
-            (api_type, cutoff)
-        ) as cursor:
-            row = await cursor.fetchone()
-            count = row[0] if row else 0
+        count, _ = await _count_recent_api_calls(db, api_type, cutoff)
         
         remaining = max(0, user_limit - count)
         is_limited = count >= user_limit
@@ -954,17 +1226,12 @@ async def check_image_global_limit(db: aiosqlite.Connection) -> tuple[bool, int]
         (제한 도달 여부, 남은 이미지 수)
     """
     try:
-        global_limit = getattr(config, 'IMAGE_GLOBAL_DAILY_LIMIT', 50)
+        global_limit = _IMAGE_GLOBAL_DAILY_LIMIT
         
         now_utc = datetime.now(timezone.utc)
         today_start = now_utc.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
         
-        async with db.execute(
-            "SELECT COUNT(*) FROM api_call_log WHERE api_type = ? AND called_at >= ?",
-            ("image_gen_global", today_start)
-        ) as cursor:
-            row = await cursor.fetchone()
-            count = row[0] if row else 0
+        count, _ = await _count_recent_api_calls(db, "image_gen_global", today_start)
         
         remaining = max(0, global_limit - count)
         is_limited = count >= global_limit
@@ -985,22 +1252,20 @@ async def check_image_guild_limit(
 ) -> tuple[bool, int]:
     """현재 서버의 UTC 일일 이미지 생성 한도를 확인합니다."""
     if not guild_id:
-        return False, int(getattr(config, "IMAGE_GUILD_DAILY_LIMIT", 30))
+        return False, _IMAGE_GUILD_DAILY_LIMIT
     try:
-        guild_limit = int(getattr(config, "IMAGE_GUILD_DAILY_LIMIT", 30))
+        guild_limit = _IMAGE_GUILD_DAILY_LIMIT
         today_start = datetime.now(timezone.utc).replace(
             hour=0,
             minute=0,
             second=0,
             microsecond=0,
         ).isoformat()
-        async with db.execute(
-            "SELECT COUNT(*) FROM api_call_log "
-            "WHERE api_type = ? AND called_at >= ?",
-            (f"image_gen_guild_{int(guild_id)}", today_start),
-        ) as cursor:
-            row = await cursor.fetchone()
-        count = int(row[0] or 0) if row else 0
+        count, _ = await _count_recent_api_calls(
+            db,
+            f"image_gen_guild_{int(guild_id)}",
+            today_start,
+        )
         return count >= guild_limit, max(0, guild_limit - count)
     except Exception as exc:
         logger.error(
@@ -1076,6 +1341,66 @@ async def check_dm_message_limit(db: aiosqlite.Connection, user_id: int) -> tupl
     Returns:
         (허용 여부, 안내 메시지용 리셋 시간 문자열 or None)
     """
+    if not _is_sqlite(db):
+        # TiDB에는 RETURNING이 없으므로 조회→분기→갱신 경로를 유지한다.
+        return await _check_dm_message_limit_read_modify_write(db, user_id)
+    try:
+        now = datetime.now(timezone.utc)
+        now_str = now.isoformat()
+        reset_at = (now + timedelta(hours=DM_LIMIT_WINDOW_HOURS)).isoformat()
+
+        # 새 사용자 INSERT, 만료된 윈도우 초기화, 윈도우 내 증가를 한 문장으로
+        # 처리한다. 한도에 도달한 사용자는 WHERE가 거짓이 되어 행이 바뀌지
+        # 않고 RETURNING도 비므로 보정 UPDATE가 필요 없다.
+        async with db.execute(
+            """
+            INSERT INTO dm_usage_logs (user_id, usage_count, window_start_at, reset_at)
+            VALUES (?, 1, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                usage_count = CASE
+                    WHEN excluded.window_start_at > dm_usage_logs.reset_at THEN 1
+                    ELSE dm_usage_logs.usage_count + 1
+                END,
+                window_start_at = CASE
+                    WHEN excluded.window_start_at > dm_usage_logs.reset_at
+                    THEN excluded.window_start_at
+                    ELSE dm_usage_logs.window_start_at
+                END,
+                reset_at = CASE
+                    WHEN excluded.window_start_at > dm_usage_logs.reset_at
+                    THEN excluded.reset_at
+                    ELSE dm_usage_logs.reset_at
+                END
+            WHERE excluded.window_start_at > dm_usage_logs.reset_at
+               OR dm_usage_logs.usage_count < ?
+            RETURNING usage_count
+            """,
+            (user_id, now_str, reset_at, DM_LIMIT_COUNT),
+        ) as cursor:
+            row = await cursor.fetchone()
+        await db.commit()
+        if row is not None:
+            return True, None
+
+        # 제한 도달: 안내용 리셋 시각만 읽는다.
+        async with db.execute("SELECT reset_at FROM dm_usage_logs WHERE user_id = ?", (user_id,)) as cursor:
+            limited_row = await cursor.fetchone()
+        reset_at_dt = datetime.fromisoformat(limited_row[0])
+        reset_kst = reset_at_dt.astimezone(KST).strftime('%H:%M')
+        return False, reset_kst
+
+    except Exception as e:
+        await _rollback_after_write_error(db, f"DM 사용자 제한 기록(user_id={user_id})")
+        logger.error(f"DM 제한 확인 중 오류 (user_id={user_id}): {e}", exc_info=True)
+        # 레거시 호출자도 사용량 저장소 장애 시 provider 비용을 발생시키지 않는다.
+        return False, None
+
+
+async def _check_dm_message_limit_read_modify_write(
+    db: aiosqlite.Connection,
+    user_id: int,
+) -> tuple[bool, str]:
+    """RETURNING이 없는 백엔드용 조회→분기→갱신 DM 제한 확인입니다."""
     try:
         now = datetime.now(timezone.utc)
         now_str = now.isoformat()
@@ -1132,6 +1457,46 @@ async def check_global_dm_limit(db: aiosqlite.Connection) -> bool:
     하루 100회 초과 시 False 반환.
     `system_counters` 테이블 사용.
     """
+    if not _is_sqlite(db):
+        # TiDB에는 RETURNING이 없으므로 조회→분기→갱신 경로를 유지한다.
+        return await _check_global_dm_limit_read_modify_write(db)
+    if DM_GLOBAL_LIMIT <= 0:
+        return False
+    try:
+        # 날짜(KST)가 키에 들어 있으므로 자정 초기화는 새 키 INSERT로 처리된다.
+        today_key = f"dm_daily_global_{datetime.now(KST).strftime('%Y-%m-%d')}"
+        now_str = datetime.now(timezone.utc).isoformat()
+
+        # 조회와 증가를 한 문장으로 합친다. 한도에 도달하면 WHERE가 거짓이 되어
+        # 값이 바뀌지 않고 RETURNING도 비어 있다.
+        async with db.execute(
+            """
+            INSERT INTO system_counters (counter_name, counter_value, last_reset_at)
+            VALUES (?, 1, ?)
+            ON CONFLICT(counter_name) DO UPDATE SET
+                counter_value = system_counters.counter_value + 1,
+                last_reset_at = excluded.last_reset_at
+            WHERE system_counters.counter_value < ?
+            RETURNING counter_value
+            """,
+            (today_key, now_str, DM_GLOBAL_LIMIT),
+        ) as cursor:
+            row = await cursor.fetchone()
+        await db.commit()
+
+        if row is None:
+            logger.warning(f"🚨 전역 DM 일일 한도 초과! ({DM_GLOBAL_LIMIT}/{DM_GLOBAL_LIMIT})")
+            return False
+        return True
+
+    except Exception as e:
+        await _rollback_after_write_error(db, "전역 DM 제한 기록")
+        logger.error(f"전역 DM 제한 확인 중 오류: {e}", exc_info=True)
+        return False
+
+
+async def _check_global_dm_limit_read_modify_write(db: aiosqlite.Connection) -> bool:
+    """RETURNING이 없는 백엔드용 조회→분기→갱신 전역 DM 제한 확인입니다."""
     try:
         # 오늘 날짜 키 생성 (KST 기준)
         today_key = f"dm_daily_global_{datetime.now(KST).strftime('%Y-%m-%d')}"
@@ -1147,24 +1512,16 @@ async def check_global_dm_limit(db: aiosqlite.Connection) -> bool:
             logger.warning(f"🚨 전역 DM 일일 한도 초과! ({current_count}/{DM_GLOBAL_LIMIT})")
             return False
             
-        # 카운트 증가 (UPSERT)
-        if config.DB_BACKEND == "tidb":
-            query = """
-                INSERT INTO system_counters (counter_name, counter_value, last_reset_at)
-                VALUES (?, 1, ?)
-                ON DUPLICATE KEY UPDATE
-                    counter_value = counter_value + 1,
-                    last_reset_at = VALUES(last_reset_at)
-            """
-        else:
-            query = """
-                INSERT INTO system_counters (counter_name, counter_value, last_reset_at)
-                VALUES (?, 1, ?)
-                ON CONFLICT(counter_name) DO UPDATE SET
-                    counter_value = counter_value + 1,
-                    last_reset_at = excluded.last_reset_at
+        await db.execute(
             """
-        await db.execute(query, (today_key, now_str))
+            INSERT INTO system_counters (counter_name, counter_value, last_reset_at)
+            VALUES (?, 1, ?)
+            ON DUPLICATE KEY UPDATE
+                counter_value = counter_value + 1,
+                last_reset_at = VALUES(last_reset_at)
+            """,
+            (today_key, now_str),
+        )
         await db.commit()
         
         return True
@@ -1250,7 +1607,6 @@ async def reserve_dm_message(
                 return False, "global_limit", None
 
             reset_text = reset_at.isoformat()
-            backend = str(getattr(db, "backend", config.DB_BACKEND))
             if user_row:
                 if window_expired:
                     await db.execute(
@@ -1281,7 +1637,7 @@ async def reserve_dm_message(
                     (normalized_user_id, now_text, reset_text),
                 )
 
-            if backend == "tidb":
+            if not _is_sqlite(db):
                 global_query = """
                     INSERT INTO system_counters (
                         counter_name, counter_value, last_reset_at
@@ -4,16 +4,25 @@
 from __future__ import annotations
 
 import asyncio
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+import hashlib
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, Optional
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
 
 import json
 import aiosqlite
-from database.compat_db import TiDBSettings
+from database.compat_db import (
+    SQLITE_READER_PRAGMAS,
+    SQLITE_TUNING_PRAGMAS,
+    TiDBSettings,
+)
 
 # 저장소 타입은 RAG 비활성 인스턴스에서도 import된다. NumPy도 실제 벡터 연산
 # 시점까지 미뤄 general 저사양 프로필의 기본 RSS를 줄인다.
@@ -25,6 +34,9 @@ _NUMPY_IMPORT_ATTEMPTED = False
 # 사용하므로, 실제 모델이 필요한 순간까지 선택적 ML 의존성을 import하지 않는다.
 SentenceTransformer: Any | None = None
 _SENTENCE_TRANSFORMER_IMPORT_ATTEMPTED = False
+# DISCORD_EMBEDDING_HNSW용 선택 의존성. 인덱스를 처음 만들 때 import한다.
+hnswlib: Any | None = None
+_HNSWLIB_IMPORT_ATTEMPTED = False
 
 try:
     import pymysql
@@ -37,10 +49,92 @@ from logger_config import logger
 _MODEL: Any | None = None
 _MODEL_LOCK = asyncio.Lock()
 _MODEL_FAILURE_RETRY_AT = 0.0
+# _MODEL_LOCK은 한 이벤트 루프 안의 코루틴만 직렬화한다. 여러 루프/스레드가
+# 동시에 로드해도 수백 MB 모델을 두 번 만들지 않도록 실제 생성은 이 lock 안에서
+# 한 번 더 확인한다.
+_MODEL_THREAD_LOCK = threading.Lock()
+# 모델 전용 executor. 기본 executor를 쓰면 DB/IO 작업 스레드마다 모델이
+# 번갈아 올라가므로 encode와 토크나이저 호출을 EMBEDDING_MAX_CONCURRENCY 개
+# 스레드에 고정한다. fast tokenizer는 여러 스레드가 동시에 빌리면
+# "Already borrowed" 오류를 내므로 토큰 계산도 같은 스레드로 보낸다.
+_ENCODE_EXECUTOR: ThreadPoolExecutor | None = None
 _ENCODE_SEMAPHORE = asyncio.Semaphore(
     max(1, int(getattr(config, "EMBEDDING_MAX_CONCURRENCY", 1)))
 )
 _WHITESPACE_TOKEN_RE = re.compile(r"\S+")
+# encode 결과 LRU. 키는 (접두사 포함 최종 입력, normalize)이고, 모델이 바뀌면
+# (테스트 대역 교체 포함) 통째로 비운다. 이벤트 루프 스레드에서만 접근한다.
+_EMBED_CACHE: "OrderedDict[tuple[str, bool], Any]" = OrderedDict()
+_EMBED_CACHE_MODEL: Any = None
+# 같은 키를 encode 중인 get_embedding 호출. 동시에 들어온 같은 질의는 먼저 온
+# 호출의 결과를 기다린다.
+_EMBED_INFLIGHT: "dict[tuple[str, bool], asyncio.Future]" = {}
+# 먼저 온 호출이 취소됐을 때 기다리던 호출에 넘기는 값. 받은 호출은 직접 encode한다.
+_EMBED_LEADER_CANCELLED = object()
+# get_embeddings가 한 번의 model.encode 호출 안에서 묶는 입력 수.
+_ENCODE_BATCH_SIZE = 32
+_STORE_SQLITE_CACHED_STATEMENTS = 256
+# iter_recent_embeddings가 커서에서 한 번에 가져오는 행 수. aiosqlite는 fetch마다
+# 워커 스레드를 왕복하므로 기본 arraysize(1)보다 크게 잡는다.
+_STORE_ITER_BATCH_ROWS = 64
+
+
+async def _open_store_sqlite_connection(
+    target: str | Path,
+    *,
+    read_only: bool,
+) -> aiosqlite.Connection:
+    """임베딩 저장소용 장수명 aiosqlite 연결을 열고 연결 설정을 적용합니다."""
+    # 장수명 연결이라 sqlite3 문장 캐시(기본 128)를 넉넉히 잡아 upsert/조회 SQL을
+    # 매번 다시 컴파일하지 않게 한다. 캐시 적중을 위해 SQL 문자열은 고정한다.
+    if read_only:
+        conn = aiosqlite.connect(
+            Path(target).resolve().as_uri() + "?mode=ro",
+            uri=True,
+            cached_statements=_STORE_SQLITE_CACHED_STATEMENTS,
+        )
+    else:
+        new_file = not Path(target).exists()
+        conn = aiosqlite.connect(
+            target,
+            cached_statements=_STORE_SQLITE_CACHED_STATEMENTS,
+        )
+    db = await conn
+    try:
+        db.row_factory = aiosqlite.Row
+        # 메인 DB와 같은 설정을 새로 연 연결마다 적용한다. 쓰기 연결은 WAL +
+        # synchronous=NORMAL로 임베딩 BLOB 쓰기마다 fsync하지 않게 하고,
+        # read-only 연결은 WAL을 건드리지 않는 읽기용 설정만 쓴다.
+        pragmas = SQLITE_READER_PRAGMAS if read_only else SQLITE_TUNING_PRAGMAS
+        if not read_only and new_file:
+            # auto_vacuum은 WAL 전환 전, 테이블이 없는 새 파일에서만 바꿀 수 있다.
+            # 기존 DB는 원래 모드를 유지하며 incremental_vacuum은 아무것도 하지 않는다.
+            pragmas = ("PRAGMA auto_vacuum=INCREMENTAL", *pragmas)
+        for pragma in pragmas:
+            await db.execute(pragma)
+    except BaseException:
+        await db.close()
+        raise
+    return db
+
+
+def _get_hnswlib() -> Any | None:
+    """hnswlib를 최초 인덱스 생성 시 한 번만 import합니다. 없으면 None."""
+    global hnswlib, _HNSWLIB_IMPORT_ATTEMPTED
+
+    if hnswlib is not None:
+        return hnswlib
+    if _HNSWLIB_IMPORT_ATTEMPTED:
+        return None
+
+    _HNSWLIB_IMPORT_ATTEMPTED = True
+    try:
+        import hnswlib as hnswlib_module
+    except ImportError:
+        return None
+
+    hnswlib = hnswlib_module
+    return hnswlib
 
 
 def _get_numpy() -> Any | None:
@@ -141,6 +235,235 @@ def _vector_literal(vector: "np.ndarray") -> str:
     return "[" + ",".join(f"{float(item):.8f}" for item in values) + "]"
 
 
+def _embedding_blob(embedding: Any, *, zero_copy: bool) -> bytes | memoryview:
+    """임베딩을 저장용 float32 BLOB 값으로 바꿉니다.
+
+    이미 C 연속 float32 배열이면 ``ascontiguousarray``가 복사하지 않는다.
+    sqlite3는 buffer protocol 객체를 BLOB으로 바로 바인딩하므로 zero_copy면
+    ``tobytes()`` 복사 없이 memoryview를 넘긴다. pymysql은 memoryview를 이스케이프
+    하지 못하므로 TiDB 경로는 bytes를 쓴다.
+    """
+    vector = np.ascontiguousarray(embedding, dtype=np.float32)
+    if zero_copy:
+        return memoryview(vector).cast("B")
+    return vector.tobytes()
+
+
+# 저장 벡터의 제곱 노름이 1에서 이만큼 벗어나면 다시 정규화한다. float16/int8
+# 행은 양자화 오차만으로도 1e-3 정도 벗어나므로 느슨한 허용치를 따로 쓴다.
+_UNIT_NORM_TOLERANCE = 1e-5
+_COMPACT_UNIT_NORM_TOLERANCE = 2e-2
+
+
+def _unit_embedding(embedding: Any, *, tolerance: float = _UNIT_NORM_TOLERANCE) -> "np.ndarray":
+    """임베딩을 L2 노름 1인 float32 배열로 맞춥니다.
+
+    저장 벡터가 단위 길이이면 질의 쪽만 한 번 정규화해 코사인을 내적 하나로
+    계산할 수 있다. 이미 단위 길이이면(모델 normalize 기본값) 복사 없이 그대로
+    돌려주고, 영벡터나 유한하지 않은 값은 건드리지 않는다.
+    """
+    vector = np.ascontiguousarray(embedding, dtype=np.float32)
+    squared = float(np.vdot(vector, vector))
+    if squared == 0.0 or not np.isfinite(squared) or abs(squared - 1.0) <= tolerance:
+        return vector
+    return vector / np.float32(np.sqrt(squared))
+
+
+def _stored_embedding(embedding: Any) -> Any:
+    """LOCAL_EMBEDDING_NORMALIZE가 켜져 있으면 단위 길이로 맞춘 저장용 벡터를 돌려줍니다."""
+    if not bool(getattr(config, "LOCAL_EMBEDDING_NORMALIZE", True)):
+        return embedding
+    return _unit_embedding(embedding)
+
+
+def content_digest(*parts: Any) -> bytes:
+    """저장 행의 내용이 바뀌었는지 비교하는 8바이트 digest를 만듭니다.
+
+    조각 사이에 구분자를 넣어 ("ab", "c")와 ("a", "bc")가 같아지지 않게 한다.
+    bytes와 numpy 배열(임베딩)은 문자열 변환 없이 원본 바이트를 넣는다.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(part)
+        elif hasattr(part, "tobytes"):
+            digest.update(part.tobytes())
+        else:
+            digest.update(str(part if part is not None else "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def _embedding_model_identity() -> str:
+    """digest에 섞는 임베딩 모델 식별자. 모델이나 정규화 설정이 바뀌면 달라진다."""
+    return (
+        f"{getattr(config, 'LOCAL_EMBEDDING_MODEL_NAME', '')}"
+        f"|normalize={bool(getattr(config, 'LOCAL_EMBEDDING_NORMALIZE', True))}"
+    )
+
+
+# discord_memory_entries에 기록되는 embedding 외 컬럼의 원본 키.
+_MEMORY_DIGEST_FIELDS = (
+    "anchor_message_id",
+    "server_id",
+    "channel_id",
+    "owner_user_id",
+    "owner_user_name",
+    "memory_scope",
+    "memory_type",
+    "summary_text",
+    "memory_text",
+    "raw_context",
+    "source_message_ids",
+    "speaker_names",
+    "keywords",
+    "timestamp_iso",
+)
+
+
+def message_row_digest(row: tuple[Any, ...]) -> bytes:
+    """``upsert_message_embedding`` 인자 튜플 전체와 모델 식별자의 digest입니다."""
+    return content_digest(_embedding_model_identity(), *row)
+
+
+def memory_entry_digest(entry: dict[str, Any]) -> bytes:
+    """메모리 엔트리의 기록 컬럼 전체와 모델 식별자의 digest를 만듭니다.
+
+    ``embedding`` 키가 있으면 벡터 바이트도 넣는다. encode 전에 변경 여부를
+    보려는 호출자는 embedding 없이 만들어 ``content_digest`` 키로 넘긴다.
+    그 경우 벡터는 같은 입력과 같은 모델이 결정하므로 모델 식별자가 대신한다.
+    """
+    parts: list[Any] = [_embedding_model_identity()]
+    for field_name in _MEMORY_DIGEST_FIELDS:
+        value = entry.get(field_name)
+        if isinstance(value, (list, tuple)):
+            value = json.dumps(list(value), ensure_ascii=False)
+        parts.append(value)
+    if entry.get("embedding") is not None:
+        parts.append(entry["embedding"])
+    return content_digest(*parts)
+
+
+def _quantize_int8(vector: Any) -> tuple[bytes, float]:
+    """float 벡터를 행별 scale을 가진 int8 BLOB으로 양자화합니다.
+
+    scale은 ``max(|v|) / 127``이라 정규화된 임베딩은 거의 1/127이 되고,
+    정규화되지 않은 벡터도 범위를 벗어나지 않는다.
+    """
+    values = np.asarray(vector, dtype=np.float32)
+    peak = float(np.max(np.abs(values))) if values.size else 0.0
+    scale = peak / 127.0 if peak > 0.0 else 1.0 / 127.0
+    quantized = np.clip(np.rint(values / scale), -127, 127).astype(np.int8)
+    return quantized.tobytes(), scale
+
+
+def _quantize_int8_rows(matrix: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    """``(N, D)`` 행렬을 행마다 ``_quantize_int8``과 같은 규칙으로 한 번에 양자화합니다."""
+    values = np.asarray(matrix, dtype=np.float32)
+    peaks = np.max(np.abs(values), axis=1) if values.size else np.zeros(len(values), np.float32)
+    scales = np.where(peaks > 0.0, peaks / 127.0, 1.0 / 127.0).astype(np.float32)
+    quantized = np.clip(np.rint(values / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales
+
+
+def _binary_code(vector: Any) -> bytes:
+    """벡터의 부호를 1비트씩 묶은 코드(``np.packbits(v > 0)``)를 만듭니다."""
+    return np.packbits(np.asarray(vector).reshape(-1) > 0).tobytes()
+
+
+_POPCOUNT_TABLE: "np.ndarray | None" = None
+
+
+def _hamming_distances(codes: "np.ndarray", query_code: "np.ndarray") -> "np.ndarray":
+    """``(N, B)`` uint8 코드 행렬과 질의 코드 사이의 Hamming 거리를 계산합니다."""
+    global _POPCOUNT_TABLE
+    diff = np.bitwise_xor(codes, query_code)
+    bitwise_count = getattr(np, "bitwise_count", None)
+    if bitwise_count is not None:
+        return bitwise_count(diff).sum(axis=1, dtype=np.int32)
+    # numpy 2.0 미만은 바이트별 popcount 표로 계산한다.
+    if _POPCOUNT_TABLE is None:
+        _POPCOUNT_TABLE = np.unpackbits(
+            np.arange(256, dtype=np.uint8)[:, None], axis=1
+        ).sum(axis=1).astype(np.uint8)
+    return _POPCOUNT_TABLE[diff].sum(axis=1, dtype=np.int32)
+
+
+def _dequantize_int8(blob: Any, scale: Any) -> "np.ndarray":
+    """int8 BLOB과 scale을 float32 벡터로 되돌립니다.
+
+    memoryview도 ``frombuffer``로 바로 읽고, astype 중간 배열 없이 곱셈 결과를
+    float32 배열 하나에 받는다.
+    """
+    quantized = np.frombuffer(blob, dtype=np.int8)
+    return np.multiply(quantized, np.float32(scale), dtype=np.float32)
+
+
+def _decode_compact_embedding(blob: Any, scale: Any) -> "np.ndarray":
+    """embedding_q 값을 float32 벡터로 되돌립니다.
+
+    int8 행은 행별 scale이 있고, float16 행은 scale이 NULL이다.
+    """
+    if scale is None:
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+    return _dequantize_int8(blob, scale)
+
+
+def _compact_storage_dtype() -> str | None:
+    """embedding_q에 쓸 저장 형식. float32 원본을 그대로 쓰면 None."""
+    if getattr(config, "DISCORD_EMBEDDING_INT8", False):
+        return "int8"
+    dtype = str(getattr(config, "DISCORD_EMBEDDING_STORAGE_DTYPE", "float32")).lower()
+    return dtype if dtype in {"float16", "int8"} else None
+
+
+def _drop_float32_source() -> bool:
+    """압축 저장일 때 float32 원본을 비우도록 명시적으로 켰는지."""
+    return _compact_storage_dtype() is not None and bool(
+        getattr(config, "DISCORD_EMBEDDING_DROP_FLOAT32", False)
+    )
+
+
+def embedding_blobs_to_matrix(
+    blobs: Iterable[Any],
+) -> tuple[list[int], "np.ndarray"]:
+    """float32 임베딩 BLOB들을 연속된 ``(N, D)`` 행렬 하나로 묶습니다.
+
+    행마다 ``np.frombuffer``로 풀어 파이썬 루프에서 내적하는 대신, BLOB을
+    한 번에 이어 붙여 ``matrix @ query`` 한 번의 BLAS 호출로 점수를 계산할 수
+    있게 한다. 차원 D는 첫 유효 BLOB에서 정하고, 길이가 다르거나 bytes가
+    아닌 값은 제외한다.
+
+    Returns:
+        행렬에 포함된 원래 위치 목록과 float32 행렬.
+    """
+    numpy_module = _get_numpy()
+    if numpy_module is None:
+        raise RuntimeError("numpy가 설치되어 있지 않아 임베딩 행렬을 만들 수 없습니다.")
+    item_size = numpy_module.dtype(numpy_module.float32).itemsize
+    indexes: list[int] = []
+    chunks: list[bytes | bytearray] = []
+    blob_size: int | None = None
+    for index, blob in enumerate(blobs):
+        if isinstance(blob, memoryview):
+            blob = blob.tobytes()
+        if not isinstance(blob, (bytes, bytearray)) or not blob:
+            continue
+        if blob_size is None:
+            if len(blob) % item_size:
+                continue
+            blob_size = len(blob)
+        elif len(blob) != blob_size:
+            continue
+        indexes.append(index)
+        # join이 한 번 복사하므로 BLOB마다 bytes()로 다시 복사하지 않는다.
+        chunks.append(blob)
+    if blob_size is None:
+        return [], numpy_module.empty((0, 0), dtype=numpy_module.float32)
+    matrix = numpy_module.frombuffer(b"".join(chunks), dtype=numpy_module.float32)
+    return indexes, matrix.reshape(len(chunks), blob_size // item_size)
+
+
 @dataclass(frozen=True)
 class _KakaoTableMeta:
     table_name: str
@@ -175,6 +498,12 @@ async def _load_model() -> Any:
         local_files_only = bool(getattr(config, "LOCAL_EMBEDDING_LOCAL_FILES_ONLY", False))
 
         def _sync_load():
+            with _MODEL_THREAD_LOCK:
+                if _MODEL is not None:
+                    return _MODEL
+                return _sync_construct()
+
+        def _sync_construct():
             # numpy/sentence-transformers/torch import 자체도 저사양 서버에서
             # 수십 초 걸릴 수 있다. 모델 생성뿐 아니라 선택적 ML import 전체를
             # executor 안에서 실행해 Discord heartbeat를 막지 않는다.
@@ -213,6 +542,39 @@ async def _load_model() -> Any:
                 if resolved_path is not None:
                     target_model = str(resolved_path)
                     logger.info("로컬 임베딩 캐시 snapshot 경로 사용: %s", target_model)
+            backend = str(getattr(config, "LOCAL_EMBEDDING_BACKEND", "torch") or "torch")
+            if backend != "torch":
+                backend_kwargs: dict[str, Any] = {"backend": backend}
+                model_kwargs: dict[str, Any] = {}
+                backend_file = str(getattr(config, "LOCAL_EMBEDDING_BACKEND_FILE", "") or "")
+                if backend_file:
+                    model_kwargs["file_name"] = backend_file
+                if backend == "onnx" and thread_limit > 0:
+                    # torch.set_num_threads는 ONNX Runtime 세션에 적용되지 않는다.
+                    try:
+                        import onnxruntime
+
+                        session_options = onnxruntime.SessionOptions()
+                        session_options.intra_op_num_threads = thread_limit
+                        session_options.inter_op_num_threads = 1
+                        model_kwargs["session_options"] = session_options
+                    except ImportError:
+                        pass
+                if model_kwargs:
+                    backend_kwargs["model_kwargs"] = model_kwargs
+                try:
+                    model = transformer_class(target_model, **load_kwargs, **backend_kwargs)
+                except Exception as exc:
+                    # 구버전(backend 인자 없음), 런타임 미설치, 양자화 파일 없음은
+                    # 모두 PyTorch 백엔드로 계속 동작하게 한다.
+                    logger.warning(
+                        "임베딩 %s 백엔드 로드 실패, torch로 대체합니다: %s",
+                        backend,
+                        exc,
+                    )
+                else:
+                    logger.info("임베딩 %s 백엔드 사용: %s", backend, backend_file or "기본 파일")
+                    return model
             try:
                 return transformer_class(target_model, **load_kwargs)
             except TypeError:
@@ -314,7 +676,7 @@ async def count_embedding_tokens(text: str, *, add_special_tokens: bool = True)
 
     try:
         loop = asyncio.get_running_loop()
-        return int(await loop.run_in_executor(None, _sync_count))
+        return int(await loop.run_in_executor(_encode_executor(), _sync_count))
     except Exception:
         return _fallback_token_count(payload)
 
@@ -386,12 +748,155 @@ async def trim_text_to_embedding_token_limit(text: str, token_limit: int) -> str
 
     try:
         loop = asyncio.get_running_loop()
-        trimmed = await loop.run_in_executor(None, _sync_trim)
+        trimmed = await loop.run_in_executor(_encode_executor(), _sync_trim)
         return trimmed or payload
     except Exception:
         return payload
 
 
+def _encode_executor() -> ThreadPoolExecutor:
+    """encode 전용 executor를 처음 사용할 때 만듭니다."""
+    global _ENCODE_EXECUTOR
+    if _ENCODE_EXECUTOR is None:
+        _ENCODE_EXECUTOR = ThreadPoolExecutor(
+            max_workers=max(1, int(getattr(config, "EMBEDDING_MAX_CONCURRENCY", 1))),
+            thread_name_prefix="masamong-embed",
+        )
+    return _ENCODE_EXECUTOR
+
+
+def _model_encode(model: Any, inputs: Any, *, normalize: bool, **options: Any) -> Any:
+    """진행 표시줄을 끄고 ``model.encode``를 호출합니다.
+
+    경량 테스트 대역이나 오래된 sentence-transformers 구현에는
+    show_progress_bar/batch_size 인자가 없을 수 있다. 그 경우에만 기존 계약으로
+    한 번 되돌리며, 실제 모델 호출 오류까지 숨기지는 않는다.
+    """
+    optional = {"show_progress_bar": False, **options}
+    try:
+        return model.encode(inputs, normalize_embeddings=normalize, **optional)
+    except TypeError as exc:
+        if not any(name in str(exc) for name in optional):
+            raise
+        return model.encode(inputs, normalize_embeddings=normalize)
+
+
+def _embed_cache_get(model: Any, key: tuple[str, bool]) -> np.ndarray | None:
+    """캐시된 임베딩 사본을 반환하고 최근 사용으로 표시합니다."""
+    global _EMBED_CACHE_MODEL
+    if _EMBED_CACHE_MODEL is not model:
+        _EMBED_CACHE.clear()
+        _EMBED_CACHE_MODEL = model
+        return None
+    vector = _EMBED_CACHE.get(key)
+    if vector is None:
+        return None
+    _EMBED_CACHE.move_to_end(key)
+    # 호출자가 결과를 제자리 수정해도 캐시가 오염되지 않도록 사본을 준다.
+    return vector.copy()
+
+
+def _embed_cache_put(model: Any, key: tuple[str, bool], vector: np.ndarray) -> None:
+    """encode 결과를 LRU에 넣고 상한을 넘으면 가장 오래된 항목을 버립니다."""
+    max_entries = int(getattr(config, "EMBEDDING_CACHE_SIZE", 10_000))
+    if max_entries <= 0 or _EMBED_CACHE_MODEL is not model:
+        return
+    _EMBED_CACHE[key] = vector.copy()
+    _EMBED_CACHE.move_to_end(key)
+    while len(_EMBED_CACHE) > max_entries:
+        _EMBED_CACHE.popitem(last=False)
+
+
+class _EncodeBatch:
+    """짧은 창 동안 모이는 get_embedding 요청 묶음. 이벤트 루프 스레드에서만 다룬다."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, model: Any, normalize: bool):
+        self.loop = loop
+        self.model = model
+        self.normalize = normalize
+        # 최종 입력 -> 기다리는 future 목록. 같은 문장은 한 번만 encode한다.
+        self.waiters: dict[str, list[asyncio.Future]] = {}
+        self.full = asyncio.Event()
+
+
+# 지금 요청을 받고 있는 묶음. 창이 끝나거나 가득 차면 떼어 내고 encode한다.
+_PENDING_ENCODE_BATCH: _EncodeBatch | None = None
+# 실행 중인 묶음 task의 강한 참조. 이벤트 루프는 약한 참조만 들고 있어
+# 호출자가 future를 기다리는 동안 task가 GC되지 않게 여기 붙잡아 둔다.
+_ENCODE_BATCH_TASKS: set[asyncio.Task] = set()
+
+
+async def _coalesced_encode(model: Any, final_text: str, normalize: bool) -> np.ndarray:
+    """다른 동시 호출과 묶어 encode한 뒤 이 입력의 벡터를 반환합니다."""
+    global _PENDING_ENCODE_BATCH
+    loop = asyncio.get_running_loop()
+    batch = _PENDING_ENCODE_BATCH
+    if (
+        batch is None
+        or batch.loop is not loop
+        or batch.model is not model
+        or batch.normalize != normalize
+    ):
+        batch = _EncodeBatch(loop, model, normalize)
+        _PENDING_ENCODE_BATCH = batch
+        task = loop.create_task(_run_encode_batch(batch))
+        _ENCODE_BATCH_TASKS.add(task)
+        task.add_done_callback(_ENCODE_BATCH_TASKS.discard)
+    future = loop.create_future()
+    batch.waiters.setdefault(final_text, []).append(future)
+    if len(batch.waiters) >= _ENCODE_BATCH_SIZE:
+        _PENDING_ENCODE_BATCH = None
+        batch.full.set()
+    return await future
+
+
+async def _run_encode_batch(batch: _EncodeBatch) -> None:
+    """창이 끝나면 묶음을 한 번의 model.encode로 처리해 각 future를 채웁니다."""
+    global _PENDING_ENCODE_BATCH
+    window = float(getattr(config, "EMBEDDING_COALESCE_WINDOW_MS", 0.0)) / 1000.0
+    try:
+        await asyncio.wait_for(batch.full.wait(), timeout=window)
+    except asyncio.TimeoutError:
+        pass
+    if _PENDING_ENCODE_BATCH is batch:
+        _PENDING_ENCODE_BATCH = None
+
+    texts = list(batch.waiters)
+    numpy_module = _get_numpy()
+
+    def _sync_encode_batch() -> np.ndarray:
+        # 혼자 들어온 입력은 예전 get_embedding과 같은 호출로 encode한다.
+        if len(texts) == 1:
+            matrix = _model_encode(batch.model, texts[0], normalize=batch.normalize)
+        else:
+            matrix = _model_encode(
+                batch.model,
+                texts,
+                normalize=batch.normalize,
+                batch_size=len(texts),
+            )
+        matrix = numpy_module.asarray(matrix, dtype=numpy_module.float32)
+        return numpy_module.ascontiguousarray(matrix.reshape(len(texts), -1))
+
+    try:
+        async with _ENCODE_SEMAPHORE:
+            matrix = await batch.loop.run_in_executor(
+                _encode_executor(),
+                _sync_encode_batch,
+            )
+    except Exception as exc:
+        for futures in batch.waiters.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+        return
+    for text, vector in zip(texts, matrix):
+        for future in batch.waiters[text]:
+            if not future.done():
+                # 같은 문장을 기다린 호출끼리도 서로의 결과를 수정하지 못하게 나눠 준다.
+                future.set_result(vector.copy())
+
+
 async def get_embedding(text: str, prefix: str = "") -> np.ndarray | None:
     """문자열을 임베딩 벡터(float32)로 변환합니다.
     
@@ -413,6 +918,12 @@ async def get_embedding(text: str, prefix: str = "") -> np.ndarray | None:
     normalize = getattr(config, "LOCAL_EMBEDDING_NORMALIZE", True)
     loop = asyncio.get_running_loop()
 
+    # 한계 안의 입력은 자른 결과가 원문과 같으므로, 토크나이저를 돌리기 전에
+    # 원문 키로 먼저 찾아 반복 질의가 토큰화 비용도 내지 않게 한다.
+    cached = _embed_cache_get(model, (f"{prefix}{text}".strip(), bool(normalize)))
+    if cached is not None:
+        return cached
+
     # E5 모델의 경우 접두사를 포함한 전체 입력을 모델 한계 안으로 자른다.
     # SentenceTransformer의 암묵적 절단에 맡기면 transformers 경고가 남고,
     # 일부 백엔드에서는 최대 길이 초과가 실제 인덱싱 오류로 이어질 수 있다.
@@ -424,32 +935,114 @@ async def get_embedding(text: str, prefix: str = "") -> np.ndarray | None:
 
     def _sync_encode() -> np.ndarray:
         # [Safe] Truncation 인자를 제거 (모델이 지원하지 않음, 기본값에 맡김)
-        try:
-            vector = model.encode(
-                final_text,
-                normalize_embeddings=normalize,
-                show_progress_bar=False,
-            )
-        except TypeError as exc:
-            # 경량 테스트 대역이나 오래된 sentence-transformers 구현에는
-            # show_progress_bar 인자가 없을 수 있다. 그 경우에만 기존 계약으로
-            # 한 번 되돌리며, 실제 모델 호출 오류까지 숨기지는 않는다.
-            if "show_progress_bar" not in str(exc):
-                raise
-            vector = model.encode(
-                final_text,
-                normalize_embeddings=normalize,
-            )
+        vector = _model_encode(model, final_text, normalize=normalize)
         if not isinstance(vector, numpy_module.ndarray):
             vector = numpy_module.asarray(vector)
-        return vector.astype(numpy_module.float32)
+        return numpy_module.ascontiguousarray(vector, dtype=numpy_module.float32)
 
+    cache_key = (final_text, bool(normalize))
+    while True:
+        cached = _embed_cache_get(model, cache_key)
+        if cached is not None:
+            return cached
+        pending = _EMBED_INFLIGHT.get(cache_key)
+        if pending is None or pending.get_loop() is not loop:
+            break
+        shared = await asyncio.shield(pending)
+        if shared is not _EMBED_LEADER_CANCELLED:
+            return None if shared is None else shared.copy()
+        # 먼저 온 호출이 취소돼 결과가 없다. 기다리던 호출 중 하나가 새로 encode하고
+        # 나머지는 그 호출을 기다린다.
+
+    inflight = loop.create_future()
+    _EMBED_INFLIGHT[cache_key] = inflight
+    vector = None
     try:
-        async with _ENCODE_SEMAPHORE:
-            return await loop.run_in_executor(None, _sync_encode)
+        if float(getattr(config, "EMBEDDING_COALESCE_WINDOW_MS", 0.0)) > 0:
+            vector = await _coalesced_encode(model, final_text, bool(normalize))
+        else:
+            async with _ENCODE_SEMAPHORE:
+                vector = await loop.run_in_executor(_encode_executor(), _sync_encode)
+    except asyncio.CancelledError:
+        vector = _EMBED_LEADER_CANCELLED
+        raise
     except Exception as exc:  # pragma: no cover - encode() 내부 오류 방지용
         logger.error("임베딩 생성 중 오류 발생: %s", exc, exc_info=True)
         return None
+    finally:
+        if _EMBED_INFLIGHT.get(cache_key) is inflight:
+            del _EMBED_INFLIGHT[cache_key]
+        # 실패하면 None으로, 취소되면 _EMBED_LEADER_CANCELLED로 기다리던 호출을 깨운다.
+        inflight.set_result(vector)
+    _embed_cache_put(model, cache_key, vector)
+    return vector
+
+
+async def get_embeddings(
+    texts: list[str],
+    prefix: str = "",
+) -> list[np.ndarray | None]:
+    """여러 문자열을 한 번의 배치 encode로 임베딩합니다.
+
+    빈 문자열 자리와 실패 시에는 None을 돌려주며, 결과 순서는 입력과 같다.
+    캐시에 있는 입력은 encode하지 않고, 나머지만 ``_ENCODE_BATCH_SIZE``
+    단위로 묶어 모델을 한 번 호출한다.
+    """
+    results: list[np.ndarray | None] = [None] * len(texts)
+    if not any(texts) or not getattr(config, "EMBEDDING_ENABLED", True):
+        return results
+    try:
+        model = await _load_model()
+    except RuntimeError as exc:
+        logger.warning("임베딩 모델을 사용할 수 없어 생성을 건너뜁니다: %s", exc)
+        return results
+    numpy_module = _get_numpy()
+    if numpy_module is None:
+        logger.warning("NumPy를 사용할 수 없어 임베딩 생성을 건너뜁니다.")
+        return results
+    normalize = bool(getattr(config, "LOCAL_EMBEDDING_NORMALIZE", True))
+
+    token_limit = await get_embedding_token_limit(reserve_tokens=0)
+    pending: list[tuple[int, tuple[str, bool]]] = []
+    for index, text in enumerate(texts):
+        if not text:
+            continue
+        final_text = await trim_text_to_embedding_token_limit(
+            f"{prefix}{text}",
+            token_limit,
+        )
+        cache_key = (final_text, normalize)
+        cached = _embed_cache_get(model, cache_key)
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.append((index, cache_key))
+    if not pending:
+        return results
+
+    def _sync_encode_many() -> np.ndarray:
+        matrix = _model_encode(
+            model,
+            [cache_key[0] for _, cache_key in pending],
+            normalize=normalize,
+            batch_size=_ENCODE_BATCH_SIZE,
+        )
+        matrix = numpy_module.asarray(matrix, dtype=numpy_module.float32)
+        return matrix.reshape(len(pending), -1)
+
+    try:
+        async with _ENCODE_SEMAPHORE:
+            matrix = await asyncio.get_running_loop().run_in_executor(
+                _encode_executor(),
+                _sync_encode_many,
+            )
+    except Exception as exc:  # pragma: no cover - encode() 내부 오류 방지용
+        logger.error("배치 임베딩 생성 중 오류 발생: %s", exc, exc_info=True)
+        return results
+    for (index, cache_key), vector in zip(pending, matrix):
+        _embed_cache_put(model, cache_key, vector)
+        results[index] = vector
+    return results
 
 
 class DiscordEmbeddingStore:
@@ -497,6 +1090,14 @@ class DiscordEmbeddingStore:
         "CREATE INDEX IF NOT EXISTS idx_discord_memory_scope ON discord_memory_entries (server_id, channel_id, memory_scope, owner_user_id)",
         "CREATE INDEX IF NOT EXISTS idx_discord_memory_timestamp ON discord_memory_entries (timestamp DESC)",
     )
+    # 저장소 단위 상태를 남기는 key/value 테이블. PRAGMA user_version처럼 DB
+    # 파일 전체가 공유하는 값은 다른 도구와 겹칠 수 있어 쓰지 않는다.
+    _CREATE_META_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS discord_embedding_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    """
     _REQUIRED_MESSAGE_COLUMNS = frozenset(
         {
             "message_id",
@@ -509,6 +1110,70 @@ class DiscordEmbeddingStore:
             "embedding",
         }
     )
+    # DISCORD_EMBEDDING_STORAGE_DTYPE(float16/int8)용 선택 컬럼. 있으면
+    # embedding_q가 NULL이 아닌 행은 embedding 대신 이 값으로 읽는다. scale이
+    # 있으면 int8, NULL이면 float16이다.
+    _QUANTIZED_MESSAGE_COLUMNS = (
+        ("embedding_q", "BLOB"),
+        ("embedding_scale", "REAL"),
+    )
+    # sqlite-vec 확장이 있을 때 쓰는 kNN 인덱스. rowid는 discord_chat_embeddings.id와
+    # 같고, scope_key("서버:채널") 파티션 안에서만 거리 계산을 한다. 원본 벡터는
+    # 메시지 테이블에 그대로 있으므로 이 테이블은 언제든 다시 만들 수 있다.
+    _KNN_TABLE = "vec_discord_embeddings"
+    _KNN_DIMENSION_RE = re.compile(r"embedding\s+float\[(\d+)\]", re.IGNORECASE)
+    _KNN_DELETE_SQL = (
+        "DELETE FROM vec_discord_embeddings WHERE rowid = "
+        "(SELECT id FROM discord_chat_embeddings WHERE message_id = ?)"
+    )
+    _KNN_INSERT_SQL = """
+        INSERT INTO vec_discord_embeddings (rowid, scope_key, user_id, embedding)
+        SELECT id, ?, ?, ? FROM discord_chat_embeddings WHERE message_id = ?
+    """
+    # fetch_recent_embeddings/iter_recent_embeddings가 돌려주는 컬럼 순서.
+    _RECENT_COLUMNS = ("message_id", "user_id", "user_name", "message", "timestamp", "embedding")
+    # 최신순 조회 SQL. (압축 컬럼 포함 여부, user_id 필터 여부)별로 미리 만들어
+    # 두어 호출마다 같은 문자열을 다시 조립하지 않는다.
+    _RECENT_SELECT_SQL = f"SELECT {', '.join(_RECENT_COLUMNS)}"
+    _RECENT_WHERE_SQL = (
+        " FROM discord_chat_embeddings WHERE server_id = ? AND channel_id = ?"
+    )
+    _SQLITE_RECENT_SQL = {
+        (False, False): (
+            _RECENT_SELECT_SQL + _RECENT_WHERE_SQL
+            + " ORDER BY timestamp DESC LIMIT ?"
+        ),
+        (False, True): (
+            _RECENT_SELECT_SQL + _RECENT_WHERE_SQL
+            + " AND user_id = ? ORDER BY timestamp DESC LIMIT ?"
+        ),
+        (True, False): (
+            _RECENT_SELECT_SQL + ", embedding_q, embedding_scale" + _RECENT_WHERE_SQL
+            + " ORDER BY timestamp DESC LIMIT ?"
+        ),
+        (True, True): (
+            _RECENT_SELECT_SQL + ", embedding_q, embedding_scale" + _RECENT_WHERE_SQL
+            + " AND user_id = ? ORDER BY timestamp DESC LIMIT ?"
+        ),
+    }
+    # 삭제할 ID 목록은 JSON 배열 하나로 넘겨, 개수와 관계없이 같은 문장을 쓴다.
+    _SQLITE_DELETE_MESSAGES_SQL = (
+        "DELETE FROM discord_chat_embeddings "
+        "WHERE message_id IN (SELECT value FROM json_each(?))"
+    )
+    _SQLITE_DELETE_MEMORY_SQL = (
+        "DELETE FROM discord_memory_entries "
+        "WHERE memory_id IN (SELECT value FROM json_each(?))"
+    )
+    # DISCORD_EMBEDDING_BINARY_INDEX용 선택 컬럼.
+    _BINARY_MESSAGE_COLUMN = ("embedding_bin", "BLOB")
+    _BINARY_UPDATE_SQL = (
+        "UPDATE discord_chat_embeddings SET embedding_bin = ? WHERE message_id = ?"
+    )
+    # 초기화 때 기존 float32 행을 int8로 옮기는 묶음 크기.
+    _QUANTIZE_MIGRATION_BATCH_ROWS = 500
+    # discord_embedding_meta에 이 키가 있으면 저장된 임베딩이 모두 단위 길이다.
+    _UNIT_NORM_META_KEY = "unit_normalized"
     _REQUIRED_MEMORY_COLUMNS = frozenset(
         {
             "memory_id",
@@ -559,6 +1224,56 @@ class DiscordEmbeddingStore:
         self._initialized = False
         # 스레드 로컬 연결 캐시 (연결 풀 역할)
         self._thread_local = __import__('threading').local()
+        # SQLite 백엔드는 연결 하나를 재사용한다. lock은 한 작업의 execute→commit
+        # 사이에 다른 코루틴의 문장이 끼어 같은 트랜잭션에 섞이지 않게 한다.
+        self._sqlite_conn: aiosqlite.Connection | None = None
+        self._sqlite_conn_lock = asyncio.Lock()
+        # 연결을 새로 열 때마다 올린다. PRAGMA data_version은 연결 단위 값이라
+        # 같은 연결에서 읽은 값끼리만 비교할 수 있다.
+        self._sqlite_conn_generation = 0
+        # SQLite 메시지 테이블에 int8 컬럼이 있는지. schema 확인 때 채운다.
+        self._quantized_columns = False
+        # 메시지 테이블에 embedding_bin 컬럼이 있는지. schema 확인 때 채운다.
+        self._binary_column = False
+        # sqlite-vec kNN 상태. _knn_loaded는 현재 연결에 확장이 로드됐는지,
+        # _knn_dimension은 vec 테이블이 있을 때 그 벡터 차원이다.
+        self._knn_extension_candidates = self._build_knn_extension_candidates()
+        self._knn_extension_unavailable = False
+        self._knn_loaded = False
+        self._knn_dimension: int | None = None
+        self._knn_search_failed = False
+        # upsert_message_embedding write-back 버퍼. message_id -> upsert 인자 tuple.
+        # flush lock은 flush와 delete가 서로 끼어들어 지운 행이 되살아나지 않게 한다.
+        self._pending_messages: dict[str, tuple[Any, ...]] = {}
+        self._pending_flush_task: asyncio.Task | None = None
+        self._pending_flush_lock = asyncio.Lock()
+        # 이 프로세스가 마지막으로 기록한 행의 content_digest. 키는
+        # "message:<message_id>" / "memory:<memory_id>"이고 LRU로 제한한다.
+        self._written_digests: OrderedDict[str, bytes] = OrderedDict()
+        # fetch_recent_matrix 결과 LRU. 키는 (server_id, channel_id, user_id, limit)
+        # 문자열/정수 조합이고, 그 채널에 쓰기가 생기면 항목을 버린다.
+        # generation은 조회 도중 쓰기가 끼어든 결과를 캐시에 넣지 않기 위한 값이다.
+        self._matrix_cache: OrderedDict[
+            tuple[str, str, str | None, int],
+            tuple[list[str], "np.ndarray", list[dict[str, Any]]],
+        ] = OrderedDict()
+        self._matrix_generation = 0
+        # DISCORD_EMBEDDING_HNSW 메모리 인덱스. 라벨은 discord_chat_embeddings.id이고
+        # _hnsw_labels가 라벨 -> (scope_key, user_id), _hnsw_scope_counts가 필터별
+        # 행 수를 가진다. _hnsw_row_estimate는 인덱스를 만들기 전 행 수 추정치다.
+        # _hnsw_source_version은 인덱스(또는 추정치)를 만든 시점의
+        # (연결 generation, PRAGMA data_version)이다.
+        self._hnsw_index: Any | None = None
+        self._hnsw_labels: dict[int, tuple[str, str]] = {}
+        self._hnsw_scope_counts: Counter[tuple[str, str | None]] = Counter()
+        self._hnsw_row_estimate: int | None = None
+        self._hnsw_source_version: tuple[int, int] | None = None
+        self._hnsw_lock = asyncio.Lock()
+        # SQLite 임베딩이 모두 단위 길이로 저장됐는지. schema 확인 때 채운다.
+        self._unit_normalized = False
+        # WAL checkpoint 백그라운드 작업과 마지막 실행 시각(monotonic).
+        self._checkpoint_task: asyncio.Task | None = None
+        self._last_checkpoint = time.monotonic()
 
     async def initialize(self) -> None:
         """DB 파일이 존재하지 않으면 생성하고 스키마를 준비합니다."""
@@ -587,15 +1302,27 @@ class DiscordEmbeddingStore:
                 return
 
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute("PRAGMA journal_mode=WAL;")
+            async with self._sqlite_connect() as db:
                 await db.execute(self._CREATE_TABLE_SQL)
                 for sql in self._CREATE_INDEX_SQL:
                     await db.execute(sql)
                 await db.execute(self._CREATE_MEMORY_TABLE_SQL)
                 for sql in self._CREATE_MEMORY_INDEX_SQL:
                     await db.execute(sql)
+                await db.execute(self._CREATE_META_TABLE_SQL)
+                if _compact_storage_dtype() is not None:
+                    await self._add_quantized_columns(db)
+                if getattr(config, "DISCORD_EMBEDDING_BINARY_INDEX", False):
+                    await self._add_quantized_columns(db, (self._BINARY_MESSAGE_COLUMN,))
+                await self._normalize_existing_rows(db)
+                await self._prepare_knn_index(db)
                 await db.commit()
+                # 기존 float32 원본을 비우는 변환은 되돌릴 수 없으므로 명시적으로
+                # 켠 경우에만 한다.
+                if _drop_float32_source():
+                    await self._quantize_existing_rows(db)
+                if getattr(config, "DISCORD_EMBEDDING_BINARY_INDEX", False):
+                    await self._backfill_binary_codes(db)
             await self._initialize_existing_only()
             self._initialized = True
             logger.info("Discord 임베딩 DB 초기화 완료: %s", self.db_path)
@@ -605,12 +1332,58 @@ class DiscordEmbeddingStore:
         if self.read_only:
             raise RuntimeError("read-only Discord 임베딩 저장소에는 쓸 수 없습니다.")
 
-    def _sqlite_connect(self):
-        """read-only 모드에서는 SQLite 파일도 mode=ro URI로 엽니다."""
-        if self.read_only:
-            uri = self.db_path.resolve().as_uri() + "?mode=ro"
-            return aiosqlite.connect(uri, uri=True)
-        return aiosqlite.connect(self.db_path)
+    @asynccontextmanager
+    async def _sqlite_connect(self):
+        """재사용하는 SQLite 연결을 한 작업 동안 독점적으로 빌려줍니다.
+
+        처음 사용할 때 연결을 열며, read-only 모드에서는 mode=ro URI로 엽니다.
+        작업 중 예외가 나면 미커밋 문장이 다음 작업의 commit에 섞이지 않도록
+        연결을 돌려주기 전에 rollback합니다.
+        """
+        async with self._sqlite_conn_lock:
+            db = self._sqlite_conn
+            if db is None:
+                db = await _open_store_sqlite_connection(
+                    self.db_path,
+                    read_only=self.read_only,
+                )
+                self._sqlite_conn = db
+                self._sqlite_conn_generation += 1
+                # 확장은 연결 단위로 로드되므로 새로 열 때마다 다시 시도한다.
+                self._knn_loaded = await self._load_knn_extension(db)
+            try:
+                yield db
+            except BaseException:
+                if db.in_transaction:
+                    try:
+                        await db.rollback()
+                    except Exception as rollback_error:
+                        logger.critical(
+                            "Discord 임베딩 작업 실패 후 rollback도 실패했습니다: %s",
+                            rollback_error,
+                            exc_info=True,
+                        )
+                raise
+
+    async def close(self) -> None:
+        """버퍼에 남은 임베딩을 기록하고 재사용 중인 SQLite 연결을 닫습니다.
+
+        이후 호출은 연결을 새로 엽니다.
+        """
+        for task in (self._pending_flush_task, self._checkpoint_task):
+            if task is not None and not task.done():
+                task.cancel()
+        self._pending_flush_task = None
+        self._checkpoint_task = None
+        try:
+            await self.flush_pending_embeddings()
+        except Exception as exc:
+            logger.error("Discord 임베딩 write-back 버퍼 기록 실패: %s", exc, exc_info=True)
+        async with self._sqlite_conn_lock:
+            db, self._sqlite_conn = self._sqlite_conn, None
+            self._knn_loaded = False
+            if db is not None:
+                await db.close()
 
     async def _initialize_existing_only(self) -> None:
         """CREATE 없이 기존 임베딩 테이블과 필수 컬럼을 확인합니다."""
@@ -790,6 +1563,493 @@ class DiscordEmbeddingStore:
                 "임베딩 저장소에 필수 UNIQUE 제약이 없습니다: "
                 + ", ".join(missing_unique)
             )
+        if self.backend != "tidb":
+            self._quantized_columns = {
+                name for name, _ in self._QUANTIZED_MESSAGE_COLUMNS
+            } <= columns_by_table[message_table]
+            self._binary_column = (
+                self._BINARY_MESSAGE_COLUMN[0] in columns_by_table[message_table]
+            )
+            async with self._sqlite_connect() as db:
+                self._knn_dimension = await self._existing_knn_dimension(db)
+                self._unit_normalized = bool(
+                    getattr(config, "LOCAL_EMBEDDING_NORMALIZE", True)
+                ) and await self._has_unit_norm_mark(db)
+
+    async def _add_quantized_columns(
+        self,
+        db: aiosqlite.Connection,
+        columns: tuple[tuple[str, str], ...] | None = None,
+    ) -> None:
+        """int8(또는 지정한) 저장용 컬럼이 없으면 메시지 테이블에 추가합니다.
+
+        기존 float32 행은 DISCORD_EMBEDDING_DROP_FLOAT32를 켰을 때만 이어서
+        _quantize_existing_rows가 압축 형식으로 옮긴다.
+        """
+        async with db.execute(
+            "SELECT name FROM pragma_table_info('discord_chat_embeddings')"
+        ) as cursor:
+            existing = {str(row[0]) for row in await cursor.fetchall()}
+        for column_name, column_type in columns or self._QUANTIZED_MESSAGE_COLUMNS:
+            if column_name not in existing:
+                await db.execute(
+                    f"ALTER TABLE discord_chat_embeddings "
+                    f"ADD COLUMN {column_name} {column_type}"
+                )
+
+    @property
+    def knn_search_available(self) -> bool:
+        """fetch_recent_embeddings가 query_vector로 후보를 고를 수 있는지.
+
+        vec0 kNN 인덱스나 1비트 코드 컬럼 중 하나라도 쓸 수 있으면 True.
+        """
+        if self.backend == "tidb":
+            return False
+        return (
+            self._vec0_search_available
+            or self._hnsw_enabled
+            or self._binary_column
+        )
+
+    @property
+    def unit_normalized(self) -> bool:
+        """SQLite에 저장된 임베딩이 모두 단위 길이라 코사인을 내적으로 계산해도 되면 True."""
+        return self.backend != "tidb" and self._unit_normalized
+
+    @property
+    def _hnsw_enabled(self) -> bool:
+        return (
+            self.backend != "tidb"
+            and bool(getattr(config, "DISCORD_EMBEDDING_HNSW", False))
+            and _get_hnswlib() is not None
+        )
+
+    @property
+    def _vec0_search_available(self) -> bool:
+        return (
+            self._knn_loaded
+            and self._knn_dimension is not None
+            and not self._knn_search_failed
+        )
+
+    def _build_knn_extension_candidates(self) -> list[str]:
+        """config, sqlite_vec 패키지, 기본 이름 순으로 vec0 확장 후보를 만듭니다."""
+        candidates: list[str] = []
+        raw = getattr(config, "DISCORD_VECTOR_EXTENSION", None)
+        if isinstance(raw, str) and raw.strip():
+            candidates.append(raw.strip())
+        elif isinstance(raw, (list, tuple)):
+            for item in raw:
+                if isinstance(item, str) and item.strip():
+                    candidates.append(item.strip())
+        try:
+            import sqlite_vec
+        except ImportError:
+            pass
+        else:
+            candidates.append(sqlite_vec.loadable_path())
+        candidates.append("vec0")
+
+        deduped: list[str] = []
+        for candidate in candidates:
+            if candidate not in deduped:
+                deduped.append(candidate)
+        return deduped
+
+    async def _load_knn_extension(self, db: aiosqlite.Connection) -> bool:
+        """sqlite-vec 확장을 로드합니다. 실패하면 이후 연결에서는 시도하지 않습니다."""
+        if self.backend == "tidb" or self._knn_extension_unavailable:
+            return False
+        try:
+            await db.enable_load_extension(True)
+        except (AttributeError, aiosqlite.Error) as exc:
+            # 확장 로딩이 빠진 sqlite3 빌드. 파이썬 스캔으로 충분하다.
+            logger.info("SQLite 확장 로딩을 쓸 수 없어 Discord kNN을 끕니다: %s", exc)
+            self._knn_extension_unavailable = True
+            return False
+
+        last_error: Exception | None = None
+        loaded = False
+        try:
+            for candidate in self._knn_extension_candidates:
+                try:
+                    await db.load_extension(candidate)
+                except aiosqlite.Error as exc:
+                    last_error = exc
+                    continue
+                loaded = True
+                break
+        finally:
+            # 로드가 끝나면 SQL의 load_extension()으로 임의 라이브러리를 올릴 수
+            # 없도록 다시 막는다.
+            await db.enable_load_extension(False)
+        if not loaded:
+            logger.info(
+                "Discord 임베딩 vec0 확장을 찾지 못해 파이썬 스캔을 사용합니다(%s): %s",
+                self._knn_extension_candidates,
+                last_error,
+            )
+            self._knn_extension_unavailable = True
+        return loaded
+
+    async def _existing_knn_dimension(self, db: aiosqlite.Connection) -> int | None:
+        """vec 테이블이 있고 확장이 로드돼 있으면 그 벡터 차원을 반환합니다."""
+        if not self._knn_loaded:
+            return None
+        async with db.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (self._KNN_TABLE,),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None or not row[0]:
+            return None
+        match = self._KNN_DIMENSION_RE.search(str(row[0]))
+        return int(match.group(1)) if match else None
+
+    async def _prepare_knn_index(
+        self,
+        db: aiosqlite.Connection,
+        dimension: int | None = None,
+    ) -> None:
+        """vec 테이블을 만들거나 메시지 테이블과 어긋난 행을 맞춥니다.
+
+        확장 없이 실행된 기간에 쌓이거나 지워진 행을 여기서 보충/삭제한다.
+        float32 원본을 비운 float16/int8 행은 embedding_q를 복원해 채운다.
+        """
+        if not self._knn_loaded:
+            return
+        try:
+            existing = await self._existing_knn_dimension(db)
+            if existing is None:
+                if dimension is None:
+                    async with db.execute(
+                        "SELECT length(embedding) FROM discord_chat_embeddings "
+                        "WHERE length(embedding) > 0 LIMIT 1"
+                    ) as cursor:
+                        row = await cursor.fetchone()
+                    if row is not None:
+                        dimension = int(row[0]) // 4
+                    else:
+                        dimension = await self._compact_embedding_dimension(db)
+                    if dimension is None:
+                        # 차원을 알 수 없으니 첫 upsert 때 만든다.
+                        return
+                await db.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self._KNN_TABLE} USING vec0("
+                    "scope_key TEXT PARTITION KEY, user_id TEXT, "
+                    f"embedding float[{int(dimension)}])"
+                )
+                existing = int(dimension)
+            else:
+                await db.execute(
+                    f"DELETE FROM {self._KNN_TABLE} WHERE rowid NOT IN "
+                    "(SELECT id FROM discord_chat_embeddings)"
+                )
+            await db.execute(
+                f"""
+                INSERT INTO {self._KNN_TABLE} (rowid, scope_key, user_id, embedding)
+                SELECT id, server_id || ':' || channel_id, user_id, embedding
+                FROM discord_chat_embeddings
+                WHERE length(embedding) = ?
+                  AND id NOT IN (SELECT rowid FROM {self._KNN_TABLE})
+                """,
+                (existing * 4,),
+            )
+            await self._backfill_knn_from_compact(db, existing)
+            self._knn_dimension = existing
+        except aiosqlite.Error as exc:
+            logger.warning("Discord 임베딩 vec0 인덱스를 준비하지 못했습니다: %s", exc)
+            self._knn_dimension = None
+
+    async def _has_compact_column(self, db: aiosqlite.Connection) -> bool:
+        async with db.execute(
+            "SELECT 1 FROM pragma_table_info('discord_chat_embeddings') "
+            "WHERE name = 'embedding_q'"
+        ) as cursor:
+            return await cursor.fetchone() is not None
+
+    async def _compact_embedding_dimension(self, db: aiosqlite.Connection) -> int | None:
+        """float32 원본 없이 embedding_q만 있는 행에서 벡터 차원을 구합니다."""
+        if not await self._has_compact_column(db):
+            return None
+        async with db.execute(
+            "SELECT length(embedding_q), embedding_scale IS NULL "
+            "FROM discord_chat_embeddings WHERE embedding_q IS NOT NULL LIMIT 1"
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        # scale이 없으면 float16(2바이트), 있으면 int8(1바이트)이다.
+        return int(row[0]) // 2 if row[1] else int(row[0])
+
+    async def _backfill_knn_from_compact(self, db: aiosqlite.Connection, dimension: int) -> int:
+        """float32 원본이 비어 vec0에 빠진 행을 embedding_q를 복원해 채웁니다."""
+        if not await self._has_compact_column(db):
+            return 0
+        filled = 0
+        last_id = 0
+        while True:
+            async with db.execute(
+                f"""
+                SELECT id, server_id || ':' || channel_id, user_id,
+                       embedding_q, embedding_scale
+                FROM discord_chat_embeddings
+                WHERE id > ? AND length(embedding) = 0 AND embedding_q IS NOT NULL
+                  AND id NOT IN (SELECT rowid FROM {self._KNN_TABLE})
+                ORDER BY id LIMIT ?
+                """,
+                (last_id, self._QUANTIZE_MIGRATION_BATCH_ROWS),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                break
+            last_id = int(rows[-1][0])
+            params = []
+            for row_id, scope_key, user_id, quantized, scale in rows:
+                vector = _decode_compact_embedding(quantized, scale)
+                if vector.size == dimension:
+                    params.append((row_id, scope_key, user_id, vector.tobytes()))
+            if params:
+                await db.executemany(
+                    f"INSERT INTO {self._KNN_TABLE} (rowid, scope_key, user_id, embedding) "
+                    "VALUES (?, ?, ?, ?)",
+                    params,
+                )
+                filled += len(params)
+        return filled
+
+    async def _mirror_knn_rows(
+        self,
+        db: aiosqlite.Connection,
+        params: list[tuple[Any, ...]],
+    ) -> None:
+        """float32 upsert 파라미터를 같은 트랜잭션에서 vec 테이블에 반영합니다."""
+        if not self._knn_loaded or not params:
+            return
+        if self._knn_dimension is None:
+            await self._prepare_knn_index(db, len(params[0][7]) // 4)
+            if self._knn_dimension is None:
+                return
+        blob_size = self._knn_dimension * 4
+        rows = [row for row in params if len(row[7]) == blob_size]
+        if not rows:
+            return
+        try:
+            await db.executemany(
+                self._KNN_DELETE_SQL,
+                [(row[0],) for row in rows],
+            )
+            await db.executemany(
+                self._KNN_INSERT_SQL,
+                [(f"{row[1]}:{row[2]}", row[3], row[7], row[0]) for row in rows],
+            )
+        except aiosqlite.Error as exc:
+            # 인덱스 반영 실패가 원본 저장을 막지는 않는다. 다음 initialize가
+            # 빠진 행을 보충한다.
+            logger.warning("Discord 임베딩 vec0 인덱스 갱신 실패: %s", exc)
+
+    async def _backfill_binary_codes(self, db: aiosqlite.Connection) -> int:
+        """embedding_bin이 비어 있는 행에 부호 코드를 채웁니다.
+
+        float32 행은 원본에서, float16/int8 행은 embedding_q에서 계산한다(둘 다
+        부호를 바꾸지 않는다). _quantize_existing_rows와 같이 id 순 묶음으로 돈다.
+        """
+        async with db.execute(
+            "SELECT name FROM pragma_table_info('discord_chat_embeddings')"
+        ) as cursor:
+            existing = {str(row[0]) for row in await cursor.fetchall()}
+        compact_columns = (
+            "embedding_q, embedding_scale" if "embedding_q" in existing else "NULL, NULL"
+        )
+        filled = 0
+        last_id = 0
+        while True:
+            async with db.execute(
+                f"SELECT id, embedding, {compact_columns} FROM discord_chat_embeddings "
+                "WHERE id > ? AND embedding_bin IS NULL ORDER BY id LIMIT ?",
+                (last_id, self._QUANTIZE_MIGRATION_BATCH_ROWS),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                break
+            last_id = int(rows[-1][0])
+            updates = []
+            for row_id, embedding, quantized, scale in rows:
+                if quantized:
+                    code = _binary_code(_decode_compact_embedding(quantized, scale))
+                elif embedding and len(embedding) % 4 == 0:
+                    code = _binary_code(np.frombuffer(embedding, dtype=np.float32))
+                else:
+                    continue
+                updates.append((code, row_id))
+            if updates:
+                await db.executemany(
+                    "UPDATE discord_chat_embeddings SET embedding_bin = ? WHERE id = ?",
+                    updates,
+                )
+                await db.commit()
+                filled += len(updates)
+        if filled:
+            logger.info("Discord 임베딩 %d행에 1비트 코드를 채웠습니다.", filled)
+        return filled
+
+    async def _has_unit_norm_mark(self, db: aiosqlite.Connection) -> bool:
+        """discord_embedding_meta에 단위 길이 정규화 완료 표시가 있으면 True."""
+        async with db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'discord_embedding_meta'"
+        ) as cursor:
+            if await cursor.fetchone() is None:
+                return False
+        async with db.execute(
+            "SELECT 1 FROM discord_embedding_meta WHERE key = ?",
+            (self._UNIT_NORM_META_KEY,),
+        ) as cursor:
+            return await cursor.fetchone() is not None
+
+    async def _normalize_existing_rows(self, db: aiosqlite.Connection) -> int:
+        """기존 메시지·기억 임베딩을 단위 길이로 한 번 맞추고 meta 테이블에 표시합니다.
+
+        LOCAL_EMBEDDING_NORMALIZE가 꺼져 있으면 행을 건드리지 않고, 이후 쓰일
+        정규화되지 않은 행과 어긋나지 않게 표시를 지운다. 켜져 있으면 새 행은
+        upsert 파라미터를 만들 때 정규화되므로 DB마다 한 번만 돈다.
+        이미 단위 길이인 행은 건너뛰고, float16/int8 값은 복원해 정규화한 뒤 같은
+        형식으로 다시 쓴다. 바뀐 행의 vec0 행은 지워 두어 이어지는
+        _prepare_knn_index가 새 값으로 다시 채우게 한다.
+        """
+        if not bool(getattr(config, "LOCAL_EMBEDDING_NORMALIZE", True)):
+            await db.execute(
+                "DELETE FROM discord_embedding_meta WHERE key = ?",
+                (self._UNIT_NORM_META_KEY,),
+            )
+            return 0
+        if await self._has_unit_norm_mark(db):
+            return 0
+        async with db.execute(
+            "SELECT name FROM pragma_table_info('discord_chat_embeddings')"
+        ) as cursor:
+            existing = {str(row[0]) for row in await cursor.fetchall()}
+        message_compact = (
+            "embedding_q, embedding_scale" if "embedding_q" in existing else "NULL, NULL"
+        )
+        knn_table = self._knn_loaded and await self._existing_knn_dimension(db) is not None
+        normalized = 0
+        for table, compact_columns in (
+            ("discord_chat_embeddings", message_compact),
+            ("discord_memory_entries", "NULL, NULL"),
+        ):
+            last_id = 0
+            while True:
+                async with db.execute(
+                    f"SELECT id, embedding, {compact_columns} FROM {table} "
+                    "WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, self._QUANTIZE_MIGRATION_BATCH_ROWS),
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                if not rows:
+                    break
+                last_id = int(rows[-1][0])
+                float_updates = []
+                compact_updates = []
+                for row_id, embedding, quantized, scale in rows:
+                    if quantized:
+                        vector = _decode_compact_embedding(quantized, scale)
+                        unit = _unit_embedding(vector, tolerance=_COMPACT_UNIT_NORM_TOLERANCE)
+                        if unit is not vector and scale is None:
+                            compact_updates.append((unit.astype(np.float16).tobytes(), None, row_id))
+                        elif unit is not vector:
+                            compact_updates.append((*_quantize_int8(unit), row_id))
+                    # 압축 값과 함께 남아 있는 float32 원본도 같이 맞춘다.
+                    if embedding and len(embedding) % 4 == 0:
+                        vector = np.frombuffer(embedding, dtype=np.float32)
+                        unit = _unit_embedding(vector)
+                        if unit is not vector:
+                            float_updates.append((unit.tobytes(), row_id))
+                if float_updates:
+                    await db.executemany(
+                        f"UPDATE {table} SET embedding = ? WHERE id = ?",
+                        float_updates,
+                    )
+                    if knn_table and table == "discord_chat_embeddings":
+                        await db.execute(
+                            f"DELETE FROM {self._KNN_TABLE} "
+                            "WHERE rowid IN (SELECT value FROM json_each(?))",
+                            (json.dumps([row_id for _, row_id in float_updates]),),
+                        )
+                if compact_updates:
+                    await db.executemany(
+                        f"UPDATE {table} SET embedding_q = ?, embedding_scale = ? WHERE id = ?",
+                        compact_updates,
+                    )
+                    if knn_table and table == "discord_chat_embeddings":
+                        # float32 원본이 비어 있던 행은 _prepare_knn_index가 복원해 다시 채운다.
+                        await db.execute(
+                            f"DELETE FROM {self._KNN_TABLE} WHERE rowid IN "
+                            "(SELECT value FROM json_each(?)) AND rowid IN "
+                            "(SELECT id FROM discord_chat_embeddings WHERE length(embedding) = 0)",
+                            (json.dumps([row_id for *_, row_id in compact_updates]),),
+                        )
+                if float_updates or compact_updates:
+                    await db.commit()
+                    normalized += len(float_updates) + len(compact_updates)
+        await db.execute(
+            "INSERT INTO discord_embedding_meta (key, value) VALUES (?, '1') "
+            "ON CONFLICT(key) DO NOTHING",
+            (self._UNIT_NORM_META_KEY,),
+        )
+        await db.commit()
+        if normalized:
+            logger.info("Discord 임베딩 %d행을 단위 길이로 정규화했습니다.", normalized)
+        return normalized
+
+    async def _quantize_existing_rows(self, db: aiosqlite.Connection) -> int:
+        """아직 float32로 남은 메시지 임베딩을 설정한 압축 형식으로 옮깁니다.
+
+        float32 원본을 비우므로 DISCORD_EMBEDDING_DROP_FLOAT32를 켠 경우에만
+        초기화 때 묶음 단위로 변환하고 묶음마다 commit한다. vec0 인덱스는 이미
+        원본으로 채워져 있고, 다시 만들 때는 embedding_q를 복원해 채운다.
+        id 순으로 훑으므로 변환할 행이 없으면 조회 한 번으로 끝난다.
+        이미 다른 압축 형식인 행은 읽을 수 있으므로 그대로 둔다.
+        """
+        storage = _compact_storage_dtype()
+        converted = 0
+        last_id = 0
+        while True:
+            async with db.execute(
+                "SELECT id, embedding FROM discord_chat_embeddings "
+                "WHERE id > ? AND embedding_q IS NULL AND length(embedding) > 0 "
+                "ORDER BY id LIMIT ?",
+                (last_id, self._QUANTIZE_MIGRATION_BATCH_ROWS),
+            ) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                break
+            last_id = int(rows[-1][0])
+            # 첫 유효 행과 차원이 다르거나 깨진 BLOB은 건너뛰고 upsert에 맡긴다.
+            indexes, matrix = embedding_blobs_to_matrix(row[1] for row in rows)
+            if not indexes:
+                continue
+            if storage == "float16":
+                halves = matrix.astype(np.float16)
+                updates = [
+                    (halves[position].tobytes(), None, rows[index][0])
+                    for position, index in enumerate(indexes)
+                ]
+            else:
+                quantized, scales = _quantize_int8_rows(matrix)
+                updates = [
+                    (quantized[position].tobytes(), float(scales[position]), rows[index][0])
+                    for position, index in enumerate(indexes)
+                ]
+            await db.executemany(
+                "UPDATE discord_chat_embeddings "
+                "SET embedding = x'', embedding_q = ?, embedding_scale = ? WHERE id = ?",
+                updates,
+            )
+            await db.commit()
+            converted += len(indexes)
+        if converted:
+            logger.info("Discord 임베딩 %d행을 %s 형식으로 변환했습니다.", converted, storage)
+        return converted
 
     async def _initialize_tidb(self) -> None:
         """TiDB에 Discord 임베딩 테이블과 메모리 엔트리 테이블을 생성합니다."""
@@ -889,6 +2149,26 @@ class DiscordEmbeddingStore:
                 return rows
             raise
 
+    def _tidb_executemany(self, query: str, params: list[tuple[Any, ...]]) -> None:
+        """TiDB에서 같은 SQL을 여러 파라미터로 실행하고 한 번에 커밋합니다."""
+        conn = self._get_tidb_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.executemany(query, params)
+            conn.commit()
+        except Exception as exc:
+            if not self._is_retryable_error(exc):
+                raise
+            try:
+                conn.close()
+            except Exception:
+                pass
+            self._thread_local.tidb_conn = None
+            conn = self._get_tidb_connection()
+            with conn.cursor() as cursor:
+                cursor.executemany(query, params)
+            conn.commit()
+
     @staticmethod
     def _is_retryable_error(exc: Exception) -> bool:
         """재시도 가능한 연결 오류인지 확인합니다."""
@@ -903,6 +2183,119 @@ class DiscordEmbeddingStore:
                 code = None
         return code in {2006, 2013, 2055}
 
+    _SQLITE_UPSERT_MESSAGE_SQL = """
+        INSERT INTO discord_chat_embeddings (
+            message_id, server_id, channel_id, user_id, user_name, message, timestamp, embedding
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(message_id) DO UPDATE SET
+            user_name = excluded.user_name,
+            message = excluded.message,
+            timestamp = excluded.timestamp,
+            embedding = excluded.embedding
+    """
+
+    _SQLITE_UPSERT_QUANTIZED_MESSAGE_SQL = """
+        INSERT INTO discord_chat_embeddings (
+            message_id, server_id, channel_id, user_id, user_name, message, timestamp,
+            embedding, embedding_q, embedding_scale
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(message_id) DO UPDATE SET
+            user_name = excluded.user_name,
+            message = excluded.message,
+            timestamp = excluded.timestamp,
+            embedding = excluded.embedding,
+            embedding_q = excluded.embedding_q,
+            embedding_scale = excluded.embedding_scale
+    """
+
+    def _tidb_upsert_message_sql(self) -> str:
+        return f"""
+            INSERT INTO {self.tidb_table} (
+                message_id, server_id, channel_id, user_id, user_name, message, timestamp, embedding
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                user_name = VALUES(user_name),
+                message = VALUES(message),
+                timestamp = VALUES(timestamp),
+                embedding = VALUES(embedding)
+        """
+
+    @staticmethod
+    def _message_embedding_params(
+        message_id: int,
+        server_id: int,
+        channel_id: int,
+        user_id: int,
+        user_name: str,
+        message: str,
+        timestamp_iso: str,
+        embedding: np.ndarray,
+        *,
+        zero_copy: bool = False,
+    ) -> tuple[Any, ...]:
+        """메시지 임베딩 upsert용 파라미터 튜플을 만듭니다.
+
+        LOCAL_EMBEDDING_NORMALIZE가 켜져 있으면 벡터를 단위 길이로 맞춘다.
+        """
+        return (
+            str(message_id),
+            str(server_id),
+            str(channel_id),
+            str(user_id),
+            user_name,
+            message,
+            timestamp_iso,
+            _embedding_blob(_stored_embedding(embedding), zero_copy=zero_copy),
+        )
+
+    def unchanged_memory_ids(self, digests: dict[str, bytes]) -> set[str]:
+        """이미 같은 내용으로 기록한 memory_id 집합을 반환합니다.
+
+        호출자는 여기 든 유닛의 요약/encode/upsert를 건너뛸 수 있다.
+        """
+        return {
+            memory_id
+            for memory_id, digest in digests.items()
+            if self._written_digests.get(f"memory:{memory_id}") == digest
+        }
+
+    def _digest_unchanged(self, key: str, digest: bytes) -> bool:
+        """key 행을 같은 digest로 이미 기록했으면 True."""
+        if self._written_digests.get(key) != digest:
+            return False
+        self._written_digests.move_to_end(key)
+        return True
+
+    def _remember_digests(self, items: Iterable[tuple[str, bytes]]) -> None:
+        """커밋된 행의 digest를 LRU 상한 안에서 기록합니다."""
+        limit = int(getattr(config, "DISCORD_EMBEDDING_DIGEST_CACHE_SIZE", 0) or 0)
+        if limit <= 0:
+            self._written_digests.clear()
+            return
+        for key, digest in items:
+            self._written_digests.pop(key, None)
+            self._written_digests[key] = digest
+        while len(self._written_digests) > limit:
+            self._written_digests.popitem(last=False)
+
+    def _forget_digests(self, keys: Iterable[str]) -> None:
+        """삭제된 행의 digest를 지워 같은 내용이 다시 오면 기록되게 합니다."""
+        for key in keys:
+            self._written_digests.pop(key, None)
+
+    def _invalidate_matrices(self, scopes: Iterable[tuple[Any, Any]] | None = None) -> None:
+        """메시지 쓰기/삭제 뒤 행렬 캐시를 버립니다.
+
+        scopes는 바뀐 (server_id, channel_id) 목록이며, None이면 전부 버린다.
+        """
+        self._matrix_generation += 1
+        if scopes is None:
+            self._matrix_cache.clear()
+            return
+        changed = {(str(server_id), str(channel_id)) for server_id, channel_id in scopes}
+        for key in [key for key in self._matrix_cache if key[:2] in changed]:
+            del self._matrix_cache[key]
+
     async def upsert_message_embedding(
         self,
         message_id: int,
@@ -914,63 +2307,220 @@ class DiscordEmbeddingStore:
         timestamp_iso: str,
         embedding: np.ndarray,
     ) -> None:
-        """메시지의 임베딩을 저장하거나 갱신합니다."""
+        """메시지의 임베딩을 저장하거나 갱신합니다.
+
+        DISCORD_EMBEDDING_WRITE_BACK_SECONDS가 양수이면 바로 쓰지 않고 버퍼에
+        모아 두었다가 그 시간 뒤(또는 버퍼가 가득 차면 즉시) 한 트랜잭션으로
+        기록합니다. 이 저장소의 조회/삭제/close는 먼저 버퍼를 반영합니다.
+        """
+        row = (
+            message_id,
+            server_id,
+            channel_id,
+            user_id,
+            user_name,
+            message,
+            timestamp_iso,
+            embedding,
+        )
+        delay = float(getattr(config, "DISCORD_EMBEDDING_WRITE_BACK_SECONDS", 0.0) or 0.0)
+        if delay <= 0:
+            await self.upsert_many_message_embeddings([row])
+            return
+
+        self._ensure_writable()
+        # schema/의존성 오류는 백그라운드 flush가 아니라 호출자에게 드러낸다.
+        await self.initialize()
+        if _get_numpy() is None:
+            raise RuntimeError("numpy가 설치되어 있지 않아 임베딩을 저장할 수 없습니다.")
+        key = str(message_id)
+        self._pending_messages.pop(key, None)
+        self._pending_messages[key] = row
+        max_rows = int(getattr(config, "DISCORD_EMBEDDING_WRITE_BACK_MAX_ROWS", 1000))
+        if len(self._pending_messages) >= max_rows:
+            await self.flush_pending_embeddings()
+        elif self._pending_flush_task is None or self._pending_flush_task.done():
+            self._pending_flush_task = asyncio.create_task(
+                self._flush_pending_later(delay)
+            )
+
+    async def _flush_pending_later(self, delay: float) -> None:
+        """write-back 지연 뒤 버퍼를 기록합니다. 실패한 행은 버퍼에 남습니다."""
+        await asyncio.sleep(delay)
+        try:
+            await self.flush_pending_embeddings()
+        except Exception as exc:
+            logger.error("Discord 임베딩 write-back 버퍼 기록 실패: %s", exc, exc_info=True)
+
+    async def flush_pending_embeddings(self) -> int:
+        """write-back 버퍼의 임베딩을 한 트랜잭션으로 기록하고 기록한 행 수를 반환합니다."""
+        async with self._pending_flush_lock:
+            if not self._pending_messages:
+                return 0
+            rows = list(self._pending_messages.values())
+            self._pending_messages.clear()
+            try:
+                return await self.upsert_many_message_embeddings(rows)
+            except BaseException:
+                # 기록 중 더 새 값이 들어온 메시지는 그 값을 유지한다.
+                for row in rows:
+                    self._pending_messages.setdefault(str(row[0]), row)
+                raise
+
+    async def upsert_many_message_embeddings(
+        self,
+        rows: Iterable[tuple[Any, ...]],
+    ) -> int:
+        """여러 메시지 임베딩을 한 트랜잭션으로 저장하거나 갱신합니다.
+
+        Args:
+            rows: ``upsert_message_embedding`` 인자 순서와 같은
+                ``(message_id, server_id, channel_id, user_id, user_name,
+                message, timestamp_iso, embedding)`` 튜플들.
+
+        Returns:
+            실제로 기록한 행 수. 이 프로세스가 모든 컬럼과 임베딩이 같은 값으로
+            이미 기록한 행은 건너뛴다.
+        """
         self._ensure_writable()
         await self.initialize()
         if _get_numpy() is None:
             raise RuntimeError("numpy가 설치되어 있지 않아 임베딩을 저장할 수 없습니다.")
-        embedding_bytes = np.asarray(embedding, dtype=np.float32).tobytes()
+        digests: list[tuple[str, bytes]] = []
+        changed_rows = []
+        for row in rows:
+            key = f"message:{row[0]}"
+            digest = message_row_digest(row)
+            if self._digest_unchanged(key, digest):
+                continue
+            digests.append((key, digest))
+            changed_rows.append(row)
+        # 문장 컴파일과 fsync를 행마다 반복하지 않도록 파라미터를 먼저 만들고
+        # executemany 한 번 + commit 한 번으로 기록한다.
+        zero_copy = self.backend != "tidb"
+        params = [
+            self._message_embedding_params(*row, zero_copy=zero_copy)
+            for row in changed_rows
+        ]
+        if not params:
+            return 0
         if self.backend == "tidb":
-            query = f"""
-                INSERT INTO {self.tidb_table} (
-                    message_id, server_id, channel_id, user_id, user_name, message, timestamp, embedding
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    user_name = VALUES(user_name),
-                    message = VALUES(message),
-                    timestamp = VALUES(timestamp),
-                    embedding = VALUES(embedding)
-            """
             await asyncio.to_thread(
-                self._tidb_exec,
-                query,
-                (
-                    str(message_id),
-                    str(server_id),
-                    str(channel_id),
-                    str(user_id),
-                    user_name,
-                    message,
-                    timestamp_iso,
-                    embedding_bytes,
-                ),
+                self._tidb_executemany,
+                self._tidb_upsert_message_sql(),
+                params,
             )
+            self._remember_digests(digests)
+            self._invalidate_matrices((row[1], row[2]) for row in changed_rows)
+            return len(params)
+
+        query = self._SQLITE_UPSERT_MESSAGE_SQL
+        float_params = params
+        if self._quantized_columns:
+            query = self._SQLITE_UPSERT_QUANTIZED_MESSAGE_SQL
+            storage = _compact_storage_dtype()
+            drop_float32 = _drop_float32_source()
+            params = [
+                self._quantized_message_params(
+                    row, storage=storage, drop_float32=drop_float32
+                )
+                for row in params
+            ]
+        async with self._sqlite_connect() as db:
+            await db.executemany(query, params)
+            if self._binary_column:
+                await db.executemany(
+                    self._BINARY_UPDATE_SQL,
+                    [
+                        (_binary_code(np.frombuffer(row[7], dtype=np.float32)), row[0])
+                        for row in float_params
+                    ],
+                )
+            await self._mirror_knn_rows(db, float_params)
+            await db.commit()
+        if self._hnsw_enabled:
+            # lock 순서는 항상 _hnsw_lock -> SQLite 연결이다.
+            async with self._hnsw_lock:
+                await self._hnsw_add_rows(float_params)
+        self._remember_digests(digests)
+        self._invalidate_matrices((row[1], row[2]) for row in changed_rows)
+        self._schedule_checkpoint()
+        return len(params)
+
+    def _schedule_checkpoint(self) -> None:
+        """SQLite 쓰기 뒤 checkpoint 주기가 지났으면 백그라운드 checkpoint를 시작합니다."""
+        interval = float(getattr(config, "DISCORD_EMBEDDING_CHECKPOINT_SECONDS", 0.0) or 0.0)
+        if interval <= 0 or self.backend == "tidb" or self.read_only:
+            return
+        if time.monotonic() - self._last_checkpoint < interval:
+            return
+        if self._checkpoint_task is not None and not self._checkpoint_task.done():
             return
+        self._last_checkpoint = time.monotonic()
+        self._checkpoint_task = asyncio.create_task(self._checkpoint_in_background())
+
+    async def _checkpoint_in_background(self) -> None:
+        """백그라운드 checkpoint. 실패는 기록만 하고 다음 주기에 다시 시도한다."""
+        try:
+            await self.checkpoint()
+        except Exception as exc:
+            logger.error("Discord 임베딩 WAL checkpoint 실패: %s", exc, exc_info=True)
 
+    async def checkpoint(self) -> None:
+        """WAL을 DB 파일에 반영해 잘라내고, 빈 페이지를 일부 돌려줍니다.
+
+        wal_autocheckpoint는 WAL 파일 크기를 줄이지 않으므로 TRUNCATE로
+        주기적으로 비운다. 다른 연결이 읽는 중이면 끝까지 진행하지 못하고
+        다음 주기에 다시 시도한다.
+        """
+        self._ensure_writable()
+        if self.backend == "tidb":
+            return
+        await self.initialize()
+        started = time.perf_counter()
+        vacuum_pages = int(getattr(config, "DISCORD_EMBEDDING_VACUUM_PAGES", 0) or 0)
         async with self._sqlite_connect() as db:
-            await db.execute(
-                """
-                INSERT INTO discord_chat_embeddings (
-                    message_id, server_id, channel_id, user_id, user_name, message, timestamp, embedding
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(message_id) DO UPDATE SET
-                    user_name = excluded.user_name,
-                    message = excluded.message,
-                    timestamp = excluded.timestamp,
-                    embedding = excluded.embedding
-                """,
-                (
-                    str(message_id),
-                    str(server_id),
-                    str(channel_id),
-                    str(user_id),
-                    user_name,
-                    message,
-                    timestamp_iso,
-                    embedding_bytes,
-                ),
+            if vacuum_pages > 0:
+                # incremental_vacuum은 step마다 한 페이지씩 처리하는데 execute()는 결과
+                # 컬럼이 없는 문장을 한 번만 step하므로, 끝까지 실행하는
+                # executescript로 돌린다. 돌려준 페이지 변경도 WAL에 쌓이므로
+                # checkpoint보다 먼저 한다.
+                await db.executescript(f"PRAGMA incremental_vacuum({vacuum_pages});")
+            async with db.execute("PRAGMA wal_checkpoint(TRUNCATE)") as cursor:
+                row = await cursor.fetchone()
+        self._last_checkpoint = time.monotonic()
+        elapsed = time.perf_counter() - started
+        if row and int(row[0] or 0):
+            logger.warning(
+                "Discord 임베딩 WAL checkpoint가 다른 연결 때문에 완료되지 못했습니다: %s",
+                tuple(row),
             )
-            await db.commit()
+        if elapsed >= 1.0:
+            logger.warning("Discord 임베딩 WAL checkpoint가 %.2f초 걸렸습니다.", elapsed)
+
+    @staticmethod
+    def _quantized_message_params(
+        row: tuple[Any, ...],
+        *,
+        storage: str | None,
+        drop_float32: bool = False,
+    ) -> tuple[Any, ...]:
+        """float32 upsert 파라미터를 embedding_q 컬럼이 있는 테이블용으로 바꿉니다.
+
+        storage가 None이면 float32를 그대로 쓰고 embedding_q를 비워, 예전에
+        압축된 행이 새 값보다 우선 읽히지 않게 한다. drop_float32가 아니면
+        float32 원본도 그대로 남긴다.
+        """
+        *fields, embedding_bytes = row
+        if storage is None:
+            return (*fields, embedding_bytes, None, None)
+        vector = np.frombuffer(embedding_bytes, dtype=np.float32)
+        # embedding 컬럼은 NOT NULL이라 비울 때는 빈 BLOB을 남긴다.
+        stored_float32 = b"" if drop_float32 else embedding_bytes
+        if storage == "float16":
+            return (*fields, stored_float32, vector.astype(np.float16).tobytes(), None)
+        quantized, scale = _quantize_int8(vector)
+        return (*fields, stored_float32, quantized, scale)
 
     async def fetch_recent_embeddings(
         self,
@@ -978,9 +2528,16 @@ class DiscordEmbeddingStore:
         channel_id: int,
         user_id: int | None = None,
         limit: int = 200,
+        query_vector: "np.ndarray | None" = None,
     ) -> list[aiosqlite.Row]:
-        """지정한 범위의 최신 임베딩 레코드를 반환합니다."""
+        """지정한 범위의 최신 임베딩 레코드를 반환합니다.
+
+        query_vector가 있고 vec0 인덱스를 쓸 수 있으면 최신순 대신 그 벡터에
+        가까운 순으로 limit개를 반환한다. 인덱스가 없으면 인자를 무시한다.
+        """
         await self.initialize()
+        if self._pending_messages:
+            await self.flush_pending_embeddings()
         if self.backend == "tidb":
             query = (
                 f"SELECT message_id, user_id, user_name, message, timestamp, embedding "
@@ -995,23 +2552,574 @@ class DiscordEmbeddingStore:
             rows = await asyncio.to_thread(self._tidb_exec, query, tuple(params), fetch=True)
             return rows or []
 
+        if query_vector is not None and self._vec0_search_available:
+            rows = await self._fetch_knn_embeddings(
+                server_id,
+                channel_id,
+                user_id=user_id,
+                limit=limit,
+                query_vector=query_vector,
+            )
+            if rows is not None:
+                return rows
+        if query_vector is not None and self._hnsw_enabled:
+            rows = await self._fetch_hnsw_candidates(
+                server_id,
+                channel_id,
+                user_id=user_id,
+                limit=limit,
+                query_vector=query_vector,
+            )
+            if rows is not None:
+                return rows
+        if query_vector is not None and self._binary_column:
+            rows = await self._fetch_binary_candidates(
+                server_id,
+                channel_id,
+                user_id=user_id,
+                limit=limit,
+                query_vector=query_vector,
+            )
+            if rows is not None:
+                return rows
+
+        query, params = self._sqlite_recent_query(server_id, channel_id, user_id, limit)
+        async with self._sqlite_connect() as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+        if self._quantized_columns:
+            return [self._dequantized_row(row) for row in rows]
+        return rows
+
+    def _sqlite_recent_query(
+        self,
+        server_id: int,
+        channel_id: int,
+        user_id: int | None,
+        limit: int,
+    ) -> tuple[str, list[str | int]]:
+        """최신 임베딩 조회 SQL과 파라미터를 만듭니다. 컬럼 순서는 _RECENT_COLUMNS를 따른다."""
+        query = self._SQLITE_RECENT_SQL[(bool(self._quantized_columns), user_id is not None)]
+        params: list[str | int] = [str(server_id), str(channel_id)]
+        if user_id is not None:
+            params.append(str(user_id))
+        params.append(int(limit))
+        return query, params
+
+    async def iter_recent_embeddings(
+        self,
+        server_id: int,
+        channel_id: int,
+        user_id: int | None = None,
+        limit: int = 200,
+    ) -> AsyncIterator[tuple[Any, ...]]:
+        """최신 임베딩을 ``_RECENT_COLUMNS`` 순서의 tuple로 하나씩 내보냅니다.
+
+        SQLite 백엔드는 커서에서 작은 묶음씩 읽어 전체 행 목록을 만들지 않는다.
+        반복하는 동안 공유 연결을 점유하므로 끝까지 빠르게 소비해야 한다.
+        embedding은 항상 float32 BLOB이며 int8 행은 복원해서 내보낸다.
+        """
+        async for row, quantized, scale in self._iter_recent_rows(
+            server_id,
+            channel_id,
+            user_id=user_id,
+            limit=limit,
+        ):
+            if quantized is not None:
+                row = (*row[:-1], _decode_compact_embedding(quantized, scale).tobytes())
+            yield row
+
+    async def _iter_recent_rows(
+        self,
+        server_id: int,
+        channel_id: int,
+        *,
+        user_id: int | None,
+        limit: int,
+    ) -> AsyncIterator[tuple[tuple[Any, ...], Any, Any]]:
+        """최신 행을 ``(row, embedding_q, embedding_scale)``로 복원 없이 내보냅니다.
+
+        embedding_q가 없는 행은 뒤 두 값이 None이다. 행렬을 만드는 쪽이 압축
+        벡터를 버퍼에 바로 풀 수 있도록 float32 BLOB 복원을 호출자에게 맡긴다.
+        """
+        await self.initialize()
+        if self._pending_messages:
+            await self.flush_pending_embeddings()
+        if self.backend == "tidb":
+            for row in await self.fetch_recent_embeddings(
+                server_id,
+                channel_id,
+                user_id=user_id,
+                limit=limit,
+            ):
+                yield tuple(row.get(name) for name in self._RECENT_COLUMNS), None, None
+            return
+
+        query, params = self._sqlite_recent_query(server_id, channel_id, user_id, limit)
+        width = len(self._RECENT_COLUMNS)
+        async with self._sqlite_connect() as db:
+            async with db.execute(query, params) as cursor:
+                cursor.row_factory = None
+                cursor.arraysize = _STORE_ITER_BATCH_ROWS
+                async for row in cursor:
+                    if len(row) > width:
+                        yield row[:width], row[width], row[width + 1]
+                    else:
+                        yield row, None, None
+
+    async def _fetch_knn_embeddings(
+        self,
+        server_id: int,
+        channel_id: int,
+        *,
+        user_id: int | None,
+        limit: int,
+        query_vector: "np.ndarray",
+    ) -> list[Any] | None:
+        """vec0 MATCH로 가까운 행을 가져옵니다. 쓸 수 없으면 None을 반환합니다."""
+        vector = np.ascontiguousarray(query_vector, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self._knn_dimension:
+            return None
+        columns = ["message_id", "user_id", "user_name", "message", "timestamp", "embedding"]
+        if self._quantized_columns:
+            columns += ["embedding_q", "embedding_scale"]
+        knn_filter = "embedding MATCH ? AND k = ? AND scope_key = ?"
+        params: list[Any] = [
+            memoryview(vector).cast("B"),
+            int(limit),
+            f"{server_id}:{channel_id}",
+        ]
+        if user_id is not None:
+            knn_filter += " AND user_id = ?"
+            params.append(str(user_id))
         query = (
-            "SELECT message_id, user_id, user_name, message, timestamp, embedding "
-            "FROM discord_chat_embeddings WHERE server_id = ? AND channel_id = ?"
+            f"SELECT {', '.join('e.' + name for name in columns)} "
+            f"FROM (SELECT rowid, distance FROM {self._KNN_TABLE} WHERE {knn_filter}) AS knn "
+            "JOIN discord_chat_embeddings AS e ON e.id = knn.rowid "
+            "ORDER BY knn.distance"
+        )
+        try:
+            async with self._sqlite_connect() as db:
+                db.row_factory = aiosqlite.Row
+                async with db.execute(query, params) as cursor:
+                    rows = await cursor.fetchall()
+        except aiosqlite.Error as exc:
+            logger.warning("Discord 임베딩 vec0 검색 실패, 최신순 스캔으로 대체합니다: %s", exc)
+            self._knn_search_failed = True
+            return None
+        if self._quantized_columns:
+            return [self._dequantized_row(row) for row in rows]
+        return rows
+
+    async def _fetch_binary_candidates(
+        self,
+        server_id: int,
+        channel_id: int,
+        *,
+        user_id: int | None,
+        limit: int,
+        query_vector: "np.ndarray",
+    ) -> list[Any] | None:
+        """1비트 코드 Hamming 거리로 후보를 뽑고 원본 벡터로 다시 정렬합니다.
+
+        코드가 없거나 차원이 맞지 않으면 None을 반환해 최신순 조회로 넘긴다.
+        """
+        vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        query_code = np.frombuffer(_binary_code(vector), dtype=np.uint8)
+        scan_query = (
+            "SELECT id, embedding_bin FROM discord_chat_embeddings "
+            "WHERE server_id = ? AND channel_id = ? AND embedding_bin IS NOT NULL"
         )
         params: list[str | int] = [str(server_id), str(channel_id)]
         if user_id is not None:
-            query += " AND user_id = ?"
+            scan_query += " AND user_id = ?"
             params.append(str(user_id))
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(int(limit))
+        scan_query += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(int(getattr(config, "DISCORD_EMBEDDING_BINARY_SCAN_LIMIT", 20000)))
+        async with self._sqlite_connect() as db:
+            async with db.execute(scan_query, params) as cursor:
+                cursor.row_factory = None
+                scanned = [
+                    row for row in await cursor.fetchall()
+                    if row[1] is not None and len(row[1]) == query_code.size
+                ]
+        if not scanned:
+            return None
+
+        codes = np.frombuffer(
+            b"".join(bytes(row[1]) for row in scanned),
+            dtype=np.uint8,
+        ).reshape(len(scanned), query_code.size)
+        distances = _hamming_distances(codes, query_code)
+        oversample = int(getattr(config, "DISCORD_EMBEDDING_BINARY_OVERSAMPLE", 4))
+        candidate_count = min(len(scanned), max(1, int(limit)) * oversample)
+        if candidate_count < len(scanned):
+            picked = np.argpartition(distances, candidate_count - 1)[:candidate_count]
+        else:
+            picked = np.arange(len(scanned))
+        candidate_ids = [int(scanned[index][0]) for index in picked]
 
+        columns = list(self._RECENT_COLUMNS)
+        if self._quantized_columns:
+            columns += ["embedding_q", "embedding_scale"]
         async with self._sqlite_connect() as db:
             db.row_factory = aiosqlite.Row
-            async with db.execute(query, params) as cursor:
+            async with db.execute(
+                f"SELECT {', '.join(columns)} FROM discord_chat_embeddings "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(candidate_ids),),
+            ) as cursor:
                 rows = await cursor.fetchall()
+        if self._quantized_columns:
+            rows = [self._dequantized_row(row) for row in rows]
+
+        # 1비트 거리는 거친 순위라, 원본 벡터 코사인으로 limit개를 다시 고른다.
+        indexes, matrix = embedding_blobs_to_matrix(row["embedding"] for row in rows)
+        if not indexes or matrix.shape[1] != vector.size:
+            return None
+        if self._unit_normalized:
+            # 저장 행이 단위 길이면 질의만 정규화해 내적 하나로 코사인을 낸다.
+            similarities = matrix @ _unit_embedding(vector)
+        else:
+            norms = np.linalg.norm(matrix, axis=1) * max(float(np.linalg.norm(vector)), 1e-12)
+            similarities = (matrix @ vector) / np.maximum(norms, 1e-12)
+        order = np.argsort(-similarities, kind="stable")[: max(0, int(limit))]
+        return [rows[indexes[position]] for position in order]
+
+    async def _fetch_hnsw_candidates(
+        self,
+        server_id: int,
+        channel_id: int,
+        *,
+        user_id: int | None,
+        limit: int,
+        query_vector: "np.ndarray",
+    ) -> list[Any] | None:
+        """HNSW 인덱스에서 범위 안의 가까운 행을 가져옵니다.
+
+        인덱스를 쓸 수 없으면(행이 적거나 차원이 다르면) None을 반환해 다음
+        경로로 넘긴다.
+        """
+        vector = np.ascontiguousarray(query_vector, dtype=np.float32).reshape(-1)
+        scope_key = f"{server_id}:{channel_id}"
+        user_key = str(user_id) if user_id is not None else None
+        async with self._hnsw_lock:
+            index = await self._ensure_hnsw_index()
+            if index is None or index.dim != vector.size:
+                return None
+            available = self._hnsw_scope_counts[(scope_key, user_key)]
+            k = min(max(0, int(limit)), available)
+            if k == 0:
+                return []
+            labels_by_id = self._hnsw_labels
+
+            def _in_scope(label: int) -> bool:
+                meta = labels_by_id.get(int(label))
+                return (
+                    meta is not None
+                    and meta[0] == scope_key
+                    and (user_key is None or meta[1] == user_key)
+                )
+
+            index.set_ef(max(int(getattr(config, "DISCORD_EMBEDDING_HNSW_EF", 64)), k))
+            try:
+                labels, _ = await asyncio.to_thread(
+                    index.knn_query, vector, k=k, filter=_in_scope
+                )
+            except RuntimeError as exc:
+                logger.warning("Discord 임베딩 HNSW 검색 실패, 다른 경로로 대체합니다: %s", exc)
+                return None
+        candidate_ids = [int(label) for label in labels[0]]
+
+        columns = list(self._RECENT_COLUMNS)
+        if self._quantized_columns:
+            columns += ["embedding_q", "embedding_scale"]
+        async with self._sqlite_connect() as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(
+                f"SELECT id, {', '.join(columns)} FROM discord_chat_embeddings "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(candidate_ids),),
+            ) as cursor:
+                fetched = {int(row["id"]): row for row in await cursor.fetchall()}
+        rows = [fetched[row_id] for row_id in candidate_ids if row_id in fetched]
+        if self._quantized_columns:
+            rows = [self._dequantized_row(row) for row in rows]
+        else:
+            rows = [dict(row) for row in rows]
+        for row in rows:
+            row.pop("id", None)
         return rows
 
+    async def _ensure_hnsw_index(self) -> Any | None:
+        """HNSW 인덱스가 없고 행이 충분하면 DB 전체에서 만듭니다. _hnsw_lock 안에서 호출한다.
+
+        이 저장소의 쓰기는 인덱스에 바로 반영하지만, 재색인 스크립트나 다른
+        프로세스처럼 다른 연결이 커밋하면 PRAGMA data_version이 바뀐다. 그때는
+        인덱스를 버리고 DB에서 다시 만든다.
+        """
+        async with self._sqlite_connect() as db:
+            async with db.execute("PRAGMA data_version") as cursor:
+                row = await cursor.fetchone()
+            version = (self._sqlite_conn_generation, int(row[0] if row else 0))
+        if version != self._hnsw_source_version:
+            if self._hnsw_index is not None:
+                logger.info("다른 연결이 Discord 임베딩을 바꿔 HNSW 인덱스를 다시 만듭니다.")
+            self._reset_hnsw_index()
+            self._hnsw_source_version = version
+        if self._hnsw_index is not None:
+            return self._hnsw_index
+        min_rows = int(getattr(config, "DISCORD_EMBEDDING_HNSW_MIN_ROWS", 1000))
+        if self._hnsw_row_estimate is None:
+            async with self._sqlite_connect() as db:
+                async with db.execute("SELECT COUNT(*) FROM discord_chat_embeddings") as cursor:
+                    row = await cursor.fetchone()
+            self._hnsw_row_estimate = int(row[0] if row else 0)
+        # 행이 적으면 최신순/1비트 경로로 전부 계산하는 편이 빠르고 정확하다.
+        if self._hnsw_row_estimate < max(1, min_rows):
+            return None
+
+        labels: list[int] = []
+        metas: list[tuple[str, str]] = []
+        vectors: list["np.ndarray"] = []
+        compact = ", embedding_q, embedding_scale" if self._quantized_columns else ""
+        async with self._sqlite_connect() as db:
+            async with db.execute(
+                f"SELECT id, server_id, channel_id, user_id, embedding{compact} "
+                "FROM discord_chat_embeddings"
+            ) as cursor:
+                cursor.row_factory = None
+                cursor.arraysize = _STORE_ITER_BATCH_ROWS
+                async for row in cursor:
+                    vector = self._hnsw_vector(row[4], *(row[5:7] if compact else (None, None)))
+                    if vector is None:
+                        continue
+                    labels.append(int(row[0]))
+                    metas.append((f"{row[1]}:{row[2]}", str(row[3])))
+                    vectors.append(vector)
+        self._hnsw_row_estimate = len(labels)
+        if len(labels) < max(1, min_rows):
+            return None
+        dimension = vectors[0].size
+        kept = [position for position, vector in enumerate(vectors) if vector.size == dimension]
+        matrix = np.stack([vectors[position] for position in kept])
+        kept_labels = np.asarray([labels[position] for position in kept], dtype=np.int64)
+
+        def _build() -> Any:
+            index = hnswlib.Index(space="cosine", dim=dimension)
+            index.init_index(max_elements=max(1024, len(kept) * 2), ef_construction=200, M=16)
+            index.add_items(matrix, kept_labels)
+            return index
+
+        started = time.perf_counter()
+        self._hnsw_index = await asyncio.to_thread(_build)
+        for position in kept:
+            self._hnsw_track(labels[position], metas[position])
+        logger.info(
+            "Discord 임베딩 HNSW 인덱스 생성: %d행, %.2f초",
+            len(kept),
+            time.perf_counter() - started,
+        )
+        return self._hnsw_index
+
+    def _reset_hnsw_index(self) -> None:
+        """HNSW 인덱스와 라벨, 행 수 추정치를 모두 버립니다."""
+        self._hnsw_index = None
+        self._hnsw_labels = {}
+        self._hnsw_scope_counts = Counter()
+        self._hnsw_row_estimate = None
+        self._hnsw_source_version = None
+
+    @staticmethod
+    def _hnsw_vector(blob: Any, quantized: Any, scale: Any) -> "np.ndarray | None":
+        """저장된 행에서 float32 벡터를 꺼냅니다. 비어 있으면 None."""
+        if quantized is not None:
+            return _decode_compact_embedding(quantized, scale)
+        if not blob or len(blob) % 4:
+            return None
+        return np.frombuffer(blob, dtype=np.float32)
+
+    def _hnsw_track(self, label: int, meta: tuple[str, str]) -> None:
+        """라벨의 범위 정보를 기록하고 필터별 행 수를 맞춥니다."""
+        previous = self._hnsw_labels.get(label)
+        if previous == meta:
+            return
+        if previous is not None:
+            self._hnsw_untrack(label)
+        self._hnsw_labels[label] = meta
+        self._hnsw_scope_counts[(meta[0], None)] += 1
+        self._hnsw_scope_counts[meta] += 1
+
+    def _hnsw_untrack(self, label: int) -> None:
+        meta = self._hnsw_labels.pop(label, None)
+        if meta is None:
+            return
+        self._hnsw_scope_counts[(meta[0], None)] -= 1
+        self._hnsw_scope_counts[meta] -= 1
+
+    async def _hnsw_add_rows(self, rows: list[tuple[Any, ...]]) -> None:
+        """upsert한 float32 행을 HNSW 인덱스에 반영합니다. _hnsw_lock 안에서 호출한다.
+
+        인덱스가 아직 없으면 행 수 추정치만 늘린다.
+        """
+        if self._hnsw_index is None:
+            if self._hnsw_row_estimate is not None:
+                self._hnsw_row_estimate += len(rows)
+            return
+        async with self._sqlite_connect() as db:
+            async with db.execute(
+                "SELECT id, message_id FROM discord_chat_embeddings "
+                "WHERE message_id IN (SELECT value FROM json_each(?))",
+                (json.dumps([str(row[0]) for row in rows]),),
+            ) as cursor:
+                ids = {
+                    str(message_id): int(row_id)
+                    for row_id, message_id in await cursor.fetchall()
+                }
+        index = self._hnsw_index
+        labels: list[int] = []
+        vectors: list["np.ndarray"] = []
+        for row in rows:
+            row_id = ids.get(str(row[0]))
+            vector = np.frombuffer(row[7], dtype=np.float32)
+            if row_id is None or vector.size != index.dim:
+                continue
+            labels.append(row_id)
+            vectors.append(vector)
+            self._hnsw_track(row_id, (f"{row[1]}:{row[2]}", str(row[3])))
+        if not labels:
+            return
+        needed = index.get_current_count() + len(labels)
+        if needed > index.get_max_elements():
+            index.resize_index(needed * 2)
+        # 이미 있는 라벨(같은 메시지 갱신)은 hnswlib가 벡터를 교체한다.
+        index.add_items(np.stack(vectors), np.asarray(labels, dtype=np.int64))
+
+    async def _hnsw_delete_rows(self, ids: list[str]) -> None:
+        """삭제할 메시지의 라벨을 HNSW 인덱스에서 지웁니다.
+
+        행 삭제 전에 _hnsw_lock 안에서 호출한다.
+        """
+        if self._hnsw_index is None:
+            if self._hnsw_row_estimate is not None:
+                self._hnsw_row_estimate = max(0, self._hnsw_row_estimate - len(ids))
+            return
+        async with self._sqlite_connect() as db:
+            async with db.execute(
+                "SELECT id FROM discord_chat_embeddings "
+                "WHERE message_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(ids),),
+            ) as cursor:
+                labels = [int(row[0]) for row in await cursor.fetchall()]
+        for label in labels:
+            if label in self._hnsw_labels:
+                self._hnsw_index.mark_deleted(label)
+                self._hnsw_untrack(label)
+
+    @staticmethod
+    def _dequantized_row(row: aiosqlite.Row) -> dict[str, Any]:
+        """float16/int8로 저장된 행의 embedding을 float32 BLOB으로 되돌린 dict를 만듭니다."""
+        record = dict(row)
+        quantized = record.pop("embedding_q", None)
+        scale = record.pop("embedding_scale", None)
+        if quantized is not None and _get_numpy() is not None:
+            record["embedding"] = _decode_compact_embedding(quantized, scale).tobytes()
+        return record
+
+    async def fetch_recent_matrix(
+        self,
+        server_id: int,
+        channel_id: int,
+        user_id: int | None = None,
+        limit: int = 200,
+    ) -> tuple[list[str], "np.ndarray", list[dict[str, Any]]]:
+        """최신 임베딩을 순위 계산용 ``(N, D)`` 행렬로 반환합니다.
+
+        Returns:
+            ``(message_ids, matrix, metadata)``. 세 값의 i번째 항목은 같은 행을
+            가리키며, metadata에는 embedding을 제외한 컬럼이 들어 있다.
+            DISCORD_EMBEDDING_MATRIX_CACHE_SIZE가 양수이면 같은 범위의 다음
+            호출이 같은 객체를 돌려받을 수 있으므로 호출자는 고치지 않는다.
+            행렬 자료형은 DISCORD_EMBEDDING_MATRIX_DTYPE(float32/float16)를 따른다.
+        """
+        if _get_numpy() is None:
+            raise RuntimeError("numpy가 설치되어 있지 않아 임베딩 행렬을 만들 수 없습니다.")
+        await self.initialize()
+        if self._pending_messages:
+            await self.flush_pending_embeddings()
+        cache_size = int(getattr(config, "DISCORD_EMBEDDING_MATRIX_CACHE_SIZE", 0) or 0)
+        key = (
+            str(server_id),
+            str(channel_id),
+            str(user_id) if user_id is not None else None,
+            int(limit),
+        )
+        cached = self._matrix_cache.get(key) if cache_size > 0 else None
+        if cached is not None:
+            self._matrix_cache.move_to_end(key)
+            return cached
+        generation = self._matrix_generation
+        matrix_dtype = (
+            np.float16
+            if str(getattr(config, "DISCORD_EMBEDDING_MATRIX_DTYPE", "float32")).lower() == "float16"
+            else np.float32
+        )
+        # 행 목록을 만들지 않고 스트리밍으로 받아, 첫 유효 행에서 정한 차원으로
+        # limit 행짜리 버퍼를 한 번 잡아 바로 채운다. 검증 규칙은
+        # embedding_blobs_to_matrix와 같다(길이가 다르거나 빈 BLOB은 제외).
+        # int8/float16 압축 행은 float32 BLOB으로 되돌리지 않고 버퍼 행에 바로
+        # 풀어, 행마다 생기던 복원 배열과 bytes 복사를 없앤다.
+        matrix: "np.ndarray | None" = None
+        dimension = 0
+        count = 0
+        metadata: list[dict[str, Any]] = []
+        async for row, quantized, scale in self._iter_recent_rows(
+            server_id,
+            channel_id,
+            user_id=user_id,
+            limit=limit,
+        ):
+            if quantized is not None:
+                blob, itemsize = quantized, (1 if scale is not None else 2)
+            else:
+                blob, itemsize = row[-1], 4
+            if not isinstance(blob, (bytes, bytearray, memoryview)) or not len(blob):
+                continue
+            if matrix is None:
+                if len(blob) % itemsize:
+                    continue
+                dimension = len(blob) // itemsize
+                matrix = np.empty((max(1, int(limit)), dimension), dtype=matrix_dtype)
+            elif len(blob) != dimension * itemsize:
+                continue
+            if itemsize == 1:
+                np.multiply(
+                    np.frombuffer(blob, dtype=np.int8),
+                    np.float32(scale),
+                    out=matrix[count],
+                    casting="unsafe",
+                )
+            else:
+                matrix[count] = np.frombuffer(
+                    blob,
+                    dtype=np.float16 if itemsize == 2 else np.float32,
+                    count=dimension,
+                )
+            count += 1
+            metadata.append(dict(zip(self._RECENT_COLUMNS[:-1], row[:-1])))
+        if matrix is None:
+            matrix = np.empty((0, 0), dtype=matrix_dtype)
+        else:
+            matrix = matrix[:count]
+        message_ids = [str(row.get("message_id")) for row in metadata]
+        result = (message_ids, matrix, metadata)
+        if cache_size > 0 and generation == self._matrix_generation:
+            self._matrix_cache[key] = result
+            while len(self._matrix_cache) > cache_size:
+                self._matrix_cache.popitem(last=False)
+        return result
+
     async def upsert_memory_entry(
         self,
         *,
@@ -1033,18 +3141,95 @@ class DiscordEmbeddingStore:
         embedding: np.ndarray,
     ) -> None:
         """메모리 엔트리를 저장하거나 갱신합니다."""
+        await self.upsert_many_memory_entries(
+            [
+                {
+                    "memory_id": memory_id,
+                    "anchor_message_id": anchor_message_id,
+                    "server_id": server_id,
+                    "channel_id": channel_id,
+                    "owner_user_id": owner_user_id,
+                    "owner_user_name": owner_user_name,
+                    "memory_scope": memory_scope,
+                    "memory_type": memory_type,
+                    "summary_text": summary_text,
+                    "memory_text": memory_text,
+                    "raw_context": raw_context,
+                    "source_message_ids": source_message_ids,
+                    "speaker_names": speaker_names,
+                    "keywords": keywords,
+                    "timestamp_iso": timestamp_iso,
+                    "embedding": embedding,
+                }
+            ]
+        )
+
+    @staticmethod
+    def _memory_entry_params(
+        entry: dict[str, Any],
+        *,
+        zero_copy: bool,
+    ) -> tuple[Any, ...]:
+        """``upsert_memory_entry`` 키워드 dict를 INSERT 파라미터 순서로 바꿉니다."""
+        owner_user_id = entry.get("owner_user_id")
+        return (
+            entry["memory_id"],
+            str(entry["anchor_message_id"]),
+            str(entry["server_id"]),
+            str(entry["channel_id"]),
+            str(owner_user_id) if owner_user_id is not None else None,
+            entry["owner_user_name"],
+            entry["memory_scope"],
+            entry["memory_type"],
+            entry["summary_text"],
+            entry["memory_text"],
+            entry["raw_context"],
+            json.dumps([int(item) for item in entry["source_message_ids"]], ensure_ascii=False),
+            json.dumps(list(entry["speaker_names"]), ensure_ascii=False),
+            json.dumps(list(entry["keywords"]), ensure_ascii=False),
+            entry["timestamp_iso"],
+            _embedding_blob(_stored_embedding(entry["embedding"]), zero_copy=zero_copy),
+        )
+
+    async def upsert_many_memory_entries(
+        self,
+        entries: Iterable[dict[str, Any]],
+    ) -> int:
+        """여러 메모리 엔트리를 한 트랜잭션으로 저장하거나 갱신합니다.
+
+        Args:
+            entries: ``upsert_memory_entry`` 키워드 인자와 같은 키를 가진 dict들.
+                선택 키 ``content_digest``가 있으면 그 값으로 변경 여부를 보고,
+                없으면 ``memory_entry_digest``로 만든다.
+
+        Returns:
+            실제로 기록한 엔트리 수. 이 프로세스가 같은 내용으로 이미 기록한
+            엔트리는 건너뛴다.
+        """
         self._ensure_writable()
         await self.initialize()
         if _get_numpy() is None:
             raise RuntimeError("numpy가 설치되어 있지 않아 임베딩을 저장할 수 없습니다.")
-        embedding_bytes = np.asarray(embedding, dtype=np.float32).tobytes()
-        source_json = json.dumps([int(item) for item in source_message_ids], ensure_ascii=False)
-        speakers_json = json.dumps(list(speaker_names), ensure_ascii=False)
-        keywords_json = json.dumps(list(keywords), ensure_ascii=False)
-        owner_user_id_str = str(owner_user_id) if owner_user_id is not None else None
+        digests: list[tuple[str, bytes]] = []
+        changed_entries: list[dict[str, Any]] = []
+        for entry in entries:
+            key = f"memory:{entry['memory_id']}"
+            digest = entry.get("content_digest") or memory_entry_digest(entry)
+            if self._digest_unchanged(key, digest):
+                continue
+            digests.append((key, digest))
+            changed_entries.append(entry)
+        entries = changed_entries
+        if not entries:
+            return 0
+        # 윈도우 하나에서 나온 유닛들을 executemany 한 번 + commit 한 번으로 기록해
+        # 엔트리마다 WAL fsync를 반복하지 않는다.
+        params = [
+            self._memory_entry_params(entry, zero_copy=self.backend != "tidb")
+            for entry in entries
+        ]
 
         if self.backend == "tidb":
-            vector_literal = _vector_literal(embedding)
             has_vector_column = await asyncio.to_thread(
                 self._vector_column_exists,
             )
@@ -1075,25 +3260,10 @@ class DiscordEmbeddingStore:
                         embedding = VALUES(embedding),
                         embedding_vec = VALUES(embedding_vec)
                 """
-                query_params = (
-                    memory_id,
-                    str(anchor_message_id),
-                    str(server_id),
-                    str(channel_id),
-                    owner_user_id_str,
-                    owner_user_name,
-                    memory_scope,
-                    memory_type,
-                    summary_text,
-                    memory_text,
-                    raw_context,
-                    source_json,
-                    speakers_json,
-                    keywords_json,
-                    timestamp_iso,
-                    embedding_bytes,
-                    vector_literal,
-                )
+                params = [
+                    (*row, _vector_literal(entry["embedding"]))
+                    for row, entry in zip(params, entries)
+                ]
             else:
                 query = """
                     INSERT INTO discord_memory_entries (
@@ -1119,33 +3289,15 @@ class DiscordEmbeddingStore:
                         timestamp = VALUES(timestamp),
                         embedding = VALUES(embedding)
                 """
-                query_params = (
-                    memory_id,
-                    str(anchor_message_id),
-                    str(server_id),
-                    str(channel_id),
-                    owner_user_id_str,
-                    owner_user_name,
-                    memory_scope,
-                    memory_type,
-                    summary_text,
-                    memory_text,
-                    raw_context,
-                    source_json,
-                    speakers_json,
-                    keywords_json,
-                    timestamp_iso,
-                    embedding_bytes,
-                )
-            await asyncio.to_thread(
-                self._tidb_exec,
-                query,
-                query_params,
-            )
-            return
+            if len(params) == 1:
+                await asyncio.to_thread(self._tidb_exec, query, params[0])
+            else:
+                await asyncio.to_thread(self._tidb_executemany, query, params)
+            self._remember_digests(digests)
+            return len(params)
 
         async with self._sqlite_connect() as db:
-            await db.execute(
+            await db.executemany(
                 """
                 INSERT INTO discord_memory_entries (
                     memory_id, anchor_message_id, server_id, channel_id, owner_user_id, owner_user_name,
@@ -1166,26 +3318,11 @@ class DiscordEmbeddingStore:
                     timestamp = excluded.timestamp,
                     embedding = excluded.embedding
                 """,
-                (
-                    memory_id,
-                    str(anchor_message_id),
-                    str(server_id),
-                    str(channel_id),
-                    owner_user_id_str,
-                    owner_user_name,
-                    memory_scope,
-                    memory_type,
-                    summary_text,
-                    memory_text,
-                    raw_context,
-                    source_json,
-                    speakers_json,
-                    keywords_json,
-                    timestamp_iso,
-                    embedding_bytes,
-                ),
+                params,
             )
             await db.commit()
+        self._remember_digests(digests)
+        return len(params)
 
     def _vector_column_exists(self, *, force: bool = False) -> bool:
         """선택적 ``embedding_vec`` 열 존재를 짧은 부정 TTL과 함께 확인한다."""
@@ -1421,6 +3558,9 @@ class DiscordEmbeddingStore:
         """모든 메모리 엔트리를 삭제합니다."""
         self._ensure_writable()
         await self.initialize()
+        self._forget_digests(
+            [key for key in self._written_digests if key.startswith("memory:")]
+        )
         if self.backend == "tidb":
             await asyncio.to_thread(self._tidb_exec, "DELETE FROM discord_memory_entries", ())
             return
@@ -1435,17 +3575,15 @@ class DiscordEmbeddingStore:
         if not ids:
             return
         await self.initialize()
+        self._forget_digests(f"memory:{memory_id}" for memory_id in ids)
         if self.backend == "tidb":
             placeholders = ",".join(["%s"] * len(ids))
             query = f"DELETE FROM discord_memory_entries WHERE memory_id IN ({placeholders})"
             await asyncio.to_thread(self._tidb_exec, query, tuple(ids))
             return
-        placeholders = ",".join("?" for _ in ids)
+        # ID 개수와 관계없이 SQL 문자열을 하나로 고정해 캐시된 문장을 재사용한다.
         async with self._sqlite_connect() as db:
-            await db.execute(
-                f"DELETE FROM discord_memory_entries WHERE memory_id IN ({placeholders})",
-                ids,
-            )
+            await db.execute(self._SQLITE_DELETE_MEMORY_SQL, (json.dumps(ids),))
             await db.commit()
 
     async def count_memory_entries(
@@ -1483,18 +3621,35 @@ class DiscordEmbeddingStore:
         if not ids:
             return
         await self.initialize()
+        async with self._pending_flush_lock:
+            # 아직 버퍼에 있는 행은 DB에 쓰지 않고 버린다. flush와 겹치지 않도록
+            # 같은 lock 안에서 삭제까지 끝낸다.
+            for message_id in ids:
+                self._pending_messages.pop(message_id, None)
+            self._forget_digests(f"message:{message_id}" for message_id in ids)
+            await self._delete_embedding_rows(ids)
+            # 삭제는 message_id만 알아 어느 채널인지 모르므로 전부 버린다.
+            self._invalidate_matrices()
+        self._schedule_checkpoint()
+
+    async def _delete_embedding_rows(self, ids: list[str]) -> None:
+        """메시지 임베딩 행(과 vec0 인덱스 행)을 한 번에 삭제합니다."""
         if self.backend == "tidb":
             placeholders = ",".join(["%s"] * len(ids))
             query = f"DELETE FROM {self.tidb_table} WHERE message_id IN ({placeholders})"
             await asyncio.to_thread(self._tidb_exec, query, tuple(ids))
             return
 
-        placeholders = ",".join("?" for _ in ids)
+        if self._hnsw_enabled:
+            async with self._hnsw_lock:
+                await self._hnsw_delete_rows(ids)
         async with self._sqlite_connect() as db:
-            await db.execute(
-                f"DELETE FROM discord_chat_embeddings WHERE message_id IN ({placeholders})",
-                ids,
-            )
+            if self._knn_loaded and self._knn_dimension is not None:
+                await db.executemany(
+                    self._KNN_DELETE_SQL,
+                    [(message_id,) for message_id in ids],
+                )
+            await db.execute(self._SQLITE_DELETE_MESSAGES_SQL, (json.dumps(ids),))
             await db.commit()
 
 
@@ -1536,6 +3691,10 @@ class KakaoEmbeddingStore:
         self._vector_extension_unavailable = False
         self._window_size = 3
 
+        # 방별 read-only SQLite 연결 재사용 캐시
+        self._conn_cache: Dict[Path, aiosqlite.Connection] = {}
+        self._conn_cache_lock = asyncio.Lock()
+
         # Numpy Backend Cache: Path -> (vectors, metadata_list)
         self._numpy_cache: Dict[Path, Any] = {}
         self._numpy_lock = asyncio.Lock()
@@ -1858,11 +4017,32 @@ class KakaoEmbeddingStore:
         self._vector_extension_unavailable = True
         return False
 
-    @staticmethod
-    def _sqlite_readonly_connect(path: Path):
-        """누적 Kakao 원본 DB를 실수로 변경하지 않도록 mode=ro로 엽니다."""
-        uri = path.resolve().as_uri() + "?mode=ro"
-        return aiosqlite.connect(uri, uri=True)
+    @asynccontextmanager
+    async def _sqlite_readonly_connect(self, path: Path):
+        """방별 read-only 연결을 재사용해 빌려줍니다.
+
+        누적 Kakao 원본 DB를 실수로 변경하지 않도록 mode=ro로 열며, 읽기만
+        하므로 트랜잭션 직렬화 없이 aiosqlite worker 큐에 맡깁니다.
+        """
+        db = self._conn_cache.get(path)
+        if db is None:
+            async with self._conn_cache_lock:
+                db = self._conn_cache.get(path)
+                if db is None:
+                    db = await _open_store_sqlite_connection(path, read_only=True)
+                    self._conn_cache[path] = db
+        yield db
+
+    async def close(self) -> None:
+        """재사용 중인 방별 SQLite 연결을 모두 닫습니다."""
+        async with self._conn_cache_lock:
+            connections = list(self._conn_cache.values())
+            self._conn_cache.clear()
+        for db in connections:
+            try:
+                await db.close()
+            except Exception as exc:
+                logger.warning("Kakao 임베딩 DB 연결 종료 중 오류: %s", exc)
 
     async def _fetch_from_path(self, path: Path, label: str, limit: int) -> list[Dict[str, Any]]:
         """SQLite 또는 numpy 백엔드에서 최신 임베딩 레코드를 읽어옵니다."""
@@ -1873,7 +4053,6 @@ class KakaoEmbeddingStore:
         # 2. SQLite Backend
         try:
             async with self._sqlite_readonly_connect(path) as db:
-                db.row_factory = aiosqlite.Row
                 table_meta = await self._get_or_detect_table_meta(path, db)
                 if table_meta is None:
                     logger.warning("Kakao 임베딩 테이블 구조를 식별하지 못했습니다: %s", path)
@@ -1895,7 +4074,12 @@ class KakaoEmbeddingStore:
                 )
 
                 async with db.execute(query, (limit,)) as cursor:
-                    return [dict(row) for row in await cursor.fetchall()]
+                    # 호출자가 label 등을 덧붙일 dict가 필요하므로 aiosqlite.Row를
+                    # 거쳐 다시 dict로 복사하지 않고, 컬럼명을 한 번만 읽어 tuple에서
+                    # 바로 만든다. row_factory는 공유 연결이 아닌 이 커서에만 바꾼다.
+                    cursor.row_factory = None
+                    columns = [item[0] for item in cursor.description]
+                    return [dict(zip(columns, row)) for row in await cursor.fetchall()]
         except aiosqlite.Error as exc:
             logger.error("Kakao 임베딩 DB 읽기 중 오류: %s", exc, exc_info=True)
         return []
@@ -1912,7 +4096,8 @@ class KakaoEmbeddingStore:
             return []
 
         try:
-            vector_blob = query_vector.astype(np.float32).tobytes()
+            # 이미 float32 연속 배열이면 astype 사본 없이 바로 직렬화한다.
+            vector_blob = np.ascontiguousarray(query_vector, dtype=np.float32).tobytes()
         except Exception as exc:  # pragma: no cover - defensive
             logger.warning("Kakao 벡터 검색용 쿼리 벡터 직렬화 실패: %s", exc)
             return []
@@ -2085,16 +4270,144 @@ class KakaoEmbeddingStore:
             if connection is None:
                 try:
                     async with self._sqlite_readonly_connect(path) as db:
-                        meta = await self._detect_table_meta(db)
+                        meta = await self._load_or_detect_table_meta(path, db)
                 except aiosqlite.Error as exc:
                     logger.error("Kakao 임베딩 DB 구조 확인 중 오류: %s", exc, exc_info=True)
                     meta = None
             else:
-                meta = await self._detect_table_meta(connection)
+                meta = await self._load_or_detect_table_meta(path, connection)
 
             self._table_meta_cache[path] = meta
             return meta
 
+    async def _load_or_detect_table_meta(
+        self,
+        path: Path,
+        db: aiosqlite.Connection,
+    ) -> Optional[_KakaoTableMeta]:
+        """sidecar가 지금 DB와 같은 스키마에서 만들어졌으면 쓰고, 아니면 감지해 기록합니다."""
+        fingerprint = await self._table_meta_fingerprint(path, db)
+        meta = self._load_table_meta_sidecar(path, fingerprint)
+        if meta is not None:
+            return meta
+        meta = await self._detect_table_meta(db)
+        if meta is not None and fingerprint is not None:
+            self._save_table_meta_sidecar(path, meta, fingerprint)
+        return meta
+
+    @staticmethod
+    async def _table_meta_fingerprint(
+        path: Path,
+        db: aiosqlite.Connection,
+    ) -> Optional[tuple[int, int]]:
+        """``(PRAGMA schema_version, DB 파일 크기)``. 읽지 못하면 None.
+
+        mtime은 cp -p나 rsync -a로 DB를 바꿔 넣어도 보존될 수 있어 쓰지 않는다.
+        schema_version은 스키마가 바뀔 때마다 SQLite가 올리는 값이다.
+        """
+        try:
+            async with db.execute("PRAGMA schema_version") as cursor:
+                row = await cursor.fetchone()
+            return int(row[0] if row else 0), path.stat().st_size
+        except (aiosqlite.Error, OSError, TypeError, ValueError):
+            return None
+
+    _TEXT_COLUMN_CANDIDATES = ("message", "content", "text", "body")
+    _EMBEDDING_COLUMN_CANDIDATES = ("embedding", "embedding_vector", "vector")
+    _TIMESTAMP_COLUMN_CANDIDATES = ("timestamp", "created_at", "datetime", "sent_at", "time")
+    _SPEAKER_COLUMN_CANDIDATES = ("user_name", "username", "sender", "author", "speaker", "nickname")
+    # 역할별 (후보 이름, 허용 타입 힌트). 후보 순서가 곧 우선순위다.
+    _COLUMN_ROLES = {
+        "text": (_TEXT_COLUMN_CANDIDATES, ("TEXT", "CHAR", "CLOB", "VARCHAR")),
+        "embedding": (_EMBEDDING_COLUMN_CANDIDATES, ("BLOB", "REAL", "FLOAT", "DOUBLE")),
+        "timestamp": (
+            _TIMESTAMP_COLUMN_CANDIDATES,
+            ("TEXT", "CHAR", "NUMERIC", "DATE", "DATETIME", "INT"),
+        ),
+        "speaker": (_SPEAKER_COLUMN_CANDIDATES, ("TEXT", "CHAR", "CLOB", "VARCHAR")),
+    }
+    # 소문자 컬럼명 -> (역할, 우선순위). 후보 이름은 역할끼리 겹치지 않으므로
+    # 컬럼을 한 번 훑으며 dict 조회만으로 역할을 정한다.
+    _COLUMN_NAME_ROLES = {
+        candidate: (role, rank)
+        for role, (role_candidates, _) in _COLUMN_ROLES.items()
+        for rank, candidate in enumerate(role_candidates)
+    }
+    _SIDECAR_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]{0,127}")
+
+    @staticmethod
+    def _table_meta_sidecar_path(path: Path) -> Path:
+        return path.with_suffix(path.suffix + ".meta.json")
+
+    def _load_table_meta_sidecar(
+        self,
+        path: Path,
+        fingerprint: Optional[tuple[int, int]],
+    ) -> Optional[_KakaoTableMeta]:
+        """지금 DB와 같은 fingerprint로 기록된 스키마 감지 결과가 있으면 읽어 옵니다."""
+        if fingerprint is None:
+            return None
+        sidecar = self._table_meta_sidecar_path(path)
+        try:
+            data = json.loads(sidecar.read_text(encoding="utf-8"))
+            if [data.get("schema_version"), data.get("db_size")] != list(fingerprint):
+                return None
+            meta = _KakaoTableMeta(**data["meta"])
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+        return meta if self._table_meta_is_storable(meta) else None
+
+    def _save_table_meta_sidecar(
+        self,
+        path: Path,
+        meta: _KakaoTableMeta,
+        fingerprint: tuple[int, int],
+    ) -> None:
+        """감지한 스키마를 다음 기동 때 재사용하도록 DB 옆에 기록합니다."""
+        if not self._table_meta_is_storable(meta):
+            # 다시 읽을 때 거부될 값을 기록하면 기동마다 감지와 기록을 반복한다.
+            return
+        sidecar = self._table_meta_sidecar_path(path)
+        schema_version, db_size = fingerprint
+        try:
+            sidecar.write_text(
+                json.dumps(
+                    {
+                        "schema_version": schema_version,
+                        "db_size": db_size,
+                        "meta": asdict(meta),
+                    }
+                ),
+                encoding="utf-8",
+            )
+        except OSError as exc:
+            # 읽기 전용 배포 디렉터리에서는 기록하지 못해도 감지 결과는 메모리 캐시로 충분하다.
+            logger.debug("Kakao 테이블 메타 sidecar 기록 생략 (%s): %s", sidecar, exc)
+
+    @classmethod
+    def _table_meta_is_storable(cls, meta: _KakaoTableMeta) -> bool:
+        """sidecar 값이 _pick_columns가 고를 수 있는 평범한 식별자인지 확인합니다.
+
+        값은 SQL 식별자로 쓰이므로 이름 규칙을 벗어나거나, 정확히든 부분이든
+        역할 후보 이름과 맞지 않는 컬럼이면 받아들이지 않는다.
+        """
+        def _allowed(column: Optional[str], role: str, required: bool) -> bool:
+            if column is None:
+                return not required
+            if not isinstance(column, str) or not cls._SIDECAR_IDENTIFIER_RE.fullmatch(column):
+                return False
+            name_lower = column.lower()
+            return any(candidate in name_lower for candidate in cls._COLUMN_ROLES[role][0])
+
+        return (
+            isinstance(meta.table_name, str)
+            and bool(cls._SIDECAR_IDENTIFIER_RE.fullmatch(meta.table_name))
+            and _allowed(meta.text_column, "text", True)
+            and _allowed(meta.embedding_column, "embedding", True)
+            and _allowed(meta.timestamp_column, "timestamp", False)
+            and _allowed(meta.speaker_column, "speaker", False)
+        )
+
     async def _detect_table_meta(self, db: aiosqlite.Connection) -> Optional[_KakaoTableMeta]:
         """SQLite DB 스키마를 분석하여 텍스트/임베딩/타임스탬프/발화자 컬럼을 감지합니다."""
         try:
@@ -2115,37 +4428,13 @@ class KakaoEmbeddingStore:
                 if not columns:
                     continue
 
-                lc_map = {name.lower(): name for name, _ in columns}
-                column_types = {name.lower(): (col_type or "").upper() for name, col_type in columns}
-
-                text_col = self._pick_column(
-                    lc_map,
-                    ["message", "content", "text", "body"],
-                    column_types,
-                    {"TEXT", "CHAR", "CLOB", "VARCHAR"},
-                )
-                embedding_col = self._pick_column(
-                    lc_map,
-                    ["embedding", "embedding_vector", "vector"],
-                    column_types,
-                    {"BLOB", "REAL", "FLOAT", "DOUBLE"},
-                )
-
+                picked = self._pick_columns(columns)
+                text_col = picked.get("text")
+                embedding_col = picked.get("embedding")
                 if not text_col or not embedding_col:
                     continue
-
-                timestamp_col = self._pick_column(
-                    lc_map,
-                    ["timestamp", "created_at", "datetime", "sent_at", "time"],
-                    column_types,
-                    {"TEXT", "CHAR", "NUMERIC", "DATE", "DATETIME", "INT"},
-                )
-                speaker_col = self._pick_column(
-                    lc_map,
-                    ["user_name", "username", "sender", "author", "speaker", "nickname"],
-                    column_types,
-                    {"TEXT", "CHAR", "CLOB", "VARCHAR"},
-                )
+                timestamp_col = picked.get("timestamp")
+                speaker_col = picked.get("speaker")
 
                 return _KakaoTableMeta(
                     table_name=table_name,
@@ -2164,32 +4453,34 @@ class KakaoEmbeddingStore:
             rows = await cursor.fetchall()
         return [(row[1], row[2]) for row in rows]
 
-    @staticmethod
-    def _pick_column(
-        lc_map: Dict[str, str],
-        candidates: list[str],
-        column_types: Optional[Dict[str, str]] = None,
-        allowed_type_hints: Optional[set[str]] = None,
-    ) -> Optional[str]:
-        """후보 컬럼명 중 테이블에 존재하고 타입이 일치하는 컬럼을 선택합니다."""
-        def _type_matches(name_lower: str) -> bool:
-            if not allowed_type_hints or not column_types:
-                return True
-            col_type = column_types.get(name_lower, "")
-            if not col_type:
-                return True
-            for hint in allowed_type_hints:
-                if hint in col_type:
-                    return True
-            return False
+    @classmethod
+    def _pick_columns(cls, columns: list[tuple[str, str]]) -> dict[str, str]:
+        """컬럼 목록을 한 번 훑어 역할별로 이름과 타입이 맞는 컬럼을 고릅니다.
+
+        정확히 일치하는 후보 중 우선순위가 가장 높은 컬럼을 쓰고, 없는 역할만
+        후보 이름을 포함하는 컬럼으로 보완합니다.
+        """
+        def _type_matches(role: str, col_type: str) -> bool:
+            col_type = (col_type or "").upper()
+            return not col_type or any(hint in col_type for hint in cls._COLUMN_ROLES[role][1])
+
+        best: dict[str, tuple[int, str]] = {}
+        for name, col_type in columns:
+            match = cls._COLUMN_NAME_ROLES.get(name.lower())
+            if match is None:
+                continue
+            role, rank = match
+            if (role not in best or rank < best[role][0]) and _type_matches(role, col_type):
+                best[role] = (rank, name)
+        picked = {role: name for role, (_, name) in best.items()}
 
-        for candidate in candidates:
-            if candidate in lc_map:
-                if _type_matches(candidate):
-                    return lc_map[candidate]
         # try contains match just in case
-        for name_lower, original in lc_map.items():
-            for candidate in candidates:
-                if candidate in name_lower and _type_matches(name_lower):
-                    return original
-        return None
+        for role, (candidates, _) in cls._COLUMN_ROLES.items():
+            if role in picked:
+                continue
+            for name, col_type in columns:
+                name_lower = name.lower()
+                if any(candidate in name_lower for candidate in candidates) and _type_matches(role, col_type):
+                    picked[role] = name
+                    break
+        return picked
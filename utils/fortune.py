@@ -4,39 +4,42 @@
 서양 점성술(ephem)과 동양 사주(korean-lunar-calendar)를 사용하여 종합적인 운세 정보를 생성합니다.
 """
 
+import functools
+import importlib.util
 import logging
 from datetime import date, datetime, time
 import pytz
 import math
+import threading
 from typing import Dict, Any, Optional
 
 from logger_config import logger
 
-# Ephem Import (Western Astrology)
-try:
-    import ephem
-    EPHEM_AVAILABLE = True
-except (ImportError, ModuleNotFoundError):
-    EPHEM_AVAILABLE = False
+# 계산 라이브러리는 설치 여부만 먼저 확인하고, 실제 import는 첫 계산 때 한다.
+# 운세 기능을 쓰지 않는 동안 봇 시작 시간에 import 비용을 더하지 않기 위함이다.
+# Ephem (Western Astrology)
+EPHEM_AVAILABLE = importlib.util.find_spec("ephem") is not None
+ephem = None
 
-# Korean Lunar Calendar Import (Eastern Saju)
-try:
-    from korean_lunar_calendar import KoreanLunarCalendar
-except ImportError:
-    pass
+# Korean Lunar Calendar (Eastern Saju)
+LUNAR_CALENDAR_AVAILABLE = importlib.util.find_spec("korean_lunar_calendar") is not None
 
 # 서울 위경도 (점성술 차트 계산용)
 SEOUL_LAT = 37.5665
 SEOUL_LON = 126.9780
 
+# 황도 12궁 이름 (양자리부터 30도 간격)
+ZODIAC_SIGNS = (
+    "양자리", "황소자리", "쌍둥이자리", "게자리", "사자자리", "처녀자리",
+    "천칭자리", "전갈자리", "사수자리", "염소자리", "물병자리", "물고기자리"
+)
+
+# 황도 경도(radian)를 궁 번호로 바꾸는 계수. 30도 = pi/6 rad
+_RADIANS_PER_SIGN = math.pi / 6
+
 def get_zodiac_sign(lon_deg: float) -> str:
     """황도 경도(degree)를 별자리 이름으로 변환합니다."""
-    signs = [
-        "양자리", "황소자리", "쌍둥이자리", "게자리", "사자자리", "처녀자리",
-        "천칭자리", "전갈자리", "사수자리", "염소자리", "물병자리", "물고기자리"
-    ]
-    index = int(lon_deg / 30)
-    return signs[index % 12]
+    return ZODIAC_SIGNS[int(lon_deg / 30) % 12]
 
 def get_sign_from_date(month: int, day: int) -> str:
     """월/일을 입력받아 별자리를 반환합니다.
@@ -57,16 +60,82 @@ def get_sign_from_date(month: int, day: int) -> str:
     if (month == 11 and day >= 22) or (month == 12 and day <= 21): return "사수자리"
     return "염소자리"
 
+# 서울 observer와 행성 객체는 호출마다 만들지 않고 재사용한다.
+_EPHEM_LOCK = threading.Lock()
+_OBSERVER = None
+_PLANETS: tuple = ()
+
+def _load_ephem() -> None:
+    """ephem을 import하고 공유 observer와 천체 객체를 한 번만 만듭니다.
+
+    _EPHEM_LOCK을 잡은 상태에서 호출한다.
+    """
+    global ephem, _OBSERVER, _PLANETS
+    if _OBSERVER is not None:
+        return
+    import ephem as ephem_module
+
+    observer = ephem_module.Observer()
+    observer.lat = str(SEOUL_LAT)
+    observer.lon = str(SEOUL_LON)
+    _PLANETS = (
+        ("태양", ephem_module.Sun()),
+        ("달", ephem_module.Moon()),
+        ("수성", ephem_module.Mercury()),
+        ("금성", ephem_module.Venus()),
+        ("화성", ephem_module.Mars()),
+        ("목성", ephem_module.Jupiter()),
+        ("토성", ephem_module.Saturn()),
+    )
+    ephem = ephem_module
+    _OBSERVER = observer
+
+@functools.lru_cache(maxsize=1024)
+def _astrology_chart_for_minute(minute_epoch: int) -> str:
+    """UTC 분 경계 epoch 시각의 서울 상공 행성 배치를 계산합니다.
+
+    예외는 캐시되지 않고 호출자에게 전파된다.
+    """
+    result_parts = []
+    # 공유 observer/천체는 date와 마지막 compute 결과를 상태로 가지므로 한
+    # 계산 전체를 lock 안에서 끝낸다.
+    with _EPHEM_LOCK:
+        _load_ephem()
+        # ephem은 UTC 기준
+        _OBSERVER.date = datetime.fromtimestamp(minute_epoch, tz=pytz.utc)
+        for name, body in _PLANETS:
+            body.compute(_OBSERVER)
+            # 황도 좌표계(Ecliptic Coordinate)로 변환한 경도(radian)를 degree 변환
+            # 없이 바로 궁 번호로 나눈다.
+            index = int(ephem.Ecliptic(body).lon / _RADIANS_PER_SIGN) % 12
+            result_parts.append(f"{name}: {ZODIAC_SIGNS[index]}")
+
+    return ", ".join(result_parts)
+
+@functools.lru_cache(maxsize=4096)
+def _saju_cached(year: int, month: int, day: int) -> str:
+    """양력 날짜의 음력 날짜와 간지 문자열을 계산합니다.
+
+    KoreanLunarCalendar는 setSolarDate 결과를 인스턴스에 담는 상태 객체라
+    호출마다 새로 만든다. 예외는 캐시되지 않고 호출자에게 전파된다.
+    """
+    from korean_lunar_calendar import KoreanLunarCalendar
+
+    calendar = KoreanLunarCalendar()
+    calendar.setSolarDate(year, month, day)
+    ganji = calendar.getGapJaString()
+    lunar_date = f"{calendar.lunarYear}-{calendar.lunarMonth:02d}-{calendar.lunarDay:02d}"
+    return f"음력: {lunar_date}, 간지: {ganji}"
+
 class FortuneCalculator:
     """서양 점성술과 동양 사주를 결합한 종합 운세 데이터를 생성하는 클래스"""
 
     def __init__(self):
-        """한국식 음력 변환기(KoreanLunarCalendar)를 초기화하고 운세 계산 준비를 수행한다."""
-        try:
-            self.calendar = KoreanLunarCalendar()
+        """음력 변환 라이브러리(KoreanLunarCalendar) 설치 여부를 확인하고 운세 계산 준비를 수행한다."""
+        if LUNAR_CALENDAR_AVAILABLE:
             logger.info("FortuneCalculator 초기화 완료")
-        except NameError:
-             logger.error("KoreanLunarCalendar not installed.")
+        else:
+            logger.error("KoreanLunarCalendar not installed.")
 
     def _get_saju_palja(self, year: int, month: int, day: int) -> str:
         """
@@ -74,10 +143,8 @@ class FortuneCalculator:
         Note: 시주(시간)는 복잡하여 제외하고 연/월/일주 위주로 제공합니다.
         """
         try:
-            self.calendar.setSolarDate(year, month, day)
-            ganji = self.calendar.getGapJaString() 
-            lunar_date = f"{self.calendar.lunarYear}-{self.calendar.lunarMonth:02d}-{self.calendar.lunarDay:02d}"
-            return f"음력: {lunar_date}, 간지: {ganji}"
+            # 같은 날짜는 하루 종일 결과가 같으므로 날짜를 키로 캐시한다.
+            return _saju_cached(year, month, day)
         except Exception as e:
             logger.error(f"사주 계산 중 오류: {e}")
             return "사주 정보 산출 실패"
@@ -91,36 +158,11 @@ class FortuneCalculator:
             return "서양 점성술 정보 없음 (라이브러리 미설치)"
 
         try:
-            # ephem 설정
-            observer = ephem.Observer()
-            observer.lat = str(SEOUL_LAT)
-            observer.lon = str(SEOUL_LON)
-            # datetime을 UTC로 변환하여 전달 (ephem은 UTC 기준)
-            dt_utc = dt.astimezone(pytz.utc)
-            observer.date = dt_utc
-
-            # 행성 객체 생성
-            planets = {
-                "태양": ephem.Sun(),
-                "달": ephem.Moon(),
-                "수성": ephem.Mercury(),
-                "금성": ephem.Venus(),
-                "화성": ephem.Mars(),
-                "목성": ephem.Jupiter(),
-                "토성": ephem.Saturn()
-            }
-            
-            result_parts = []
-            for name, body in planets.items():
-                body.compute(observer)
-                # 황도 좌표계(Ecliptic Coordinate)로 변환하여 경도(Longitude) 추출
-                ecl_lon = ephem.Ecliptic(body).lon
-                degree = math.degrees(ecl_lon)
-                sign = get_zodiac_sign(degree)
-                result_parts.append(f"{name}: {sign}") 
-
-            return ", ".join(result_parts)
-
+            # 출력은 궁(30°) 이름뿐이다. 가장 빠른 달도 1분에 약 30각초만 움직이므로
+            # 분 경계로 내려 계산한 결과는 그 1분 안에 궁 경계를 지나는 드문 경우에만
+            # 실제 시각과 다르다. UTC 분 경계 epoch를 키로 캐시해 7개 천체 계산을 생략한다.
+            minute_epoch = int(dt.astimezone(pytz.utc).timestamp()) // 60 * 60
+            return _astrology_chart_for_minute(minute_epoch)
         except Exception as e:
             logger.error(f"점성술 차트 계산 중 오류: {e}")
             return "천체 배치 정보 산출 실패"
@@ -4,13 +4,25 @@ HTTP 요청을 위한 커스텀 `requests.Session` 객체를 생성하는 유틸
 
 다양한 서버의 TLS/SSL 요구사항에 대응하기 위해, 특정 TLS 버전이나
 암호화 스위트를 강제하는 세션을 생성하는 함수들을 제공합니다.
+`shared_get`은 실행 스레드별로 세션을 재사용해 keep-alive 연결과 TLS
+세션을 다음 요청에서도 쓰게 합니다.
 """
 
+import json
+import threading
+from typing import Any, Literal
+
 import requests
 import ssl
 from requests.adapters import HTTPAdapter
 from urllib3.util.ssl_ import create_urllib3_context
 
+# orjson은 선택 의존성이다. 설치되어 있으면 API 응답 JSON 해석에 사용한다.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 선택 의존성
+    orjson = None
+
 # 최신 서버와의 호환성을 높이기 위한 암호화 스위트 목록
 CIPHERS = (
     'ECDHE-ECDSA-AES128-GCM-SHA256:ECDHE-RSA-AES128-GCM-SHA256:ECDHE-ECDSA-AES256-GCM-SHA384:'
@@ -18,14 +30,51 @@ CIPHERS = (
     'DHE-RSA-AES128-GCM-SHA256:DHE-RSA-AES256-GCM-SHA384'
 )
 
+def _build_modern_tls_context() -> ssl.SSLContext:
+    """최신 암호화 스위트와 인증서 검증을 강제하는 SSL 컨텍스트를 만듭니다."""
+    context = create_urllib3_context(ciphers=CIPHERS)
+    context.check_hostname = True
+    context.verify_mode = ssl.CERT_REQUIRED
+    return context
+
+def _build_tlsv12_context() -> ssl.SSLContext:
+    """TLSv1.2 이상을 강제하는 SSL 컨텍스트를 만듭니다."""
+    context = ssl.create_default_context()
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    return context
+
+# SSL 컨텍스트는 어댑터마다 새로 만들지 않고 import 시 한 번만 만들어 공유한다.
+_MODERN_TLS_CONTEXT = _build_modern_tls_context()
+_TLSV12_CONTEXT = _build_tlsv12_context()
+
+def json_loads(data: bytes | bytearray | str) -> Any:
+    """API 응답 본문을 JSON으로 해석합니다.
+
+    orjson이 있으면 bytes를 str로 디코딩하지 않고 바로 해석합니다. 앞쪽의
+    UTF-8 BOM과 공백은 제거합니다. 잘못된 JSON은 두 경로 모두 ``ValueError``
+    하위 예외를 던집니다.
+    """
+    if isinstance(data, str):
+        data = data.lstrip("\ufeff \t\r\n")
+    else:
+        data = bytes(data).lstrip(b" \t\r\n")
+        if data.startswith(b"\xef\xbb\xbf"):
+            data = data[3:]
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(payload: Any) -> bytes:
+    """요청 본문용 UTF-8 JSON bytes를 만듭니다."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
 class ModernTlsAdapter(HTTPAdapter):
     """최신 TLS 암호화 스위트를 강제하는 커스텀 HTTP 어댑터입니다."""
     def init_poolmanager(self, *args, **kwargs):
         """최신 TLS 암호화 스위트로 poolmanager를 초기화합니다."""
-        context = create_urllib3_context(ciphers=CIPHERS)
-        context.check_hostname = True
-        context.verify_mode = ssl.CERT_REQUIRED
-        kwargs['ssl_context'] = context
+        kwargs['ssl_context'] = _MODERN_TLS_CONTEXT
         return super().init_poolmanager(*args, **kwargs)
 
 class TlsV12Adapter(HTTPAdapter):
@@ -34,30 +83,40 @@ class TlsV12Adapter(HTTPAdapter):
     """
     def init_poolmanager(self, *args, **kwargs):
         """TLSv1.2를 강제하는 SSL 컨텍스트로 poolmanager를 초기화합니다."""
-        context = ssl.create_default_context()
-        context.minimum_version = ssl.TLSVersion.TLSv1_2
-        kwargs['ssl_context'] = context
+        kwargs['ssl_context'] = _TLSV12_CONTEXT
         return super().init_poolmanager(*args, **kwargs)
 
+# get_shared_session이 만드는 세션만 이 어댑터를 공유해 같은 urllib3
+# PoolManager(스레드 안전)로 keep-alive 연결을 함께 재사용한다. 공유 세션은
+# 닫지 않으므로 어댑터도 프로세스가 끝날 때까지 살아 있다.
+MODERN_ADAPTER = ModernTlsAdapter()
+TLSV12_ADAPTER = TlsV12Adapter()
+
+_USER_AGENT = 'Masamong-Bot/5.2 (Discord Bot; +https://github.com/kim0040/masamong)'
+
 # --- 세션 생성 함수 --- #
 
-def get_modern_tls_session() -> requests.Session:
-    """최신 TLS 암호화 스위트를 사용하는 `requests.Session` 객체를 반환합니다."""
+def _new_session(adapter: HTTPAdapter) -> requests.Session:
+    """https 요청에 ``adapter``를 쓰는 `requests.Session` 객체를 만듭니다."""
     session = requests.Session()
-    session.mount('https://', ModernTlsAdapter())
-    session.headers.update({
-        'User-Agent': 'Masamong-Bot/5.2 (Discord Bot; +https://github.com/kim0040/masamong)'
-    })
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': _USER_AGENT})
     return session
 
+def get_modern_tls_session() -> requests.Session:
+    """최신 TLS 암호화 스위트를 사용하는 `requests.Session` 객체를 반환합니다.
+
+    어댑터는 세션마다 새로 만들고 SSL 컨텍스트만 공유하므로, 호출한 쪽이
+    ``with``로 닫아도 다른 세션의 연결 풀에는 영향이 없습니다.
+    """
+    return _new_session(ModernTlsAdapter())
+
 def get_tlsv12_session() -> requests.Session:
-    """TLSv1.2를 강제하는 `requests.Session` 객체를 반환합니다."""
-    session = requests.Session()
-    session.mount('https://', TlsV12Adapter())
-    session.headers.update({
-        'User-Agent': 'Masamong-Bot/5.2 (Discord Bot; +https://github.com/kim0040/masamong)'
-    })
-    return session
+    """TLSv1.2를 강제하는 `requests.Session` 객체를 반환합니다.
+
+    어댑터는 세션마다 새로 만들고 SSL 컨텍스트만 공유합니다.
+    """
+    return _new_session(TlsV12Adapter())
 
 def get_insecure_session() -> requests.Session:
     """
@@ -66,7 +125,44 @@ def get_insecure_session() -> requests.Session:
     """
     session = requests.Session()
     session.verify = False
-    session.headers.update({
-        'User-Agent': 'Masamong-Bot/5.2 (Discord Bot; +https://github.com/kim0040/masamong)'
-    })
+    session.headers.update({'User-Agent': _USER_AGENT})
     return session
+
+# --- 스레드별 공유 세션 --- #
+
+SessionProfile = Literal["modern", "tlsv12", "insecure"]
+
+# requests.Session은 스레드 안전성을 보장하지 않으므로 프로필별 세션을
+# 실행 스레드마다 하나씩 둔다. to_thread executor 스레드는 재사용되므로
+# 연결 풀과 TLS 세션도 다음 요청에서 그대로 재사용된다.
+_SESSION_LOCAL = threading.local()
+
+def get_shared_session(profile: SessionProfile) -> requests.Session:
+    """현재 스레드에서 재사용하는 프로필별 `requests.Session`을 반환합니다.
+
+    반환된 세션을 ``with``로 닫으면 안 됩니다.
+    """
+    sessions = getattr(_SESSION_LOCAL, "sessions", None)
+    if sessions is None:
+        sessions = {}
+        _SESSION_LOCAL.sessions = sessions
+    session = sessions.get(profile)
+    if session is None:
+        factories = {
+            "modern": lambda: _new_session(MODERN_ADAPTER),
+            "tlsv12": lambda: _new_session(TLSV12_ADAPTER),
+            "insecure": get_insecure_session,
+        }
+        if profile not in factories:
+            raise ValueError(f"알 수 없는 HTTP 세션 프로필: {profile}")
+        session = factories[profile]()
+        sessions[profile] = session
+    return session
+
+def shared_get(profile: SessionProfile, url: str, **kwargs: Any) -> requests.Response:
+    """호출한 스레드의 공유 세션으로 GET 요청을 보냅니다.
+
+    ``asyncio.to_thread(shared_get, ...)``로 부르면 세션 조회까지 executor
+    스레드 안에서 일어나 스레드 간에 세션을 공유하지 않습니다.
+    """
+    return get_shared_session(profile).get(url, **kwargs)
@@ -3,19 +3,30 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import math
 import re
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
 
 np: Any | None = None
 _NUMPY_IMPORT_ATTEMPTED = False
+simsimd: Any | None = None
+_SIMSIMD_IMPORT_ATTEMPTED = False
 
 from utils.text_cleaner import clean_profanity
 import config
 from logger_config import logger
-from utils.chunker import SemanticChunker, ChunkerConfig
-from utils.embeddings import DiscordEmbeddingStore, KakaoEmbeddingStore, get_embedding
+from utils.chunker import SemanticChunker, ChunkerConfig, default_tokenizer, split_sentences
+from utils.embeddings import (
+    DiscordEmbeddingStore,
+    KakaoEmbeddingStore,
+    embedding_blobs_to_matrix,
+    get_embedding,
+    get_embeddings,
+)
 from utils.query_rewriter import expand_query
 from utils.reranker import Reranker
 
@@ -95,6 +106,25 @@ def _get_numpy() -> Any | None:
     return np
 
 
+def _get_simsimd() -> Any | None:
+    """설치돼 있으면 SIMD 코사인 커널(simsimd)을 최초 사용 시 한 번만 import합니다."""
+    global simsimd, _SIMSIMD_IMPORT_ATTEMPTED
+
+    if simsimd is not None:
+        return simsimd
+    if _SIMSIMD_IMPORT_ATTEMPTED:
+        return None
+
+    _SIMSIMD_IMPORT_ATTEMPTED = True
+    try:
+        import simsimd as simsimd_module
+    except ImportError:  # 선택적 의존성. 없으면 NumPy/BLAS 경로를 쓴다.
+        return None
+
+    simsimd = simsimd_module
+    return simsimd
+
+
 @dataclass
 class HybridSearchResult:
     """하이브리드 검색 결과 리스트와 부가 정보를 캡슐화합니다."""
@@ -108,6 +138,22 @@ class HybridSearchResult:
 class HybridSearchEngine:
     """BM25 + 임베딩 결합 검색을 처리하는 엔진."""
 
+    # 대화 블록 원문 -> 첫 청크 텍스트 LRU 크기.
+    _DIALOGUE_CHUNK_CACHE_SIZE = 512
+    # 메시지 원문 -> _clean_content 결과 LRU 크기.
+    _CLEAN_CONTENT_CACHE_SIZE = 2048
+    # 재순위화 전에 최고 결합 점수의 이 비율보다 낮은 후보는 cross-encoder에
+    # 넣지 않는다. 단 상위 _RERANK_MIN_DOCS개는 항상 재순위화한다.
+    _RERANK_PREFILTER_RATIO = 0.3
+    _RERANK_MIN_DOCS = 3
+    # 질의 임베딩의 코사인이 이보다 큰 변형은 앞선 변형과 같은 검색으로 보고
+    # 임베딩/BM25 조회를 건너뛴다.
+    _VARIANT_DEDUP_SIMILARITY = 0.97
+    # _lexical_relevance 보너스 상한과 본인 범위 구조화 기억 가산점. 후보 점수의
+    # 최대 가산폭이라 임계값 미달 행을 미리 거를 때도 쓴다.
+    _LEXICAL_BONUS_CAP = 0.08
+    _PERSONAL_SCOPE_BONUS = 0.025
+
     def __init__(
         self,
         discord_store: DiscordEmbeddingStore,
@@ -166,12 +212,26 @@ class HybridSearchEngine:
         self.hybrid_top_k = getattr(config, "RAG_HYBRID_TOP_K", 4)
         self.embedding_top_n = getattr(config, "RAG_EMBEDDING_TOP_N", 8)
         self.bm25_top_n = getattr(config, "RAG_BM25_TOP_N", 8)
+        # BM25 순위별 보조 점수. 순위 수가 bm25_top_n으로 정해져 있으므로
+        # 후보마다 다시 계산하지 않고 미리 만든 표에서 읽는다.
+        self._bm25_rank_scores = tuple(
+            max(0.0, 0.57 - (rank * 0.02))
+            for rank in range(max(int(self.bm25_top_n), 0))
+        )
         self.embedding_weight = 0.55
         self.bm25_weight = 0.45
+        self.score_fusion = str(getattr(config, "RAG_SCORE_FUSION", "similarity")).lower()
+        self.rrf_k = max(0.0, float(getattr(config, "RAG_RRF_K", 60.0)))
         self.neighbor_radius = max(1, getattr(config, "CONVERSATION_NEIGHBOR_RADIUS", 3))
         self.recent_turn_limit = 2
         self.query_expansion_enabled = config.SEARCH_QUERY_EXPANSION_ENABLED
         self._warned_numpy = False
+        # 청커 결과는 입력에 대해 결정적이라, 변형끼리 겹치는 후보의 같은 대화
+        # 블록을 다시 자르지 않도록 엔진 범위에서 재사용한다.
+        self._dialogue_chunk_cache: OrderedDict[str, str] = OrderedDict()
+        # 같은 메시지는 변형·겹치는 대화 창·재순위화 문서마다 다시 정제되므로
+        # 정제 결과도 엔진 범위에서 재사용한다.
+        self._clean_content_cache: OrderedDict[str, str] = OrderedDict()
 
     async def search(
         self,
@@ -198,28 +258,60 @@ class HybridSearchEngine:
         candidate_map: Dict[str, dict[str, Any]] = {}
         dialogue_cache: Dict[tuple[str, int, int], List[dict[str, Any]]] = {}
         # 쿼리 변형마다 같은 TiDB BLOB 행을 다시 읽지 않도록 검색 1회 범위에서 공유한다.
-        discord_row_cache: Dict[str, List[Any]] = {}
-        for variant in variants:
-            embed_entries = await self._embedding_candidates(
-                variant,
-                guild_id=guild_id,
-                channel_id=channel_id,
-                user_id=user_id,
-                memory_user_id=memory_user_id,
-                dialogue_cache=dialogue_cache,
-                row_cache=discord_row_cache,
-                deep_search=deep_search,
+        discord_row_cache: Dict[str, asyncio.Future] = {}
+        # 결과의 query_variants는 확장된 변형 전체를 그대로 보고하고, 조회는
+        # 의미가 겹치지 않는 변형만 한다. 미리 만든 질의 임베딩은 같은 캐시로 재사용된다.
+        searched_variants = await self._distinct_variants(variants, discord_row_cache)
+        # 변형별 임베딩/BM25 조회는 서로 독립이라 한 번에 띄우고, 병합은 결과가
+        # 순서와 무관하도록 기존과 같은 변형 순서(임베딩 → BM25)로 한다.
+        candidate_lists = await asyncio.gather(
+            *(
+                self._embedding_candidates(
+                    variant,
+                    guild_id=guild_id,
+                    channel_id=channel_id,
+                    user_id=user_id,
+                    memory_user_id=memory_user_id,
+                    dialogue_cache=dialogue_cache,
+                    row_cache=discord_row_cache,
+                    deep_search=deep_search,
+                )
+                for variant in searched_variants
+            ),
+            *(
+                self._bm25_candidates(
+                    variant,
+                    guild_id=guild_id,
+                    channel_id=channel_id,
+                    dialogue_cache=dialogue_cache,
+                )
+                for variant in searched_variants
+            ),
+            return_exceptions=True,
+        )
+        # 한 변형의 한 조회가 실패해도 나머지 결과로 검색을 이어 간다.
+        for index, outcome in enumerate(candidate_lists):
+            if not isinstance(outcome, BaseException):
+                continue
+            if not isinstance(outcome, Exception):
+                raise outcome
+            source = "임베딩" if index < len(searched_variants) else "BM25"
+            logger.warning(
+                "하이브리드 검색 %s 조회 실패(변형 %r), 이 결과는 건너뜁니다: %s",
+                source,
+                searched_variants[index % len(searched_variants)],
+                outcome,
+                exc_info=outcome,
             )
+            candidate_lists[index] = []
+        for embed_entries, bm25_entries in zip(
+            candidate_lists[: len(searched_variants)],
+            candidate_lists[len(searched_variants):],
+        ):
             for rank, entry in enumerate(embed_entries[: self.embedding_top_n]):
                 # 임베딩 후보는 가중치 계산을 위해 랭크를 기록한다.
                 self._merge_candidate(candidate_map, entry, source="embedding", rank=rank)
 
-            bm25_entries = await self._bm25_candidates(
-                variant,
-                guild_id=guild_id,
-                channel_id=channel_id,
-                dialogue_cache=dialogue_cache,
-            )
             for rank, entry in enumerate(bm25_entries[: self.bm25_top_n]):
                 # BM25 후보도 동일한 후보 맵에 합산한다.
                 self._merge_candidate(candidate_map, entry, source="bm25", rank=rank)
@@ -228,12 +320,13 @@ class HybridSearchEngine:
             return HybridSearchResult(entries=[], query_variants=variants, top_score=0.0)
 
         enriched: List[dict[str, Any]] = []
-        for candidate_id, entry in candidate_map.items():
-            candidate = dict(entry)
+        # candidate_map은 이 호출에서만 쓰므로 항목을 복사하지 않고 채운다.
+        for candidate_id, candidate in candidate_map.items():
             candidate["candidate_id"] = candidate_id
             sources = candidate.get("sources")
-            if isinstance(sources, set):
-                candidate["sources"] = sorted(sources)
+            if isinstance(sources, dict):
+                # 출처는 병합 순서(임베딩 → BM25)를 지키는 dict 키라 정렬 없이 내보낸다.
+                candidate["sources"] = list(sources)
 
             similarity = candidate.get("similarity") or candidate.get("score") or 0.0
             bm25_score = candidate.get("bm25_score") or 0.0
@@ -241,18 +334,34 @@ class HybridSearchEngine:
             # EMB 참조 구현과 동일하게 raw similarity 사용
             combined = similarity if similarity > 0.0 else bm25_score
             candidate["combined_score"] = combined
+            # 순위는 0부터라 RRF의 1부터 세는 순위로 맞춘다.
+            candidate["rrf_score"] = sum(
+                1.0 / (self.rrf_k + candidate[rank_key] + 1)
+                for rank_key in ("embedding_rank", "bm25_rank")
+                if rank_key in candidate
+            )
             if not candidate.get("dialogue_block"):
-                candidate["dialogue_block"] = self._format_dialogue_block(candidate.get("dialogue_messages") or [])
+                # BM25 후보는 블록을 미뤄 두므로 병합에서 살아남은 것만 여기서 만든다.
+                candidate["dialogue_block"] = self._format_dialogue_block(
+                    candidate.get("dialogue_messages") or []
+                ) or self._clean_content(candidate.get("message") or "")
             enriched.append(candidate)
 
-        enriched.sort(
-            key=lambda item: (
-                item.get("combined_score", 0.0),
-                item.get("similarity", 0.0),
-                item.get("bm25_score", 0.0),
-            ),
-            reverse=True,
-        )
+        if self.score_fusion == "rrf":
+            # 척도가 다른 임베딩 유사도와 BM25 점수를 섞지 않고 순위만 합친다.
+            enriched.sort(
+                key=lambda item: (item["rrf_score"], item.get("combined_score", 0.0)),
+                reverse=True,
+            )
+        else:
+            enriched.sort(
+                key=lambda item: (
+                    item.get("combined_score", 0.0),
+                    item.get("similarity", 0.0),
+                    item.get("bm25_score", 0.0),
+                ),
+                reverse=True,
+            )
         enriched = self._gate_by_relevance(
             query,
             enriched,
@@ -268,14 +377,15 @@ class HybridSearchEngine:
         # 상대 점수 floor 앞뒤 어디에 두든 결과는 같다. floor는 최고점 대비
         # 임계값이고 dedupe는 순서를 지키며 최고점 후보를 남기므로 두 연산이
         # 교환 가능하다. 실측 ablation에서도 블록 수와 중복도가 동일했다.
-        enriched = self._dedupe_overlapping_entries(enriched)
         # 상한은 config 파일의 top_k와 코드 상한 중 작은 쪽이다. 이미 배포된
         # 서버의 embedding config를 고치지 않아도 새 상한이 적용되게 한다.
         block_limit = min(
             max(self.hybrid_top_k, 1),
             max(int(getattr(config, "RAG_MEMORY_MAX_BLOCKS", 3)), 1),
         )
-        enriched = enriched[:block_limit]
+        # dedupe는 순서대로 앞선 선택만 보고 판단하므로, 상한만큼 고르면 멈춰도
+        # 전체를 돈 뒤 자른 결과와 같다.
+        enriched = self._dedupe_overlapping_entries(enriched, limit=block_limit)
 
         reranked = await self._apply_reranker(query, enriched)
         top_score = reranked[0].get("combined_score", 0.0) if reranked else 0.0
@@ -354,7 +464,8 @@ class HybridSearchEngine:
             )
             return []
 
-        best = _score(entries[0])
+        # RAG_SCORE_FUSION=rrf이면 첫 항목이 최고 유사도가 아닐 수 있다.
+        best = max(_score(entry) for entry in entries)
         floor_ratio = float(getattr(config, "RAG_MEMORY_RELATIVE_FLOOR", 0.94))
         floor = best * max(0.0, min(1.0, floor_ratio))
         selected = [entry for entry in entries if _score(entry) >= floor]
@@ -463,6 +574,8 @@ class HybridSearchEngine:
     def _dedupe_overlapping_entries(
         cls,
         entries: List[dict[str, Any]],
+        *,
+        limit: int | None = None,
     ) -> List[dict[str, Any]]:
         """순위를 유지하며 사실상 같은 내용을 말하는 기억 블록을 하나만 남깁니다.
 
@@ -479,6 +592,8 @@ class HybridSearchEngine:
         - 원문 ID가 조금이라도 겹치면서 의미도 가까우면 같은 구간의 반복이다.
         - 원문 ID가 전혀 겹치지 않으면 벡터가 거의 일치할 때만 중복으로 본다.
         - 벡터가 없는 후보(사전 계산 점수만 온 Kakao 행)는 어휘 3-gram으로 본다.
+
+        limit이 있으면 그만큼 남긴 뒤 나머지 후보는 비교하지 않는다.
         """
 
         def _ratio(name: str, default: float) -> float:
@@ -497,6 +612,8 @@ class HybridSearchEngine:
         selected_blocks: set[str] = set()
 
         for entry in entries:
+            if limit is not None and len(selected) >= limit:
+                break
             source_ids = cls._source_message_id_set(
                 entry.get("source_message_ids")
             )
@@ -632,7 +749,7 @@ class HybridSearchEngine:
         user_id: int | None,
         memory_user_id: int | None = None,
         dialogue_cache: Dict[tuple[str, int, int], List[dict[str, Any]]] | None = None,
-        row_cache: Dict[str, List[Any]] | None = None,
+        row_cache: Dict[str, asyncio.Future] | None = None,
         deep_search: bool = False,
     ) -> List[dict[str, Any]]:
         if _get_numpy() is None:
@@ -641,12 +758,19 @@ class HybridSearchEngine:
                 self._warned_numpy = True
             return []
 
-        query_vector = await get_embedding(query, prefix="query: ")
+        cache = row_cache if row_cache is not None else {}
+        query_vector = await self._query_embedding(query, cache)
         if query_vector is None:
             return []
+        # 저장 행이 단위 길이면 질의를 여기서 한 번만 정규화해, 구조화 기억과
+        # 원문 행 모두 행 노름 계산 없이 내적으로 코사인을 구한다.
+        unit_query = (
+            self._unit_vector(query_vector)
+            if getattr(self.discord_store, "unit_normalized", False)
+            else None
+        )
 
         dispatcher: List[dict[str, Any]] = []
-        cache = row_cache if row_cache is not None else {}
         structured_cache_key = (
             "structured_wide" if deep_search else "structured"
         )
@@ -666,21 +790,21 @@ class HybridSearchEngine:
             structured_limit = int(
                 getattr(config, "STRUCTURED_MEMORY_VECTOR_TOP_K", 32)
             )
-        if structured_cache_key not in cache:
-            cache[structured_cache_key] = (
-                await self.discord_store.fetch_recent_memory_entries(
-                    server_id=guild_id,
-                    channel_id=channel_id,
-                    user_id=(
-                        memory_user_id
-                        if memory_user_id is not None
-                        else user_id
-                    ),
-                    limit=structured_limit,
-                    query_vector=query_vector,
-                )
-            )
-        structured_rows = cache[structured_cache_key]
+        structured_rows = await self._shared_fetch(
+            cache,
+            structured_cache_key,
+            lambda: self.discord_store.fetch_recent_memory_entries(
+                server_id=guild_id,
+                channel_id=channel_id,
+                user_id=(
+                    memory_user_id
+                    if memory_user_id is not None
+                    else user_id
+                ),
+                limit=structured_limit,
+                query_vector=query_vector,
+            ),
+        )
         if structured_rows:
             dispatcher.extend(
                 await self._score_discord_rows(
@@ -691,6 +815,10 @@ class HybridSearchEngine:
                     channel_id=channel_id,
                     dialogue_cache=dialogue_cache,
                     use_legacy_discord_rows=False,
+                    matrix=await self._shared_rows_matrix(
+                        cache, structured_cache_key, structured_rows
+                    ),
+                    unit_query=unit_query,
                 )
             )
 
@@ -698,14 +826,44 @@ class HybridSearchEngine:
         # 조회한다. 얕은 검색은 구조화 후보가 없을 때만 원문으로 보완해
         # 평상시 TiDB BLOB 읽기량을 제한한다.
         if deep_search or not dispatcher:
-            if "legacy" not in cache:
-                cache["legacy"] = await self.discord_store.fetch_recent_embeddings(
-                    server_id=guild_id,
-                    channel_id=channel_id,
-                    user_id=user_id,
-                    limit=self.embedding_limit,
+            # vec0 kNN이나 1비트 코드가 있으면 저장소가 질의 벡터 기준 top-k를 골라 준다.
+            # 구조화 후보와 같은 이유로 그때는 질의 변형마다 따로 캐시한다.
+            legacy_fetch_kwargs: dict[str, Any] = {}
+            legacy_cache_key = "legacy"
+            legacy_matrix = None
+            fetch_matrix = getattr(self.discord_store, "fetch_recent_matrix", None)
+            if getattr(self.discord_store, "knn_search_available", False):
+                legacy_fetch_kwargs["query_vector"] = query_vector
+                legacy_cache_key += f":vector:{hash(query)}"
+            elif callable(fetch_matrix):
+                # 최신순 후보는 저장소가 캐시한 (N, D) 행렬로 받아 BLOB 해석 없이
+                # 행렬곱 한 번으로 점수를 낸다.
+                legacy_cache_key += ":matrix"
+                _, legacy_matrix, legacy_rows = await self._shared_fetch(
+                    cache,
+                    legacy_cache_key,
+                    lambda: fetch_matrix(
+                        guild_id,
+                        channel_id,
+                        user_id=user_id,
+                        limit=self.embedding_limit,
+                    ),
+                )
+            if legacy_matrix is None:
+                legacy_rows = await self._shared_fetch(
+                    cache,
+                    legacy_cache_key,
+                    lambda: self.discord_store.fetch_recent_embeddings(
+                        server_id=guild_id,
+                        channel_id=channel_id,
+                        user_id=user_id,
+                        limit=self.embedding_limit,
+                        **legacy_fetch_kwargs,
+                    ),
+                )
+                legacy_matrix = await self._shared_rows_matrix(
+                    cache, legacy_cache_key, legacy_rows
                 )
-            legacy_rows = cache["legacy"]
             structured_message_ids = {
                 str(entry.get("message_id"))
                 for entry in dispatcher
@@ -719,6 +877,8 @@ class HybridSearchEngine:
                 channel_id=channel_id,
                 dialogue_cache=dialogue_cache,
                 use_legacy_discord_rows=True,
+                matrix=legacy_matrix,
+                unit_query=unit_query,
             )
             dispatcher.extend(
                 entry
@@ -732,19 +892,31 @@ class HybridSearchEngine:
                 limit=self.embedding_limit,
                 query_vector=query_vector,
             )
-            for raw_row in kakao_rows:
-                row = dict(raw_row)
-                message = row.get("message") or ""
-                # Offline store returns 'score' (pre-calculated similarity) and might skip 'embedding'
-                similarity = row.get("score")
-                vector = self._to_vector(row.get("embedding"))
-                if similarity is None:
-                    if vector is not None:
-                        similarity = self._cosine_similarity(query_vector, vector)
-
-                if similarity is None:
-                    continue
-                semantic_similarity = float(similarity)
+            rows = [dict(raw_row) for raw_row in kakao_rows]
+            # Offline store returns 'score' (pre-calculated similarity) and might skip 'embedding'.
+            # 점수가 없는 행만 벡터로 풀어 행렬곱 한 번으로 코사인을 계산한다.
+            scores = [row.get("score") for row in rows]
+            unscored = [index for index, score in enumerate(scores) if score is None]
+            vectors: Dict[int, np.ndarray | None] = {
+                index: self._to_vector(rows[index].get("embedding")) for index in unscored
+            }
+            computed = self._batch_cosine_similarities(
+                query_vector,
+                [vectors[index] for index in unscored],
+            )
+            for index, score in zip(unscored, computed):
+                scores[index] = score
+            # 어휘 보너스를 최대로 받아도 임계값에 못 미치는 행은 마스크 한 번으로
+            # 거르고, 남은 행만 어휘 점수·후보 dict를 만든다.
+            score_array = np.array(
+                [np.nan if score is None else float(score) for score in scores],
+                dtype=np.float64,
+            )
+            floor = self.embedding_threshold - self._LEXICAL_BONUS_CAP - 1e-6
+            kakao_accepted = []
+            for index in np.flatnonzero(score_array >= floor).tolist():
+                row = rows[index]
+                semantic_similarity = float(scores[index])
                 lexical_score = self._lexical_relevance(query, row)
                 similarity = min(
                     0.999999,
@@ -752,30 +924,48 @@ class HybridSearchEngine:
                 )
                 if similarity < self.embedding_threshold:
                     continue
-
                 message_id = row.get("message_id")
                 try:
                     message_id_int = int(message_id)
                 except (TypeError, ValueError):
                     message_id_int = None
-                timestamp = row.get("timestamp") or ""
+                kakao_accepted.append(
+                    (index, row, semantic_similarity, lexical_score, similarity, message_id_int)
+                )
 
-                focus = {
-                    "message_id": message_id_int,
-                    "user_id": row.get("user_id"),
-                    "user_name": row.get("speaker") or row.get("user_name") or "카카오",
-                    "content": message,
-                    "created_at": timestamp,
-                    "is_bot": False,
-                }
-                dialogue_messages = await self._resolve_dialogue_messages(
-                    channel_id=channel_id,
-                    message_id=message_id_int,
-                    fallback=None,
-                    focus=focus,
-                    cache_namespace=f"kakao:{row.get('db_path') or ''}",
-                    dialogue_cache=dialogue_cache,
+            # 통과한 행의 주변 대화 조회는 서로 독립이라 한 번에 띄운다.
+            kakao_dialogues = await asyncio.gather(
+                *(
+                    self._resolve_dialogue_messages(
+                        channel_id=channel_id,
+                        message_id=message_id_int,
+                        fallback=None,
+                        focus={
+                            "message_id": message_id_int,
+                            "user_id": row.get("user_id"),
+                            "user_name": row.get("speaker") or row.get("user_name") or "카카오",
+                            "content": row.get("message") or "",
+                            "created_at": row.get("timestamp") or "",
+                            "is_bot": False,
+                        },
+                        cache_namespace=f"kakao:{row.get('db_path') or ''}",
+                        dialogue_cache=dialogue_cache,
+                    )
+                    for _, row, _, _, _, message_id_int in kakao_accepted
                 )
+            )
+            for (
+                index,
+                row,
+                semantic_similarity,
+                lexical_score,
+                similarity,
+                message_id_int,
+            ), dialogue_messages in zip(kakao_accepted, kakao_dialogues):
+                vector = vectors[index] if index in vectors else self._to_vector(row.get("embedding"))
+                message = row.get("message") or ""
+                message_id = row.get("message_id")
+                timestamp = row.get("timestamp") or ""
                 dialogue_block = self._format_dialogue_block(dialogue_messages)
                 if not dialogue_block:
                     dialogue_block = self._clean_content(message)
@@ -809,6 +999,102 @@ class HybridSearchEngine:
         dispatcher.sort(key=lambda item: item.get("similarity", 0.0), reverse=True)
         return dispatcher
 
+    async def _query_embedding(
+        self,
+        query: str,
+        cache: Dict[str, asyncio.Future],
+    ) -> np.ndarray | None:
+        """검색 1회 캐시를 거쳐 질의 임베딩을 구합니다.
+
+        공백만 다른 변형은 같은 임베딩을 기다린다. 모델이 대소문자를 구분하므로
+        소문자화는 하지 않는다. 검색 간 재사용은 get_embedding LRU가 맡는다.
+        """
+        embed_text = " ".join(query.split())
+        return await self._shared_fetch(
+            cache,
+            f"query-embedding:{embed_text}",
+            lambda: get_embedding(embed_text, prefix="query: "),
+        )
+
+    def _prefetch_query_embeddings(
+        self,
+        variants: List[str],
+        cache: Dict[str, asyncio.Future],
+    ) -> None:
+        """아직 캐시에 없는 변형 임베딩을 get_embeddings 한 번으로 미리 띄웁니다.
+
+        변형마다 get_embedding을 따로 부르면 encode가 변형 수만큼 돌거나 묶음
+        대기 창을 기다린다. 배치 Task 하나를 띄우고 변형별 캐시 키에는 그
+        결과의 해당 행을 꺼내는 Task를 넣어, _query_embedding이 그대로 재사용한다.
+        """
+        texts: List[str] = []
+        for variant in variants:
+            embed_text = " ".join(variant.split())
+            if (
+                embed_text
+                and f"query-embedding:{embed_text}" not in cache
+                and embed_text not in texts
+            ):
+                texts.append(embed_text)
+        if len(texts) < 2:
+            return
+        batch = asyncio.ensure_future(get_embeddings(texts, prefix="query: "))
+
+        async def _row(position: int) -> np.ndarray | None:
+            return (await batch)[position]
+
+        for position, embed_text in enumerate(texts):
+            cache[f"query-embedding:{embed_text}"] = asyncio.ensure_future(_row(position))
+
+    async def _distinct_variants(
+        self,
+        variants: List[str],
+        cache: Dict[str, asyncio.Future],
+    ) -> List[str]:
+        """질의 임베딩이 앞선 변형과 거의 같은 변형을 빼고 검색할 변형을 고릅니다.
+
+        문자열이 달라도 의역 확장은 같은 벡터에 가까울 수 있다. 변형 임베딩을
+        한꺼번에 구해 V @ V.T 한 번으로 비교하고, 앞에서부터 남긴 변형과의
+        코사인이 _VARIANT_DEDUP_SIMILARITY를 넘으면 버린다. 임베딩이 없는
+        변형은 BM25 조회를 위해 남긴다.
+        """
+        if len(variants) < 2 or _get_numpy() is None:
+            return variants
+        self._prefetch_query_embeddings(variants, cache)
+        vectors = await asyncio.gather(
+            *(self._query_embedding(variant, cache) for variant in variants)
+        )
+        embedded = [index for index, vector in enumerate(vectors) if vector is not None]
+        if len(embedded) < 2 or len({np.shape(vectors[index]) for index in embedded}) != 1:
+            return variants
+        units = np.stack([self._unit_vector(vectors[index]) for index in embedded])
+        similarities = units @ units.T
+        dropped: set[int] = set()
+        kept_rows: List[int] = []
+        for row, index in enumerate(embedded):
+            if kept_rows and float(similarities[row, kept_rows].max()) > self._VARIANT_DEDUP_SIMILARITY:
+                dropped.add(index)
+                continue
+            kept_rows.append(row)
+        return [variant for index, variant in enumerate(variants) if index not in dropped]
+
+    @staticmethod
+    async def _shared_fetch(
+        cache: Dict[str, asyncio.Future],
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """검색 1회 캐시에서 key의 조회 결과를 돌려줍니다.
+
+        질의 변형이 동시에 실행되므로 결과 대신 진행 중인 Task를 넣어 둔다.
+        같은 키를 요청한 다른 변형은 조회를 다시 하지 않고 그 Task를 기다린다.
+        """
+        pending = cache.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(fetch())
+            cache[key] = pending
+        return await pending
+
     @staticmethod
     def _lexical_query_terms(query: str) -> tuple[str, ...]:
         """고유명사 보조 점수에 쓸 일반 토큰과 조사 제거 후보를 만듭니다."""
@@ -850,7 +1136,39 @@ class HybridSearchEngine:
             return 0.0
         longest = max(len(term) for term in matched)
         base = 0.015 if longest == 2 else 0.04 if longest == 3 else 0.06
-        return min(0.08, base + min(0.02, 0.01 * (len(matched) - 1)))
+        return min(cls._LEXICAL_BONUS_CAP, base + min(0.02, 0.01 * (len(matched) - 1)))
+
+    @staticmethod
+    def _blob_rows_matrix(rows: List[dict[str, Any]] | List[Any]) -> np.ndarray | None:
+        """모든 행의 embedding이 BLOB이면 이어 붙여 ``(N, D)`` 행렬 하나로 풉니다.
+
+        행마다 작은 배열을 만들지 않기 위한 것으로, 빠지는 행(빈 BLOB·다른
+        차원)이 있으면 None을 돌려 행별 경로를 타게 한다.
+        """
+        blobs = [row["embedding"] if "embedding" in row.keys() else None for row in rows]
+        if not blobs or not all(
+            isinstance(blob, (bytes, bytearray, memoryview)) for blob in blobs
+        ):
+            return None
+        indexes, matrix = embedding_blobs_to_matrix(blobs)
+        return matrix if len(indexes) == len(rows) else None
+
+    async def _shared_rows_matrix(
+        self,
+        cache: Dict[str, asyncio.Future],
+        key: str,
+        rows: List[dict[str, Any]] | List[Any],
+    ) -> np.ndarray | None:
+        """변형끼리 공유하는 행의 BLOB 행렬을 검색 1회에 한 번만 풉니다.
+
+        같은 행 목록을 변형마다 다시 해석하지 않도록 key로 캐시하고, 해석은
+        이벤트 루프를 막지 않게 스레드에서 한다.
+        """
+        return await self._shared_fetch(
+            cache,
+            f"{key}:matrix-decoded",
+            lambda: asyncio.to_thread(self._blob_rows_matrix, rows),
+        )
 
     async def _score_discord_rows(
         self,
@@ -862,55 +1180,116 @@ class HybridSearchEngine:
         channel_id: int,
         dialogue_cache: Dict[tuple[str, int, int], List[dict[str, Any]]] | None = None,
         use_legacy_discord_rows: bool,
+        matrix: np.ndarray | None = None,
+        unit_query: np.ndarray | None = None,
     ) -> List[dict[str, Any]]:
+        """Discord 행을 점수화해 후보 dict로 만듭니다.
+
+        matrix가 있으면 i번째 행이 discord_rows[i]의 임베딩이며, 행의
+        embedding 컬럼 대신 그 행렬로 점수를 계산한다. unit_query는 정규화한
+        질의 벡터로, matrix 행이 단위 길이일 때만 넘겨 코사인을 내적으로 낸다.
+        """
         threshold = self.embedding_threshold if use_legacy_discord_rows else self.structured_memory_threshold
         dispatcher: List[dict[str, Any]] = []
 
-        for raw_row in discord_rows:
-            row = dict(raw_row)
-            vector = self._to_vector(row.get("embedding"))
+        rows = [dict(raw_row) for raw_row in discord_rows]
+        query_array = np.asarray(query_vector, dtype=np.float32)
+        if matrix is None:
+            matrix = self._blob_rows_matrix(rows)
+        # 어휘 보너스와 본인 범위 가산점을 모두 받아도 임계값에 못 미치는 행은
+        # 어휘 일치 계산 같은 행별 파이썬 처리 전에 점수 비교 한 번으로 거른다.
+        floor = threshold - self._LEXICAL_BONUS_CAP - self._PERSONAL_SCOPE_BONUS - 1e-6
+        vectors: List[np.ndarray | None] | None = None
+        if matrix is not None and matrix.ndim == 2 and matrix.shape[1:] == query_array.shape:
+            if unit_query is not None:
+                score_array = self._matrix_dot_scores(unit_query, matrix)
+            else:
+                score_array = self._matrix_cosine_similarities(query_array, matrix)
+            semantic_scores = score_array.tolist()
+            indexes = np.flatnonzero(score_array >= floor).tolist()
+        else:
+            vectors = [self._to_vector(row.get("embedding")) for row in rows]
+            semantic_scores = self._batch_cosine_similarities(query_vector, vectors)
+            indexes = [
+                index
+                for index, score in enumerate(semantic_scores)
+                if score is not None and score >= floor
+            ]
+
+        accepted = []
+        for index in indexes:
+            row = rows[index]
+            vector = vectors[index] if vectors is not None else matrix[index]
+            semantic_similarity = semantic_scores[index]
             message = row.get("summary_text") or row.get("message") or ""
             if vector is None or not message.strip():
                 continue
-            semantic_similarity = self._cosine_similarity(query_vector, vector)
             lexical_score = self._lexical_relevance(query, row)
             similarity = min(
                 0.999999,
                 semantic_similarity + lexical_score,
             )
-            memory_scope = row.get("memory_scope")
-            memory_type = row.get("memory_type")
             if (
                 not use_legacy_discord_rows
-                and memory_scope in {"user", "guild_user", "dm_user"}
+                and row.get("memory_scope") in {"user", "guild_user", "dm_user"}
             ):
-                similarity = min(0.999999, similarity + 0.025)
+                similarity = min(0.999999, similarity + self._PERSONAL_SCOPE_BONUS)
             if similarity < threshold:
                 continue
-
-            message_id = row.get("message_id")
             try:
-                message_id_int = int(message_id)
+                message_id_int = int(row.get("message_id"))
             except (TypeError, ValueError):
                 message_id_int = None
-            timestamp = row.get("timestamp") or ""
+            accepted.append(
+                (row, vector, semantic_similarity, lexical_score, similarity, message, message_id_int)
+            )
 
+        cache_namespace = "discord-memory" if not use_legacy_discord_rows else "discord"
+        windows = await self._prefetch_windows(
+            channel_id,
+            (item[-1] for item in accepted),
+            cache_namespace=cache_namespace,
+            dialogue_cache=dialogue_cache,
+        )
+
+        async def _dialogue(row: dict[str, Any], message: str, message_id_int: int | None):
             focus = {
                 "message_id": message_id_int,
                 "user_id": row.get("user_id"),
                 "user_name": row.get("user_name") or "User",
                 "content": row.get("raw_context") or row.get("message") or message,
-                "created_at": timestamp,
-                "is_bot": str(memory_type or "").startswith("assistant_"),
+                "created_at": row.get("timestamp") or "",
+                "is_bot": str(row.get("memory_type") or "").startswith("assistant_"),
             }
-            dialogue_messages = await self._resolve_dialogue_messages(
+            return await self._resolve_dialogue_messages(
                 channel_id=channel_id,
                 message_id=message_id_int,
                 fallback=row.get("raw_context") or row.get("context_window"),
                 focus=focus,
-                cache_namespace="discord-memory" if not use_legacy_discord_rows else "discord",
+                cache_namespace=cache_namespace,
                 dialogue_cache=dialogue_cache,
+                windows=windows,
             )
+
+        # 일괄 윈도우에 없던 후보의 주변 대화 조회(fetch_neighbors 등)는 후보끼리
+        # 독립이라 한 번에 띄운다.
+        dialogues = await asyncio.gather(
+            *(_dialogue(item[0], item[5], item[6]) for item in accepted)
+        )
+        for (
+            row,
+            vector,
+            semantic_similarity,
+            lexical_score,
+            similarity,
+            message,
+            message_id_int,
+        ), dialogue_messages in zip(accepted, dialogues):
+            memory_scope = row.get("memory_scope")
+            memory_type = row.get("memory_type")
+            message_id = row.get("message_id")
+            timestamp = row.get("timestamp") or ""
+
             dialogue_block = self._format_dialogue_block(dialogue_messages)
             if not dialogue_block:
                 dialogue_block = self._clean_content(row.get("raw_context") or row.get("message") or message)
@@ -965,11 +1344,42 @@ class HybridSearchEngine:
             limit=self.bm25_top_n,
         )
         dispatcher: List[dict[str, Any]] = []
-        for rank, item in enumerate(results):
+        windows = await self._prefetch_windows(
+            channel_id,
+            (item.message_id for item in results),
+            cache_namespace="bm25",
+            dialogue_cache=dialogue_cache,
+        )
+        dialogues = await asyncio.gather(
+            *(
+                self._resolve_dialogue_messages(
+                    channel_id=channel_id,
+                    message_id=item.message_id,
+                    fallback=item.context_window,
+                    focus={
+                        "message_id": item.message_id,
+                        "user_id": item.user_id,
+                        "user_name": item.user_name,
+                        "content": item.content,
+                        "created_at": item.created_at,
+                        "is_bot": False,
+                    },
+                    cache_namespace="bm25",
+                    dialogue_cache=dialogue_cache,
+                    windows=windows,
+                )
+                for item in results
+            )
+        )
+        for rank, (item, dialogue_messages) in enumerate(zip(results, dialogues)):
             # SQLite FTS5 bm25()는 작은 값이 우수하고 흔히 음수이므로 이를
             # 확률처럼 1/(1+raw)로 바꾸면 거의 1.0이 되어 의미 게이트를
             # 우회한다. 절대값 대신 순위만 낮은 보조 점수 대역으로 매핑한다.
-            normalized_score = max(0.0, 0.57 - (rank * 0.02))
+            normalized_score = (
+                self._bm25_rank_scores[rank]
+                if rank < len(self._bm25_rank_scores)
+                else max(0.0, 0.57 - (rank * 0.02))
+            )
             lexical_score = self._lexical_relevance(
                 query,
                 {
@@ -977,26 +1387,6 @@ class HybridSearchEngine:
                     "user_name": item.user_name,
                 },
             )
-            focus = {
-                "message_id": item.message_id,
-                "user_id": item.user_id,
-                "user_name": item.user_name,
-                "content": item.content,
-                "created_at": item.created_at,
-                "is_bot": False,
-            }
-            dialogue_messages = await self._resolve_dialogue_messages(
-                channel_id=channel_id,
-                message_id=item.message_id,
-                fallback=item.context_window,
-                focus=focus,
-                cache_namespace="bm25",
-                dialogue_cache=dialogue_cache,
-            )
-            dialogue_block = self._format_dialogue_block(dialogue_messages)
-            if not dialogue_block:
-                dialogue_block = self._clean_content(item.content)
-
             dispatcher.append(
                 {
                     "id": f"bm25:{item.message_id}",
@@ -1013,7 +1403,9 @@ class HybridSearchEngine:
                     "timestamp": item.created_at,
                     "source": "bm25",
                     "dialogue_messages": dialogue_messages,
-                    "dialogue_block": dialogue_block,
+                    # 같은 메시지가 다른 변형·임베딩 후보와 겹치는 일이 잦아,
+                    # 포맷·청킹은 병합 뒤 search()의 보강 단계에서 한 번만 한다.
+                    "dialogue_block": None,
                 }
             )
         return dispatcher
@@ -1037,8 +1429,10 @@ class HybridSearchEngine:
 
         candidate = candidate_map.get(candidate_id)
         if candidate is None:
-            candidate = dict(entry)
-            candidate["sources"] = {source}
+            # 후보 dict는 _embedding_candidates/_bm25_candidates가 이 검색을 위해
+            # 새로 만든 것이라, 복사하지 않고 맵이 그대로 소유한다.
+            candidate = entry
+            candidate["sources"] = {source: None}
             if source == "embedding":
                 candidate["embedding_rank"] = rank
             if source == "bm25":
@@ -1046,7 +1440,7 @@ class HybridSearchEngine:
             candidate_map[candidate_id] = candidate
             return
 
-        candidate.setdefault("sources", set()).add(source)
+        candidate.setdefault("sources", {})[source] = None
         if source == "embedding":
             new_sim = entry.get("similarity") or 0.0
             old_sim = candidate.get("similarity") or 0.0
@@ -1063,9 +1457,12 @@ class HybridSearchEngine:
             if new_bm25 > old_bm25:
                 candidate["bm25_score"] = new_bm25
                 candidate["bm25_score_raw"] = entry.get("bm25_score_raw")
-                candidate["message"] = entry.get("message") or candidate.get("message")
-                candidate["dialogue_messages"] = entry.get("dialogue_messages") or candidate.get("dialogue_messages")
-                candidate["dialogue_block"] = entry.get("dialogue_block") or candidate.get("dialogue_block")
+                # 임베딩 적중이 이미 채운 본문·블록은 BM25 항목으로 덮지 않는다.
+                if "embedding" not in candidate["sources"]:
+                    candidate["message"] = entry.get("message") or candidate.get("message")
+                    if entry.get("dialogue_messages"):
+                        candidate["dialogue_messages"] = entry["dialogue_messages"]
+                        candidate["dialogue_block"] = entry.get("dialogue_block")
 
         if not candidate.get("dialogue_block") and entry.get("dialogue_block"):
             candidate["dialogue_block"] = entry.get("dialogue_block")
@@ -1080,7 +1477,13 @@ class HybridSearchEngine:
         focus: dict[str, Any] | None,
         cache_namespace: str,
         dialogue_cache: Dict[tuple[str, int, int], List[dict[str, Any]]] | None = None,
+        windows: Dict[int, List[dict[str, Any]]] | None = None,
     ) -> List[dict[str, Any]]:
+        """후보 메시지 주변 대화를 찾습니다.
+
+        windows는 ``_prefetch_windows``로 미리 읽은 슬라이딩 윈도우이며, 주어지면
+        메시지별 윈도우 조회를 다시 하지 않는다.
+        """
         messages: List[dict[str, Any]] = []
         target_id_str = str(message_id) if message_id is not None else None
         cache_key: tuple[str, int, int] | None = None
@@ -1092,10 +1495,13 @@ class HybridSearchEngine:
                     return [dict(item) for item in cached]
 
         if message_id is not None and self.bm25_manager is not None:
-            window = await self.bm25_manager.fetch_window_for_message(
-                channel_id=channel_id,
-                message_id=message_id,
-            )
+            if windows is not None:
+                window = windows.get(message_id)
+            else:
+                window = await self.bm25_manager.fetch_window_for_message(
+                    channel_id=channel_id,
+                    message_id=message_id,
+                )
             if window:
                 messages = [self._coerce_dialogue_entry(item) for item in window]  # 미리 캐싱한 윈도우 활용
             else:
@@ -1133,6 +1539,35 @@ class HybridSearchEngine:
             dialogue_cache[cache_key] = [dict(item) for item in messages]
         return messages
 
+    async def _prefetch_windows(
+        self,
+        channel_id: int,
+        message_ids: Iterable[int | None],
+        *,
+        cache_namespace: str,
+        dialogue_cache: Dict[tuple[str, int, int], List[dict[str, Any]]] | None,
+    ) -> Dict[int, List[dict[str, Any]]] | None:
+        """후보들의 슬라이딩 윈도우를 쿼리 한 번으로 읽어 둡니다.
+
+        대화 캐시에 이미 있는 메시지는 제외한다. 일괄 조회를 지원하지 않는
+        관리자면 None을 돌려 메시지별 조회로 둔다.
+        """
+        fetch_many = getattr(self.bm25_manager, "fetch_windows_for_messages", None)
+        if not callable(fetch_many):
+            return None
+        pending = {
+            message_id
+            for message_id in message_ids
+            if message_id is not None
+            and (
+                dialogue_cache is None
+                or (cache_namespace, channel_id, message_id) not in dialogue_cache
+            )
+        }
+        if not pending:
+            return {}
+        return await fetch_many(channel_id=channel_id, message_ids=pending)
+
     def _coerce_dialogue_entry(self, raw: dict[str, Any]) -> dict[str, Any]:
         message_id = raw.get("message_id")
         try:
@@ -1242,22 +1677,54 @@ class HybridSearchEngine:
             lines.append(line)
         combined = "\n".join(lines)
         if self.chunker and combined:
-            chunks = self.chunker.chunk(combined, metadata={"origin": "dialogue"})
-            if chunks:
-                combined = chunks[0].text
+            combined = self._first_dialogue_chunk(combined)
         return combined
 
+    def _first_dialogue_chunk(self, combined: str) -> str:
+        """대화 블록의 첫 청크 텍스트를 돌려줍니다. 결과는 LRU에 남긴다."""
+        cached = self._dialogue_chunk_cache.get(combined)
+        if cached is not None:
+            self._dialogue_chunk_cache.move_to_end(combined)
+            return cached
+        chunk_config = getattr(self.chunker, "config", None)
+        if (
+            isinstance(chunk_config, ChunkerConfig)
+            and chunk_config.tokenizer is default_tokenizer
+            and len(combined.split()) <= max(1, chunk_config.max_tokens)
+        ):
+            # 전체 토큰 수가 한도 이하면 첫 청크가 모든 문장을 담으므로 청커의
+            # 누적·오버랩 계산 없이 같은 결과(문장을 공백으로 이은 값)를 만든다.
+            sentences = split_sentences(combined)
+            text = " ".join(sentences) if sentences else combined
+        else:
+            chunks = self.chunker.chunk(combined, metadata={"origin": "dialogue"})
+            text = chunks[0].text if chunks else combined
+        self._dialogue_chunk_cache[combined] = text
+        if len(self._dialogue_chunk_cache) > self._DIALOGUE_CHUNK_CACHE_SIZE:
+            self._dialogue_chunk_cache.popitem(last=False)
+        return text
+
     def _clean_content(self, text: str) -> str:
         """텍스트에서 URL을 제거하고 공백을 정규화하며 욕설을 마스킹합니다.
         
-        성능 최적화를 위해 미리 컴파일된 정규식 패턴을 사용합니다.
+        성능 최적화를 위해 미리 컴파일된 정규식 패턴을 사용하고, 결과는
+        _CLEAN_CONTENT_CACHE_SIZE 크기의 LRU로 재사용한다. 줄바꿈은 공백
+        정규화에 함께 흡수되므로 따로 바꾸지 않고, "://"가 없으면 URL 치환을
+        건너뛴다.
         """
         if not text:
             return ""
-        normalized = text.replace("\r\n", "\n").replace("\r", "\n")
-        normalized = _URL_PATTERN.sub("[링크]", normalized)  # 컴파일된 패턴 사용
-        normalized = _WHITESPACE_PATTERN.sub(" ", normalized).strip()  # 컴파일된 패턴 사용
-        return clean_profanity(normalized)
+        cached = self._clean_content_cache.get(text)
+        if cached is not None:
+            self._clean_content_cache.move_to_end(text)
+            return cached
+        normalized = _URL_PATTERN.sub("[링크]", text) if "://" in text else text
+        normalized = _WHITESPACE_PATTERN.sub(" ", normalized).strip()
+        cleaned = clean_profanity(normalized)
+        self._clean_content_cache[text] = cleaned
+        if len(self._clean_content_cache) > self._CLEAN_CONTENT_CACHE_SIZE:
+            self._clean_content_cache.popitem(last=False)
+        return cleaned
 
     def _compose_recent_context(self, recent_messages: list[str] | None) -> str:
         if not recent_messages:
@@ -1292,13 +1759,25 @@ class HybridSearchEngine:
                     "origin": entry.get("origin"),
                     "message_id": entry.get("message_id"),
                     "candidate_id": entry.get("candidate_id"),
-                    "combined_score": entry.get("combined_score", 0.0),
+                    # 정렬·컷오프에서 매번 변환하지 않도록 한 번만 float로 바꿔 둔다.
+                    "combined_score": float(entry.get("combined_score") or 0.0),
                 }
             )
 
         if not docs:
             return entries
 
+        # cross-encoder 비용은 문서 수에 비례하므로, 결합 점수가 최고점과 크게
+        # 벌어진 후보는 재순위화 없이 뒤에 그대로 붙인다.
+        ranked_docs = sorted(docs, key=lambda doc: doc["combined_score"], reverse=True)
+        cutoff = ranked_docs[0]["combined_score"] * self._RERANK_PREFILTER_RATIO
+        docs = [
+            doc
+            for position, doc in enumerate(ranked_docs)
+            if position < self._RERANK_MIN_DOCS or doc["combined_score"] >= cutoff
+        ]
+        reranked_ids = {doc["candidate_id"] for doc in docs}
+
         reranked = await self.reranker.rerank(
             original_query,
             docs,
@@ -1307,10 +1786,13 @@ class HybridSearchEngine:
         if not reranked:
             return entries
 
+        # 같은 ID가 여럿이면 앞선 항목을 쓰던 선형 탐색과 맞추려고 setdefault로 채운다.
+        entries_by_id: Dict[Any, dict[str, Any]] = {}
+        for entry in entries:
+            entries_by_id.setdefault(entry.get("candidate_id"), entry)
         merged: List[dict[str, Any]] = []
         for item in reranked:
-            candidate_id = item.get("candidate_id")
-            base = next((entry for entry in entries if entry.get("candidate_id") == candidate_id), None)
+            base = entries_by_id.get(item.get("candidate_id"))
             if base is None:
                 continue
             enriched = dict(base)
@@ -1327,6 +1809,11 @@ class HybridSearchEngine:
             ),
             reverse=True,
         )
+        merged.extend(
+            entry for entry in entries
+            if entry.get("candidate_id") not in reranked_ids
+            and (entry.get("dialogue_block") or entry.get("message"))
+        )
         return merged[: len(entries)]
 
     def _to_vector(self, blob: Any) -> np.ndarray | None:
@@ -1335,7 +1822,8 @@ class HybridSearchEngine:
         if blob is None:
             return None
         if isinstance(blob, np.ndarray):
-            return blob.astype(np.float32)
+            # 이미 float32면 복사하지 않는다. 반환 벡터는 읽기 전용으로만 쓴다.
+            return np.asarray(blob, dtype=np.float32)
         if isinstance(blob, memoryview):
             blob = blob.tobytes()
         if isinstance(blob, (bytes, bytearray)):
@@ -1351,12 +1839,125 @@ class HybridSearchEngine:
                 return np.asarray(parsed, dtype=np.float32)
         return None
 
+    @staticmethod
+    def _unit_vector(vector: np.ndarray) -> np.ndarray:
+        """벡터를 L2 노름 1인 float32 배열로 만든다. 영벡터는 그대로 둔다."""
+        array = np.asarray(vector, dtype=np.float32)
+        squared = float(np.vdot(array, array))
+        if squared == 0:
+            return array
+        return array / np.float32(math.sqrt(squared))
+
+    @classmethod
+    def _batch_cosine_similarities(
+        cls,
+        query_vector: np.ndarray,
+        vectors: List[np.ndarray | None],
+    ) -> List[float | None]:
+        """후보 벡터 전체의 코사인 유사도를 행렬곱 한 번으로 계산한다.
+
+        질의와 차원이 같은 벡터만 ``(N, D)`` 행렬로 쌓아 BLAS로 계산하고,
+        차원이 다른 벡터는 기존 단건 계산 경로를 그대로 탄다.
+        """
+        scores: List[float | None] = [None] * len(vectors)
+        if _get_numpy() is None:
+            return [0.0 if vector is not None else None for vector in vectors]
+        query = np.asarray(query_vector, dtype=np.float32)
+        stacked_indexes: List[int] = []
+        for index, vector in enumerate(vectors):
+            if vector is None:
+                continue
+            if vector.shape == query.shape and query.ndim == 1:
+                stacked_indexes.append(index)
+            else:
+                scores[index] = cls._cosine_similarity(query, vector)
+        if not stacked_indexes:
+            return scores
+
+        # 후보를 미리 잡은 연속 버퍼 하나에 채워 np.stack의 중간 리스트 없이
+        # (N, D) 행렬을 만들고, 정규화까지 벡터 연산으로 끝낸다.
+        matrix = np.empty((len(stacked_indexes), query.shape[0]), dtype=np.float32)
+        for position, index in enumerate(stacked_indexes):
+            matrix[position] = vectors[index]
+        cosines = cls._matrix_cosine_similarities(query, matrix)
+        for index, score in zip(stacked_indexes, cosines.tolist()):
+            scores[index] = score
+        return scores
+
+    @staticmethod
+    def _matrix_dot_scores(unit_query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """단위 길이 ``(N, D)`` 행렬과 단위 질의의 내적(=코사인)을 float32로 돌려준다.
+
+        float16 행렬은 질의도 float16으로 맞춰 행렬을 float32로 올리지 않는다.
+        simsimd가 있으면 float16/float32 모두 SIMD 내적 커널을 쓰고, 없으면
+        NumPy 행렬곱으로 계산한다.
+        """
+        dtype = np.float16 if matrix.dtype == np.float16 else np.float32
+        query = np.ascontiguousarray(unit_query, dtype=dtype)
+        simd = _get_simsimd()
+        if simd is not None and len(matrix):
+            try:
+                dots = simd.cdist(
+                    np.ascontiguousarray(matrix, dtype=dtype),
+                    query.reshape(1, -1),
+                    metric="dot",
+                )
+            except (TypeError, ValueError):  # 내적 지표가 없는 구버전은 NumPy로 계산한다.
+                pass
+            else:
+                return np.asarray(dots, dtype=np.float32).reshape(-1)
+        return (matrix @ query).astype(np.float32, copy=False)
+
+    @staticmethod
+    def _matrix_cosine_similarities(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """``(N, D)`` 행렬의 각 행과 질의 벡터의 코사인을 float32로 한 번에 계산한다.
+
+        영벡터 행(또는 영벡터 질의)의 점수는 0.0이다. simsimd 경로는 float16
+        행렬을 그대로 넘기고, NumPy 경로는 float32로 계산한다.
+        """
+        simd = _get_simsimd()
+        if simd is not None and len(matrix):
+            # simsimd는 코사인 거리(1 - 코사인)를 돌려주고 영벡터도 거리 0으로
+            # 보므로, 영벡터 행은 NumPy 경로처럼 0.0으로 되돌린다.
+            dtype = np.float16 if matrix.dtype == np.float16 else np.float32
+            distances = simd.cdist(
+                np.ascontiguousarray(matrix, dtype=dtype),
+                np.ascontiguousarray(query, dtype=dtype).reshape(1, -1),
+                metric="cosine",
+            )
+            cosines = 1.0 - np.asarray(distances, dtype=np.float32).reshape(-1)
+            if query.any():
+                cosines[~matrix.any(axis=1)] = 0.0
+            else:
+                cosines[:] = 0.0
+            return cosines
+        matrix = matrix.astype(np.float32, copy=False)
+        denominators = np.linalg.norm(matrix, axis=1) * np.float32(np.linalg.norm(query))
+        dots = matrix @ query
+        return np.divide(
+            dots,
+            denominators,
+            out=np.zeros_like(dots),
+            where=denominators != 0,
+        )
+
     @staticmethod
     def _cosine_similarity(v1: np.ndarray, v2: np.ndarray) -> float:
         if _get_numpy() is None:
             return 0.0
-        norm_v1 = np.linalg.norm(v1)
-        norm_v2 = np.linalg.norm(v2)
-        if norm_v1 == 0 or norm_v2 == 0:
+        simd = _get_simsimd()
+        if (
+            simd is not None
+            and v1.dtype in (np.float32, np.float16)
+            and v1.dtype == v2.dtype
+            and v1.ndim == 1
+            and v1.shape == v2.shape
+        ):
+            if not (v1.any() and v2.any()):
+                return 0.0
+            return 1.0 - float(simd.cosine(v1, v2))
+        # linalg.norm 두 번 대신 제곱합 두 개를 곱해 sqrt를 한 번만 한다.
+        denominator = float(np.vdot(v1, v1)) * float(np.vdot(v2, v2))
+        if denominator == 0:
             return 0.0
-        return float(np.dot(v1, v2) / (norm_v1 * norm_v2))
+        return float(np.dot(v1, v2)) / math.sqrt(denominator)
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import csv
 import logging
+from itertools import product
 from pathlib import Path
 from typing import Iterable
 
@@ -98,38 +99,40 @@ def _collect_candidate_names(level1: str, level2: str, level3: str) -> set[str]:
     names: set[str] = set()
     l1_aliases = list(_expand_level_aliases(level1))
     l2_aliases = list(_expand_level_aliases(level2))
-    l3_aliases = [_normalize_name(level3)] if _normalize_name(level3) else []
+    norm3 = _normalize_name(level3)
 
     # 단일 레벨 조합
     names.update(alias for alias in l1_aliases if alias)
-    if not _normalize_name(level3):
+    if not norm3:
         names.update(alias for alias in l2_aliases if alias and len(alias) > 1)
-    names.update(alias for alias in l3_aliases if alias and len(alias) > 1)
+    elif len(norm3) > 1:
+        names.add(norm3)
 
-    # 결합된 이름 (상세 → 광역 순)
+    # 결합 이름은 정규화한 조각을 공백으로 이어 붙인다. 조각마다 한 번만
+    # 정규화해 두면 이어 붙인 결과를 다시 정규화한 것과 같으므로, 조합마다
+    # split/join을 반복하지 않는다. 같은 별칭은 한 번만 조합한다.
     def _join(*parts: str) -> str:
-        joined = " ".join(p for p in parts if p)
-        return _normalize_name(joined)
+        return " ".join(part for part in parts if part)
+
+    norm1 = _normalize_name(level1)
+    norm2 = _normalize_name(level2)
+    l1_norm = [alias for alias in dict.fromkeys(map(_normalize_name, l1_aliases)) if alias]
+    l2_norm = [alias for alias in dict.fromkeys(map(_normalize_name, l2_aliases)) if alias]
+    l3_norm = [norm3] if norm3 else []
 
-    combos = {
-        _join(level1, level2, level3),
-        _join(level1, level2),
-        _join(level2, level3),
-        _join(level1, level3),
-    }
-    names.update(name for name in combos if name)
+    # 결합된 이름 (상세 → 광역 순)
+    names.add(_join(norm1, norm2, norm3))
+    names.add(_join(norm1, norm2))
+    names.add(_join(norm2, norm3))
+    names.add(_join(norm1, norm3))
 
     # 광역명+세부명 조합 (예: "서울 청운효자동")
-    for l1 in l1_aliases:
-        for l2 in l2_aliases:
-            names.add(_join(l1, l2))
-        for l3 in l3_aliases:
-            names.add(_join(l1, l3))
-    for l2 in l2_aliases:
-        for l3 in l3_aliases:
-            names.add(_join(l2, l3))
+    names.update(f"{l1} {l2}" for l1, l2 in product(l1_norm, l2_norm))
+    names.update(f"{l1} {l3}" for l1, l3 in product(l1_norm, l3_norm))
+    names.update(f"{l2} {l3}" for l2, l3 in product(l2_norm, l3_norm))
 
-    return {n for n in names if n}
+    names.discard("")
+    return names
 
 
 def load_locations_from_csv(csv_path: str | Path | None = None) -> list[dict[str, int]]:
@@ -148,29 +151,39 @@ def load_locations_from_csv(csv_path: str | Path | None = None) -> list[dict[str
 
     try:
         with csv_path.open('r', encoding='utf-8-sig') as fp:
-            reader = csv.DictReader(fp)
+            # 행마다 dict를 만들지 않도록 헤더에서 열 위치만 찾아 csv.reader로 읽는다.
+            reader = csv.reader(fp)
+            header = next(reader, [])
+            columns = {name: index for index, name in enumerate(header)}
+            x_index = columns.get('격자 X')
+            y_index = columns.get('격자 Y')
+            if x_index is None or y_index is None:
+                logger.warning("Location CSV has no grid columns: %s", csv_path)
+                return []
+            level_indexes = [columns.get(name) for name in ('1단계', '2단계', '3단계')]
+            width = max(x_index, y_index) + 1
             for row in reader:
+                if len(row) < width:
+                    continue
                 try:
-                    nx = int(float(row.get('격자 X', '0')))
-                    ny = int(float(row.get('격자 Y', '0')))
+                    nx = int(float(row[x_index]))
+                    ny = int(float(row[y_index]))
                 except ValueError:
                     continue
-
-                level1 = row.get('1단계', '')
-                level2 = row.get('2단계', '')
-                level3 = row.get('3단계', '')
                 if not nx or not ny:
                     continue
+
+                coords = (nx, ny)
+                level1, level2, level3 = (
+                    row[index] if index is not None and index < len(row) else ''
+                    for index in level_indexes
+                )
                 for name in _collect_candidate_names(level1, level2, level3):
-                    if name in entries:
-                        # 동일 이름인데 좌표가 다르면 구체적인(긴) 이름만 유지합니다.
-                        existing = entries[name]
-                        if existing != (nx, ny):
-                            if len(name.split()) == 1:
-                                continue
-                            logger.debug("Duplicate location name '%s' with differing coords detected. Keeping first entry.", name)
-                            continue
-                    entries.setdefault(name, (nx, ny))
+                    # 같은 이름은 먼저 읽은 좌표를 유지한다. 좌표가 다른 중복은
+                    # 여러 단어로 된 구체적인 이름일 때만 기록한다.
+                    existing = entries.setdefault(name, coords)
+                    if existing != coords and " " in name:
+                        logger.debug("Duplicate location name '%s' with differing coords detected. Keeping first entry.", name)
     except Exception as exc:
         logger.error("Failed to load location CSV '%s': %s", csv_path, exc, exc_info=True)
         return []
@@ -24,6 +24,7 @@ import aiohttp
 import config
 from logger_config import logger
 from utils import db as db_utils
+from utils import http
 
 
 KST = timezone(timedelta(hours=9))
@@ -636,7 +637,7 @@ async def _linkup_post_json(endpoint: str, payload: dict[str, Any]) -> dict[str,
 
     try:
         async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(url, headers=headers, json=payload) as response:
+            async with session.post(url, headers=headers, data=http.json_dumps(payload)) as response:
                 body_text = await response.text()
                 if response.status >= 400:
                     # 명시적인 4xx 거절은 provider가 검색을 수행하지 않은 것으로
@@ -655,8 +656,8 @@ async def _linkup_post_json(endpoint: str, payload: dict[str, Any]) -> dict[str,
                         status=response.status,
                     )
                 try:
-                    return json.loads(body_text) if body_text else {}
-                except (TypeError, ValueError, json.JSONDecodeError):
+                    return http.json_loads(body_text) if body_text else {}
+                except (TypeError, ValueError):
                     return {}
     except LinkupRequestError:
         raise
@@ -7,6 +7,7 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import json
 import re
 from collections import OrderedDict, deque
@@ -20,7 +21,9 @@ from logger_config import logger
 from utils.embeddings import (
     count_embedding_tokens,
     get_embedding,
+    get_embeddings,
     get_embedding_token_limit,
+    memory_entry_digest,
     trim_text_to_embedding_token_limit,
 )
 from utils.memory_units import (
@@ -159,6 +162,26 @@ class RAGManager:
             logger.error("임베딩 생성 실패", extra=log_extra)
         return embedding
 
+    async def _generate_local_embeddings(
+        self,
+        contents: list[str],
+        log_extra: dict,
+    ) -> list[Any | None]:
+        """여러 텍스트의 로컬 임베딩을 한 번의 배치 encode로 생성합니다."""
+        if not (config.AI_MEMORY_ENABLED and config.EMBEDDING_ENABLED) or not contents:
+            return [None] * len(contents)
+
+        embeddings = await get_embeddings(contents)
+        failed = sum(1 for embedding in embeddings if embedding is None)
+        if failed:
+            logger.error(
+                "임베딩 생성 실패: %d/%d",
+                failed,
+                len(contents),
+                extra=log_extra,
+            )
+        return embeddings
+
     @staticmethod
     def _estimate_window_tokens(text: str) -> int:
         """윈도우 저장 판단용 경량 토큰 추정치."""
@@ -547,6 +570,21 @@ class RAGManager:
         if not memory_units:
             return
 
+        # 윈도우가 stride만큼 겹치므로 직전 윈도우와 같은 유닛이 다시 나온다.
+        # 같은 내용으로 이미 저장한 유닛은 요약/encode/upsert를 모두 건너뛴다.
+        digests = {
+            unit.memory_id: memory_entry_digest(
+                {**dataclasses.asdict(unit), "server_id": guild_id, "channel_id": channel_id}
+            )
+            for unit in memory_units
+        }
+        unchanged = self.embedding_store.unchanged_memory_ids(digests)
+        memory_units = [unit for unit in memory_units if unit.memory_id not in unchanged]
+        if not memory_units:
+            return
+
+        # 유닛별로 입력 텍스트를 먼저 확정한 뒤 한 번의 배치 encode로 임베딩한다.
+        prepared: list[tuple[StructuredMemoryUnit, dict[str, Any], str, str]] = []
         for unit in memory_units:
             log_extra = {
                 'guild_id': guild_id,
@@ -599,35 +637,55 @@ class RAGManager:
                         memory_text_for_embedding = trimmed
                         token_count = await count_embedding_tokens(f"passage: {memory_text_for_embedding}")
 
-            embedding_vector = await self._generate_local_embedding(
-                f"passage: {memory_text_for_embedding}",
-                log_extra,
-                prefix="",
+            prepared.append(
+                (unit, log_extra, memory_text_for_embedding, summary_text_for_storage)
             )
+
+        embedding_vectors = await self._generate_local_embeddings(
+            [f"passage: {memory_text}" for _, _, memory_text, _ in prepared],
+            {'guild_id': guild_id, 'channel_id': channel_id},
+        )
+        entries: list[dict[str, Any]] = []
+        for (
+            (unit, _log_extra, memory_text_for_embedding, summary_text_for_storage),
+            embedding_vector,
+        ) in zip(prepared, embedding_vectors):
             if embedding_vector is None:
                 continue
+            entries.append(
+                {
+                    "memory_id": unit.memory_id,
+                    "anchor_message_id": unit.anchor_message_id,
+                    "server_id": guild_id,
+                    "channel_id": channel_id,
+                    "owner_user_id": unit.owner_user_id,
+                    "owner_user_name": unit.owner_user_name,
+                    "memory_scope": unit.memory_scope,
+                    "memory_type": unit.memory_type,
+                    "summary_text": summary_text_for_storage,
+                    "memory_text": memory_text_for_embedding,
+                    "raw_context": unit.raw_context,
+                    "source_message_ids": unit.source_message_ids,
+                    "speaker_names": unit.speaker_names,
+                    "keywords": unit.keywords,
+                    "timestamp_iso": unit.timestamp_iso,
+                    "embedding": embedding_vector,
+                    "content_digest": digests[unit.memory_id],
+                }
+            )
+        if not entries:
+            return
 
-            try:
-                await self.embedding_store.upsert_memory_entry(
-                    memory_id=unit.memory_id,
-                    anchor_message_id=unit.anchor_message_id,
-                    server_id=guild_id,
-                    channel_id=channel_id,
-                    owner_user_id=unit.owner_user_id,
-                    owner_user_name=unit.owner_user_name,
-                    memory_scope=unit.memory_scope,
-                    memory_type=unit.memory_type,
-                    summary_text=summary_text_for_storage,
-                    memory_text=memory_text_for_embedding,
-                    raw_context=unit.raw_context,
-                    source_message_ids=unit.source_message_ids,
-                    speaker_names=unit.speaker_names,
-                    keywords=unit.keywords,
-                    timestamp_iso=unit.timestamp_iso,
-                    embedding=embedding_vector,
-                )
-            except Exception as e:
-                logger.error("구조화 메모리 저장 중 오류: %s", e, extra=log_extra, exc_info=True)
+        # 한 윈도우의 유닛을 한 트랜잭션으로 기록한다.
+        try:
+            await self.embedding_store.upsert_many_memory_entries(entries)
+        except Exception as e:
+            logger.error(
+                "구조화 메모리 저장 중 오류: %s",
+                e,
+                extra={'guild_id': guild_id, 'channel_id': channel_id},
+                exc_info=True,
+            )
 
     async def _update_conversation_windows(self, message: discord.Message) -> None:
         """대화 슬라이딩 윈도우(6개, stride=3)를 누적해 별도 테이블에 저장합니다."""
@@ -50,6 +50,25 @@ def _load_reranker_dependencies() -> tuple[Any, Any, Any] | None:
     return AutoTokenizer, AutoModelForSequenceClassification, torch
 
 
+def _apply_reranker_dtype(model: Any, dtype: str | None, device: str, torch_module: Any) -> Any:
+    """모델을 설정한 추론 정밀도로 바꿉니다. 장치와 맞지 않는 조합은 float32로 둡니다."""
+    name = str(dtype or "float32").lower()
+    on_cuda = str(device).startswith("cuda")
+    if name in {"bfloat16", "bf16"}:
+        return model.to(dtype=torch_module.bfloat16)
+    if name in {"float16", "fp16"} and on_cuda:
+        return model.to(dtype=torch_module.float16)
+    if name == "int8" and not on_cuda:
+        return torch_module.ao.quantization.quantize_dynamic(
+            model,
+            {torch_module.nn.Linear},
+            dtype=torch_module.qint8,
+        )
+    if name not in {"float32", "fp32"}:
+        logger.warning("재순위화 정밀도 %s는 device=%s에서 쓸 수 없어 float32로 둡니다.", dtype, device)
+    return model
+
+
 @dataclass
 class RerankerConfig:
     """재순위화 모델 설정."""
@@ -59,6 +78,9 @@ class RerankerConfig:
     batch_size: int = 8
     max_length: int = 512
     score_threshold: float | None = None
+    # 추론 정밀도. "bfloat16"은 가중치를 bf16으로, "int8"은 CPU에서 Linear 층을
+    # 동적 양자화하고, "float16"은 CUDA에서만 쓴다. 나머지는 float32 그대로다.
+    dtype: str = "float32"
 
 
 class Reranker:
@@ -99,6 +121,7 @@ class Reranker:
                 model = model_class.from_pretrained(self.config.model_name)
                 device = self.config.device or ("cuda" if torch_module.cuda.is_available() else "cpu")
                 model.to(device)
+                model = _apply_reranker_dtype(model, self.config.dtype, device, torch_module)
                 model.eval()
                 return tokenizer, model, device
 
@@ -111,7 +134,12 @@ class Reranker:
                     logger.warning("재순위화 모델을 사용할 수 없습니다: %s", exc)
                     self._dependency_warning_logged = True
                 raise RuntimeError("재순위화 모델 로드 실패") from exc
-            logger.info("재순위화 모델 로드 완료: %s (device=%s)", self.config.model_name, device)
+            logger.info(
+                "재순위화 모델 로드 완료: %s (device=%s, dtype=%s)",
+                self.config.model_name,
+                device,
+                self.config.dtype,
+            )
             self._tokenizer = tokenizer
             self._model = model
             self._device = device
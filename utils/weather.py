@@ -10,7 +10,6 @@ import csv
 import difflib
 import math
 import re
-import threading
 import time
 from datetime import datetime, timedelta
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
@@ -33,7 +32,6 @@ _SENSITIVE_QUERY_KEYS = frozenset({
     "key",
     "token",
 })
-_KMA_HTTP_LOCAL = threading.local()
 _KMA_SUCCESS_LOG_STATE: dict[str, tuple[float, int]] = {}
 _KMA_URGENT_SUCCESS_LOG_INTERVAL_SECONDS = 60 * 60
 
@@ -68,20 +66,6 @@ def _should_log_kma_success(
     return should_log
 
 
-def _get_kma_http_session() -> requests.Session:
-    """실행 스레드별 KMA 세션을 재사용해 TLS 연결 비용을 줄입니다.
-
-    requests.Session은 스레드 안전성을 보장하지 않으므로 전역 단일 객체 대신
-    executor 스레드마다 하나씩 둡니다. 연결 풀은 같은 스레드의 다음 호출에서
-    재사용되고 프로세스 종료 시 운영체제가 정리합니다.
-    """
-    session = getattr(_KMA_HTTP_LOCAL, "session", None)
-    if session is None:
-        session = http.get_tlsv12_session()
-        _KMA_HTTP_LOCAL.session = session
-    return session
-
-
 def _mask_sensitive_url(url: str | None) -> str:
     """URL 쿼리 문자열의 민감 키를 마스킹합니다."""
     raw = str(url or "").strip()
@@ -220,15 +204,16 @@ async def _fetch_kma_api(
         else max(1, getattr(config, 'KMA_API_MAX_RETRIES', 3))
     )
     retry_delay = max(0, getattr(config, 'KMA_API_RETRY_DELAY_SECONDS', 2))
+    # 재시도 정책 값은 시도마다 다시 읽지 않고 한 번만 정한다.
+    timeout_seconds = float(timeout) if timeout is not None else float(getattr(config, 'KMA_API_TIMEOUT', 30))
 
     try:
         for attempt in range(1, max_retries + 1):
             try:
-                timeout_seconds = float(timeout) if timeout is not None else float(getattr(config, 'KMA_API_TIMEOUT', 30))
-                
                 req_start = datetime.now()
                 response = await asyncio.to_thread(
-                    _get_kma_http_session().get,
+                    http.shared_get,
+                    "tlsv12",
                     full_url,
                     params=base_params,
                     timeout=timeout_seconds,